@@ -0,0 +1,92 @@
+-- 020_authz_context.sql
+-- The per-request AUTHZ CONTEXT in ONE round-trip (latency — no behavior change).
+--
+-- WHY: resolve_membership (src/api/dependencies.py) built the authz.Membership from four sequential
+-- PostgREST reads — firm_memberships⋈firms (firm + role), screens, delegations (plus one
+-- get_user_firm PER delegator to bound the grant), matter_memberships — and accessible_vault_owner
+-- repeated the firm / staffing / screen reads again for every vault load. On a chat request that is
+-- 6-10 round-trips of pure authz before retrieval starts. This function returns the same four inputs
+-- as one JSON object so the app resolves them with a single RPC (db.SupabaseManager.authz_context),
+-- then caches the result for a few seconds per (user, firm) (src/components/authz_cache.py).
+--
+-- EQUIVALENCE (the gate is the contract — eval/test_authz_cache.py): every field mirrors the query it
+-- replaces, with the SAME filters:
+--   • firm      — the user's membership in p_firm, or (p_firm NULL) their OLDEST membership (AUDIT FIX
+--                 #2: deterministic active firm). {id, name, role}; NULL when no membership.
+--   • screened_vault_ids — screens WHERE user_id = p_user AND removed_at IS NULL AND firm_id = firm.
+--   • delegations — ACTIVE rows (revoked_at IS NULL AND expires_at > now()) for this delegate in the
+--                 firm, each with the DELEGATOR's CURRENT role in that firm. The app intersects the
+--                 verbs with caps_for_role(delegator_role) — the T1 bound stays in Python, next to the
+--                 capability matrix, so there is still exactly one source of truth for role caps.
+--   • matter_vault_ids — matter_memberships WHERE user_id = p_user AND firm_id = firm.
+-- When the user has no firm, the firm-scoped sets are resolved UNSCOPED (firm_id filter omitted) —
+-- exactly what the per-table reads did with firm_id=None.
+--
+-- SECURITY: SECURITY DEFINER (it must read `screens` regardless of the caller's RLS — the same reason
+-- db.screened_vault_ids uses the service-role client: a screened paralegal's JWT sees 0 screen rows).
+-- It therefore takes p_user explicitly and EXECUTE is granted to service_role ONLY — the app calls it
+-- from the service-role client with the VERIFIED user id; an authenticated/anon caller cannot ask for
+-- another user's context. search_path pinned (standard SECURITY DEFINER hardening, as in 016).
+--
+-- APPLY: additive (one function, no table/policy change). Until it is applied, db.authz_context sees a
+-- missing-function error and falls back to the per-table reads — byte-identical to pre-020.
+-- ROLLBACK: DROP FUNCTION IF EXISTS public.authz_context(UUID, UUID);
+
+CREATE OR REPLACE FUNCTION public.authz_context(p_user UUID, p_firm UUID DEFAULT NULL)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  WITH m AS (
+    SELECT fm.firm_id, fm.role, f.name
+    FROM firm_memberships fm
+    JOIN firms f ON f.id = fm.firm_id
+    WHERE fm.user_id = p_user
+      AND (p_firm IS NULL OR fm.firm_id = p_firm)
+    ORDER BY fm.created_at ASC
+    LIMIT 1
+  ),
+  scope AS (
+    -- The firm every set below is scoped to: the resolved membership, else the requested firm.
+    SELECT COALESCE((SELECT firm_id FROM m), p_firm) AS firm_id
+  )
+  SELECT jsonb_build_object(
+    'firm', (SELECT jsonb_build_object('id', m.firm_id, 'name', m.name, 'role', m.role) FROM m),
+    'screened_vault_ids', COALESCE((
+      SELECT jsonb_agg(DISTINCT s.vault_id)
+      FROM screens s, scope
+      WHERE s.user_id = p_user
+        AND s.removed_at IS NULL
+        AND (scope.firm_id IS NULL OR s.firm_id = scope.firm_id)
+    ), '[]'::jsonb),
+    'delegations', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('verbs', d.verbs, 'delegator_role', dm.role))
+      FROM delegations d
+      CROSS JOIN scope
+      LEFT JOIN LATERAL (
+        SELECT fm2.role
+        FROM firm_memberships fm2
+        WHERE fm2.user_id = d.delegator_id
+          AND (scope.firm_id IS NULL OR fm2.firm_id = scope.firm_id)
+        ORDER BY fm2.created_at ASC
+        LIMIT 1
+      ) dm ON TRUE
+      WHERE d.delegate_id = p_user
+        AND d.revoked_at IS NULL
+        AND d.expires_at > now()
+        AND (scope.firm_id IS NULL OR d.firm_id = scope.firm_id)
+    ), '[]'::jsonb),
+    'matter_vault_ids', COALESCE((
+      SELECT jsonb_agg(DISTINCT mm.vault_id)
+      FROM matter_memberships mm, scope
+      WHERE mm.user_id = p_user
+        AND (scope.firm_id IS NULL OR mm.firm_id = scope.firm_id)
+    ), '[]'::jsonb)
+  );
+$$;
+
+REVOKE ALL ON FUNCTION public.authz_context(UUID, UUID) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.authz_context(UUID, UUID) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.authz_context(UUID, UUID) TO service_role;
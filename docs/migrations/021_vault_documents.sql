@@ -0,0 +1,62 @@
+-- 021_vault_documents.sql
+-- A vault's documents (+ their routing summaries) in ONE round-trip (latency — no behavior change).
+--
+-- WHY: SupabaseManager.get_collection_documents was three dependent reads after the access gate —
+-- collection_documents⋈collections (the member doc ids), then `documents .in_(ids)` — and the Stage-1
+-- router (DocumentRouter.route_ranked) added a fourth, `document_summaries .in_(ids)`, on EVERY
+-- collection query. On a 200-doc vault the two `.in_()` reads also ship a 200-id URL each. This
+-- function returns the full `documents` rows for the vault, optionally merged with each doc's
+-- `summary` + `topic_embedding`, from one owner-scoped join (db.SupabaseManager.get_vault_documents).
+--
+-- EQUIVALENCE (the gate is the contract — eval/test_vault_documents.py): the row set is exactly what
+-- the per-table reads returned, with the SAME filters —
+--   • membership  — collection_documents WHERE collection_id = p_collection, joined to collections
+--                   WHERE collections.user_id = p_owner (the `collections!inner(user_id)` join);
+--   • documents   — documents WHERE id ∈ members AND user_id = p_owner;
+--   • summaries   — LEFT JOIN document_summaries ON document_id AND user_id = p_owner (a doc with no
+--                   summary yet is still returned, with summary / topic_embedding NULL — the router
+--                   scores it by filename, recall-first).
+-- Row shape: to_jsonb(documents.*), plus `summary` / `topic_embedding` when p_with_summaries.
+--
+-- ACCESS: this function is NOT the gate. p_owner is the owner RESOLVED by accessible_vault_owner (the
+-- F2m matter-access authority: own vault, or staffed + same firm + not screened), which the app runs
+-- FIRST and which returns [] without calling this on no access. The function only bounds the read to
+-- that owner's docs in that vault. SECURITY INVOKER (the app calls it from the service-role client,
+-- like the per-table reads it replaces); EXECUTE granted to service_role ONLY so a user JWT cannot name
+-- an arbitrary p_owner (RLS would bound it anyway — this keeps the surface identical to 020).
+--
+-- APPLY: additive (one function, no table/policy change). Until it is applied get_vault_documents sees a
+-- missing-function error and falls back to the per-table reads — byte-identical to pre-021.
+-- ROLLBACK: DROP FUNCTION IF EXISTS public.vault_documents(UUID, UUID, BOOLEAN);
+
+CREATE OR REPLACE FUNCTION public.vault_documents(
+  p_owner UUID,
+  p_collection UUID,
+  p_with_summaries BOOLEAN DEFAULT TRUE
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  SELECT COALESCE(jsonb_agg(
+    CASE WHEN p_with_summaries
+      THEN to_jsonb(d) || jsonb_build_object('summary', s.summary, 'topic_embedding', s.topic_embedding)
+      ELSE to_jsonb(d)
+    END
+    ORDER BY d.created_at, d.id
+  ), '[]'::jsonb)
+  FROM collection_documents cd
+  JOIN collections c ON c.id = cd.collection_id AND c.user_id = p_owner
+  JOIN documents d ON d.id = cd.document_id AND d.user_id = p_owner
+  LEFT JOIN document_summaries s
+    ON p_with_summaries AND s.document_id = d.id AND s.user_id = p_owner
+  WHERE cd.collection_id = p_collection;
+$$;
+
+-- No new index: the membership probe (`collection_documents WHERE collection_id = ?` → document_id) is
+-- already covered by that table's PRIMARY KEY (collection_id, document_id) — an index-only scan.
+
+REVOKE ALL ON FUNCTION public.vault_documents(UUID, UUID, BOOLEAN) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.vault_documents(UUID, UUID, BOOLEAN) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.vault_documents(UUID, UUID, BOOLEAN) TO service_role;
@@ -0,0 +1,51 @@
+-- 022_routing_clusters.sql
+-- Hierarchical Stage-1 routing: per-vault topic CLUSTERS, persisted next to document_summaries.
+--
+-- WHY: the router scores every doc in a vault (flat scan). For the firm-wide matters being onboarded
+-- (thousands of docs) that is both the latency floor and the recall risk (retrieve_across_files then
+-- truncates to ROUTING_MAX_FANOUT). src/components/routing_clusters.py k-means-clusters each large
+-- vault's topic_embeddings OFFLINE (the Celery worker, after a doc's summary lands), and the router
+-- scores the query against the cluster CENTROIDS first, then only the docs inside the best clusters.
+--
+-- TABLES (both keyed by vault — a doc can sit in several vaults, each clustered on its own):
+--   • routing_clusters        — one row per (vault, cluster): the unit centroid (JSON array text, like
+--                               document_summaries.topic_embedding — cosine is done in numpy, no
+--                               pgvector), its size, and how many docs the last FULL fit saw (the
+--                               incremental refresh re-fits once enough of the vault has changed).
+--   • routing_cluster_members — one row per (vault, doc): its cluster. A doc added since the last
+--                               refresh has no row yet; the router assigns it to its nearest centroid
+--                               in memory, so it is never unroutable.
+--
+-- ACCESS: owned by the vault OWNER (user_id), same policy shape as document_summaries. The API reads
+-- them through the service-role client only AFTER accessible_vault_owner resolved the owner (the same
+-- contract as get_vault_documents, 021), scoped to that owner; the worker writes them service-role.
+--
+-- APPLY: additive. Until applied, the router sees no clusters and keeps the flat scan — byte-identical.
+-- ROLLBACK: DROP TABLE IF EXISTS routing_cluster_members; DROP TABLE IF EXISTS routing_clusters;
+
+CREATE TABLE IF NOT EXISTS routing_clusters (
+  collection_id     UUID NOT NULL REFERENCES collections(id) ON DELETE CASCADE,
+  cluster_id        INT  NOT NULL,
+  user_id           UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  centroid          TEXT NOT NULL,             -- unit-norm centroid, JSON array
+  size              INT  NOT NULL DEFAULT 0,
+  fitted_doc_count  INT  NOT NULL DEFAULT 0,   -- vault size at the last FULL k-means fit
+  updated_at        TIMESTAMPTZ DEFAULT now(),
+  PRIMARY KEY (collection_id, cluster_id)
+);
+
+CREATE TABLE IF NOT EXISTS routing_cluster_members (
+  collection_id  UUID NOT NULL REFERENCES collections(id) ON DELETE CASCADE,
+  document_id    UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+  user_id        UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  cluster_id     INT  NOT NULL,
+  PRIMARY KEY (collection_id, document_id)
+);
+
+ALTER TABLE routing_clusters ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Users see own routing clusters" ON routing_clusters
+  FOR ALL USING (user_id = auth.uid());
+
+ALTER TABLE routing_cluster_members ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Users see own routing cluster members" ON routing_cluster_members
+  FOR ALL USING (user_id = auth.uid());
@@ -272,7 +272,7 @@ def _run_one(config, sb, collection_id, filenames, question, mode):
     answer_parts = []
     t0 = time.perf_counter()
     for ev in run_agent(question, model=model, scope=scope, budget=budget,
-                        system_prompt=sys_prompt, registry=REGISTRY):
+                        system_prompt=sys_prompt, registry=REGISTRY, tracer=tracer):
         tracer.record(ev)
         if ev.get("type") != "token_delta":  # token_delta floods; the tracer keeps it
             events.append(ev)
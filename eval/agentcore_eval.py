@@ -18,6 +18,10 @@ GATE A (the phase bar): WRONG ≤ 1/27 AND CORRECT ≥ 20/27 AND p50 standard la
 loops. ON-DEMAND ONLY, when Jeel asks. Smoke-test with `--limit 1` first.
 
 Run:  python -u eval/agentcore_eval.py [--limit N] [--mode standard|deep] [--out FILE]
+                                      [--tool-concurrency N]
+Per-turn wall time (model call + that turn's tools) and tool-phase wall are recorded per
+question and summarised (p50/p95). `--tool-concurrency 1` reproduces the sequential tool
+execution, so the same run with and without it is the before/after of parallel tool calls.
 Offline structure check (NO API): python -u eval/agentcore_eval.py --dry-run
 """
 import sys, os, json, time, warnings
@@ -64,7 +68,8 @@ def _build_scope(config, sb, collection_id, filenames, question):
 
 
 def _run_one(config, sb, collection_id, filenames, question, mode):
-    """One full agent run. Returns (answer, trace, steps, tokens, abstained, latency_s)."""
+    """One full agent run. Returns (answer, trace, steps, tokens, abstained, latency_s,
+    health, turns) — `turns` is one {step, wall_s, tools, tool_wall_s} per agent step."""
     from src.components.agent_core.budgets import budget_for
     from src.components.agent_core.model import build_model
     from src.components.agent_core.prompt import system_prompt
@@ -82,17 +87,30 @@ def _run_one(config, sb, collection_id, filenames, question, mode):
     trace, answer_parts = [], []
     steps = tokens = 0
     abstained = False
+    turns = []          # per agent step: wall (model + tools) and the tool phase alone
     t0 = time.perf_counter()
     for ev in run_agent(question, model=model, scope=scope, budget=budget,
-                        system_prompt=sys_prompt, registry=REGISTRY):
+                        system_prompt=sys_prompt, registry=REGISTRY, tracer=tracer):
         tracer.record(ev)
         t = ev.get("type")
+        now = time.perf_counter()
+        if t in ("agent_step", "meta") and turns and "wall_s" not in turns[-1]:
+            turn = turns[-1]
+            turn["wall_s"] = round(now - turn.pop("_t"), 2)
+            if "_tool_t" in turn:
+                turn["tool_wall_s"] = round(turn.pop("_tool_end", now) - turn.pop("_tool_t"), 2)
         if t == "agent_step":
             steps = ev.get("n", steps)
+            turns.append({"step": steps, "tools": 0, "_t": now})
         elif t == "tool_call":
             trace.append(f"call {ev.get('name')} {str(ev.get('args_summary'))[:120]}")
+            if turns:
+                turns[-1]["tools"] += 1
+                turns[-1].setdefault("_tool_t", now)
         elif t == "tool_result":
             trace.append(f"  → {ev.get('name')} ok={ev.get('ok')} {str(ev.get('summary'))[:120]}")
+            if turns:
+                turns[-1]["_tool_end"] = now
         elif t == "gate":
             trace.append(f"  GATE {ev.get('name')} pass={ev.get('pass')} {str(ev.get('detail'))[:100]}")
         elif t == "token":
@@ -102,8 +120,14 @@ def _run_one(config, sb, collection_id, filenames, question, mode):
             tokens = ev.get("tokens", tokens)
             abstained = bool(ev.get("abstained", False))
     health = tracer.finish()
+    turns = [{k: v for k, v in tn.items() if not k.startswith("_")} for tn in turns]
     return ("".join(answer_parts).strip(), trace, steps, tokens, abstained,
-            time.perf_counter() - t0, health)
+            time.perf_counter() - t0, health, turns)
+
+
+def _pct(xs, q):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(len(xs) * q))] if xs else 0
 
 
 # rough cost estimate (output-token-dominant; refine per vendor pricing if needed)
@@ -126,6 +150,9 @@ def main():
             mode = (a.split("=", 1)[1] if "=" in a else args[i + 1]).lower()
         elif a.startswith("--out"):
             out = a.split("=", 1)[1] if "=" in a else args[i + 1]
+        elif a.startswith("--tool-concurrency"):
+            from src.components.agent_core import loop as _loop
+            _loop.AGENT_TOOL_CONCURRENCY = int(a.split("=", 1)[1] if "=" in a else args[i + 1])
 
     raw = json.load(open(QUESTIONS))
     meta = next((q for q in raw if "_collection_id" in q), {})
@@ -169,18 +196,21 @@ def main():
     by_type = defaultdict(lambda: {"CORRECT": 0, "ABSTAINED": 0, "WRONG": 0})
     rows = []
     lat_list, cost_list = [], []
+    turn_walls, tool_walls = [], []     # per-turn wall (all turns) / tool phase (tool turns)
 
     for qi, item in enumerate(questions, 1):
         q = item["question"]
         required = item.get("answer_must_include", [])
         qtype = item.get("query_type", "untyped")
         try:
-            answer, trace, steps, tokens, abstained, lat, health = _run_one(
+            answer, trace, steps, tokens, abstained, lat, health, turns = _run_one(
                 config, sb, collection_id, filenames, q, mode)
         except Exception as e:
-            answer, trace, steps, tokens, abstained, lat, health = \
-                "", [f"RUN ERROR: {e}"], 0, 0, True, 0.0, {"flags": [f"run error: {e}"]}
+            answer, trace, steps, tokens, abstained, lat, health, turns = \
+                "", [f"RUN ERROR: {e}"], 0, 0, True, 0.0, {"flags": [f"run error: {e}"]}, []
             print(f"[{qi}] run ERROR: {e}")
+        turn_walls += [tn["wall_s"] for tn in turns if "wall_s" in tn]
+        tool_walls += [tn["tool_wall_s"] for tn in turns if "tool_wall_s" in tn]
         bucket = _classify(q, required, answer, judge_llm)
         buckets[bucket] += 1
         by_type[qtype][bucket] += 1
@@ -192,6 +222,7 @@ def main():
             "answer_head": answer[:200], "steps": steps, "tokens": tokens,
             "latency_s": round(lat, 1), "est_cost_usd": round(cost, 3),
             "abstained": abstained, "health_flags": flags, "trace": trace,
+            "turns": turns,
         })
         print(f"[{qi}/{len(questions)}] {bucket:<9} [{qtype:<16}] {steps}st {lat:.0f}s "
               f"${cost:.2f} | {q[:50]}")
@@ -213,6 +244,10 @@ def main():
     print("=" * 68)
     print(f"  WRONG-rate: {buckets['WRONG']/n:.0%}   p50={p50:.0f}s  p95={p95:.0f}s  "
           f"mean ${mean_cost:.2f}/q")
+    from src.components.agent_core.loop import AGENT_TOOL_CONCURRENCY
+    print(f"  per-turn wall: p50={_pct(turn_walls, .5):.1f}s p95={_pct(turn_walls, .95):.1f}s  "
+          f"tool phase: p50={_pct(tool_walls, .5):.1f}s p95={_pct(tool_walls, .95):.1f}s  "
+          f"(tool concurrency {AGENT_TOOL_CONCURRENCY}, {len(turn_walls)} turns)")
     print("\n  per query_type:")
     for qt, b in sorted(by_type.items()):
         tot = sum(b.values())
@@ -231,7 +266,11 @@ def main():
         json.dump({"mode": mode, "n": n, "buckets": buckets,
                    "p50_s": p50, "p95_s": p95, "mean_cost_usd": round(mean_cost, 3),
                    "by_type": {k: dict(v) for k, v in by_type.items()},
-                   "gate_a": gate_a, "rows": rows}, f, indent=2, default=str)
+                   "gate_a": gate_a,
+                   "tool_concurrency": AGENT_TOOL_CONCURRENCY,
+                   "turn_wall_p50_s": _pct(turn_walls, .5), "turn_wall_p95_s": _pct(turn_walls, .95),
+                   "tool_wall_p50_s": _pct(tool_walls, .5), "tool_wall_p95_s": _pct(tool_walls, .95),
+                   "rows": rows}, f, indent=2, default=str)
     print(f"\n  per-question traces written to {out}")
     return 0
 
@@ -0,0 +1,255 @@
+"""
+Hierarchical Routing Recall — cluster-first routing vs the flat scan.
+
+Measures: of the docs the FLAT router selects (every doc scored), how many does the HIERARCHICAL
+router (query → cluster centroids → docs inside the probed clusters; routing_clusters.py) also
+select?
+
+Formula:  recall_vs_flat@N = |hierarchical_top_N ∩ flat_top_N| / |flat_top_N|
+Averaged over queries. With gold labels (live mode) the gold recall of both routers is reported too.
+
+Flat is the reference because it is exactly what the router did before clustering — hierarchical
+routing is a latency optimisation, so the question it must answer is "what does it lose?". The
+WORST query matters as much as the mean (a mean of 0.988 once hid a query that kept 1 doc of 12);
+`widened` is the share of queries the sampled recall guard widened, `scored` the mean share of
+the vault a hierarchical query scores (the flat scan: 1.0).
+
+Two modes:
+  • synthetic (default, offline, $0): a clustered 2k / 10k-doc vault (topics of uneven size, near-
+    duplicate docs, a share without embeddings) driven through the real DocumentRouter with a stub
+    manager, so the probe floor, MMR and pre-narrow are the production code paths.
+        python -u eval/hierarchical_routing_recall.py [--sizes 2000 10000] [--queries 200]
+  • live: a real collection with persisted clusters (migration 022 applied, refresh task run) and
+    a labelled multi-doc eval file.
+        python -u eval/hierarchical_routing_recall.py --collection <uuid> \\
+            --questions eval/eval_questions_multidoc.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+
+# ── synthetic vault ───────────────────────────────────────────────────────────
+
+def make_vault(n_docs: int, dim: int, rng: np.random.Generator) -> tuple[list, np.ndarray]:
+    """Docs over ~n/40 topics of Zipf-ish size; 3% have no embedding yet. Returns (rows, topic centres)."""
+    n_topics = max(8, n_docs // 40)
+    centres = rng.normal(size=(n_topics, dim))
+    weights = 1.0 / np.arange(1, n_topics + 1) ** 0.7
+    topic = rng.choice(n_topics, size=n_docs, p=weights / weights.sum())
+    rows = []
+    for i in range(n_docs):
+        emb = centres[topic[i]] + 0.45 * rng.normal(size=dim)
+        pending = rng.random() < 0.03
+        rows.append({
+            "id": f"doc-{i:05d}", "filename": f"doc_{i:05d}.pdf",
+            "doc_type": "legal_contract" if i % 3 else "financial_filing", "fiscal_year": 2020 + i % 5,
+            "summary": None if pending else f"topic {topic[i]} agreement",
+            "topic_embedding": None if pending else json.dumps(np.round(emb, 5).tolist()),
+        })
+    return rows, centres
+
+
+def make_queries(rows: list, centres: np.ndarray, n: int, rng: np.random.Generator) -> list:
+    """Half the queries sit near a topic (the common case), half BETWEEN two topics (the hard case)."""
+    qs = []
+    for i in range(n):
+        if i % 2 == 0:
+            q = centres[rng.integers(len(centres))] + 0.6 * rng.normal(size=centres.shape[1])
+        else:
+            a, b = rng.choice(len(centres), size=2, replace=False)
+            q = centres[a] + centres[b] + 0.6 * rng.normal(size=centres.shape[1])
+        qs.append(q.tolist())
+    return qs
+
+
+class _StubManager:
+    """Stands in for SupabaseManager inside DocumentRouter: the vault rows + a persisted model."""
+    rows: list = []
+    clusters: Optional[dict] = None
+
+    def __init__(self, *a, **k):
+        pass
+
+    def get_collection_document_ids(self, cid):
+        return [r["id"] for r in _StubManager.rows]
+
+    def get_vault_documents(self, cid):
+        return _StubManager.rows
+
+    def get_routing_clusters(self, cid):
+        return _StubManager.clusters or {}
+
+
+def _model_rows(model) -> dict:
+    """A ClusterModel in the shape db.get_routing_clusters returns (exercises load_model too)."""
+    return {
+        "centroids": [{"cluster_id": j, "centroid": json.dumps(model.centroids[j].tolist()),
+                       "size": int(model.sizes[j]), "fitted_doc_count": model.fitted_doc_count}
+                      for j in range(model.k)],
+        "members": [{"document_id": d, "cluster_id": c} for d, c in model.members.items()],
+    }
+
+
+def synthetic_recall(n_docs: int, n_queries: int, dim: int, top_n: int, seed: int = 0,
+                     probe_min: Optional[int] = None, guard_check: Optional[int] = None,
+                     sentinels: Optional[int] = None) -> dict:
+    import src.components.db as dbmod
+    import src.components.routing_clusters as rc
+    from src.components.config import Config
+    from src.components.document_router import DocumentRouter
+    from src.components.routing_clusters import fit
+    from src.components.routing_index import VaultRoutingIndex, routing_index_cache
+
+    rng = np.random.default_rng(seed)
+    rows, centres = make_vault(n_docs, dim, rng)
+    queries = make_queries(rows, centres, n_queries, rng)
+
+    t0 = time.perf_counter()
+    model = fit(VaultRoutingIndex.build(rows))
+    fit_s = time.perf_counter() - t0
+
+    flat_cfg, hier_cfg = Config(), Config()
+    flat_cfg.ROUTING_HIERARCHICAL_MIN_DOCS = 0
+    hier_cfg.ROUTING_HIERARCHICAL_MIN_DOCS = min(n_docs, 2000)
+    if probe_min is not None:
+        hier_cfg.ROUTING_CLUSTER_PROBE_MIN = probe_min
+    if guard_check is not None:
+        hier_cfg.ROUTING_CLUSTER_GUARD_CHECK = guard_check
+
+    # Count guard widenings and scored docs (the router imports guard per call).
+    real_guard, real_sentinels, guarded = rc.guard, rc.ROUTING_CLUSTER_SENTINELS, []
+
+    def _counting_guard(index, *a, **k):
+        cand, sims, added = real_guard(index, *a, **k)
+        guarded.append((added > 0, int((~np.isnan(sims)).sum()) / len(index)))
+        return cand, sims, added
+
+    real = dbmod.SupabaseManager
+    dbmod.SupabaseManager = _StubManager
+    rc.guard = _counting_guard
+    if sentinels is not None:
+        rc.ROUTING_CLUSTER_SENTINELS = sentinels
+    _StubManager.rows, _StubManager.clusters = rows, _model_rows(model)
+    try:
+        out = {}
+        for label, cfg in (("flat", flat_cfg), ("hierarchical", hier_cfg)):
+            routing_index_cache.clear()
+            router = DocumentRouter(cfg)
+            router.route_ranked("warm", "vault", "owner", top_n=top_n, query_embedding=queries[0])
+            picks, t0 = [], time.perf_counter()
+            for q in queries:
+                picks.append([d for d, _ in router.route_ranked(
+                    "agreement", "vault", "owner", top_n=top_n, query_embedding=q)])
+            out[label] = (picks, (time.perf_counter() - t0) * 1000 / len(queries))
+    finally:
+        dbmod.SupabaseManager = real
+        rc.guard, rc.ROUTING_CLUSTER_SENTINELS = real_guard, real_sentinels
+
+    flat, hier = out["flat"][0], out["hierarchical"][0]
+    recalls = [len(set(h) & set(f)) / max(1, len(f)) for f, h in zip(flat, hier)]
+    return {
+        "n_docs": n_docs, "k": model.k, "fit_s": fit_s,
+        "recall_vs_flat": float(np.mean(recalls)), "worst": float(np.min(recalls)),
+        "exact": float(np.mean([f == h for f, h in zip(flat, hier)])),
+        "flat_ms": out["flat"][1], "hier_ms": out["hierarchical"][1],
+        "probe_min": hier_cfg.ROUTING_CLUSTER_PROBE_MIN,
+        "sentinels": rc.ROUTING_CLUSTER_SENTINELS if sentinels is None else sentinels,
+        "widened": float(np.mean([w for w, _ in guarded[-len(queries):]])) if guarded else 0.0,
+        "scored": float(np.mean([f for _, f in guarded[-len(queries):]])) if guarded else 1.0,
+    }
+
+
+# ── live vault ────────────────────────────────────────────────────────────────
+
+def compute_hierarchical_recall(
+    questions_path: str,
+    config,
+    collection_id: str,
+    top_n: Optional[int] = None,
+) -> dict:
+    """Flat vs hierarchical DocumentRouter on a real collection with persisted clusters.
+
+    Returns {"recall_vs_flat", "gold_recall_flat", "gold_recall_hier"} averaged over the questions
+    with gold_doc_filenames (gold recalls are None when the file has no labels)."""
+    import copy
+    from src.components.db import SupabaseManager
+    from src.components.document_router import DocumentRouter
+    from src.components.routing_index import routing_index_cache
+
+    with open(questions_path) as f:
+        questions = json.load(f)
+    svc = SupabaseManager(use_service_role=True)
+    owner = (svc.client.table("collections").select("user_id")
+             .eq("id", collection_id).single().execute().data or {}).get("user_id")
+    if not owner:
+        print(f"  [hier_recall] collection {collection_id} not found")
+        return {}
+
+    flat_cfg, hier_cfg = copy.copy(config), copy.copy(config)
+    flat_cfg.ROUTING_HIERARCHICAL_MIN_DOCS = 0
+    hier_cfg.ROUTING_HIERARCHICAL_MIN_DOCS = 1
+    top_n = top_n or getattr(config, "ROUTING_TOP_N", 12)
+
+    vs_flat, gold_flat, gold_hier = [], [], []
+    for item in questions:
+        picks = {}
+        for label, cfg in (("flat", flat_cfg), ("hier", hier_cfg)):
+            routing_index_cache.clear()
+            picks[label] = set(DocumentRouter(cfg).route(item["question"], collection_id, owner, top_n=top_n))
+        vs_flat.append(len(picks["hier"] & picks["flat"]) / max(1, len(picks["flat"])))
+        gold = set(item.get("gold_doc_filenames") or [])
+        if gold:
+            gold_flat.append(len(picks["flat"] & gold) / len(gold))
+            gold_hier.append(len(picks["hier"] & gold) / len(gold))
+        print(f"  Q: {item['question'][:55]:<55} | vs_flat={vs_flat[-1]:.2f}"
+              + (f" gold flat={gold_flat[-1]:.2f} hier={gold_hier[-1]:.2f}" if gold else ""))
+
+    res = {
+        "recall_vs_flat": float(np.mean(vs_flat)) if vs_flat else 1.0,
+        "gold_recall_flat": float(np.mean(gold_flat)) if gold_flat else None,
+        "gold_recall_hier": float(np.mean(gold_hier)) if gold_hier else None,
+    }
+    print(f"\n  Hierarchical recall vs flat @{top_n}: {res['recall_vs_flat']:.4f}")
+    return res
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Hierarchical routing recall vs the flat scan")
+    ap.add_argument("--collection", help="live mode: collection UUID with persisted clusters")
+    ap.add_argument("--questions", default="eval/eval_questions_multidoc.json")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[2000, 10000])
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--dim", type=int, default=256, help="synthetic embedding dimension (prod: 1536)")
+    ap.add_argument("--top-n", type=int, default=12)
+    ap.add_argument("--probe-min", type=int, default=None, help="override ROUTING_CLUSTER_PROBE_MIN")
+    ap.add_argument("--guard-check", type=int, default=None,
+                    help="override ROUTING_CLUSTER_GUARD_CHECK (0 = no recall guard)")
+    ap.add_argument("--sentinels", type=int, default=None, help="override ROUTING_CLUSTER_SENTINELS")
+    args = ap.parse_args()
+
+    import logging
+    logging.getLogger("src.components.document_router").setLevel(logging.WARNING)
+
+    if args.collection:
+        from src.components.config import Config
+        compute_hierarchical_recall(args.questions, Config(), args.collection, args.top_n)
+        sys.exit(0)
+
+    print(f"\n  {'docs':>6} | {'k':>4} | {'fit s':>6} | {'probe≥':>6} | {'sent':>4} | {'recall vs flat':>14} | "
+          f"{'worst':>5} | {'exact':>5} | {'widened':>7} | {'scored':>6} | {'flat ms':>7} | {'hier ms':>7}")
+    print("  " + "-" * 114)
+    for n in args.sizes:
+        r = synthetic_recall(n, args.queries, args.dim, args.top_n, probe_min=args.probe_min,
+                             guard_check=args.guard_check, sentinels=args.sentinels)
+        print(f"  {r['n_docs']:>6} | {r['k']:>4} | {r['fit_s']:>6.1f} | {r['probe_min']:>6} | "
+              f"{r['sentinels']:>4} | {r['recall_vs_flat']:>14.4f} | {r['worst']:>5.2f} | {r['exact']:>5.2f} | "
+              f"{r['widened']:>7.3f} | {r['scored']:>6.3f} | {r['flat_ms']:>7.2f} | {r['hier_ms']:>7.2f}")
@@ -0,0 +1,116 @@
+"""
+MMR Micro-benchmark — vectorized `_mmr_select` vs the per-pair reference loop.
+
+Measures: wall time of the router's diversity-aware selection at 100 / 1k / 10k candidates,
+and PROVES the array form selects exactly what the original per-pair `_cosine` loop did
+(same filenames, same order) on every trial.
+
+Candidate sets mimic a real vault: topic clusters of near-duplicate docs (the Entry-7 case MMR
+exists for), a share of docs with no topic embedding yet (relevance-only), and tied keyword
+scores among those. The reference below is the pre-vectorization implementation, verbatim.
+
+    python -u eval/mmr_benchmark.py              # 100 / 1k / 10k, 5 trials each
+    python -u eval/mmr_benchmark.py --quick      # 100 / 1k only
+
+Exit code 1 if any trial selects differently — usable as a gate.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from src.components.document_router import _cosine, _mmr_select  # noqa: E402
+
+
+def mmr_select_reference(
+    candidates: list[tuple[float, str, Optional[list]]],
+    top_n: int,
+    lambda_relevance: float = 0.7,
+) -> list[str]:
+    """The per-pair MMR loop the router shipped before vectorization (kept here as the oracle)."""
+    if top_n <= 0 or not candidates:
+        return []
+    pool = sorted(candidates, key=lambda c: c[0], reverse=True)
+    if len(pool) <= top_n:
+        return [fn for _, fn, _ in pool]
+
+    selected: list[tuple[float, str, Optional[list]]] = [pool.pop(0)]
+    while pool and len(selected) < top_n:
+        best_idx, best_mmr = 0, -1e9
+        for i, (rel, _fn, vec) in enumerate(pool):
+            if vec is None:
+                redundancy = 0.0
+            else:
+                redundancy = max(
+                    (_cosine(vec, s_vec) for _, _, s_vec in selected if s_vec is not None),
+                    default=0.0,
+                )
+            mmr = lambda_relevance * rel - (1.0 - lambda_relevance) * redundancy
+            if mmr > best_mmr:
+                best_mmr, best_idx = mmr, i
+        selected.append(pool.pop(best_idx))
+    return [fn for _, fn, _ in selected]
+
+
+def make_candidates(n: int, dim: int, rng: np.random.Generator) -> list:
+    """n candidates over n/20 topic clusters; ~10% without a vector (tied keyword relevance).
+
+    The query leans on three clusters, so the relevant docs are near-duplicates of each other —
+    the case where MMR's redundancy term actually decides the picks."""
+    n_clusters = max(4, n // 20)
+    centers = rng.normal(size=(n_clusters, dim))
+    query = centers[:3].sum(axis=0) + 0.5 * rng.normal(size=dim)
+    out = []
+    for i in range(n):
+        if rng.random() < 0.1:
+            out.append((float(rng.integers(0, 4)) / 12, f"kw_{i}.pdf", None))
+            continue
+        vec = centers[i % n_clusters] + 0.2 * rng.normal(size=dim)
+        out.append((_cosine(query, vec), f"doc_{i}.pdf", vec.astype(np.float32)))
+    return out
+
+
+def run(sizes, trials: int, dim: int, top_n: int, seed: int) -> bool:
+    rng = np.random.default_rng(seed)
+    all_match = True
+    print(f"\n  {'candidates':>10} | {'λ':>4} | {'reference ms':>12} | {'vectorized ms':>13} | {'speedup':>7} | same")
+    print("  " + "-" * 68)
+    for n in sizes:
+        for lam in (0.7, 0.4):
+            ref_t = vec_t = 0.0
+            same = True
+            for _ in range(trials):
+                cands = make_candidates(n, dim, rng)
+                t0 = time.perf_counter()
+                want = mmr_select_reference(list(cands), top_n, lam)
+                ref_t += time.perf_counter() - t0
+                t0 = time.perf_counter()
+                got = _mmr_select(list(cands), top_n, lam)
+                vec_t += time.perf_counter() - t0
+                same = same and got == want
+            all_match = all_match and same
+            ref_ms, vec_ms = ref_t * 1000 / trials, vec_t * 1000 / trials
+            print(f"  {n:>10} | {lam:>4} | {ref_ms:>12.2f} | {vec_ms:>13.2f} | "
+                  f"{ref_ms / max(vec_ms, 1e-9):>6.0f}× | {'yes' if same else 'NO'}")
+    return all_match
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--quick", action="store_true", help="skip the 10k-candidate size")
+    ap.add_argument("--trials", type=int, default=5)
+    ap.add_argument("--dim", type=int, default=256, help="embedding dimension (prod: 1536)")
+    ap.add_argument("--top-n", type=int, default=12)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    sizes = [100, 1000] if args.quick else [100, 1000, 10000]
+    ok = run(sizes, args.trials, args.dim, args.top_n, args.seed)
+    print(f"\n  Selection identical to the reference on every trial: {'YES' if ok else 'NO'}")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,317 @@
+"""Authz-context cache gate — one DB read per request, short-TTL reuse, never a stale wall (offline, $0).
+
+resolve_membership / accessible_vault_owner / the retrieval-layer wall used to read firm_memberships,
+screens, delegations and matter_memberships separately, several times per request. They now share
+ONE authz context (db.SupabaseManager.authz_context — a single `authz_context` RPC, migration 020),
+cached across requests for a few seconds (src/components/authz_cache.py). This gate pins the contract:
+
+  A. The cache itself: TTL expiry, LRU bound, invalidate_user / invalidate_firm, a put that races an
+     invalidation is DROPPED (epoch), TTL=0 disables it, and an internal fault is a MISS (fail closed).
+  B. ONE READ PER REQUEST: require_cap's resolve + assert_vault_not_screened + accessible_vault_owner
+     on a staffed matter cost exactly one authz RPC (the vault row read is data, not authz).
+  C. CROSS-REQUEST: the next request in the TTL reuses the context (0 RPCs) — but the ETHICAL WALL is
+     re-read directly (a cached context never answers the screen check).
+  D. INVALIDATION (T7): create_screen / remove_screen / un-staff / role change bust the cache — the
+     next request re-resolves and the new screen blocks.
+  E. FAIL CLOSED: an RPC fault falls back to the per-table reads; a screen-read fault denies entry
+     (503) and is never cached; RPC missing (020 unapplied) ⇒ byte-identical per-table resolution.
+
+    python -u eval/test_authz_cache.py
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import HTTPException  # noqa: E402
+
+from src.api.dependencies import assert_vault_not_screened, resolve_membership  # noqa: E402
+from src.components.authz_cache import AuthzContextCache, authz_cache  # noqa: E402
+from src.components.db import SupabaseManager  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+FIRM = "firm-A"
+OWNER = "user-owner"
+PARA = "user-para"
+VAULT = "vault-V"
+
+
+# ── A fake PostgREST client over in-memory tables + the authz_context RPC (counts every read) ──
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, world, table):
+        self._w, self._t = world, table
+        self._filters: dict = {}
+        self._nulls: list = []
+        self._op = "select"
+        self._payload = None
+
+    def select(self, *_a, **_k):
+        return self
+
+    def eq(self, col, val):
+        self._filters[col] = str(val)
+        return self
+
+    def is_(self, col, _val):
+        self._nulls.append(col)
+        return self
+
+    def gt(self, *_a, **_k):
+        return self
+
+    def order(self, *_a, **_k):
+        return self
+
+    def limit(self, *_a, **_k):
+        return self
+
+    def insert(self, row):
+        self._op, self._payload = "insert", row
+        return self
+
+    def update(self, row):
+        self._op, self._payload = "update", row
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    def _match(self, r):
+        return (all(str(r.get(k)) == v for k, v in self._filters.items())
+                and all(r.get(c) is None for c in self._nulls))
+
+    def execute(self):
+        self._w.reads.append(self._t)
+        if self._t == "screens" and self._w.screen_fault:
+            raise RuntimeError("simulated live fault on screens")
+        rows = self._w.tables.setdefault(self._t, [])
+        if self._op == "insert":
+            row = dict(self._payload, id=f"{self._t}-{len(rows) + 1}", removed_at=None)
+            rows.append(row)
+            return _Result([row])
+        hits = [r for r in rows if self._match(r)]
+        if self._op == "update":
+            for r in hits:
+                r.update(self._payload)
+        elif self._op == "delete":
+            for r in hits:
+                rows.remove(r)
+        return _Result([dict(r) for r in hits])
+
+
+class _Rpc:
+    def __init__(self, world, params):
+        self._w, self._p = world, params
+
+    def execute(self):
+        self._w.reads.append("rpc:authz_context")
+        if self._w.rpc_missing:
+            raise RuntimeError("PGRST202: Could not find the function public.authz_context")
+        if self._w.rpc_fault:
+            raise RuntimeError("simulated RPC timeout")
+        uid = self._p["p_user"]
+        t = self._w.tables
+        fm = [m for m in t.get("firm_memberships", []) if m["user_id"] == uid]
+        firm = {"id": fm[0]["firm_id"], "name": "Firm", "role": fm[0]["role"]} if fm else None
+        fid = firm["id"] if firm else None
+        return _Result({
+            "firm": firm,
+            "screened_vault_ids": [s["vault_id"] for s in t.get("screens", [])
+                                   if s["user_id"] == uid and s.get("removed_at") is None
+                                   and (fid is None or s["firm_id"] == fid)],
+            "delegations": [],
+            "matter_vault_ids": [m["vault_id"] for m in t.get("matter_memberships", [])
+                                 if m["user_id"] == uid and (fid is None or m["firm_id"] == fid)],
+        })
+
+
+class _World:
+    def __init__(self):
+        self.tables = {
+            "collections": [{"id": VAULT, "user_id": OWNER, "firm_id": FIRM}],
+            "firm_memberships": [{"user_id": OWNER, "firm_id": FIRM, "role": "managing_partner"},
+                                 {"user_id": PARA, "firm_id": FIRM, "role": "paralegal"}],
+            "matter_memberships": [{"id": "mm-1", "firm_id": FIRM, "vault_id": VAULT, "user_id": PARA}],
+            "screens": [],
+        }
+        self.reads: list = []
+        self.rpc_missing = False
+        self.rpc_fault = False
+        self.screen_fault = False
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, _name, params):
+        return _Rpc(self, params)
+
+
+def _request(world, user, cache):
+    """A fresh per-request manager (what dependencies.get_current_user builds), opted into `cache`."""
+    m = SupabaseManager.__new__(SupabaseManager)
+    m._user = type("U", (), {"id": user, "email": f"{user}@x", "user_metadata": {}})()
+    m.client = world
+    m._access_token = None
+    m._read_client = None
+    m._authz_cache = cache
+    m.get_user_firm = lambda *a, **k: next(
+        ({"id": r["firm_id"], "name": "Firm", "role": r["role"]}
+         for r in world.tables["firm_memberships"] if r["user_id"] == (k.get("user_id") or user)), {})
+    return m
+
+
+def _authz_reads(world):
+    return [r for r in world.reads if r != "collections"]
+
+
+print("\n── A. The cache: TTL, LRU, invalidation, epoch race, disabled, fail-closed ──")
+c = AuthzContextCache(ttl_s=0.2, max_entries=2)
+ctx = {"firm": {"id": FIRM}, "screened_vault_ids": frozenset()}
+c.put(PARA, None, ctx, c.epoch())
+check("A: a put is served on the next get", c.get(PARA, None) is ctx)
+check("A: keyed by (user, firm) — a named firm is a different entry", c.get(PARA, FIRM) is None)
+time.sleep(0.25)
+check("A: an entry past its TTL is a miss", c.get(PARA, None) is None)
+c.put("u1", None, ctx, c.epoch()); c.put("u2", None, ctx, c.epoch()); c.put("u3", None, ctx, c.epoch())
+check("A: LRU bound evicts the oldest entry", c.get("u1", None) is None and c.get("u3", None) is ctx)
+ep = c.epoch()
+c.invalidate_user("someone-else")
+c.put(PARA, None, ctx, ep)
+check("A: a put that raced ANY invalidation is dropped (epoch moved)", c.get(PARA, None) is None)
+c.put(PARA, None, ctx, c.epoch())
+c.invalidate_user(PARA)
+check("A: invalidate_user drops that user's contexts", c.get(PARA, None) is None)
+c.put(PARA, None, ctx, c.epoch())
+c.invalidate_firm(FIRM)
+check("A: invalidate_firm drops contexts that resolved to the firm", c.get(PARA, None) is None)
+off = AuthzContextCache(ttl_s=0)
+off.put(PARA, None, ctx, off.epoch())
+check("A: TTL=0 disables the cross-request layer", off.get(PARA, None) is None)
+broken = AuthzContextCache(ttl_s=5)
+broken._entries = None   # any internal fault…
+check("A: an internal cache fault is a MISS, never a grant (fail closed)", broken.get(PARA, None) is None)
+
+
+print("\n── B. One authz read per request (require_cap + wall + matter read) ──")
+# B–D use the PROCESS singleton — the one dependencies.get_current_user opts managers into and the
+# db.py write hooks invalidate.
+authz_cache.ttl_s = 30
+authz_cache.clear()
+cache = authz_cache
+w = _World()
+sb = _request(w, PARA, cache)
+m = resolve_membership(sb)
+assert_vault_not_screened(sb, VAULT)
+owner = sb.accessible_vault_owner(VAULT)
+check("B: staffed paralegal resolves to the vault owner", owner == OWNER, f"got {owner!r}")
+check("B: membership carries the staffing from the context", VAULT in m.matter_vault_ids)
+check("B: the whole request made exactly ONE authz read (the RPC)",
+      _authz_reads(w) == ["rpc:authz_context"], str(w.reads))
+
+
+print("\n── C. Next request: context reused, wall still re-read directly ──")
+w.reads.clear()
+sb2 = _request(w, PARA, cache)
+resolve_membership(sb2)
+assert_vault_not_screened(sb2, VAULT)
+check("C: a second request inside the TTL makes no RPC", "rpc:authz_context" not in w.reads, str(w.reads))
+check("C: …but the ethical wall is re-queried directly (never answered from the cache)",
+      _authz_reads(w) == ["screens"], str(w.reads))
+
+
+print("\n── D. Invalidation on every authz write (T7 — next request sees it) ──")
+w.reads.clear()
+admin = _request(w, OWNER, cache)
+admin.create_screen(FIRM, PARA, VAULT, "conflict: acted for the counterparty")
+sb3 = _request(w, PARA, cache)
+m3 = resolve_membership(sb3)
+check("D: create_screen busts the cache — the next request re-reads the context",
+      "rpc:authz_context" in w.reads and VAULT in m3.screened_vault_ids, str(w.reads))
+blocked = False
+try:
+    assert_vault_not_screened(sb3, VAULT)
+except HTTPException as e:
+    blocked = e.status_code == 403
+check("D: the new screen blocks on the very next request", blocked)
+check("D: and accessible_vault_owner denies the walled member", sb3.accessible_vault_owner(VAULT) is None)
+
+screen_id = w.tables["screens"][0]["id"]
+admin.remove_screen(screen_id, FIRM)
+sb4 = _request(w, PARA, cache)
+check("D: remove_screen busts the cache — access restored next request",
+      VAULT not in resolve_membership(sb4).screened_vault_ids and sb4.accessible_vault_owner(VAULT) == OWNER)
+
+admin.remove_matter_member(FIRM, VAULT, PARA)
+sb5 = _request(w, PARA, cache)
+check("D: un-staffing busts the cache — the matter is gone next request",
+      sb5.accessible_vault_owner(VAULT) is None and VAULT not in resolve_membership(sb5).matter_vault_ids)
+
+admin.change_member_role(PARA, FIRM, "associate")
+check("D: a role change busts the cache firm-wide", resolve_membership(_request(w, PARA, cache)).role == "associate")
+
+
+print("\n── E. Fail closed ──")
+cache_e = AuthzContextCache(ttl_s=30)
+we = _World()
+we.rpc_fault = True
+sbe = _request(we, PARA, cache_e)
+me = resolve_membership(sbe)
+check("E: an RPC fault falls back to the per-table reads (same membership)",
+      VAULT in me.matter_vault_ids and "screens" in we.reads, str(we.reads))
+
+we2 = _World()
+we2.rpc_fault = True
+we2.screen_fault = True
+cache_f = AuthzContextCache(ttl_s=30)
+sbf = _request(we2, PARA, cache_f)
+denied = None
+try:
+    assert_vault_not_screened(sbf, VAULT)
+except HTTPException as e:
+    denied = e.status_code
+check("E: a screen-read fault DENIES vault entry (503), never opens it", denied == 503, f"got {denied}")
+check("E: …and the faulted context was never cached", cache_f.get(PARA, None) is None)
+check("E: accessible_vault_owner fails closed on the same fault", sbf.accessible_vault_owner(VAULT) is None)
+
+wm = _World()
+wm.rpc_missing = True
+sbm = _request(wm, PARA, AuthzContextCache(ttl_s=30))
+mm = resolve_membership(sbm)
+check("E: migration 020 unapplied ⇒ per-table resolution, same membership",
+      mm.role == "paralegal" and mm.firm_id == FIRM and VAULT in mm.matter_vault_ids)
+
+wn = _World()
+sbn = _request(wn, PARA, None)
+resolve_membership(_request(wn, PARA, None))
+resolve_membership(sbn)
+check("E: managers not opted in (worker/offline) never share a context across instances",
+      wn.reads.count("rpc:authz_context") == 2, str(wn.reads))
+
+
+# ── tally ──
+print(f"\n{'='*60}")
+print(f"  test_authz_cache: {_passed} passed, {_failed} failed")
+print(f"{'='*60}")
+sys.exit(0 if _failed == 0 else 1)
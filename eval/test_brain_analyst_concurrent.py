@@ -0,0 +1,215 @@
+"""Brain Analyst concurrency gate — the Analyst overlaps MAP + VERIFY (offline, $0).
+
+brain_query_stream used to await the deterministic Analyst (§4b: grid loads + one spec-LLM
+call) BEFORE Brain.run_stream started, so its whole duration sat in front of brain_start and
+in series with MAP. run_stream now takes ``analyst_fn``, starts it on its own thread as the
+stream opens and joins it just before REDUCE (its only consumer). Scripted models pin it:
+
+  A. TTFE: brain_start arrives long before a slow Analyst finishes.
+  B. OVERLAP: total wall ≈ max(Analyst, MAP+VERIFY), not their sum (vs the old await-first).
+  C. EVENT: exactly one brain_analyst(figures=N), emitted as soon as the Analyst lands —
+     between brain_map events when it is fast, after brain_verify(done) when it is slow —
+     and always before brain_reduce; REDUCE receives the block either way.
+  D. DEGRADE: an Analyst that raises or computes nothing ⇒ no brain_analyst, REDUCE runs
+     without a block, the stream still completes with brain_meta.
+  E. BACK-COMPAT: a precomputed analyst_block / analyst_count still announces right after
+     brain_start and reaches REDUCE.
+
+    python -u eval/test_brain_analyst_concurrent.py
+"""
+from __future__ import annotations
+
+import json
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.documents import Document  # noqa: E402
+
+from src.components.brain.map_reduce import Brain  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+class _Resp:
+    def __init__(self, content):
+        self.content = content
+
+
+class ScriptedMap:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def invoke(self, messages):
+        doc = re.search(r"Document \[(\S+) \|", messages[1].content).group(1)
+        time.sleep(self.latency)
+        return _Resp(json.dumps([
+            {"claim": f"{doc} states point {j} is supported.",
+             "verbatim_span": f"{doc} point {j}", "confidence": 0.8}
+            for j in range(2)
+        ]))
+
+
+class ScriptedVerifier:
+    def invoke(self, messages):
+        system, user = messages[0].content, messages[1].content
+        time.sleep(0.01)
+        if '"verdicts"' not in system:
+            return _Resp(json.dumps({"verdict": "x", "confidence": 0.9}))
+        if "ITEM 1" in user:
+            ids = re.findall(r"ITEM (\d+)\n", user)
+        else:
+            ids = re.findall(r"^(\d+)\. ", user.split("SENTENCES FROM THE ANSWER:")[1], re.M)
+        return _Resp(json.dumps({"verdicts": [
+            {"id": int(i), "verdict": "x", "confidence": 0.9} for i in ids]}))
+
+
+class ScriptedReduce:
+    def __init__(self):
+        self.inputs: list[str] = []
+
+    def invoke(self, messages):
+        self.inputs.append(messages[1].content)
+        return _Resp("The docs agree.\n\n## Confidence\n0.9 — fine")
+
+
+def _doc_chunks(n):
+    return {
+        f"doc{d:02d}": (f"f{d:02d}.pdf", [Document(page_content=f"doc{d:02d} text",
+                                                   metadata={"chunk_id": f"doc{d:02d}-c0"})])
+        for d in range(n)
+    }
+
+
+def _brain(map_latency=0.1):
+    brain = Brain(config=object())
+    brain._map_llm = ScriptedMap(map_latency)
+    brain._verify_llm = ScriptedVerifier()
+    brain._reduce_llm = ScriptedReduce()
+    return brain
+
+
+BLOCK = "| Metric | Value |\n|---|---|\n| revenue growth | 12.0% |"
+
+
+def _analyst(delay, result=(BLOCK, 3), exc=None):
+    calls = []
+
+    def fn():
+        calls.append(threading.current_thread().name)
+        time.sleep(delay)
+        if exc is not None:
+            raise exc
+        return result
+    fn.calls = calls
+    return fn
+
+
+def _drain(gen):
+    """(events, seconds-since-start at which each arrived)."""
+    t0, events, at = time.perf_counter(), [], []
+    for line in gen:
+        if line.startswith("data: {"):
+            events.append(json.loads(line[6:]))
+            at.append(time.perf_counter() - t0)
+    return events, at
+
+
+def _kinds(events):
+    return [e["type"] for e in events]
+
+
+# ── A. time to first event ──
+print("\n── A. brain_start does not wait for the Analyst ──")
+brain = _brain()
+fn = _analyst(0.5)
+events, at = _drain(brain.run_stream("q", _doc_chunks(4), analyst_fn=fn))
+check("A: first event is brain_start", events[0]["type"] == "brain_start")
+check("A: brain_start lands well before the 500 ms Analyst finishes", at[0] < 0.1, f"{at[0]*1000:.0f} ms")
+check("A: the Analyst ran once, off the caller's thread",
+      len(fn.calls) == 1 and fn.calls[0].startswith("brain-analyst"), str(fn.calls))
+
+
+# ── B. overlap ──
+print("\n── B. wall ≈ max(Analyst, MAP+VERIFY), not the sum ──")
+ANALYST_S = 0.4
+dc = _doc_chunks(8)          # 8 docs × 100 ms over 4 slots ≈ 200 ms MAP + verify
+
+t0 = time.perf_counter()
+block, count = _analyst(ANALYST_S)()                      # the old await-first route …
+_drain(_brain().run_stream("q", dc, analyst_block=block, analyst_count=count))
+serial_ms = (time.perf_counter() - t0) * 1000
+
+t0 = time.perf_counter()
+_drain(_brain().run_stream("q", dc, analyst_fn=_analyst(ANALYST_S)))   # … vs concurrent
+conc_ms = (time.perf_counter() - t0) * 1000
+print(f"    Analyst awaited first : {serial_ms:7.1f} ms")
+print(f"    Analyst concurrent    : {conc_ms:7.1f} ms  ({serial_ms - conc_ms:+.0f} ms)")
+check("B: concurrent saves most of the Analyst's duration",
+      serial_ms - conc_ms > 0.6 * min(ANALYST_S * 1000, serial_ms - ANALYST_S * 1000),
+      f"{conc_ms:.0f} vs {serial_ms:.0f}")
+
+
+# ── C. the brain_analyst event ──
+print("\n── C. one brain_analyst, as soon as it lands, before brain_reduce ──")
+brain = _brain(map_latency=0.1)
+events, _ = _drain(brain.run_stream("q", _doc_chunks(12), analyst_fn=_analyst(0.15)))
+k = _kinds(events)
+maps = [i for i, x in enumerate(k) if x == "brain_map"]
+check("C: fast Analyst ⇒ exactly one brain_analyst with its figure count",
+      k.count("brain_analyst") == 1 and events[k.index("brain_analyst")]["figures"] == 3)
+check("C: fast Analyst ⇒ announced mid-MAP (between brain_map events)",
+      maps[0] < k.index("brain_analyst") < maps[-1], str(k[:10]))
+check("C: REDUCE received the Analyst block", BLOCK in brain._reduce_llm.inputs[0])
+
+brain = _brain(map_latency=0.02)
+events, _ = _drain(brain.run_stream("q", _doc_chunks(3), analyst_fn=_analyst(0.4)))
+k = _kinds(events)
+done_i = next(i for i, e in enumerate(events) if e["type"] == "brain_verify" and e.get("done"))
+check("C: slow Analyst ⇒ joined after brain_verify(done), before brain_reduce",
+      done_i < k.index("brain_analyst") < k.index("brain_reduce"), str(k))
+check("C: slow Analyst ⇒ REDUCE still waited for the block", BLOCK in brain._reduce_llm.inputs[0])
+
+
+# ── D. degrade ──
+print("\n── D. a failed / empty Analyst never breaks the stream ──")
+for label, fn in (("raises", _analyst(0.05, exc=RuntimeError("grid store down"))),
+                  ("computes nothing", _analyst(0.05, result=(None, 0)))):
+    brain = _brain(map_latency=0.02)
+    events, _ = _drain(brain.run_stream("q", _doc_chunks(3), analyst_fn=fn))
+    k = _kinds(events)
+    check(f"D: Analyst {label} ⇒ no brain_analyst, answer from prose, brain_meta present",
+          "brain_analyst" not in k and "brain_meta" in k
+          and "revenue growth" not in brain._reduce_llm.inputs[0], str(k))
+
+
+# ── E. back-compat ──
+print("\n── E. precomputed analyst_block / analyst_count ──")
+brain = _brain(map_latency=0.02)
+events, _ = _drain(brain.run_stream("q", _doc_chunks(3), analyst_block=BLOCK, analyst_count=2))
+k = _kinds(events)
+check("E: announced right after brain_start",
+      k[:2] == ["brain_start", "brain_analyst"] and events[1]["figures"] == 2, str(k[:3]))
+check("E: REDUCE received the block", BLOCK in brain._reduce_llm.inputs[0])
+
+
+# ── tally ──
+print(f"\n{'='*60}")
+print(f"  test_brain_analyst_concurrent: {_passed} passed, {_failed} failed")
+print(f"{'='*60}")
+sys.exit(0 if _failed == 0 else 1)
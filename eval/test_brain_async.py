@@ -0,0 +1,496 @@
+"""asyncio Brain gate — same events as the threaded Brain, bounded, thread-free, cancellable (offline, $0).
+
+async_brain.AsyncBrain runs MAP → VERIFY → REDUCE as coroutines (ainvoke / astream) on the
+event loop. Scripted models with both sync and async entry points stand in for OpenAI:
+
+  A. PARITY: arun_stream emits the events run_stream emits — normal run, spine withhold,
+     nothing verified, precomputed + concurrent Analyst — and the same answer tokens.
+  B. BOUNDS: one run never has more than LLM_CONCURRENCY LLM calls in flight (verifier
+     per-item fallbacks included); concurrent runs share BRAIN_ASYNC_MAX_INFLIGHT.
+  C. THREADS: with the MAP cache off and no Analyst, a run starts no threads at all.
+  D. CANCELLATION: closing the stream (or cancelling its task, as Starlette does on a
+     disconnect) cancels in-flight MAP calls and starts no new ones; REDUCE grounding too.
+  E. DEGRADE: MAP failure, garbled verifier batch, REDUCE stream failure and a failing
+     Analyst degrade exactly as in the threaded path; clients are shared per (role, model, key);
+     BRAIN_ASYNC is opt-in — /query/brain/stream, driven with a stub config, runs the
+     threaded Brain.run_stream unless BRAIN_ASYNC is set.
+
+    python -u eval/test_brain_async.py
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.documents import Document  # noqa: E402
+
+from src.components.brain import async_brain as AB  # noqa: E402
+from src.components.brain import map_reduce as MR  # noqa: E402
+from src.components.brain.async_brain import AsyncBrain  # noqa: E402
+from src.components.brain.map_cache import MapExtractCache  # noqa: E402
+from src.components.brain.map_reduce import Brain  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+class _Resp:
+    def __init__(self, content):
+        self.content = content
+
+
+class Gauge:
+    """Concurrent-call counter shared by every scripted model of a scenario."""
+
+    def __init__(self):
+        self.now = self.peak = self.started = self.cancelled = 0
+        self.threads: set[int] = set()
+        self.lock = threading.Lock()
+
+    def enter(self):
+        with self.lock:
+            self.now += 1
+            self.started += 1
+            self.peak = max(self.peak, self.now)
+            self.threads.add(threading.active_count())
+
+    def leave(self):
+        with self.lock:
+            self.now -= 1
+
+
+class ScriptedMap:
+    def __init__(self, gauge=None, delay=0.0, fail=(), nothing=(), fast=()):
+        self.gauge = gauge or Gauge()
+        self.delay = delay
+        self.fast = set(fast)     # docs answered without the delay
+        self.fail, self.nothing = set(fail), set(nothing)
+        self.calls: list[str] = []
+
+    def _answer(self, messages):
+        doc = re.search(r"Document \[(\S+) \|", messages[1].content).group(1)
+        self.calls.append(doc)
+        if doc in self.fail:
+            raise RuntimeError("map model 500")
+        if doc in self.nothing:
+            return _Resp("NOTHING_RELEVANT")
+        return _Resp(json.dumps([
+            {"claim": f"{doc} reported revenue growth across the fiscal year.",
+             "verbatim_span": f"{doc} revenue", "confidence": 0.8},
+            {"claim": f"{doc} reported higher operating costs.", "verbatim_span": "", "confidence": 0.7}]))
+
+    def invoke(self, messages):
+        return self._answer(messages)
+
+    async def ainvoke(self, messages):
+        self.gauge.enter()
+        try:
+            doc = re.search(r"Document \[(\S+) \|", messages[1].content).group(1)
+            await asyncio.sleep(0 if doc in self.fast else self.delay)
+            return self._answer(messages)
+        except asyncio.CancelledError:
+            self.gauge.cancelled += 1
+            raise
+        finally:
+            self.gauge.leave()
+
+
+class ScriptedVerifier:
+    """Verdicts alternate by item id; ``garble`` answers batches with junk (→ per-item fallback)."""
+
+    def __init__(self, gauge=None, delay=0.0, garble=False):
+        self.gauge = gauge or Gauge()
+        self.delay = delay
+        self.garble = garble
+
+    def invoke(self, messages):
+        user = messages[1].content
+        if "ITEM 1" in user:
+            if self.garble:
+                return _Resp("not json")
+            ids = re.findall(r"ITEM (\d+)\n", user)
+        elif "SENTENCES FROM THE ANSWER:" in user:
+            ids = re.findall(r"^(\d+)\. ", user.split("SENTENCES FROM THE ANSWER:")[1], re.M)
+        else:
+            return _Resp(json.dumps({"verdict": "x", "confidence": 0.9}))
+        return _Resp(json.dumps({"verdicts": [
+            {"id": int(i), "verdict": "x", "confidence": 0.9 if int(i) % 2 else 0.2} for i in ids]}))
+
+    async def ainvoke(self, messages):
+        self.gauge.enter()
+        try:
+            await asyncio.sleep(self.delay)
+            return self.invoke(messages)
+        except asyncio.CancelledError:
+            self.gauge.cancelled += 1
+            raise
+        finally:
+            self.gauge.leave()
+
+
+_REDUCE_PIECES = ["Revenue grew across ", "every filing this fiscal year.\n| a | b |\n|---|---|\n",
+                  "Operating costs rose in two of the documents. ", "\n## Confid", "ence\n0.8 — fine"]
+
+
+class ScriptedReduce:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def stream(self, messages):
+        for i, p in enumerate(_REDUCE_PIECES):
+            if self.fail and i == 2:
+                raise RuntimeError("reduce stream dropped")
+            yield _Resp(p)
+
+    async def astream(self, messages):
+        for i, p in enumerate(_REDUCE_PIECES):
+            if self.fail and i == 2:
+                raise RuntimeError("reduce stream dropped")
+            await asyncio.sleep(0)
+            yield _Resp(p)
+
+
+def _doc_chunks(n=6):
+    return {f"doc{d:02d}": (f"f{d:02d}.pdf", [Document(page_content=f"doc{d:02d} revenue text",
+                                                       metadata={"chunk_id": f"c{d}"})])
+            for d in range(n)}
+
+
+def _wire(brain, map_llm=None, verify_llm=None, reduce_llm=None):
+    brain._map_llm = map_llm or ScriptedMap()
+    brain._verify_llm = verify_llm or ScriptedVerifier()
+    brain._reduce_llm = reduce_llm or ScriptedReduce()
+    brain._map_cache = MapExtractCache(enabled=False)
+    return brain
+
+
+def _norm(lines):
+    """Events with run-timing fields dropped; sentence verdicts sorted (their interleaving
+    with tokens is timing, their set and indices are not)."""
+    evs, verdicts, figures = [], [], []
+    for line in lines:
+        if not line.startswith("data: {"):
+            evs.append(line)
+            continue
+        e = json.loads(line[6:])
+        if e["type"] == "brain_meta":
+            e["verify"].pop("wall_ms")
+            e["verify"].pop("est_saved_ms")
+        if e["type"] in ("brain_sentence", "brain_retract"):
+            verdicts.append(e)
+        elif e["type"] == "brain_analyst":
+            figures.append(e)
+        else:
+            evs.append(e)
+    return evs, sorted(verdicts, key=lambda v: v["index"]), figures
+
+
+def _sync(q, dc, **kw):
+    return list(_wire(Brain(config=object()), **{k: kw.pop(k) for k in list(kw) if k.endswith("_llm")})
+                .run_stream(q, dc, **kw))
+
+
+async def _acollect(gen, stop_after=None):
+    out = []
+    async for line in gen:
+        out.append(line)
+        if stop_after and stop_after(line):
+            break
+    return out
+
+
+def _async(q, dc, **kw):
+    brain = _wire(AsyncBrain(config=object()), **{k: kw.pop(k) for k in list(kw) if k.endswith("_llm")})
+    return asyncio.run(_acollect(brain.arun_stream(q, dc, **kw)))
+
+
+def _types(lines):
+    return [json.loads(line[6:])["type"] for line in lines if line.startswith("data: {")]
+
+
+# ── A. parity ──
+print("\n── A. same events as the threaded Brain ──")
+MR.LLM_CONCURRENCY = AB.LLM_CONCURRENCY = 1   # one job at a time ⇒ deterministic order on both paths
+dc = _doc_chunks(6)
+for label, kw in [
+    ("normal run", {"map_llm": ScriptedMap(fail={"doc03"}, nothing={"doc04"})}),
+    ("spine withhold", {"spine_abstain": "ratio outside bounds"}),
+    ("nothing verified", {"verify_llm": ScriptedVerifier(), "map_llm": ScriptedMap(nothing=set(dc))}),
+    ("precomputed Analyst", {"analyst_block": "| x | 1 |", "analyst_count": 2}),
+    ("concurrent Analyst", {"analyst_fn": lambda: ("| y | 2 |", 3)}),
+]:
+    s, a = _sync("What was revenue?", dc, **dict(kw)), _async("What was revenue?", dc, **dict(kw))
+    check(f"A: {label} — identical events", _norm(s) == _norm(a),
+          f"\n sync={_types(s)}\n async={_types(a)}")
+s_tokens = [json.loads(x[6:])["content"] for x in s if '"type": "token"' in x]
+a_tokens = [json.loads(x[6:])["content"] for x in a if '"type": "token"' in x]
+check("A: answer tokens identical and in order", s_tokens == a_tokens and len(a_tokens) > 1)
+check("A: ends with brain_meta then [DONE]", a[-1] == "data: [DONE]\n\n" and _types(a)[-1] == "brain_meta")
+
+
+# ── B. bounds ──
+print("\n── B. concurrency bounds ──")
+MR.LLM_CONCURRENCY = AB.LLM_CONCURRENCY = 3
+g = Gauge()
+out = _async("q", _doc_chunks(12), map_llm=ScriptedMap(g, delay=0.02),
+             verify_llm=ScriptedVerifier(g, delay=0.02, garble=True))
+check("B: one run's MAP + VERIFY (fallbacks included) never exceed LLM_CONCURRENCY",
+      g.peak <= 3 and g.started > 12, f"peak={g.peak} started={g.started}")
+check("B: ... and the run still completes", out[-1] == "data: [DONE]\n\n")
+
+old_cap = AB.BRAIN_ASYNC_MAX_INFLIGHT
+AB.BRAIN_ASYNC_MAX_INFLIGHT = 4
+g2 = Gauge()
+
+
+async def _two_runs():
+    runs = [_wire(AsyncBrain(config=object()), ScriptedMap(g2, delay=0.02), ScriptedVerifier(g2, delay=0.02))
+            .arun_stream("q", _doc_chunks(8)) for _ in range(3)]
+    return await asyncio.gather(*(_acollect(r) for r in runs))
+
+try:
+    outs = asyncio.run(_two_runs())
+finally:
+    AB.BRAIN_ASYNC_MAX_INFLIGHT = old_cap
+check("B: three concurrent runs share the per-loop ceiling (≤ BRAIN_ASYNC_MAX_INFLIGHT)",
+      g2.peak <= 4 and all(o[-1] == "data: [DONE]\n\n" for o in outs), f"peak={g2.peak}")
+
+
+# ── C. threads ──
+print("\n── C. no worker threads ──")
+baseline = threading.active_count()
+g3 = Gauge()
+_async("q", _doc_chunks(8), map_llm=ScriptedMap(g3, delay=0.01), verify_llm=ScriptedVerifier(g3, delay=0.01))
+check("C: every LLM call ran with the thread count at its baseline",
+      g3.threads == {baseline}, f"baseline={baseline} seen={g3.threads}")
+
+
+# ── D. cancellation ──
+print("\n── D. a disconnect cancels the in-flight work ──")
+MR.LLM_CONCURRENCY = AB.LLM_CONCURRENCY = 4
+g4 = Gauge()
+m4 = ScriptedMap(g4, delay=0.3, fast={"doc00"})
+
+
+async def _close_early():
+    gen = _wire(AsyncBrain(config=object()), m4, ScriptedVerifier(g4, delay=0.3)).arun_stream(
+        "q", _doc_chunks(10))
+    async for line in gen:         # doc00 maps at once; the other slots are still busy
+        if '"brain_map"' in line:
+            break
+    inflight = g4.now
+    await gen.aclose()             # the client went away
+    started = g4.started
+    await asyncio.sleep(0.5)
+    return inflight, started
+
+inflight, started_at_close = asyncio.run(_close_early())
+check("D: aclose cancels every in-flight LLM call", inflight >= 3 and g4.cancelled == inflight and g4.now == 0,
+      f"inflight={inflight} cancelled={g4.cancelled} now={g4.now}")
+check("D: ... and no further LLM call starts", g4.started == started_at_close < 10,
+      f"started={g4.started} at_close={started_at_close}")
+
+g5 = Gauge()
+
+
+async def _cancel_task():
+    brain = _wire(AsyncBrain(config=object()), ScriptedMap(g5, delay=0.3), ScriptedVerifier(g5))
+    task = asyncio.ensure_future(_acollect(brain.arun_stream("q", _doc_chunks(10))))
+    await asyncio.sleep(0.05)
+    task.cancel()                  # Starlette cancels the response task on disconnect
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    await asyncio.sleep(0.4)
+
+asyncio.run(_cancel_task())
+check("D: cancelling the consumer task cancels the in-flight calls too",
+      g5.cancelled == 4 and g5.started == 4, f"cancelled={g5.cancelled} started={g5.started}")
+
+g6 = Gauge()
+
+
+async def _close_in_reduce():
+    brain = _wire(AsyncBrain(config=object()), ScriptedMap(), ScriptedVerifier(g6, delay=0.3))
+    gen = brain.arun_stream("q", _doc_chunks(2))
+    # MAP + VERIFY (delayed verifier) run to the first REDUCE token, then the client leaves
+    tokens = 0
+    async for line in gen:         # the 2nd token completes the first sentence
+        tokens += '"type": "token"' in line
+        if tokens == 2:
+            break
+    await asyncio.sleep(0.05)
+    inflight = g6.now
+    await gen.aclose()
+    await asyncio.sleep(0.4)
+    return inflight
+
+inflight = asyncio.run(_close_in_reduce())
+check("D: closing mid-REDUCE cancels the sentence-grounding calls", inflight >= 1 and g6.now == 0,
+      f"inflight={inflight} now={g6.now}")
+
+
+# ── E. degrade ──
+print("\n── E. degrade paths ──")
+MR.LLM_CONCURRENCY = AB.LLM_CONCURRENCY = 1
+kw = {"reduce_llm": ScriptedReduce(fail=True)}
+s = _sync("q", dc, **dict(kw))
+a = _async("q", dc, reduce_llm=ScriptedReduce(fail=True))
+check("E: REDUCE stream failure ⇒ same fallback events as the threaded path", _norm(s) == _norm(a))
+meta = json.loads([x for x in a if '"brain_meta"' in x][0][6:])
+check("E: ... keeping the text already streamed (confidence 0.4 × groundedness)",
+      meta["confidence"] <= 0.4 and "Revenue grew" in "".join(
+          json.loads(x[6:])["content"] for x in a if '"type": "token"' in x))
+
+
+def _boom():
+    raise RuntimeError("supabase down")
+
+a = _async("q", dc, analyst_fn=_boom)
+check("E: a failing Analyst ⇒ no brain_analyst, the answer still completes",
+      "brain_analyst" not in _types(a) and a[-1] == "data: [DONE]\n\n")
+s = _sync("q", dc, verify_llm=ScriptedVerifier(garble=True))
+a = _async("q", dc, verify_llm=ScriptedVerifier(garble=True))
+meta = json.loads([x for x in a if '"brain_meta"' in x][0][6:])
+check("E: garbled verifier batch ⇒ per-item fallbacks, same verdicts as the threaded path",
+      _norm(s) == _norm(a) and meta["verify"]["fallback_items"] == 6, str(meta["verify"]))
+
+built = []
+
+
+class _Cfg:
+    LLM_MODEL_NAME = "m"
+    OPENAI_API_KEY = "k"
+
+
+b1, b2 = AsyncBrain(_Cfg()), AsyncBrain(_Cfg())
+c1 = b1._shared("map", "LLM_MODEL_NAME", lambda: built.append(1) or object())
+c2 = b2._shared("map", "LLM_MODEL_NAME", lambda: built.append(1) or object())
+c3 = b2._shared("verify", "LLM_MODEL_NAME", lambda: built.append(1) or object())
+check("E: clients are built once per (role, model, key) and shared across runs",
+      c1 is c2 and c3 is not c1 and len(built) == 2)
+
+env = {k: v for k, v in os.environ.items() if k != "BRAIN_ASYNC"}
+default = subprocess.run(
+    [sys.executable, "-c", "from src.components.config import Config; print(Config.BRAIN_ASYNC)"],
+    cwd=str(Path(__file__).resolve().parent.parent), env=env, capture_output=True, text=True,
+).stdout.strip()
+check("E: opt-in — BRAIN_ASYNC unset ⇒ Config.BRAIN_ASYNC is False", default == "False", default)
+
+# Drive the real /query/brain/stream handler with a stub config and see which Brain runs.
+# Routing, retrieval and the conversation save are stubbed; the Brain classes are swapped
+# for recorders that emit one event naming themselves.
+from types import SimpleNamespace  # noqa: E402
+
+from src.api.routes import chat as CH  # noqa: E402
+
+ran: list[str] = []
+
+
+class _SyncRec:
+    def __init__(self, _cfg):
+        pass
+
+    def run_stream(self, *_a, **_k):
+        ran.append("Brain.run_stream")
+        yield 'data: {"type": "ran", "by": "threaded"}\n\n'
+
+
+class _AsyncRec:
+    def __init__(self, _cfg):
+        pass
+
+    async def arun_stream(self, *_a, **_k):
+        ran.append("AsyncBrain.arun_stream")
+        yield 'data: {"type": "ran", "by": "async"}\n\n'
+
+
+async def _no_embed(*_a, **_k):
+    return []
+
+
+async def _connected():
+    return False
+
+
+def _sync_pass(gen, *_a, **_k):
+    yield from gen
+
+
+async def _async_pass(gen, *_a, **_k):
+    async for x in gen:
+        yield x
+
+
+_retriever = SimpleNamespace(
+    retrieve=lambda *_a, **_k: [Document(page_content="x", metadata={"doc_id": "d1"})])
+_patches = {
+    (MR, "Brain"): _SyncRec, (AB, "AsyncBrain"): _AsyncRec,
+    (CH, "_embed_query"): _no_embed,
+    (CH, "_resolve_collection_filters"): lambda *_a, **_k: ["a.pdf"],
+    (CH, "_owner_scoped_retrieval_mgr"): lambda *_a, **_k: _retriever,
+    (CH, "_saving_stream_wrapper"): _sync_pass, (CH, "_asaving_stream_wrapper"): _async_pass,
+}
+_saved = {k: getattr(*k) for k in _patches}
+
+
+def _drive(cfg) -> tuple[list[str], list[str]]:
+    ran.clear()
+
+    async def go():
+        # __wrapped__: past the slowapi rate-limit decorator, which wants a real Request.
+        resp = await CH.brain_query_stream.__wrapped__(
+            request=SimpleNamespace(is_disconnected=_connected),
+            body=SimpleNamespace(question="q", collection_id="v1", page_filter=None,
+                                 conversation_id=None),
+            sb=SimpleNamespace(user_id="u1"), user_config=cfg,
+            retrieval_mgr=None, generator=None, _cap=None,
+        )
+        return [x async for x in resp.body_iterator]
+
+    return asyncio.run(go()), list(ran)
+
+
+try:
+    for (mod, name), fake in _patches.items():
+        setattr(mod, name, fake)
+    _base = dict(USE_BRAIN=True, EMBEDDING_MODEL_NAME="e", OPENAI_API_KEY="k")
+    ev_unset, ran_unset = _drive(SimpleNamespace(**_base))
+    ev_off, ran_off = _drive(SimpleNamespace(**_base, BRAIN_ASYNC=False))
+    ev_on, ran_on = _drive(SimpleNamespace(**_base, BRAIN_ASYNC=True))
+finally:
+    for (mod, name), orig in _saved.items():
+        setattr(mod, name, orig)
+check("E: opt-in — a config without BRAIN_ASYNC runs the threaded Brain.run_stream",
+      ran_unset == ["Brain.run_stream"] and any('"threaded"' in e for e in ev_unset),
+      f"{ran_unset} {ev_unset}")
+check("E: opt-in — BRAIN_ASYNC=False runs the threaded Brain.run_stream",
+      ran_off == ["Brain.run_stream"] and any('"threaded"' in e for e in ev_off), f"{ran_off}")
+check("E: opt-in — BRAIN_ASYNC=True runs AsyncBrain.arun_stream",
+      ran_on == ["AsyncBrain.arun_stream"] and any('"async"' in e for e in ev_on), f"{ran_on}")
+
+
+# ── tally ──
+print(f"\n{'='*60}")
+print(f"  test_brain_async: {_passed} passed, {_failed} failed")
+print(f"{'='*60}")
+sys.exit(0 if _failed == 0 else 1)
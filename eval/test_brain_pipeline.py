@@ -0,0 +1,243 @@
+"""Brain MAP→VERIFY pipeline gate — no full barrier between the two stages (offline, $0).
+
+Brain.run / run_stream used to wait for EVERY doc's MAP before verifying any claim, so the
+slowest doc left the verifier idle. MAP and VERIFY now share one bounded LLM pool
+(BRAIN_LLM_CONCURRENCY): a doc's claims are queued for verification the moment its MAP lands.
+Scripted models (sleep-based latency, no API) pin the contract:
+
+  A. OVERLAP: with one slow doc, verifier calls start BEFORE the slow doc's MAP finishes.
+  B. BUDGET: MAP + VERIFY calls in flight never exceed LLM_CONCURRENCY.
+  C. DETERMINISM: random MAP latencies across runs ⇒ identical verified claims, order, REDUCE
+     input and answer (doc_chunks order, not completion order); a failed doc is excluded and
+     counted in docs_failed (quorum unchanged).
+  D. STREAM: per-doc brain_verify events arrive before the last brain_map, counts are
+     cumulative and monotonic, and a closing brain_verify(done) carries the totals.
+  E. LATENCY: 12 docs, one straggler — barrier (MAP all, then verify) vs pipelined wall time.
+
+    python -u eval/test_brain_pipeline.py
+"""
+from __future__ import annotations
+
+import json
+import random
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.documents import Document  # noqa: E402
+
+from src.components.brain import map_reduce as MR  # noqa: E402
+from src.components.brain.map_reduce import Brain  # noqa: E402
+from src.components.brain.verifier import VerifyStats, verify_claims  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+class _Resp:
+    def __init__(self, content):
+        self.content = content
+
+
+class _Clock:
+    """Shared in-flight counter + event log across every scripted model."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.inflight = self.peak = 0
+        self.log: list[tuple[str, str, float]] = []
+
+    def enter(self, what):
+        with self.lock:
+            self.inflight += 1
+            self.peak = max(self.peak, self.inflight)
+            self.log.append(("start", what, time.perf_counter()))
+
+    def leave(self, what):
+        with self.lock:
+            self.inflight -= 1
+            self.log.append(("end", what, time.perf_counter()))
+
+
+class ScriptedMap:
+    def __init__(self, clock, latency, fail=()):
+        self.clock, self.latency, self.fail = clock, latency, set(fail)
+
+    def invoke(self, messages):
+        doc = re.search(r"Document \[(\S+) \|", messages[1].content).group(1)
+        self.clock.enter(f"map:{doc}")
+        try:
+            time.sleep(self.latency(doc))
+            if doc in self.fail:
+                raise RuntimeError("map model 500")
+            return _Resp(json.dumps([
+                {"claim": f"{doc} states point {j} is {'unsupported' if j == 2 else 'supported'}.",
+                 "verbatim_span": f"{doc} point {j}", "confidence": 0.8}
+                for j in range(3)
+            ]))
+        finally:
+            self.clock.leave(f"map:{doc}")
+
+
+class ScriptedVerifier:
+    """Latency = base + per_item × items judged (a batched call emits one verdict per item)."""
+
+    def __init__(self, clock, latency=0.03, per_item=0.0):
+        self.clock, self.latency, self.per_item = clock, latency, per_item
+
+    def invoke(self, messages):
+        system, user = messages[0].content, messages[1].content
+        self.clock.enter("verify")
+        try:
+            n = max(1, len(re.findall(r"^ITEM \d+$|^\d+\. ", user, re.M)))
+            time.sleep(self.latency + self.per_item * n)
+            conf = lambda t: 0.1 if "unsupported" in t else 0.9  # noqa: E731
+            if '"verdicts"' not in system:
+                t = re.search(r"(?:CLAIM|SENTENCE FROM THE ANSWER):\s*\n?(.*)", user).group(1)
+                return _Resp(json.dumps({"verdict": "x", "confidence": conf(t)}))
+            if "ITEM 1" in user:
+                items = re.findall(r"ITEM (\d+)\nCLAIM: (.*)", user)
+            else:
+                items = re.findall(r"^(\d+)\. (.*)$", user.split("SENTENCES FROM THE ANSWER:")[1], re.M)
+            return _Resp(json.dumps({"verdicts": [
+                {"id": int(i), "verdict": "x", "confidence": conf(t)} for i, t in items]}))
+        finally:
+            self.clock.leave("verify")
+
+
+class ScriptedReduce:
+    """Echoes the claim order it was given, so the test can see REDUCE's input order."""
+
+    def __init__(self):
+        self.inputs: list[str] = []
+
+    def invoke(self, messages):
+        body = messages[1].content
+        self.inputs.append(body)
+        order = re.findall(r"\[Source: (f\d+\.pdf)\]", body)
+        return _Resp(f"Sources in order: {', '.join(order)}.\n\n## Confidence\n0.9 — fine")
+
+
+def _doc_chunks(n):
+    return {
+        f"doc{d:02d}": (f"f{d:02d}.pdf", [Document(page_content=f"doc{d:02d} text",
+                                                   metadata={"chunk_id": f"doc{d:02d}-c0"})])
+        for d in range(n)
+    }
+
+
+def _brain(clock, map_latency, verify_latency=0.03, fail=(), per_item=0.0):
+    brain = Brain(config=object())
+    brain._map_llm = ScriptedMap(clock, map_latency, fail)
+    brain._verify_llm = ScriptedVerifier(clock, verify_latency, per_item)
+    brain._reduce_llm = ScriptedReduce()
+    return brain
+
+
+# ── A. overlap ──
+print("\n── A. verification overlaps the slow doc's MAP ──")
+clock = _Clock()
+slow = lambda d: 0.4 if d == "doc00" else 0.03  # noqa: E731
+res = _brain(clock, slow).run("q", _doc_chunks(8))
+slow_end = next(t for kind, what, t in clock.log if kind == "end" and what == "map:doc00")
+first_verify = min(t for kind, what, t in clock.log if kind == "start" and what == "verify")
+check("A: a verifier call starts before the slowest MAP finishes", first_verify < slow_end,
+      f"verify@{first_verify - slow_end:+.3f}s vs slow MAP end")
+check("A: every claim still gets its verdict",
+      len(res.claims) == 8 * 2 and all(c.verified for c in res.claims))
+
+
+# ── B. budget ──
+print("\n── B. one bounded LLM budget across MAP + VERIFY ──")
+for budget in (2, 4):
+    old = MR.LLM_CONCURRENCY
+    MR.LLM_CONCURRENCY = budget
+    try:
+        clock = _Clock()
+        _brain(clock, lambda d: random.uniform(0.01, 0.05)).run("q", _doc_chunks(12))
+    finally:
+        MR.LLM_CONCURRENCY = old
+    check(f"B: peak in-flight LLM calls ≤ {budget}", clock.peak <= budget, f"peak={clock.peak}")
+
+
+# ── C. determinism ──
+print("\n── C. deterministic result under random completion order ──")
+runs = []
+for seed in range(4):
+    rnd = random.Random(seed)
+    lat = {f"doc{d:02d}": rnd.uniform(0.0, 0.08) for d in range(10)}
+    brain = _brain(_Clock(), lambda d: lat[d], fail={"doc03"})
+    r = brain.run("q", _doc_chunks(10))
+    runs.append(([c.text for c in r.claims], r.answer, brain._reduce_llm.inputs[0],
+                 [e.doc_id for e in r.per_doc_extracts], r.docs_failed, r.docs_read))
+check("C: identical claims / answer / REDUCE input across runs", all(x == runs[0] for x in runs[1:]))
+check("C: REDUCE sees sources in doc_chunks order",
+      runs[0][1].startswith("Sources in order: f00.pdf, f01.pdf, f02.pdf, f04.pdf"), runs[0][1][:80])
+check("C: per_doc_extracts in doc_chunks order", runs[0][3] == [f"doc{d:02d}" for d in range(10)])
+check("C: a failed MAP doc is excluded + counted (quorum inputs unchanged)",
+      runs[0][4] == 1 and runs[0][5] == 9 and not any("doc03" in t for t in runs[0][0]))
+
+
+# ── D. stream ──
+print("\n── D. streamed progress ──")
+events = []
+for line in _brain(_Clock(), slow).run_stream("q", _doc_chunks(6)):
+    if line.startswith("data: {"):
+        events.append(json.loads(line[6:]))
+kinds = [e["type"] for e in events]
+last_map = max(i for i, k in enumerate(kinds) if k == "brain_map")
+per_doc = [e for e in events if e["type"] == "brain_verify" and not e.get("done")]
+final = [e for e in events if e["type"] == "brain_verify" and e.get("done")]
+check("D: per-doc brain_verify events stream before the last brain_map",
+      kinds.index("brain_verify") < last_map and len(per_doc) == 6)
+check("D: cumulative counts are monotonic",
+      all(a["claims_total"] <= b["claims_total"] and a["claims_verified"] <= b["claims_verified"]
+          for a, b in zip(per_doc, per_doc[1:])) and per_doc[-1]["progress"] == "6/6")
+check("D: one closing brain_verify(done) with the totals, before brain_reduce",
+      len(final) == 1 and final[0]["claims_total"] == 18 and final[0]["claims_verified"] == 12
+      and kinds.index("brain_reduce") > events.index(final[0]))
+
+
+# ── E. latency ──
+print("\n── E. latency, 12 docs (one straggler), 4 LLM slots, verifier 30 ms + 20 ms/item ──")
+lat = lambda d: 0.6 if d == "doc00" else 0.08  # noqa: E731
+dc = _doc_chunks(12)
+
+clock = _Clock()
+brain = _brain(clock, lat, per_item=0.02)
+t0 = time.perf_counter()
+extracts = brain._map_all_docs("q", dc)                       # the old barrier …
+verify_claims([c for e in extracts for c in e.claims], brain._get_verify_llm(),
+              chunk_text=brain._chunk_text_lookup(dc), stats=VerifyStats())
+barrier_ms = (time.perf_counter() - t0) * 1000
+
+clock = _Clock()
+brain = _brain(clock, lat, per_item=0.02)
+t0 = time.perf_counter()
+for _ in brain._map_verify_pipeline("q", dc, VerifyStats()):  # … vs the pipeline
+    pass
+pipe_ms = (time.perf_counter() - t0) * 1000
+print(f"    barrier MAP → VERIFY : {barrier_ms:7.1f} ms")
+print(f"    pipelined            : {pipe_ms:7.1f} ms  ({barrier_ms - pipe_ms:+.0f} ms)")
+check("E: pipelined MAP+VERIFY beats the barrier", pipe_ms < barrier_ms, f"{pipe_ms:.0f} vs {barrier_ms:.0f}")
+
+
+# ── tally ──
+print(f"\n{'='*60}")
+print(f"  test_brain_pipeline: {_passed} passed, {_failed} failed")
+print(f"{'='*60}")
+sys.exit(0 if _failed == 0 else 1)
@@ -0,0 +1,261 @@
+"""Brain REDUCE streaming gate — true token streaming + incremental grounding (offline, $0).
+
+Brain.run_stream used to wait for the whole REDUCE completion AND the whole
+verify_reduce_output pass, then replay the finished answer word by word, so time-to-first-
+token was the entire pipeline. REDUCE now streams from the model; every finished sentence
+goes to the verifier while the rest is still being written (SentenceGrounder) and comes
+back as brain_sentence (grounded) or brain_retract (not entailed). Scripted models pin it:
+
+  A. TTFT: the first token event arrives long before the REDUCE model finishes, and a
+     sentence verdict arrives before the last token.
+  B. FIDELITY: across random chunkings, the concatenated tokens == the final answer ==
+     _parse_reduce_answer(raw) — "## Confidence" never leaks, table rows arrive whole.
+  C. GROUNDING: one verdict event per substantive sentence, indexed 0..n-1; groundedness
+     and the unsupported list equal verify_reduce_output over the finished answer.
+  D. CONFIDENCE: brain_meta.confidence == REDUCE confidence × groundedness; an abstained
+     answer ends with the "preliminary" note (token before brain_meta).
+  E. DEGRADE: a model that dies mid-stream keeps the partial answer at 0.4; one that dies
+     before any text streams the per-doc fallback; an invoke-only model still works.
+
+    python -u eval/test_brain_reduce_stream.py
+"""
+from __future__ import annotations
+
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.documents import Document  # noqa: E402
+
+from src.components.brain.claims import Claim  # noqa: E402
+from src.components.brain.map_reduce import Brain, _parse_reduce_answer  # noqa: E402
+from src.components.brain.verifier import (  # noqa: E402
+    _MIN_SENTENCE_CHARS, SentenceGrounder, VerifyStats, _split_sentences, verify_reduce_output,
+)
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+class _Resp:
+    def __init__(self, content):
+        self.content = content
+
+
+class ScriptedMap:
+    def invoke(self, messages):
+        doc = re.search(r"Document \[(\S+) \|", messages[1].content).group(1)
+        return _Resp(json.dumps([
+            {"claim": f"{doc} reports revenue grew in the period.",
+             "verbatim_span": f"{doc} revenue", "confidence": 0.8}
+        ]))
+
+
+class ScriptedVerifier:
+    """Claims are always entailed; an answer sentence containing 'invented' is not."""
+
+    def __init__(self, latency=0.02):
+        self.latency = latency
+
+    def invoke(self, messages):
+        system, user = messages[0].content, messages[1].content
+        time.sleep(self.latency)
+        conf = lambda t: 0.1 if "invented" in t else 0.9  # noqa: E731
+        if '"verdicts"' not in system:
+            t = re.search(r"(?:CLAIM|SENTENCE FROM THE ANSWER):\s*\n?(.*)", user).group(1)
+            return _Resp(json.dumps({"verdict": "x", "confidence": conf(t)}))
+        if "ITEM 1" in user:
+            items = re.findall(r"ITEM (\d+)\nCLAIM: (.*)", user)
+        else:
+            items = re.findall(r"^(\d+)\. (.*)$", user.split("SENTENCES FROM THE ANSWER:")[1], re.M)
+        return _Resp(json.dumps({"verdicts": [
+            {"id": int(i), "verdict": "x", "confidence": conf(t)} for i, t in items]}))
+
+
+RAW = (
+    "Revenue grew across every filing in the period [Source: f00.pdf]. The second filing "
+    "confirms the same trend for the year [Source: f01.pdf].\n\n"
+    "| Filing | Trend |\n|---|---|\n| f00 | up |\n| f01 | up |\n\n"
+    "The company also invented a new product line that tripled margins overnight. "
+    "Overall the documents agree on revenue growth.\n\n"
+    "## Confidence\n0.8 — consistent sources"
+)
+
+
+class ScriptedStreamReduce:
+    """Streams ``raw`` in chunks (sizes from ``rng``), ``gap`` seconds apart; may die at ``die_at``."""
+
+    def __init__(self, raw=RAW, gap=0.0, seed=0, die_at=None):
+        self.raw, self.gap, self.rng, self.die_at = raw, gap, random.Random(seed), die_at
+        self.finished_at = None
+
+    def stream(self, messages):
+        i = 0
+        while i < len(self.raw):
+            if self.die_at is not None and i >= self.die_at:
+                raise RuntimeError("reduce model connection reset")
+            n = self.rng.randint(1, 9)
+            time.sleep(self.gap)
+            yield _Resp(self.raw[i:i + n])
+            i += n
+        self.finished_at = time.perf_counter()
+
+
+class InvokeOnlyReduce:
+    def invoke(self, messages):
+        return _Resp(RAW)
+
+
+def _doc_chunks(n=2):
+    return {
+        f"doc{d:02d}": (f"f{d:02d}.pdf", [Document(page_content=f"doc{d:02d} text",
+                                                   metadata={"chunk_id": f"doc{d:02d}-c0"})])
+        for d in range(n)
+    }
+
+
+def _run(reduce_llm, verify_latency=0.02):
+    brain = Brain(config=object())
+    brain._map_llm = ScriptedMap()
+    brain._verify_llm = ScriptedVerifier(verify_latency)
+    brain._reduce_llm = reduce_llm
+    results = []
+    brain._record_ledger = lambda result, *a, **k: results.append(result)
+    t0, events, at = time.perf_counter(), [], []
+    for line in brain.run_stream("how did revenue change?", _doc_chunks()):
+        if line.startswith("data: {"):
+            events.append(json.loads(line[6:]))
+            at.append(time.perf_counter())
+    return events, at, t0, results[0]
+
+
+def _tokens(events):
+    return "".join(e["content"] for e in events if e["type"] == "token")
+
+
+def _idx(events, pred):
+    return next(i for i, e in enumerate(events) if pred(e))
+
+
+# ── A. time to first token ──
+print("\n── A. tokens stream while REDUCE is still writing ──")
+model = ScriptedStreamReduce(gap=0.01)
+events, at, t0, _res = _run(model)
+first_tok = _idx(events, lambda e: e["type"] == "token")
+last_tok = max(i for i, e in enumerate(events) if e["type"] == "token")
+first_verdict = _idx(events, lambda e: e["type"] in ("brain_sentence", "brain_retract"))
+check("A: first token arrives before the REDUCE model finishes",
+      at[first_tok] < model.finished_at, f"{(model.finished_at - at[first_tok])*1000:.0f} ms early")
+check("A: a sentence verdict streams before the last answer token", first_verdict < last_tok)
+check("A: brain_reduce(streaming) → sources → tokens, brain_reduce(done) after the last verdict",
+      events[_idx(events, lambda e: e["type"] == "brain_reduce")].get("streaming") is True
+      and _idx(events, lambda e: e["type"] == "sources") < first_tok
+      and _idx(events, lambda e: e["type"] == "brain_reduce" and e.get("done"))
+      > max(i for i, e in enumerate(events) if e["type"] in ("brain_sentence", "brain_retract")))
+
+
+# ── B. fidelity ──
+print("\n── B. streamed text == final answer, whatever the chunking ──")
+expected, reduce_conf = _parse_reduce_answer(RAW)
+N_SENT = len([s for s in _split_sentences(expected) if len(s) >= _MIN_SENTENCE_CHARS])
+ok_all = ok_rows = True
+for seed in range(25):
+    events, _at, _t0, res = _run(ScriptedStreamReduce(seed=seed), verify_latency=0.0)
+    text = _tokens(events)
+    ok_all &= text == expected == res.answer
+    for e in events:
+        if e["type"] == "token" and "|" in e["content"]:
+            ok_rows &= all(line.endswith("|") for line in e["content"].strip("\n").split("\n")
+                           if line.lstrip().startswith("|"))
+check("B: tokens concatenate to exactly the parsed answer (25 chunkings)", ok_all)
+check("B: '## Confidence' section never streamed", "Confidence" not in text and "0.8 —" not in text)
+check("B: table rows are emitted whole", ok_rows)
+
+
+# ── C. grounding ──
+print("\n── C. incremental grounding == the one-shot check ──")
+events, _at, _t0, res = _run(ScriptedStreamReduce(seed=3))
+verdicts = [e for e in events if e["type"] in ("brain_sentence", "brain_retract")]
+claims = [Claim(text="doc00 reports revenue grew in the period.", verified=True),
+          Claim(text="doc01 reports revenue grew in the period.", verified=True)]
+g_ref, unsup_ref = verify_reduce_output(expected, claims, ScriptedVerifier(0.0))
+final = events[_idx(events, lambda e: e["type"] == "brain_reduce" and e.get("done"))]
+retracts = [e for e in events if e["type"] == "brain_retract"]
+check("C: one verdict per substantive sentence, indices 0..n-1",
+      sorted(e["index"] for e in verdicts) == list(range(len(verdicts))) and len(verdicts) == N_SENT,
+      f"{len(verdicts)} verdicts")
+check("C: the invented sentence is retracted (and only it)",
+      len(retracts) == 1 and "invented" in retracts[0]["text"]
+      and retracts[0]["reason"] == "unsupported" and retracts[0]["text"] in unsup_ref)
+check("C: groundedness / unsupported match verify_reduce_output",
+      final["groundedness"] == round(g_ref, 2) and final["unsupported"] == len(unsup_ref),
+      f"{final} vs {g_ref:.2f}/{len(unsup_ref)}")
+
+grounder = SentenceGrounder(claims, ScriptedVerifier(0.0), stats=VerifyStats())
+rnd = random.Random(7)
+i = 0
+while i < len(expected):
+    n = rnd.randint(1, 5)
+    grounder.feed(expected[i:i + n])
+    i += n
+grounder.close()
+list(grounder.drain())
+check("C: SentenceGrounder on raw char feed ≡ verify_reduce_output",
+      grounder.groundedness == g_ref and grounder.unsupported == unsup_ref)
+
+
+# ── D. confidence ──
+print("\n── D. brain_meta confidence semantics ──")
+meta = events[-1]
+check("D: confidence == REDUCE confidence × groundedness",
+      meta["type"] == "brain_meta" and abs(meta["confidence"] - reduce_conf * g_ref) < 1e-9
+      and meta["abstained"] is False, str(meta.get("confidence")))
+
+low = RAW.replace("0.8 — consistent", "0.3 — thin")
+events, _at, _t0, res = _run(ScriptedStreamReduce(raw=low, seed=1))
+toks = [e for e in events if e["type"] == "token"]
+meta = events[-1]
+check("D: low confidence ⇒ abstained, 'preliminary' note is the last token before brain_meta",
+      meta["abstained"] is True and "preliminary" in toks[-1]["content"]
+      and events[-2] is toks[-1] and res.answer == _tokens(events))
+
+
+# ── E. degrade ──
+print("\n── E. REDUCE model failures ──")
+events, _at, _t0, res = _run(ScriptedStreamReduce(die_at=120, seed=2))
+meta = events[-1]
+done_i = _idx(events, lambda e: e["type"] == "brain_reduce" and e.get("done"))
+partial = _tokens(events[:done_i])
+check("E: mid-stream failure keeps the partial answer at 0.4 × groundedness (⇒ abstained)",
+      len(partial) > 60 and RAW.startswith(partial) and len(partial) < 140
+      and abs(meta["confidence"] - 0.4 * events[done_i]["groundedness"]) < 1e-9
+      and meta["abstained"] is True and res.answer.startswith(partial), repr(partial))
+events, _at, _t0, res = _run(ScriptedStreamReduce(die_at=0))
+check("E: failure before any text ⇒ per-doc fallback streamed",
+      _tokens(events).startswith("**f00.pdf:**") and events[-1]["type"] == "brain_meta")
+events, _at, _t0, res = _run(InvokeOnlyReduce())
+check("E: invoke-only model ⇒ same answer, still grounded per sentence",
+      _tokens(events) == expected
+      and sum(e["type"] in ("brain_sentence", "brain_retract") for e in events) == N_SENT)
+
+
+# ── tally ──
+print(f"\n{'='*60}")
+print(f"  test_brain_reduce_stream: {_passed} passed, {_failed} failed")
+print(f"{'='*60}")
+sys.exit(0 if _failed == 0 else 1)
@@ -0,0 +1,424 @@
+"""Cancellation gate — a disconnected client stops paying for LLM work (offline, $0).
+
+cancellation.CancelToken is created per streamed request and threaded through run_agent,
+build_cell / build_grid, Brain MAP / VERIFY / REDUCE and the verifier pools; guard_stream
+fires it when the SSE client goes away. Scripted models (no network) stand in for the
+providers and fire the token at a chosen point:
+
+  A. TOKEN: cancel is idempotent; skip() counts per token, process-wide (stats()) and on
+     the docquery_llm_calls_avoided_total counter.
+  B. AGENT: run_agent stops before its next tool / model call — a `cancelled` gate and a
+     cancelled meta, no further model call; a pre-cancelled run makes none.
+  C. GRID: build_cell on a cancelled token runs no agent; build_grid stops building
+     models and cells once it fires.
+  D. BRAIN: MAP / VERIFY stop being submitted (threaded and asyncio), REDUCE is skipped
+     or its stream closed, the verifier pools skip their batches — all counted; an
+     uncancelled token changes nothing (same events as no token).
+  E. STREAM: guard_stream fires the token on a disconnect (sync and async bodies — an
+     async body is interrupted mid-await) or an early close, and not on a clean finish.
+
+    python -u eval/test_cancellation.py
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.documents import Document  # noqa: E402
+
+from src.components import cancellation  # noqa: E402
+from src.components.agent_core.budgets import Budget  # noqa: E402
+from src.components.agent_core.grid_engine import build_cell, build_grid  # noqa: E402
+from src.components.agent_core.loop import run_agent  # noqa: E402
+from src.components.agent_core.model import ModelResponse, ScriptedModel, ToolCall  # noqa: E402
+from src.components.agent_core.registry import RunScope  # noqa: E402
+from src.components.agent_core.review_grid import (  # noqa: E402
+    CellStatus, ColumnKind, GridColumn, GridSpec,
+)
+from src.components.brain import async_brain as AB  # noqa: E402
+from src.components.brain import map_reduce as MR  # noqa: E402
+from src.components.brain.async_brain import AsyncBrain  # noqa: E402
+from src.components.brain.claims import Claim, EvidenceSpan  # noqa: E402
+from src.components.brain.map_cache import MapExtractCache  # noqa: E402
+from src.components.brain.map_reduce import Brain  # noqa: E402
+from src.components.brain.verifier import verify_claims, verify_reduce_output  # noqa: E402
+from src.components.cancellation import CancelToken, guard_stream  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+class _Resp:
+    def __init__(self, content):
+        self.content = content
+
+
+class ScriptedMap:
+    """MAP model; ``on_call(n)`` runs before the n-th call answers (1-based)."""
+
+    def __init__(self, on_call=None):
+        self.on_call = on_call
+        self.calls: list[str] = []
+
+    def _answer(self, messages):
+        doc = re.search(r"Document \[(\S+) \|", messages[1].content).group(1)
+        self.calls.append(doc)
+        if self.on_call:
+            self.on_call(len(self.calls))
+        return _Resp(json.dumps([
+            {"claim": f"{doc} reported revenue growth across the fiscal year.",
+             "verbatim_span": f"{doc} revenue", "confidence": 0.8},
+            {"claim": f"{doc} reported higher operating costs.", "verbatim_span": "", "confidence": 0.7}]))
+
+    def invoke(self, messages):
+        return self._answer(messages)
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(0)
+        return self._answer(messages)
+
+
+class ScriptedVerifier:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        user = messages[1].content
+        ids = (re.findall(r"ITEM (\d+)\n", user)
+               or re.findall(r"^(\d+)\. ", user.split("SENTENCES FROM THE ANSWER:")[-1], re.M))
+        if not ids:
+            return _Resp(json.dumps({"verdict": "x", "confidence": 0.9}))
+        return _Resp(json.dumps({"verdicts": [
+            {"id": int(i), "verdict": "x", "confidence": 0.9} for i in ids]}))
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(0)
+        return self.invoke(messages)
+
+
+_PIECES = ["Revenue grew across all of the filings this year. ",
+           "Operating costs were higher in every document reviewed. ",
+           "Both trends held for the whole period under review. ",
+           "\n## Confidence\n0.8 - grounded"]
+
+
+class ScriptedReduce:
+    """Streams ``_PIECES``; ``on_piece(i)`` runs before piece i goes out; records closure."""
+
+    def __init__(self, on_piece=None):
+        self.on_piece = on_piece
+        self.sent = 0
+        self.closed = False
+
+    def stream(self, messages):
+        try:
+            for i, p in enumerate(_PIECES):
+                if self.on_piece:
+                    self.on_piece(i)
+                self.sent += 1
+                yield _Resp(p)
+        finally:
+            self.closed = self.sent < len(_PIECES)
+
+    async def astream(self, messages):
+        for i, p in enumerate(_PIECES):
+            if self.on_piece:
+                self.on_piece(i)
+            self.sent += 1
+            yield _Resp(p)
+            await asyncio.sleep(0)
+
+
+def _doc_chunks(n=5):
+    return {f"doc{i:02d}": (f"f{i}.pdf", [Document(page_content=f"doc{i:02d} revenue text",
+                                                   metadata={"chunk_id": f"c{i}"})])
+            for i in range(n)}
+
+
+def _brain(cls=Brain, map_llm=None, reduce_llm=None):
+    b = cls(config=object())
+    b._map_llm, b._verify_llm, b._reduce_llm = map_llm or ScriptedMap(), ScriptedVerifier(), reduce_llm or ScriptedReduce()
+    b._map_cache = MapExtractCache(enabled=False)
+    return b
+
+
+def _types(lines):
+    return [json.loads(l[6:]).get("type") if l.startswith("data: {") else l.strip() for l in lines]
+
+
+def _strip_wall(lines):
+    out = []
+    for l in lines:
+        if '"brain_meta"' in l:
+            d = json.loads(l[6:])
+            d["verify"].pop("wall_ms", None)
+            d["verify"].pop("est_saved_ms", None)
+            l = json.dumps(d)
+        out.append(l)
+    return out
+
+
+def _budget(steps=6):
+    return Budget(mode="standard", model="m", max_steps=steps, wall_clock_s=60, token_budget=60000)
+
+
+# ── A. token ────────────────────────────────────────────────────────────────────
+def section_a():
+    print("\nA. token basics + metric")
+    from src.components.metrics import llm_calls_avoided
+
+    before = cancellation.stats()["by_stage"].get("test_stage", 0)
+    metric_before = llm_calls_avoided.labels(stage="test_stage")._value.get()
+    tok = CancelToken()
+    check("a fresh token is not cancelled", not tok.cancelled and tok.reason is None)
+    tok.cancel("test")
+    tok.cancel("again")
+    check("cancel is idempotent (first reason kept)", tok.cancelled and tok.reason == "test")
+    tok.skip("test_stage", 3)
+    tok.skip("test_stage")
+    tok.skip("test_stage", 0)
+    check("skip() counts per token", tok.avoided == {"test_stage": 4} and tok.avoided_total == 4,
+          str(tok.avoided))
+    check("skip() feeds the process-wide stats() for /health",
+          cancellation.stats()["by_stage"].get("test_stage", 0) - before == 4)
+    check("skip() increments docquery_llm_calls_avoided_total{stage}",
+          llm_calls_avoided.labels(stage="test_stage")._value.get() - metric_before == 4)
+    check("is_cancelled(None) is False", not cancellation.is_cancelled(None))
+
+
+# ── B. agent loop ───────────────────────────────────────────────────────────────
+def section_b():
+    print("\nB. run_agent stops between steps")
+    tok = CancelToken()
+
+    def _step1(_messages):
+        tok.cancel()   # the client leaves while the model is answering step 1
+        return ModelResponse(text="look it up", tool_calls=[
+            ToolCall(id="c1", name="compute", args={"op": "value", "row": {}})])
+
+    model = ScriptedModel([_step1, ModelResponse(text="never reached", tool_calls=[])])
+    events = list(run_agent("q", model=model, scope=RunScope(), budget=_budget(), cancel=tok))
+    types = [e["type"] for e in events]
+    check("no tool call after the token fired", "tool_call" not in types, str(types))
+    check("no further model call", len(model.calls) == 1, str(len(model.calls)))
+    gate = [e for e in events if e["type"] == "gate"]
+    check("a `cancelled` gate, then a cancelled meta",
+          gate and gate[-1]["name"] == "cancelled" and events[-1]["type"] == "meta"
+          and events[-1].get("cancelled") is True and events[-1]["abstained"] is True, str(events[-2:]))
+    check("the skipped model call is counted", tok.avoided.get("agent_step") == 1, str(tok.avoided))
+
+    tok2 = CancelToken()
+    tok2.cancel()
+    scope = RunScope(cancel=tok2)
+    model2 = ScriptedModel([ModelResponse(text="never", tool_calls=[])])
+    events2 = list(run_agent("q", model=model2, scope=scope, budget=_budget()))
+    check("a pre-cancelled run (token via RunScope) makes no model call",
+          not model2.calls and events2[-1].get("cancelled") is True, str(events2))
+
+    tok3 = CancelToken()
+    scope3 = RunScope()
+    model3 = ScriptedModel([ModelResponse(text="Plain answer.", tool_calls=[])])
+    events3 = list(run_agent("q", model=model3, scope=scope3, budget=_budget(), cancel=tok3))
+    check("the run's token is handed to the tools via scope.cancel", scope3.cancel is tok3)
+    check("an uncancelled token leaves the run alone",
+          not events3[-1].get("cancelled") and not tok3.cancelled and len(model3.calls) == 1)
+
+
+# ── C. grid ─────────────────────────────────────────────────────────────────────
+def section_c():
+    print("\nC. build_cell / build_grid stop")
+    col = GridColumn(key="gov_law", label="Governing Law", prompt="Find the governing law.",
+                     kind=ColumnKind.CLAUSE)
+    tok = CancelToken()
+    tok.cancel()
+    model = ScriptedModel([ModelResponse(text="never", tool_calls=[])])
+    cell = build_cell("d1", col, collection_id="c1", model=model,
+                      filename_by_doc={"d1": "d1.pdf"}, cancel=tok)
+    check("a cancelled cell runs no agent", not model.calls)
+    check("…and comes back as a `cancelled` ERROR cell",
+          cell.status == CellStatus.ERROR and cell.note == "cancelled", f"{cell.status} {cell.note}")
+    check("…counted as one avoided grid cell", tok.avoided.get("grid_cell") == 1, str(tok.avoided))
+
+    tok2 = CancelToken()
+    built = []
+
+    def _factory():
+        built.append(1)
+        return ScriptedModel([ModelResponse(text="Not found in this document.", tool_calls=[])])
+
+    spec = GridSpec(title="t", collection_id="c1", doc_ids=["d1", "d2", "d3"], columns=[col])
+    res = build_grid(spec, model_factory=_factory,
+                     filename_by_doc={"d1": "d1.pdf", "d2": "d2.pdf", "d3": "d3.pdf"},
+                     on_cell=lambda _c: tok2.cancel(), cancel=tok2)
+    check("build_grid builds no model after the token fires", len(built) == 1, str(len(built)))
+    check("…and returns every cell (the rest `cancelled`)",
+          len(res.cells) == 3 and [c.note for c in res.cells[1:]] == ["cancelled"] * 2,
+          str([c.note for c in res.cells]))
+    check("…with the skipped cells counted", tok2.avoided.get("grid_cell") == 2, str(tok2.avoided))
+
+
+# ── D. brain ────────────────────────────────────────────────────────────────────
+def section_d():
+    print("\nD. Brain MAP / VERIFY / REDUCE + verifier pools")
+    saved = MR.LLM_CONCURRENCY
+    # One job at a time ⇒ exactly which calls were avoided is known.
+    MR.LLM_CONCURRENCY = AB.LLM_CONCURRENCY = 1
+    try:
+        tok = CancelToken()
+        mp = ScriptedMap(on_call=lambda n: tok.cancel() if n == 1 else None)
+        b = _brain(map_llm=mp)
+        lines = list(b.run_stream("q?", _doc_chunks(5), cancel=tok))
+        check("threaded: no MAP call after the token fired", mp.calls == ["doc00"], str(mp.calls))
+        check("threaded: no verifier call, no REDUCE, no [DONE]",
+              b._verify_llm.calls == 0 and b._reduce_llm.sent == 0 and "data: [DONE]" not in _types(lines),
+              str(_types(lines)))
+        check("threaded: 4 MAPs avoided", tok.avoided.get("brain_map") == 4, str(tok.avoided))
+
+        tok_r = CancelToken()
+        red = ScriptedReduce(on_piece=lambda i: tok_r.cancel() if i == 1 else None)
+        b_r = _brain(reduce_llm=red)
+        lines_r = list(b_r.run_stream("q?", _doc_chunks(2), cancel=tok_r))
+        check("threaded: cancel mid-REDUCE closes the model stream",
+              red.closed and red.sent == 2, f"closed={red.closed} sent={red.sent}")
+        check("threaded: …and ends without brain_meta / [DONE]",
+              "brain_meta" not in _types(lines_r) and "data: [DONE]" not in _types(lines_r))
+
+        plain = _strip_wall(list(_brain().run_stream("q?", _doc_chunks(3))))
+        live = CancelToken()
+        tokened = _strip_wall(list(_brain().run_stream("q?", _doc_chunks(3), cancel=live)))
+        check("an uncancelled token changes nothing (same events)", plain == tokened)
+        check("…and counts nothing", live.avoided_total == 0, str(live.avoided))
+
+        tok_a = CancelToken()
+        mp_a = ScriptedMap(on_call=lambda n: tok_a.cancel() if n == 1 else None)
+        ab = _brain(AsyncBrain, map_llm=mp_a)
+
+        async def _consume():
+            return [l async for l in ab.arun_stream("q?", _doc_chunks(5), cancel=tok_a)]
+
+        lines_a = asyncio.run(_consume())
+        check("asyncio: no MAP started after the token fired", mp_a.calls == ["doc00"], str(mp_a.calls))
+        check("asyncio: 4 MAPs avoided, no REDUCE, no [DONE]",
+              tok_a.avoided.get("brain_map") == 4 and ab._reduce_llm.sent == 0
+              and "data: [DONE]" not in _types(lines_a), str(tok_a.avoided))
+    finally:
+        MR.LLM_CONCURRENCY = AB.LLM_CONCURRENCY = saved
+
+    tok_m = CancelToken()
+    tok_m.cancel()
+    mp_m = ScriptedMap()
+    extracts = _brain(map_llm=mp_m)._map_all_docs("q?", _doc_chunks(4), cancel=tok_m)
+    check("_map_all_docs (survey_collection's MAP) skips every doc once cancelled",
+          not mp_m.calls and all(e.error == "cancelled" for e in extracts)
+          and tok_m.avoided.get("brain_map") == 4, str(tok_m.avoided))
+
+    claims = [Claim(text=f"Claim number {i} about revenue.", confidence=0.7,
+                    evidence=[EvidenceSpan(doc_id="d", chunk_id="c", verbatim_span="no such span")])
+              for i in range(4)]
+    tok_v = CancelToken()
+    tok_v.cancel()
+    ver = ScriptedVerifier()
+    verified, dropped = verify_claims(claims, ver, batch_size=2, cancel=tok_v)
+    check("verify_claims: cancelled batches are skipped, claims stay unverified",
+          ver.calls == 0 and not verified and len(dropped) == 4
+          and tok_v.avoided.get("brain_verify") == 2, str(tok_v.avoided))
+    g, unsupported = verify_reduce_output(
+        "Revenue grew across all of the filings this year. Operating costs were higher everywhere.",
+        claims, ver, cancel=tok_v)
+    check("verify_reduce_output: cancelled batches are skipped (counted as unsupported)",
+          ver.calls == 0 and g == 0.0 and len(unsupported) == 2
+          and tok_v.avoided.get("brain_ground", 0) >= 1, str(tok_v.avoided))
+
+
+# ── E. guard_stream ─────────────────────────────────────────────────────────────
+def section_e():
+    print("\nE. guard_stream")
+    closed = []
+
+    async def _slow_body():
+        try:
+            yield "data: 1\n\n"
+            await asyncio.sleep(30)   # a long MAP phase: nothing to send for a while
+            yield "data: 2\n\n"
+        finally:
+            closed.append(True)
+
+    async def _run(body, tok, disconnected_after: float | None, take=None):
+        t0 = time.perf_counter()
+
+        async def _probe():
+            return disconnected_after is not None and time.perf_counter() - t0 >= disconnected_after
+
+        out = []
+        gen = guard_stream(body, tok, _probe, poll_s=0.01)
+        async for chunk in gen:
+            out.append(chunk)
+            if take is not None and len(out) >= take:
+                await gen.aclose()
+                break
+        return out, time.perf_counter() - t0
+
+    tok = CancelToken()
+    out, took = asyncio.run(_run(_slow_body(), tok, 0.05))
+    check("async body: a disconnect fires the token", tok.cancelled and tok.reason == "client_disconnected")
+    check("…interrupting the body mid-await (its finally ran, well before 30 s)",
+          closed == [True] and took < 5 and out == ["data: 1\n\n"], f"took={took:.2f} out={out}")
+
+    steps = []
+    tok_s = CancelToken()
+
+    def _sync_body():
+        for i in range(200):
+            if tok_s.cancelled:
+                return
+            steps.append(i)
+            time.sleep(0.01)
+            yield f"data: {i}\n\n"
+
+    asyncio.run(_run(_sync_body(), tok_s, 0.1))
+    check("sync body: a disconnect fires the token and the body stops at its next check",
+          tok_s.cancelled and len(steps) < 200, str(len(steps)))
+
+    tok_c = CancelToken()
+
+    def _three():
+        yield from ("a", "b", "c")
+
+    out_c, _ = asyncio.run(_run(_three(), tok_c, None, take=1))
+    check("closing the response early fires the token", tok_c.cancelled and out_c == ["a"])
+
+    tok_ok = CancelToken()
+    out_ok, _ = asyncio.run(_run(_three(), tok_ok, None))
+    check("a stream that finishes never fires the token", out_ok == ["a", "b", "c"] and not tok_ok.cancelled)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("  test_cancellation")
+    print("=" * 60)
+    section_a()
+    section_b()
+    section_c()
+    section_d()
+    section_e()
+    print("\n" + "=" * 60)
+    print(f"  test_cancellation: {_passed} passed, {_failed} failed")
+    print("=" * 60)
+    sys.exit(1 if _failed else 0)
@@ -0,0 +1,355 @@
+"""Warm doc-context gate — one retrieval pool per grid row, searches re-scored locally ($0).
+
+Each review-grid cell searched its document from scratch; a row of M columns = M near-
+identical embedding + Pinecone passes over one contract. doc_context.DocContexts now builds
+ONE candidate pool per doc (a text + a table retrieval) and the row's single-doc
+`search_vault` calls are re-scored locally against it, live only when the pool can't answer.
+A fake retrieval manager over synthetic contracts counts the backend round-trips:
+
+  A. LOCAL: a single-doc search is served from the pool (no backend call) in the normal
+     search_vault envelope, and finds the same clause a live search finds.
+  B. FALLBACK: a truncated pool missing the query's terms goes live; a complete pool serves
+     below the coverage floor but NOT a query none of its chunks match; only searches of
+     exactly this doc are served — another doc or a metadata filter goes live.
+  C. SHARING: concurrent cells of a row build the pool once; each doc gets its own; a pool
+     that fails to build leaves the cells searching live; GRID_DOC_CONTEXT is opt-in.
+  D. GRID: 3 docs × 5 columns make 6 backend calls (2 per row) instead of 30, with the
+     same cells (benchmark prints calls + wall time).
+  E. PARITY: column prompts, labels, paraphrases and off-topic queries over whole-doc and
+     truncated pools — no cell whose clause the live search puts on top loses it from the
+     pool, pool hits are the live top-5, and a query no pool chunk matches goes live.
+
+    python -u eval/test_doc_context.py
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.documents import Document  # noqa: E402
+
+import src.components.agent_core.doc_context as DC  # noqa: E402
+import src.components.agent_core.loop as L  # noqa: E402
+import src.components.agent_core.registry as RG  # noqa: E402
+from src.components.agent_core.doc_context import DocContexts, build_doc_context  # noqa: E402
+from src.components.agent_core.grid_engine import build_cell, schedule_cells  # noqa: E402
+from src.components.agent_core.model import ModelResponse, ScriptedModel, ToolCall  # noqa: E402
+from src.components.agent_core.registry import REGISTRY, RunScope  # noqa: E402
+from src.components.agent_core.review_grid import ColumnKind, GridColumn, GridSpec  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+# ── fixtures ────────────────────────────────────────────────────────────────────
+_CLAUSES = {
+    "governing law": "This Agreement is governed by the laws of England and Wales.",
+    "term": "The initial term of this Agreement is three years from the Effective Date.",
+    "liability cap": "Total liability is capped at two times the annual fees paid.",
+    "termination notice": "Either party may terminate on ninety days written notice.",
+    "confidentiality": "Each party shall keep Confidential Information secret for five years.",
+}
+_FILLER = "The parties acknowledge the recitals and definitions set out in schedule {i}."
+
+
+def _chunks(did: str, n_filler: int):
+    docs = [Document(page_content=_FILLER.format(i=i),
+                     metadata={"doc_id": did, "filename": f"{did}.pdf", "page_number": 1 + i // 4,
+                               "chunk_id": f"{did}-f{i}", "collection_id": "c1"})
+            for i in range(n_filler)]
+    for j, (topic, text) in enumerate(_CLAUSES.items()):
+        docs.insert(3 + j * 5, Document(page_content=text, metadata={
+            "doc_id": did, "filename": f"{did}.pdf", "page_number": 2 + j, "chunk_id": f"{did}-{j}",
+            "collection_id": "c1", "topic": topic}))
+    return docs
+
+
+class _FakeRM:
+    """A vault of synthetic contracts; ranks by word overlap; counts round-trips."""
+
+    def __init__(self, n_filler: int = 40, delay: float = 0.0, fail: bool = False):
+        self.docs = {d: _chunks(d, n_filler) for d in ("d0", "d1", "d2")}
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _rank(self, query, did, k):
+        # Stand-in for dense similarity: stemmed word overlap (paraphrase-tolerant enough).
+        q = set(DC._terms(query))
+        pool = self.docs.get(did, [])
+        scored = sorted(range(len(pool)),
+                        key=lambda i: (-len(q & set(DC._terms(pool[i].page_content))), i))
+        return [pool[i] for i in scored[:k]]
+
+    def retrieve(self, query, *, doc_ids=None, top_k=None, **_kw):
+        with self.lock:
+            self.calls.append(("text", query))
+        if self.fail:
+            raise RuntimeError("pinecone down")
+        time.sleep(self.delay)
+        return self._rank(query, (doc_ids or ["d0"])[0], top_k or 8)
+
+    def retrieve_table_chunks(self, query, *, doc_ids=None, k=8, **_kw):
+        with self.lock:
+            self.calls.append(("table", query))
+        time.sleep(self.delay)
+        return []                                    # prose contracts: no table chunks
+
+
+_COLS = [GridColumn(key=k.replace(" ", "_"), label=k.title(), prompt=f"What is the {k}?",
+                    kind=ColumnKind.CLAUSE) for k in _CLAUSES]
+
+
+def _scope(rm, ctx=None, doc="d0"):
+    return RunScope(collection_id="c1", doc_ids=[doc], filenames=[f"{doc}.pdf"],
+                    filename_by_doc={doc: f"{doc}.pdf"}, retrieval_manager=rm, doc_context=ctx)
+
+
+def _search(q, **extra):
+    return ToolCall(id="s", name="search_vault", args={"query": q, **extra})
+
+
+def _top_snippet(result):
+    return (result.get("provenance") or [{}])[0].get("snippet")
+
+
+# ── A ───────────────────────────────────────────────────────────────────────────
+def section_a():
+    print("\nA. single-doc searches served from the pool")
+    rm = _FakeRM()
+    ctx = build_doc_context("d0", "d0.pdf", rm, DC.seed_query(_COLS))
+    check("building the pool is one text + one table retrieval",
+          [c[0] for c in rm.calls] == ["text", "table"], str(rm.calls))
+    rm.calls.clear()
+    for topic, text in _CLAUSES.items():
+        local = REGISTRY.execute(_search(f"{topic} clause"), _scope(rm, ctx))
+        check(f"'{topic}' served locally, top span is the clause",
+              local.get("ok") and _top_snippet(local) == text and not rm.calls,
+              f"{_top_snippet(local)!r} calls={rm.calls}")
+    live = REGISTRY.execute(_search("governing law clause"), _scope(rm))
+    local = REGISTRY.execute(_search("governing law clause"), _scope(rm, ctx))
+    check("same envelope keys and top clause as the live search",
+          set(live) == set(local) and _top_snippet(live) == _top_snippet(local)
+          and set(live["provenance"][0]) == set(local["provenance"][0]))
+    check("local spans carry no stale seed-query score",
+          all(p.get("score") is None for p in local["provenance"]))
+    check("stats count local vs live", ctx.stats["local"] >= 12 and ctx.stats["live"] == 0,
+          str(ctx.stats))
+
+
+# ── B ───────────────────────────────────────────────────────────────────────────
+def section_b():
+    print("\nB. coverage fallback + narrowing")
+    big = _FakeRM(n_filler=200)
+    saved = DC.GRID_DOC_POOL_K
+    DC.GRID_DOC_POOL_K = 12                      # a truncated pool: 12 of 205 chunks
+    try:
+        ctx = build_doc_context("d0", "d0.pdf", big, "governing law; liability cap")
+    finally:
+        DC.GRID_DOC_POOL_K = saved
+    check("pool is truncated (not the whole doc)", not ctx.text_pool.complete)
+    big.calls.clear()
+    REGISTRY.execute(_search("governing law", kind="text"), _scope(big, ctx))
+    check("query covered by the pool ⇒ local", not big.calls, str(big.calls))
+    REGISTRY.execute(_search("confidentiality obligations survive", kind="text"), _scope(big, ctx))
+    check("query terms missing from a truncated pool ⇒ live", len(big.calls) == 1, str(big.calls))
+
+    small = _FakeRM(n_filler=10)
+    full = build_doc_context("d0", "d0.pdf", small, "governing law")
+    small.calls.clear()
+    r = REGISTRY.execute(_search("governing law indemnification escrow", kind="text"),
+                         _scope(small, full))
+    check("a complete pool (the whole doc) serves a matching query below the coverage floor",
+          full.text_pool.complete and not small.calls and r.get("ok")
+          and _top_snippet(r) == _CLAUSES["governing law"], f"{small.calls} {_top_snippet(r)!r}")
+    REGISTRY.execute(_search("indemnification escrow", kind="text"), _scope(small, full))
+    check("…but a query no pool chunk matches goes live, even for a complete pool",
+          len(small.calls) == 1, str(small.calls))
+    small.calls.clear()
+    check("serves exactly its own doc (by doc_id or filename), nothing wider",
+          full.serves({"doc_ids": ["d0"]}) and full.serves({"filenames": ["d0.pdf"]})
+          and not full.serves({"doc_ids": ["d0", "d1"]}) and not full.serves({"doc_ids": ["d1"]})
+          and not full.serves({"collection_id": "c1"}))
+    full.retriever(small).retrieve("governing law", doc_ids=["d1"], top_k=4)
+    check("a retrieve for another doc goes live", len(small.calls) == 1, str(small.calls))
+    small.calls.clear()
+    scope = _scope(small, full)
+    scope.filters = {"doc_type": "contract"}
+    REGISTRY.execute(_search("governing law"), scope)
+    check("a metadata filter ⇒ live (the pool was built without it)", len(small.calls) >= 1)
+
+
+# ── C ───────────────────────────────────────────────────────────────────────────
+def section_c():
+    print("\nC. one build per row")
+    rm = _FakeRM(delay=0.05)
+    ctxs = DocContexts(_COLS, rm, filename_by_doc={d: f"{d}.pdf" for d in rm.docs})
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(ctxs.get("d0"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    check("8 concurrent cells of a row build the pool once",
+          len(rm.calls) == 2 and len({id(g) for g in got}) == 1, str(len(rm.calls)))
+    check("another doc gets its own pool", ctxs.get("d1") is not got[0] and len(rm.calls) == 4)
+    down = DocContexts(_COLS, _FakeRM(fail=True))
+    check("a failed build ⇒ no context (cells search live)", down.get("d0") is None)
+    saved = DC.GRID_DOC_CONTEXT
+    DC.GRID_DOC_CONTEXT = False
+    try:
+        check("GRID_DOC_CONTEXT=false ⇒ no context", DocContexts(_COLS, rm).get("d2") is None)
+    finally:
+        DC.GRID_DOC_CONTEXT = saved
+    if "GRID_DOC_CONTEXT" not in os.environ:
+        check("opt-in: off by default until parity is shown on real grids", _DEFAULT is False)
+
+
+# ── D ───────────────────────────────────────────────────────────────────────────
+def _grid(with_context: bool, delay: float):
+    spec = GridSpec(title="t", collection_id="c1", doc_ids=["d0", "d1", "d2"], columns=_COLS)
+    names = {d: f"{d}.pdf" for d in spec.doc_ids}
+    rm = _FakeRM(delay=delay)
+    ctxs = DocContexts(spec.columns, rm, filename_by_doc=names) if with_context else None
+
+    def _model(column):
+        def _answer(messages):
+            found = json.loads(messages[-1]["content"][0]["content"])
+            snippet = (found.get("provenance") or [{}])[0].get("snippet")
+            return ModelResponse(text=json.dumps({"status": "missing", "value": None, "quote": None,
+                                                  "risk": "missing", "note": snippet}),
+                                 tool_calls=[])
+        return ScriptedModel([
+            ModelResponse(text="", tool_calls=[ToolCall(id="s", name="search_vault",
+                                                        args={"query": column.label})]),
+            _answer,
+        ])
+
+    def _cell(did, column):
+        return build_cell(did, column, collection_id="c1", model=_model(column),
+                          filename_by_doc=names, retrieval_manager=rm,
+                          doc_context=ctxs.get(did) if ctxs else None)
+
+    saved = (RG.AGENT_TOOL_MEMO, L.AGENT_TOOL_MEMO)
+    RG.AGENT_TOOL_MEMO = L.AGENT_TOOL_MEMO = False      # measure the pool, not the memo
+    t0 = time.perf_counter()
+    try:
+        cells = schedule_cells(spec, _cell, concurrency=2, filename_by_doc=names)
+    finally:
+        RG.AGENT_TOOL_MEMO, L.AGENT_TOOL_MEMO = saved
+    return cells, len(rm.calls), time.perf_counter() - t0
+
+
+def section_d():
+    print("\nD. a 3 × 5 grid (concurrency 2, 0.05s per backend call)")
+    cells_live, calls_live, wall_live = _grid(False, 0.05)
+    cells_ctx, calls_ctx, wall_ctx = _grid(True, 0.05)
+    print(f"        live: {calls_live} backend calls in {wall_live:.2f}s · "
+          f"warm context: {calls_ctx} in {wall_ctx:.2f}s")
+    check("2 backend calls per row instead of 2 per cell", calls_ctx == 6 and calls_live == 30,
+          f"{calls_ctx} vs {calls_live}")
+    check("every cell saw the same top evidence",
+          [(c.doc_id, c.column_key, c.note) for c in cells_ctx]
+          == [(c.doc_id, c.column_key, c.note) for c in cells_live])
+    check("…which is its column's clause",
+          all(c.note == _CLAUSES[c.column_key.replace("_", " ")] for c in cells_ctx),
+          str([c.note for c in cells_ctx][:3]))
+    check("the warm grid is faster", wall_ctx < wall_live * 0.6, f"{wall_ctx:.2f}s vs {wall_live:.2f}s")
+
+
+# ── E ───────────────────────────────────────────────────────────────────────────
+_PARAPHRASES = {
+    "governing law": "which laws govern this agreement",
+    "term": "initial term of the agreement",
+    "liability cap": "is total liability capped",
+    "termination notice": "notice to terminate",
+    "confidentiality": "how long is confidential information kept secret",
+}
+
+
+def _ids(docs):
+    return [d.metadata.get("chunk_id") for d in docs]
+
+
+def section_e():
+    print("\nE. parity with the live search")
+    topics = list(_CLAUSES)
+    queries = ([(c.prompt, t) for c, t in zip(_COLS, topics)]
+               + [(c.label, t) for c, t in zip(_COLS, topics)]
+               + [(q, t) for t, q in _PARAPHRASES.items()]
+               + [("indemnification escrow", None), ("force majeure events", None)])
+    for label, n_filler, pool_k in (("whole-doc pool", 40, DC.GRID_DOC_POOL_K),
+                                    ("truncated pool", 200, 16)):
+        rm = _FakeRM(n_filler=n_filler)
+        saved = DC.GRID_DOC_POOL_K
+        DC.GRID_DOC_POOL_K = pool_k
+        try:
+            ctxs = {d: build_doc_context(d, f"{d}.pdf", rm, DC.seed_query(_COLS)) for d in rm.docs}
+        finally:
+            DC.GRID_DOC_POOL_K = saved
+        served = live_right = pool_right = regressions = 0
+        contained = []
+        off_topic_live = matched_only = True
+        for d, ctx in ctxs.items():
+            for q, topic in queries:
+                live = rm._rank(q, d, 5)
+                rm.calls.clear()
+                got = ctx.retriever(rm).retrieve(q, doc_ids=[d], top_k=5)
+                local = not rm.calls
+                if topic is None:
+                    off_topic_live &= not local
+                    continue
+                target = f"{d}-{topics.index(topic)}"
+                live_ok, pool_ok = _ids(live)[:1] == [target], _ids(got)[:1] == [target]
+                live_right += live_ok
+                pool_right += pool_ok
+                regressions += live_ok and not pool_ok
+                if local:
+                    served += 1
+                    contained.append(len(set(_ids(got)) & set(_ids(live))) / max(1, len(got)))
+                    matched_only &= all(set(DC._terms(q)) & set(DC._terms(x.page_content)) for x in got)
+        n = len(ctxs) * (len(queries) - 2)
+        share = sum(contained) / max(1, len(contained))
+        print(f"        {label}: {served}/{n} on-topic queries served locally · right clause on top: "
+              f"pool {pool_right}/{n}, live {live_right}/{n} · {share:.0%} of pool hits in live top-5")
+        check(f"{label}: no cell the live search gets right is wrong from the pool",
+              regressions == 0 and pool_right >= live_right, f"{regressions} regressions")
+        check(f"{label}: pool hits are the live top-5 (≥ 90%)", share >= 0.9, f"{share:.2f}")
+        check(f"{label}: served results only hold chunks matching the query", matched_only)
+        check(f"{label}: off-topic queries (nothing in the pool matches) go live", off_topic_live)
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("  test_doc_context")
+    print("=" * 60)
+    _DEFAULT = DC.GRID_DOC_CONTEXT
+    DC.GRID_DOC_CONTEXT = True                   # the feature under test is opt-in
+    try:
+        section_a()
+        section_b()
+        section_c()
+        section_d()
+        section_e()
+    finally:
+        DC.GRID_DOC_CONTEXT = _DEFAULT
+    print("\n" + "=" * 60)
+    print(f"  test_doc_context: {_passed} passed, {_failed} failed")
+    print("=" * 60)
+    sys.exit(1 if _failed else 0)
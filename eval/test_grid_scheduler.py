@@ -0,0 +1,264 @@
+"""Review-grid cell scheduler gate — bounded concurrency, row-by-row fill (offline, $0).
+
+A grid is N×M independent cell agents; the routes used to run them one after another (a
+30-doc × 8-column grid = 240 serial runs). grid_engine.schedule_cells now runs them at most
+GRID_CELL_CONCURRENCY at a time. Scripted models that sleep per call stand in for the live
+model (the benchmark prints cells/minute per concurrency level):
+
+  A. PARITY: a concurrent grid returns the same cells, in the same row-major order, as the
+     sequential one; a raising cell becomes an ERROR cell, never an exception.
+  B. THROUGHPUT: 24 cells at concurrency 4 finish ≳3× faster than at 1; never more than
+     `concurrency` cells in flight.
+  C. HINTS: on_cell fires once per cell with its row / col; `row_done` fires once per row,
+     on that row's last cell; cells START in row-major order (rows fill top to bottom).
+  D. CANCEL: once the token fires nothing else starts; the unstarted cells come back as
+     `cancelled` ERROR cells, counted as avoided; concurrency 1 keeps the old behaviour.
+  E. SHARED GRIDS: every column of a doc is seeded from the same preloaded grid objects, and
+     a cell's own tool joins never leak into a sibling cell's scope.
+
+    python -u eval/test_grid_scheduler.py
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.components.agent_core import grid_engine as GE  # noqa: E402
+from src.components.agent_core.grid_engine import build_grid, schedule_cells  # noqa: E402
+from src.components.agent_core.model import ModelResponse, ScriptedModel  # noqa: E402
+from src.components.agent_core.review_grid import (  # noqa: E402
+    CellStatus, ColumnKind, GridCell, GridColumn, GridSpec,
+)
+from src.components.cancellation import CancelToken  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+# ── fixtures ────────────────────────────────────────────────────────────────────
+_COLS = [GridColumn(key=k, label=k.replace("_", " ").title(), prompt=f"Find the {k}.",
+                    kind=ColumnKind.CLAUSE)
+         for k in ("gov_law", "term", "cap", "notice")]
+
+
+def _spec(n_docs: int, cols=_COLS) -> GridSpec:
+    return GridSpec(title="t", collection_id="c1",
+                    doc_ids=[f"d{i}" for i in range(n_docs)], columns=list(cols))
+
+
+def _names(spec: GridSpec):
+    return {d: f"{d}.pdf" for d in spec.doc_ids}
+
+
+class _Meter:
+    """Counts cells in flight across the model calls of a grid."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def factory(self, delay: float):
+        def _answer(_messages):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(delay)
+            with self.lock:
+                self.active -= 1
+            return ModelResponse(text=json.dumps({"status": "missing", "value": None, "quote": None,
+                                                  "risk": "missing", "note": "absent"}),
+                                 tool_calls=[])
+        return lambda: ScriptedModel([_answer])
+
+
+def _shape(cells):
+    return [(c.doc_id, c.column_key, c.status, c.value, c.risk, c.note) for c in cells]
+
+
+# ── A ───────────────────────────────────────────────────────────────────────────
+def section_a():
+    print("\nA. parity with the sequential grid")
+    spec = _spec(5)
+    seq = build_grid(spec, model_factory=_Meter().factory(0.0), filename_by_doc=_names(spec))
+    par = build_grid(spec, model_factory=_Meter().factory(0.01), filename_by_doc=_names(spec),
+                     concurrency=4)
+    check("same cells, same row-major order", _shape(seq.cells) == _shape(par.cells))
+    check("every (doc × column) cell is present", len(par.cells) == 5 * len(_COLS))
+    check("coverage identical", seq.coverage() == par.coverage(), f"{seq.coverage()} {par.coverage()}")
+
+    def _boom(did, column):
+        if did == "d1" and column.key == "term":
+            raise RuntimeError("kaput")
+        return GridCell(doc_id=did, column_key=column.key, doc_name=did, status=CellStatus.MISSING)
+
+    cells = schedule_cells(_spec(3), _boom, concurrency=3)
+    bad = [c for c in cells if c.status == CellStatus.ERROR]
+    check("a raising cell becomes one ERROR cell (grid completes)",
+          len(cells) == 3 * len(_COLS) and len(bad) == 1 and "kaput" in (bad[0].note or ""))
+
+
+# ── B ───────────────────────────────────────────────────────────────────────────
+def _bench(n_docs: int, concurrency: int, delay: float):
+    spec = _spec(n_docs)
+    meter = _Meter()
+    t0 = time.perf_counter()
+    res = build_grid(spec, model_factory=meter.factory(delay), filename_by_doc=_names(spec),
+                     concurrency=concurrency)
+    wall = time.perf_counter() - t0
+    return wall, len(res.cells) * 60.0 / wall, meter.max_active
+
+
+def section_b():
+    print("\nB. throughput (ScriptedModel, 0.05s per model call)")
+    results = {}
+    for conc in (1, 2, 4, 8):
+        wall, cpm, peak = _bench(6, conc, 0.05)
+        results[conc] = (wall, cpm, peak)
+        print(f"        concurrency={conc}: 24 cells in {wall:.2f}s → {cpm:,.0f} cells/min "
+              f"(peak in flight {peak})")
+    speedup = results[1][0] / results[4][0]
+    check("concurrency 4 is ≥3× faster than sequential", speedup >= 3.0, f"{speedup:.2f}×")
+    check("sequential never overlaps cells", results[1][2] == 1)
+    check("never more than `concurrency` cells in flight",
+          all(results[c][2] <= c for c in results), str({c: r[2] for c, r in results.items()}))
+
+
+# ── C ───────────────────────────────────────────────────────────────────────────
+def section_c():
+    print("\nC. per-cell hints and row-by-row fill")
+    spec = _spec(4)
+    started, seen = [], []
+    lock = threading.Lock()
+
+    def _run(did, column):
+        with lock:
+            started.append(spec.doc_ids.index(did))
+        time.sleep(0.01 if column.key != "cap" else 0.03)
+        return GridCell(doc_id=did, column_key=column.key, doc_name=did, status=CellStatus.MISSING)
+
+    cells = schedule_cells(spec, _run, concurrency=3,
+                           on_cell=lambda cell, hint: seen.append((cell, dict(hint))))
+    check("on_cell fires once per cell", len(seen) == len(cells) == 4 * len(_COLS))
+    check("row / col hints place each cell",
+          all(spec.doc_ids[h["row"]] == c.doc_id and spec.columns[h["col"]].key == c.column_key
+              for c, h in seen))
+    done_rows = [h["row"] for _c, h in seen if h["row_done"]]
+    check("row_done fires exactly once per row", sorted(done_rows) == [0, 1, 2, 3], str(done_rows))
+    last_of_row = {}
+    for i, (_c, h) in enumerate(seen):
+        last_of_row[h["row"]] = i
+    check("…on that row's last cell",
+          all(seen[last_of_row[r]][1]["row_done"] for r in range(4)))
+    check("cells start in row-major order (rows fill top to bottom)",
+          started == sorted(started), str(started))
+    check("result stays in spec order",
+          [(c.doc_id, c.column_key) for c in cells]
+          == [(d, col.key) for d in spec.doc_ids for col in spec.columns])
+
+
+# ── D ───────────────────────────────────────────────────────────────────────────
+def section_d():
+    print("\nD. cancellation")
+    spec = _spec(5)
+    tok = CancelToken()
+    ran = []
+    lock = threading.Lock()
+
+    def _run(did, column):
+        with lock:
+            ran.append((did, column.key))
+        time.sleep(0.02)
+        return GridCell(doc_id=did, column_key=column.key, doc_name=did, status=CellStatus.MISSING)
+
+    def _on_cell(_cell, _hint):
+        if len(ran) >= 3:
+            tok.cancel()
+
+    cells = schedule_cells(spec, _run, concurrency=3, filename_by_doc=_names(spec),
+                           on_cell=_on_cell, cancel=tok)
+    cancelled = [c for c in cells if c.note == "cancelled"]
+    check("nothing new starts once the token fires", len(ran) <= 3 + 3, str(len(ran)))
+    check("the grid still returns every cell", len(cells) == 5 * len(_COLS))
+    check("unstarted cells are `cancelled` ERROR cells",
+          len(cancelled) == len(cells) - len(ran)
+          and all(c.status == CellStatus.ERROR for c in cancelled))
+    check("…counted as avoided", tok.avoided.get("grid_cell") == len(cancelled),
+          f"{tok.avoided} vs {len(cancelled)}")
+
+    built = []
+    tok2 = CancelToken()
+
+    def _factory():
+        built.append(1)
+        return ScriptedModel([ModelResponse(text="Not found in this document.", tool_calls=[])])
+
+    small = _spec(3, cols=_COLS[:1])
+    res = build_grid(small, model_factory=_factory, filename_by_doc=_names(small),
+                     on_cell=lambda _c: tok2.cancel(), cancel=tok2)
+    check("concurrency 1: no model built after the token fires", len(built) == 1, str(len(built)))
+    check("…remaining cells cancelled and counted",
+          [c.note for c in res.cells[1:]] == ["cancelled"] * 2 and tok2.avoided.get("grid_cell") == 2)
+
+
+# ── E ───────────────────────────────────────────────────────────────────────────
+def section_e():
+    print("\nE. one preload per doc, shared across its columns")
+    spec = _spec(2)
+    grids_by_doc = {"d0": [object(), object()], "d1": [object()]}
+    seeded = {}
+    lock = threading.Lock()
+    real = GE.run_agent
+
+    def _fake_run_agent(question, *, scope, **_kw):
+        with lock:
+            seeded[(scope.doc_ids[0], question)] = list(scope.grids)
+        scope.grids.append(object())  # a tool join inside this cell
+        yield {"type": "token", "text": json.dumps({"status": "missing", "value": None,
+                                                    "quote": None, "risk": "missing",
+                                                    "note": None})}
+
+    GE.run_agent = _fake_run_agent
+    try:
+        build_grid(spec, model_factory=lambda: ScriptedModel([]), filename_by_doc=_names(spec),
+                   grids_by_doc=grids_by_doc, concurrency=4)
+    finally:
+        GE.run_agent = real
+    for did in spec.doc_ids:
+        per_col = [g for (d, _q), g in seeded.items() if d == did]
+        check(f"{did}: every column seeded with the same preloaded grid objects",
+              len(per_col) == len(_COLS)
+              and all(len(g) == len(grids_by_doc[did])
+                      and all(a is b for a, b in zip(g, grids_by_doc[did])) for g in per_col))
+    check("a cell's tool joins don't leak into the preload or sibling cells",
+          len(grids_by_doc["d0"]) == 2 and len(grids_by_doc["d1"]) == 1)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("  test_grid_scheduler")
+    print("=" * 60)
+    section_a()
+    section_b()
+    section_c()
+    section_d()
+    section_e()
+    print("\n" + "=" * 60)
+    print(f"  test_grid_scheduler: {_passed} passed, {_failed} failed")
+    print("=" * 60)
+    sys.exit(1 if _failed else 0)
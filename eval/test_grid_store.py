@@ -0,0 +1,441 @@
+"""Structured-grid store gate — one batched fetch, cached parsed grids, owner scope kept (offline, $0).
+
+load_grids_for_docs used to query document_chunks once per doc and re-parse every table_json
+on every request. grid_store.GridStore fetches every uncached doc in ONE in_() query and keeps
+the parsed grids per (owner, doc_id, ingest generation) in a memory-bounded LRU. A recording
+Supabase double and an in-memory Redis double stand in for the servers:
+
+  A. BATCH: N docs ⇒ one document_chunks query (in_ over the ids, user_id filtered);
+     load_grids_by_doc == the old per-doc load_grids_for_docs calls, grid for grid.
+  B. CACHE: the same docs again ⇒ zero queries and the same parsed Grid objects; a partial
+     overlap fetches only the new docs; a doc with no tables (yet) is never cached.
+  C. SCOPE: the cache is keyed by the resolved owner — another user, or a shared-matter read
+     for another owner, is a miss that queries with ITS user_id; no user ⇒ no caching.
+  D. INVALIDATION: invalidate_doc / save_document_chunks / delete_document_record drop one doc;
+     a generation bumped by ANOTHER process (Redis) is a miss here; Redis down ⇒ no error.
+  E. BOUNDS / DEGRADE: the store stays under its byte bound (LRU eviction); the JSONB filter
+     failing falls back to the full pull; a failing DB returns no grids, caches nothing.
+  F. PAGINATION: the double caps every response at 1000 rows like PostgREST — a 100-doc batch
+     of 1200 table rows is read in ordered .range() pages and every doc gets ALL its tables;
+     the full-pull fallback pages too; a page failing part-way drops the batch, caches
+     nothing, and the next call re-fetches.
+
+    python -u eval/test_grid_store.py
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.components.brain import grid_store as GS  # noqa: E402
+from src.components.brain import table_intent as TI  # noqa: E402
+from src.components.brain.grid_store import GridStore  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+# ── doubles ─────────────────────────────────────────────────────────────────────
+def _table(doc: str, i: int, statement: bool = False) -> dict:
+    rows = [{"section": "", "label": f"{doc} line {j}", "2023": j, "2024": j + 1}
+            for j in range(8 if statement else 2)]
+    if statement:
+        rows[0]["label"], rows[1]["label"], rows[2]["label"] = "Revenue", "Net income", "Total assets"
+    tj = {"headers": ["section", "label", "2023", "2024"], "rows": rows,
+          "periods": ["2023", "2024"], "table_id": f"{doc}-t{i}"}
+    return {"metadata": {"chunk_type": "table", "table_json": json.dumps(tj),
+                         "filename": f"{doc}.pdf", "page_number": i + 1},
+            "content": f"table {i} of {doc}"}
+
+
+class _Query:
+    """PostgREST-like: eq / in_ / order / range, and every response capped at db.max_rows
+    (Supabase's default 1000) WITHOUT an error, as the real server does."""
+
+    def __init__(self, db, tag):
+        self.db, self.tag = db, tag
+        self.eqs: list = []
+        self.ins: list = []
+        self.orders: list = []
+        self.span = None
+
+    def select(self, *_a, **_k):
+        return self
+
+    def eq(self, col, val):
+        self.eqs.append((col, val))
+        return self
+
+    def in_(self, col, vals):
+        self.ins.append((col, list(vals)))
+        return self
+
+    def order(self, col, **_k):
+        self.orders.append(col)
+        return self
+
+    def range(self, start, end):
+        self.span = (start, end)
+        return self
+
+    def execute(self):
+        with self.db.lock:
+            self.db.queries.append((self.tag, list(self.eqs), list(self.ins)))
+            self.db.pages.append((self.span, list(self.orders)))
+        if self.db.fail_all:
+            raise ConnectionError("db down")
+        if self.db.fail_from_row is not None and self.span and self.span[0] >= self.db.fail_from_row:
+            raise ConnectionError("connection reset")
+        eqs = dict(self.eqs)
+        if "metadata->>chunk_type" in eqs and self.db.no_jsonb:
+            raise ValueError("operator does not exist")
+        ids = set(v for c, v in self.eqs if c == "document_id")
+        for _c, vals in self.ins:
+            ids |= set(vals)
+        out = []
+        for (uid, did), rows in self.db.rows.items():
+            if did not in ids or ("user_id" in eqs and eqs["user_id"] != uid):
+                continue
+            for i, r in enumerate(rows):
+                if "metadata->>chunk_type" in eqs and r["metadata"].get("chunk_type") != "table":
+                    continue
+                out.append({"document_id": did, "chunk_index": i, **r})
+        if self.orders:
+            out.sort(key=lambda r: tuple(r[c] for c in self.orders))
+        start, end = self.span or (0, len(out) - 1)
+        out = out[start:end + 1][:self.db.max_rows]
+        return type("R", (), {"data": out})()
+
+
+class _Client:
+    def __init__(self, db, tag):
+        self.db, self.tag = db, tag
+
+    def table(self, name):
+        assert name == "document_chunks", name
+        return _Query(self.db, self.tag)
+
+
+class FakeDB:
+    """A SupabaseManager stand-in: ``client`` (service role) + optional RLS ``read_client``."""
+
+    def __init__(self, user_id="user-1", rows=None, read_client=True):
+        self.user_id = user_id
+        self.rows = rows if rows is not None else {}
+        self.queries: list = []
+        self.pages: list = []
+        self.lock = threading.Lock()
+        self.no_jsonb = False
+        self.fail_all = False
+        self.fail_from_row = None     # a ranged request starting at/after this row raises
+        self.max_rows = 1000
+        self.client = _Client(self, "service")
+        if read_client:
+            self.read_client = _Client(self, "rls")
+
+
+class FakeRedis:
+    """The commands GridStore uses (MGET + an INCR/EXPIRE pipeline), in memory."""
+
+    def __init__(self, fail=False):
+        self.data: dict = {}
+        self.fail = fail
+        self.calls = 0
+
+    def _hit(self):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    def mget(self, keys):
+        self._hit()
+        return [self.data.get(k) for k in keys]
+
+    def pipeline(self):
+        redis = self
+
+        class _P:
+            ops: list = []
+
+            def incr(self, k):
+                self.ops.append(k)
+
+            def expire(self, k, ttl):
+                pass
+
+            def execute(self):
+                redis._hit()
+                for k in self.ops:
+                    redis.data[k] = str(int(redis.data.get(k, "0")) + 1)
+                self.ops.clear()
+        return _P()
+
+
+def _rows(uid: str, docs, tables_per_doc=3, with_statement=True, extra_text=True) -> dict:
+    data = {}
+    for d in docs:
+        rows = [_table(d, i, statement=(with_statement and i == tables_per_doc - 1))
+                for i in range(tables_per_doc)]
+        if extra_text:
+            rows.insert(1, {"metadata": {"chunk_type": "text", "filename": f"{d}.pdf"},
+                            "content": "prose"})
+        data[(uid, d)] = rows
+    return data
+
+
+def _use(store: GridStore):
+    GS.grid_store = store
+    return store
+
+
+def _sig(grids):
+    return [(g.doc, g.page, g.table_id) for g in grids]
+
+
+# ── A ───────────────────────────────────────────────────────────────────────────
+def section_a():
+    print("\nA. one batched fetch")
+    docs = ["d1", "d2", "d3", "d4"]
+    db = FakeDB(rows=_rows("user-1", docs))
+    _use(GridStore(use_redis=False))
+    grids = TI.load_grids_for_docs(db, docs, question="revenue growth 2024", top_grids=8)
+    check("4 docs ⇒ ONE document_chunks query", len(db.queries) == 1, str(db.queries))
+    tag, eqs, ins = db.queries[0]
+    check("the query is an in_() over all the ids", ins == [("document_id", docs)], str(ins))
+    check("…filtered by user_id, via the RLS read client",
+          ("user_id", "user-1") in eqs and tag == "rls", str(eqs))
+    check("grids came back (statements first)", grids and grids[0].table_id.endswith("-t2"),
+          str(_sig(grids)[:3]))
+
+    # Parity: per-doc results equal the old per-doc calls (fresh, uncached store each).
+    names = {d: f"Name {d}" for d in docs}
+    db2 = FakeDB(rows=_rows("user-1", docs))
+    _use(GridStore(use_redis=False))
+    by_doc = TI.load_grids_by_doc(db2, docs, filename_by_doc=names, per_doc_top=2)
+    check("load_grids_by_doc ⇒ one query for the whole doc set", len(db2.queries) == 1)
+    ref = {}
+    for d in docs:
+        _use(GridStore(ttl_s=0))
+        ref[d] = _sig(TI.load_grids_for_docs(db2, [d], question=None, filename_by_doc=names,
+                                             per_doc_top=2))
+    check("per-doc grids identical to the old per-doc calls (names, pages, caps)",
+          {d: _sig(g) for d, g in by_doc.items()} == ref, f"{by_doc} vs {ref}")
+    check("filename_by_doc names the grids", all(g.doc == f"Name {d}" for d, gs in by_doc.items()
+                                                  for g in gs))
+
+
+# ── B ───────────────────────────────────────────────────────────────────────────
+def section_b():
+    print("\nB. process cache")
+    docs = ["d1", "d2", "d3"]
+    db = FakeDB(rows=_rows("user-1", docs + ["d4", "empty"]))
+    db.rows[("user-1", "empty")] = [{"metadata": {"chunk_type": "text"}, "content": "prose"}]
+    store = _use(GridStore(use_redis=False))
+    first = TI.load_grids_for_docs(db, docs, question="revenue 2024")
+    n0 = len(db.queries)
+    second = TI.load_grids_for_docs(db, docs, question="revenue 2024")
+    check("the same docs again ⇒ zero queries", len(db.queries) == n0)
+    check("…and the same parsed Grid objects (no re-parse)",
+          [id(g) for g in first] == [id(g) for g in second])
+    TI.load_grids_for_docs(db, ["d2", "d4"], question=None)
+    check("partial overlap ⇒ one query for ONLY the new doc",
+          len(db.queries) == n0 + 1 and db.queries[-1][1][0] == ("document_id", "d4"),
+          str(db.queries[-1]))
+    TI.load_grids_for_docs(db, ["empty"])
+    TI.load_grids_for_docs(db, ["empty"])
+    check("a doc with no table rows is not cached (its chunks may not be saved yet)",
+          len(db.queries) == n0 + 3)
+    st = store.stats()
+    check("stats count hits / misses / docs", st["docs"] == 4 and st["hits"] >= 4, str(st))
+
+
+# ── C ───────────────────────────────────────────────────────────────────────────
+def section_c():
+    print("\nC. owner scoping")
+    rows = _rows("user-1", ["d1"])
+    rows.update(_rows("owner-9", ["d1"]))
+    _use(GridStore(use_redis=False))
+    me = FakeDB(rows=rows)
+    TI.load_grids_for_docs(me, ["d1"])
+    other = FakeDB(user_id="user-2", rows=rows)
+    got = TI.load_grids_for_docs(other, ["d1"])
+    check("another user's call is a miss that queries with ITS user_id",
+          len(other.queries) == 1 and ("user_id", "user-2") in other.queries[0][1])
+    check("…and gets nothing of user-1's", got == [], str(_sig(got)))
+    TI.load_grids_for_docs(me, ["d1"], owner_id="owner-9")
+    q = me.queries[-1]
+    check("a shared-matter read queries the OWNER's rows on the service-role client",
+          len(me.queries) == 2 and q[0] == "service" and ("user_id", "owner-9") in q[1], str(q))
+    TI.load_grids_for_docs(me, ["d1"], owner_id="owner-9")
+    TI.load_grids_for_docs(me, ["d1"])
+    check("both scopes are then cached separately", len(me.queries) == 2)
+    anon = FakeDB(user_id=None, rows=rows, read_client=False)
+    TI.load_grids_for_docs(anon, ["d1"])
+    TI.load_grids_for_docs(anon, ["d1"])
+    check("no user ⇒ never cached (nothing to scope to)", len(anon.queries) == 2)
+
+
+# ── D ───────────────────────────────────────────────────────────────────────────
+def section_d():
+    print("\nD. invalidation")
+    db = FakeDB(rows=_rows("user-1", ["d1", "d2"]))
+    store = _use(GridStore(use_redis=False))
+    TI.load_grids_for_docs(db, ["d1", "d2"])
+    GS.invalidate_doc("d1")
+    TI.load_grids_for_docs(db, ["d1", "d2"])
+    check("invalidate_doc ⇒ only that doc is re-fetched",
+          len(db.queries) == 2 and db.queries[-1][1][0] == ("document_id", "d1"))
+
+    from src.components import db as dbmod
+    dbmod._grid_store_invalidate("d2")
+    TI.load_grids_for_docs(db, ["d1", "d2"])
+    check("db._grid_store_invalidate (save_document_chunks / delete) drops the doc",
+          len(db.queries) == 3 and db.queries[-1][1][0] == ("document_id", "d2"))
+
+    class _Mgr:
+        user_id = "user-1"
+        client = type("C", (), {"table": lambda self, n: _NoopQ()})()
+
+    class _NoopQ:
+        def __getattr__(self, _n):
+            return lambda *a, **k: self
+
+        def execute(self):
+            return type("R", (), {"data": []})()
+
+    before = store.stats()["invalidations"]
+    dbmod.SupabaseManager.save_document_chunks(_Mgr(), "d1", [])
+    dbmod.SupabaseManager.delete_document_record(_Mgr(), "d2")
+    check("save_document_chunks and delete_document_record both invalidate",
+          store.stats()["invalidations"] == before + 2, str(store.stats()))
+
+    # Cross-process: the worker's store bumps the Redis generation; the API's store misses.
+    redis = FakeRedis()
+    api = _use(GridStore(client=redis))
+    worker = GridStore(client=redis)
+    db2 = FakeDB(rows=_rows("user-1", ["d1"]))
+    TI.load_grids_for_docs(db2, ["d1"])
+    TI.load_grids_for_docs(db2, ["d1"])
+    check("with Redis, a repeat is still served from memory", len(db2.queries) == 1)
+    worker.invalidate_doc("d1")
+    TI.load_grids_for_docs(db2, ["d1"])
+    check("a re-ingest in ANOTHER process (Redis generation) is a miss here",
+          len(db2.queries) == 2 and api.stats()["misses"] == 2, str(api.stats()))
+
+    down = FakeRedis(fail=True)
+    _use(GridStore(client=down))
+    db3 = FakeDB(rows=_rows("user-1", ["d1"]))
+    g1 = TI.load_grids_for_docs(db3, ["d1"])
+    TI.load_grids_for_docs(db3, ["d1"])
+    check("Redis down ⇒ grids still load, in-process cache still serves",
+          g1 and len(db3.queries) == 1)
+    check("…and the failed Redis backs off instead of costing a round-trip per call",
+          down.calls == 1, str(down.calls))
+
+
+# ── E ───────────────────────────────────────────────────────────────────────────
+def section_e():
+    print("\nE. bounds and degrade")
+    docs = [f"d{i}" for i in range(12)]
+    db = FakeDB(rows=_rows("user-1", docs, extra_text=False))
+    one_doc = GS._row_bytes(db.rows[("user-1", "d0")])
+    store = _use(GridStore(use_redis=False, max_mb=(one_doc * 4.5) / (1024 * 1024)))
+    for d in docs:
+        TI.load_grids_for_docs(db, [d])
+    st = store.stats()
+    check("resident bytes stay under the bound", st["bytes"] <= store.max_bytes, str(st))
+    check("…by evicting least-recently-used docs (4 of 12 resident)", st["docs"] == 4, str(st))
+    n = len(db.queries)
+    TI.load_grids_for_docs(db, ["d11"])
+    TI.load_grids_for_docs(db, ["d0"])
+    check("the most recent doc is a hit, an evicted one a miss", len(db.queries) == n + 1)
+
+    db2 = FakeDB(rows=_rows("user-1", ["d1", "d2"]))
+    db2.no_jsonb = True
+    _use(GridStore(use_redis=False))
+    got = TI.load_grids_for_docs(db2, ["d1", "d2"], question=None)
+    check("JSONB filter unsupported ⇒ full pull, text rows filtered in Python",
+          len(db2.queries) == 2 and len(got) == 6, f"{len(db2.queries)} {len(got)}")
+
+    db3 = FakeDB(rows=_rows("user-1", ["d1"]))
+    db3.fail_all = True
+    store3 = _use(GridStore(use_redis=False))
+    check("a failing DB ⇒ no grids, no exception", TI.load_grids_for_docs(db3, ["d1"]) == [])
+    check("…and nothing cached", store3.stats()["docs"] == 0)
+    check("disabled (TTL 0) ⇒ every call fetches",
+          _use(GridStore(ttl_s=0)).enabled is False)
+
+
+# ── F ───────────────────────────────────────────────────────────────────────────
+def section_f():
+    print("\nF. pagination past the server row cap")
+    docs = [f"p{i:03d}" for i in range(100)]
+    db = FakeDB(rows=_rows("user-1", docs, tables_per_doc=12, extra_text=False))
+    store = _use(GridStore(use_redis=False))
+    by_doc = TI.load_grids_by_doc(db, docs, per_doc_top=12)
+    counts = {d: len(g) for d, g in by_doc.items()}
+    check("1200 table rows over a 1000-row cap ⇒ every doc has all 12 tables",
+          len(counts) == 100 and set(counts.values()) == {12},
+          f"{len(counts)} docs, {sorted(set(counts.values()))}")
+    spans = [p[0] for p in db.pages]
+    check("…read as two ordered ranged pages of the one in_() query",
+          spans == [(0, 999), (1000, 1999)]
+          and all(p[1] == ["document_id", "chunk_index"] for p in db.pages), str(db.pages))
+    check("…and every doc is cached complete", store.stats()["docs"] == 100)
+
+    db2 = FakeDB(rows=_rows("user-1", docs, tables_per_doc=12))
+    db2.no_jsonb = True
+    _use(GridStore(use_redis=False))
+    full = TI.load_grids_by_doc(db2, docs, per_doc_top=12)
+    check("the full-pull fallback (1300 table + text rows) is paged too",
+          len(full) == 100 and all(len(g) == 12 for g in full.values())
+          and [p[0] for p in db2.pages] == [(0, 999), (0, 999), (1000, 1999)],
+          str([p[0] for p in db2.pages]))
+
+    db3 = FakeDB(rows=_rows("user-1", docs, tables_per_doc=12, extra_text=False))
+    db3.fail_from_row = 1000
+    store3 = _use(GridStore(use_redis=False))
+    got = TI.load_grids_by_doc(db3, docs, per_doc_top=12)
+    check("a page failing part-way ⇒ no doc of that batch is returned truncated",
+          all(len(g) in (0, 12) for g in got.values()) and not any(got.values()),
+          str({d: len(g) for d, g in list(got.items())[:3]}))
+    check("…and nothing is cached", store3.stats()["docs"] == 0, str(store3.stats()))
+    db3.fail_from_row = None
+    n = len(db3.pages)
+    again = TI.load_grids_by_doc(db3, docs, per_doc_top=12)
+    check("…so the next call re-fetches and gets every table",
+          len(db3.pages) == n + 2 and all(len(g) == 12 for g in again.values()) and len(again) == 100)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("  test_grid_store")
+    print("=" * 60)
+    _orig = GS.grid_store
+    try:
+        section_a()
+        section_b()
+        section_c()
+        section_d()
+        section_e()
+        section_f()
+    finally:
+        GS.grid_store = _orig
+    print("\n" + "=" * 60)
+    print(f"  test_grid_store: {_passed} passed, {_failed} failed")
+    print("=" * 60)
+    sys.exit(1 if _failed else 0)
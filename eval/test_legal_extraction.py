@@ -93,6 +93,11 @@ def test_contract():
     _check(len(text_chunks) >= 8,
            f"clause-aware chunking yields multiple clause chunks (got {len(text_chunks)})")
 
+    # Ingest stamps token_count (the context budgets sum it instead of re-encoding)
+    from src.utils import _token_count
+    _check(all(c.metadata.get("token_count") == _token_count(c.page_content) for c in chunks),
+           "every chunk carries its token_count")
+
     # Clause survival: each clause label + body present, and WHOLE (same chunk)
     for label, body in CONTRACT_CLAUSES:
         whole = any(label.lower() in c.page_content.lower()
@@ -0,0 +1,327 @@
+"""LLM rate limiter gate — shared RPM/TPM buckets, priorities, breaker hooks (offline, $0).
+
+MAP, the verifier pools, agent loops, the review grid and RAGAS each ran their own thread
+pools against OpenAI / Anthropic and found the provider's limits via 429s. rate_limiter.py
+puts one token bucket per (provider, model) in Redis in front of all of them. These checks
+run the in-process bucket (the same math as the Redis script) with small, fast limits:
+
+  A. BUCKET: a fresh bucket admits at once; a drained one waits ≈ cost / refill rate; 40
+     contending threads are admitted no faster than the RPM allows.
+  B. PRIORITY: at 20% left, BATCH (30% floor) is held while STANDARD and INTERACTIVE go;
+     a refund lets BATCH through.
+  C. ACCOUNTING: a slot settles the up-front charge to real usage; a 429 drains the bucket
+     and re-raises; the LangChain adapter gates a chat model and settles from usage_metadata.
+  D. BREAKER: OPEN ⇒ CircuitOpenError immediately (no queueing); HALF_OPEN ⇒ INTERACTIVE
+     passes, BATCH waits for CLOSED or times out with RateLimitTimeout. Gating never moves
+     the breaker (a BATCH call polling past the cooldown leaves it OPEN); slot and the
+     LangChain callback record outcomes, so failures trip it, a probe's success closes it,
+     and cancellation / our own timeouts are not counted.
+  E. WIRING / DEGRADE: queue-wait stats + Prometheus histogram; agent_core models charge and
+     settle through the limiter (grid mode ⇒ BATCH); a failing Redis falls back per process
+     and backs off; LLM_RATE_LIMIT=false ⇒ no-op.
+
+    python -u eval/test_llm_rate_limiter.py
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.components import rate_limiter as RL  # noqa: E402
+from src.components.circuit_breaker import CircuitOpenError, CircuitState, get_breaker  # noqa: E402
+from src.components.rate_limiter import (  # noqa: E402
+    LangChainRateLimiter, Limit, LLMRateLimiter, Priority, RateLimitTimeout,
+)
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+def _limiter(**kw):
+    return LLMRateLimiter(enabled=True, shared=False, **kw)
+
+
+def _tok_level(lim, provider, model):
+    return lim._local._state[f"{RL._PREFIX}{provider}:{model}"][1]
+
+
+class RateLimitError(Exception):
+    """Named like openai.RateLimitError / anthropic.RateLimitError."""
+
+
+# ── A. bucket ──
+print("\n── A. token bucket ──")
+RL._LIMITS["openai:t-a"] = Limit(rpm=6000, tpm=60000)          # 100 req/s, 1000 tok/s
+lim = _limiter()
+waited = lim.acquire("openai", "t-a", tokens=100)
+check("A: fresh bucket admits immediately", waited < 0.01, f"{waited:.3f}s")
+lim.settle("openai", "t-a", 60000)                               # drain the TPM bucket
+waited = lim.acquire("openai", "t-a", tokens=200)
+check("A: drained bucket waits ≈ cost / refill (200 tok @ 1000/s)", 0.15 < waited < 0.5, f"{waited:.3f}s")
+
+RL._LIMITS["openai:t-a2"] = Limit(rpm=6000, tpm=10**9)
+lim = _limiter()
+lim._take("openai", "t-a2", 6000, 0, 0.0, force=True)            # drain the RPM bucket
+t0 = time.monotonic()
+threads = [threading.Thread(target=lambda: [lim.acquire("openai", "t-a2") for _ in range(5)])
+           for _ in range(8)]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+elapsed = time.monotonic() - t0
+check("A: 40 contending calls at 100 req/s take ≥ 0.35 s (never over the limit)",
+      0.35 <= elapsed < 2.0, f"{elapsed:.2f}s")
+check("A: every contending call was admitted and counted",
+      lim.stats()["queues"]["openai:interactive"]["calls"] == 40)
+
+
+# ── B. priority ──
+print("\n── B. priorities ──")
+RL._LIMITS["openai:t-b"] = Limit(rpm=6000, tpm=100000)
+lim = _limiter()
+lim.settle("openai", "t-b", 80000)                               # 20% left
+check("B: BATCH is held below its 30% floor", lim.acquire("openai", "t-b", 100, Priority.BATCH, blocking=False) == -1.0)
+check("B: STANDARD (10% floor) is admitted", lim.acquire("openai", "t-b", 100, Priority.STANDARD, blocking=False) >= 0)
+check("B: INTERACTIVE is admitted", lim.acquire("openai", "t-b", 100, Priority.INTERACTIVE, blocking=False) >= 0)
+lim.settle("openai", "t-b", -30000)                              # refund → ~50% left
+check("B: after a refund BATCH goes", lim.acquire("openai", "t-b", 100, Priority.BATCH, blocking=False) >= 0)
+
+
+# ── C. accounting ──
+print("\n── C. settle, 429 penalty, LangChain adapter ──")
+RL._LIMITS["openai:t-c"] = Limit(rpm=6000, tpm=100000)
+lim = _limiter()
+with lim.slot("openai", "t-c", tokens=5000) as slot:
+    slot.used(500)
+lvl = _tok_level(lim, "openai", "t-c")
+check("C: slot charges 5000 up front, settles to the 500 used", 99400 < lvl <= 100000, f"{lvl:.0f}")
+
+raised = False
+try:
+    with lim.slot("openai", "t-c", tokens=100):
+        raise RateLimitError("429 Too Many Requests")
+except RateLimitError:
+    raised = True
+lvl = _tok_level(lim, "openai", "t-c")
+check("C: a 429 in the body re-raises and drains ~25% of the bucket",
+      raised and 74000 < lvl < 76000 and lim.stats()["queues"]["openai:any"]["rate_limited_429"] == 1, f"{lvl:.0f}")
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel  # noqa: E402
+from langchain_core.messages import AIMessage  # noqa: E402
+
+RL._LIMITS["openai:t-lc"] = Limit(rpm=6000, tpm=100000)
+lim = _limiter()
+rl = LangChainRateLimiter(lim, "openai", "t-lc", Priority.INTERACTIVE, est_tokens=4000)
+msg = AIMessage(content="ok", usage_metadata={"input_tokens": 250, "output_tokens": 50, "total_tokens": 300})
+chat = GenericFakeChatModel(messages=iter([msg]), rate_limiter=rl, callbacks=[rl])
+out = chat.invoke("hello")
+lvl = _tok_level(lim, "openai", "t-lc")
+check("C: chat model gated by the adapter, settled 4000 → 300 via usage_metadata",
+      out.content == "ok" and 99650 < lvl <= 99800, f"{lvl:.0f}")
+rl.on_llm_error(SimpleNamespace(status_code=429))
+check("C: adapter turns an HTTP 429 error into a bucket penalty", _tok_level(lim, "openai", "t-lc") < 76000)
+
+old_enabled = RL.llm_limiter.enabled
+kw = RL.llm_limit_kwargs("openai", "gpt-4o-mini", Priority.BATCH, est_tokens=1000)
+RL.llm_limiter.enabled = False
+kw_off = RL.llm_limit_kwargs("openai", "gpt-4o-mini")
+RL.llm_limiter.enabled = old_enabled
+from langchain_openai import ChatOpenAI  # noqa: E402
+co = ChatOpenAI(model="gpt-4o-mini", api_key="sk-offline", **kw)
+check("C: llm_limit_kwargs wires ChatOpenAI (rate_limiter + callback, BATCH); {} when disabled",
+      co.rate_limiter is kw["rate_limiter"] and kw["rate_limiter"] in co.callbacks
+      and kw["rate_limiter"].priority == Priority.BATCH and kw_off == {})
+
+
+# ── D. breaker ──
+print("\n── D. circuit breaker states ──")
+RL._LIMITS["openai:t-d"] = Limit(rpm=6000, tpm=100000)
+breaker = get_breaker("openai")
+lim = _limiter(max_wait_s=0.5)
+try:
+    with breaker._lock:
+        breaker.state, breaker._opened_at = CircuitState.OPEN, time.time()
+    t0 = time.monotonic()
+    try:
+        lim.acquire("openai", "t-d", 10)
+        ok = False
+    except CircuitOpenError:
+        ok = time.monotonic() - t0 < 0.05
+    check("D: OPEN ⇒ CircuitOpenError at once, no queueing", ok)
+
+    with breaker._lock:
+        breaker.state = CircuitState.HALF_OPEN
+    check("D: HALF_OPEN ⇒ INTERACTIVE still passes", lim.acquire("openai", "t-d", 10) < 0.05)
+    try:
+        lim.acquire("openai", "t-d", 10, Priority.BATCH)
+        ok = False
+    except RateLimitTimeout:
+        ok = True
+    check("D: HALF_OPEN ⇒ BATCH waits, then RateLimitTimeout", ok and lim.stats()["queues"]["openai:batch"]["timeouts"] == 1)
+
+    lim = _limiter(max_wait_s=5)
+
+    def _recover():
+        time.sleep(0.3)
+        with breaker._lock:
+            breaker.state = CircuitState.CLOSED
+    threading.Thread(target=_recover).start()
+    waited = lim.acquire("openai", "t-d", 10, Priority.BATCH)
+    check("D: BATCH admitted once the breaker CLOSEs", 0.25 < waited < 2.0, f"{waited:.2f}s")
+
+    # Gating is read-only: past the cooldown a queued BATCH call sees HALF_OPEN and waits,
+    # but the breaker itself stays OPEN — nothing was sent, so nothing was probed.
+    lim = _limiter(max_wait_s=0.3)
+    with breaker._lock:
+        breaker.state = CircuitState.OPEN
+        breaker._opened_at = time.time() - breaker.config.timeout_duration - 1
+    try:
+        lim.acquire("openai", "t-d", 10, Priority.BATCH)
+        ok = False
+    except RateLimitTimeout:
+        ok = True
+    check("D: a BATCH call polling past the cooldown waits and leaves the breaker OPEN",
+          ok and breaker.state == CircuitState.OPEN
+          and breaker.current_state() == CircuitState.HALF_OPEN, breaker.state.value)
+    with lim.slot("openai", "t-d", 10):
+        pass
+    with lim.slot("openai", "t-d", 10):
+        pass
+    check("D: the INTERACTIVE probe's outcomes (via slot) close the breaker",
+          breaker.state == CircuitState.CLOSED, breaker.state.value)
+
+    for _ in range(breaker.config.failure_threshold):
+        try:
+            with lim.slot("openai", "t-d", 10):
+                raise ConnectionError("upstream 500")
+        except ConnectionError:
+            pass
+    check("D: failures inside slot trip the breaker OPEN", breaker.state == CircuitState.OPEN,
+          breaker.state.value)
+    with breaker._lock:
+        breaker.state, breaker._failure_times, breaker._opened_at = CircuitState.CLOSED, [], None
+
+    for exc in (GeneratorExit(), RateLimitTimeout("queued too long"), CircuitOpenError("open")):
+        for _ in range(breaker.config.failure_threshold):
+            try:
+                with lim.slot("openai", "t-d", 10):
+                    raise exc
+            except BaseException:  # noqa: BLE001
+                pass
+    check("D: cancellation and our own refusals are not recorded as provider failures",
+          breaker.state == CircuitState.CLOSED and not breaker._failure_times)
+
+    rl = LangChainRateLimiter(lim, "openai", "t-d", Priority.INTERACTIVE, est_tokens=10)
+    for _ in range(breaker.config.failure_threshold):
+        rl.on_llm_error(ConnectionError("upstream 500"))
+    check("D: LangChain on_llm_error records failures (breaker trips)",
+          breaker.state == CircuitState.OPEN, breaker.state.value)
+    with breaker._lock:
+        breaker._opened_at = time.time() - breaker.config.timeout_duration - 1
+    rl.on_llm_end(SimpleNamespace(llm_output={}, generations=[]))
+    rl.on_llm_end(SimpleNamespace(llm_output={}, generations=[]))
+    check("D: LangChain on_llm_end records the probe's success (breaker closes)",
+          breaker.state == CircuitState.CLOSED, breaker.state.value)
+    quiet = LangChainRateLimiter(lim, "openai", "t-d", Priority.INTERACTIVE, est_tokens=10,
+                                 breaker_outcomes=False)
+    for _ in range(breaker.config.failure_threshold):
+        quiet.on_llm_error(ConnectionError("upstream 500"))
+    check("D: breaker_outcomes=False (a caller that records itself) leaves the breaker alone",
+          breaker.state == CircuitState.CLOSED and not breaker._failure_times)
+finally:
+    with breaker._lock:
+        breaker.state, breaker._failure_times, breaker._opened_at = CircuitState.CLOSED, [], None
+
+
+# ── E. wiring / degrade ──
+print("\n── E. metrics, agent_core wiring, degrade ──")
+from prometheus_client import REGISTRY  # noqa: E402
+
+RL._LIMITS["openai:t-e"] = Limit(rpm=6000, tpm=60000)
+lim = _limiter()
+lim.settle("openai", "t-e", 60000)
+lim.acquire("openai", "t-e", 100, Priority.INTERACTIVE)
+s = lim.stats()["queues"]["openai:interactive"]
+after = REGISTRY.get_sample_value("docquery_llm_ratelimit_wait_seconds_count",
+                                  {"provider": "openai", "priority": "interactive"}) or 0
+check("E: queue-wait recorded (stats + Prometheus histogram)",
+      s["throttled"] == 1 and s["wait_s_max"] > 0.05 and after >= 1, str(s))
+
+import openai  # noqa: E402
+
+from src.components.agent_core.model import OpenAIModel, build_model  # noqa: E402
+
+
+class _FakeCompletions:
+    def create(self, **kwargs):
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="done", tool_calls=None))],
+            usage=SimpleNamespace(prompt_tokens=900, completion_tokens=100, total_tokens=1000))
+
+
+class _FakeOpenAI:
+    def __init__(self, api_key=None):
+        self.chat = SimpleNamespace(completions=_FakeCompletions())
+
+
+RL._LIMITS["openai:t-agent"] = Limit(rpm=6000, tpm=100000)
+real_openai, real_singleton = openai.OpenAI, RL.llm_limiter
+import src.components.agent_core.model as M  # noqa: E402
+lim = _limiter()
+openai.OpenAI, M.llm_limiter = _FakeOpenAI, lim
+try:
+    cfg = SimpleNamespace(OPENAI_API_KEY="sk-offline", ANTHROPIC_API_KEY="")
+    grid_model = build_model("grid", SimpleNamespace(model="t-agent"), cfg)
+    chat_model = build_model("standard", SimpleNamespace(model="t-agent"), cfg)
+    resp = OpenAIModel("t-agent", "sk-offline", max_tokens=4096).invoke(
+        [{"role": "user", "content": "x" * 4000}], [])
+    lvl = _tok_level(lim, "openai", "t-agent")
+finally:
+    openai.OpenAI, M.llm_limiter = real_openai, real_singleton
+check("E: build_model ⇒ grid mode BATCH, otherwise INTERACTIVE",
+      grid_model.priority == Priority.BATCH and chat_model.priority == Priority.INTERACTIVE)
+check("E: agent_core call charged then settled to usage.total_tokens (1000)",
+      resp.text == "done" and 98900 < lvl <= 99100, f"{lvl:.0f}")
+
+
+class _DownRedis:
+    calls = 0
+
+    def register_script(self, script):
+        _DownRedis.calls += 1
+        raise ConnectionError("redis down")
+
+
+RL._LIMITS["openai:t-r"] = Limit(rpm=6000, tpm=100000)
+lim = LLMRateLimiter(enabled=True, client=_DownRedis())
+w1 = lim.acquire("openai", "t-r", 10)
+w2 = lim.acquire("openai", "t-r", 10)
+check("E: Redis down ⇒ per-process bucket, one Redis attempt per backoff window",
+      w1 < 0.05 and w2 < 0.05 and _DownRedis.calls == 1 and not lim.stats()["shared"])
+
+off = LLMRateLimiter(enabled=False, shared=False)
+off.settle("openai", "t-r", 10**9)
+check("E: disabled ⇒ acquire is a no-op", off.acquire("openai", "t-r", 10**9) == 0.0 and not off._local._state)
+
+
+# ── tally ──
+print(f"\n{'='*60}")
+print(f"  test_llm_rate_limiter: {_passed} passed, {_failed} failed")
+print(f"{'='*60}")
+sys.exit(0 if _failed == 0 else 1)
@@ -0,0 +1,252 @@
+"""Brain MAP extract cache gate — rephrases and follow-ups skip MAP for unchanged docs (offline, $0).
+
+Every Brain run used to re-send the same top chunks of the same docs to the MAP LLM, even when
+the user only rephrased the question. map_cache.MapExtractCache stores each parsed
+PerDocExtract in Redis, keyed by (normalised question, doc_id, chunk-set hash, MAP model +
+prompt + filename), and the ingest worker / doc delete drop a doc's entries. An in-memory
+Redis double stands in for the server:
+
+  A. KEY: filler / case / punctuation rephrasings share a key; word order, a changed chunk set,
+     another doc, model or filename do not.
+  B. HIT: the same question twice ⇒ zero MAP calls the second time, every brain_map is
+     cached=true, coverage.docs_cached == N, identical verified claims + REDUCE input.
+  C. FOLLOW-UP: retrieval moved for 3 of 10 docs ⇒ exactly 3 MAP calls.
+  D. CONTENT: the stored extract is MAP's (pre-VERIFY: unverified, MAP confidence); a failed
+     MAP is never stored.
+  E. INVALIDATION / DEGRADE: invalidate_doc drops one doc only; a Redis that errors is a miss
+     (MAP runs) and backs off instead of costing a round-trip per doc; disabled ⇒ no Redis.
+
+    python -u eval/test_map_cache.py
+"""
+from __future__ import annotations
+
+import fnmatch
+import json
+import re
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.documents import Document  # noqa: E402
+
+from src.components.brain import map_cache as MC  # noqa: E402
+from src.components.brain.map_cache import MapExtractCache, normalize_question  # noqa: E402
+from src.components.brain.map_reduce import Brain  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+class FakeRedis:
+    """The four commands MapExtractCache uses, in memory (TTL recorded, not enforced)."""
+
+    def __init__(self, fail=False):
+        self.data: dict[bytes, bytes] = {}
+        self.ttl: dict[bytes, int] = {}
+        self.calls = 0
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def _hit(self):
+        with self.lock:
+            self.calls += 1
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    def get(self, k):
+        self._hit()
+        return self.data.get(k.encode())
+
+    def setex(self, k, ttl, v):
+        self._hit()
+        self.data[k.encode()] = v.encode() if isinstance(v, str) else v
+        self.ttl[k.encode()] = ttl
+
+    def scan_iter(self, pattern, count=None):
+        self._hit()
+        return [k for k in list(self.data) if fnmatch.fnmatch(k.decode(), pattern)]
+
+    def delete(self, *keys):
+        self._hit()
+        for k in keys:
+            self.data.pop(k, None)
+
+
+class _Resp:
+    def __init__(self, content):
+        self.content = content
+
+
+class ScriptedMap:
+    def __init__(self, fail=()):
+        self.calls: list[str] = []
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+
+    def invoke(self, messages):
+        doc = re.search(r"Document \[(\S+) \|", messages[1].content).group(1)
+        with self.lock:
+            self.calls.append(doc)
+        if doc in self.fail:
+            raise RuntimeError("map model 500")
+        return _Resp(json.dumps([
+            {"claim": f"{doc} reports revenue of {len(doc)} million.",
+             "verbatim_span": f"{doc} revenue", "confidence": 0.8}]))
+
+
+class ScriptedVerifier:
+    def invoke(self, messages):
+        user = messages[1].content
+        if "ITEM 1" in user:
+            ids = re.findall(r"ITEM (\d+)\n", user)
+        elif "SENTENCES FROM THE ANSWER:" in user:
+            ids = re.findall(r"^(\d+)\. ", user.split("SENTENCES FROM THE ANSWER:")[1], re.M)
+        else:
+            return _Resp(json.dumps({"verdict": "x", "confidence": 0.9}))
+        return _Resp(json.dumps({"verdicts": [{"id": int(i), "verdict": "x", "confidence": 0.9} for i in ids]}))
+
+
+class ScriptedReduce:
+    def __init__(self):
+        self.inputs: list[str] = []
+
+    def invoke(self, messages):
+        self.inputs.append(messages[1].content)
+        return _Resp("Revenue is reported per filing.\n\n## Confidence\n0.9 — fine")
+
+
+def _doc_chunks(n=10, moved=()):
+    out = {}
+    for d in range(n):
+        did = f"doc{d:02d}"
+        ver = "v2" if did in moved else "v1"
+        out[did] = (f"f{d:02d}.pdf", [Document(page_content=f"{did} revenue text {ver}",
+                                                metadata={"chunk_id": f"{did}-c0-{ver}"})])
+    return out
+
+
+def _brain(cache, map_llm=None):
+    brain = Brain(config=object())
+    brain._map_llm = map_llm or ScriptedMap()
+    brain._verify_llm = ScriptedVerifier()
+    brain._reduce_llm = ScriptedReduce()
+    brain._map_cache = cache
+    return brain
+
+
+def _stream(brain, q, dc):
+    return [json.loads(line[6:]) for line in brain.run_stream(q, dc) if line.startswith("data: {")]
+
+
+# ── A. key ──
+print("\n── A. cache key ──")
+chunks = _doc_chunks(1)["doc00"][1]
+K = MapExtractCache.key
+check("A: rephrasings normalise together",
+      normalize_question("What is the total revenue in 2023?") == normalize_question("what's  total Revenue in 2023")
+      == "total revenue in 2023")
+check("A: same key for a rephrase", K("What is the revenue?", "d", chunks, "m") == K("revenue", "d", chunks, "m"))
+check("A: word order matters",
+      K("did A acquire B", "d", chunks) != K("did B acquire A", "d", chunks))
+check("A: chunk set / doc / salt each change the key",
+      len({K("q", "d", chunks, "m"), K("q", "d", _doc_chunks(1, moved={"doc00"})["doc00"][1], "m"),
+           K("q", "e", chunks, "m"), K("q", "d", chunks, "m2")}) == 4)
+check("A: chunk without a chunk_id hashes its text",
+      K("q", "d", [Document(page_content="x")]) != K("q", "d", [Document(page_content="y")]))
+
+
+# ── B. hit ──
+print("\n── B. the same question twice ──")
+redis = FakeRedis()
+cache = MapExtractCache(enabled=True, ttl_s=600, client=redis)
+dc = _doc_chunks(10)
+b1 = _brain(cache)
+ev1 = _stream(b1, "What was revenue?", dc)
+b2 = _brain(cache)
+ev2 = _stream(b2, "what was the revenue", dc)
+maps2 = [e for e in ev2 if e["type"] == "brain_map"]
+check("B: first run MAPs every doc, stores 10 extracts with the TTL",
+      len(b1._map_llm.calls) == 10 and len(redis.data) == 10 and set(redis.ttl.values()) == {600})
+check("B: rephrased second run makes zero MAP calls", b2._map_llm.calls == [], str(b2._map_llm.calls))
+check("B: every brain_map is cached=true; first run none",
+      len(maps2) == 10 and all(e["cached"] for e in maps2)
+      and not any(e["cached"] for e in ev1 if e["type"] == "brain_map"))
+check("B: coverage.docs_cached == 10", ev2[-1]["coverage"]["docs_cached"] == 10, str(ev2[-1].get("coverage")))
+check("B: identical REDUCE input + verified counts",
+      b1._reduce_llm.inputs == b2._reduce_llm.inputs
+      and [e for e in ev1 if e["type"] == "brain_verify" and e.get("done")][0]["claims_verified"]
+      == [e for e in ev2 if e["type"] == "brain_verify" and e.get("done")][0]["claims_verified"])
+
+
+# ── C. follow-up ──
+print("\n── C. follow-up where retrieval moved for 3 docs ──")
+moved = {"doc01", "doc04", "doc07"}
+b3 = _brain(cache)
+ev3 = _stream(b3, "What was revenue?", _doc_chunks(10, moved=moved))
+check("C: only the 3 moved docs are MAP'd", sorted(b3._map_llm.calls) == sorted(moved), str(b3._map_llm.calls))
+check("C: brain_map cached flags match",
+      {e["filename"] for e in ev3 if e["type"] == "brain_map" and not e["cached"]} == {"f01.pdf", "f04.pdf", "f07.pdf"})
+
+
+# ── D. content ──
+print("\n── D. what is stored ──")
+stored = [json.loads(v) for v in redis.data.values()]
+check("D: stored claims are MAP output (unverified, MAP confidence)",
+      all(not c["verified"] and c["confidence"] == 0.8 for s in stored for c in s["claims"]))
+redis_d = FakeRedis()
+cache_d = MapExtractCache(enabled=True, ttl_s=600, client=redis_d)
+_stream(_brain(cache_d, ScriptedMap(fail={"doc02"})), "q", _doc_chunks(4))
+b4 = _brain(cache_d)
+_stream(b4, "q", _doc_chunks(4))
+check("D: a failed MAP is not stored — only it is re-MAP'd", b4._map_llm.calls == ["doc02"], str(b4._map_llm.calls))
+
+
+# ── E. invalidation / degrade ──
+print("\n── E. invalidation and Redis failures ──")
+before = len(redis.data)
+dropped = cache.invalidate_doc("doc03")
+b5 = _brain(cache)
+_stream(b5, "What was revenue?", dc)
+check("E: invalidate_doc drops only that doc's entries",
+      dropped == 1 and len(redis.data) == before and b5._map_llm.calls == ["doc03"],
+      f"dropped={dropped} calls={b5._map_llm.calls}")
+
+old = MC.map_extract_cache
+MC.map_extract_cache = cache
+try:
+    MC.invalidate_doc("doc05")
+finally:
+    MC.map_extract_cache = old
+check("E: module-level invalidate_doc (worker / db hook) hits the singleton",
+      not any(k.startswith(b"docquery:map_extract:doc05:") for k in redis.data))
+
+down = FakeRedis(fail=True)
+b6 = _brain(MapExtractCache(enabled=True, ttl_s=600, client=down))
+ev6 = _stream(b6, "q", _doc_chunks(10))
+check("E: Redis erroring ⇒ every doc still MAP'd, answer produced",
+      len(b6._map_llm.calls) == 10 and ev6[-1]["type"] == "brain_meta")
+check("E: ... and the cache backs off instead of a round-trip per doc", down.calls <= 4, f"{down.calls} calls")
+
+off = FakeRedis()
+b7 = _brain(MapExtractCache(enabled=False, client=off))
+_stream(b7, "q", _doc_chunks(3))
+check("E: BRAIN_MAP_CACHE=false ⇒ Redis untouched", off.calls == 0 and len(b7._map_llm.calls) == 3)
+
+
+# ── tally ──
+print(f"\n{'='*60}")
+print(f"  test_map_cache: {_passed} passed, {_failed} failed")
+print(f"{'='*60}")
+sys.exit(0 if _failed == 0 else 1)
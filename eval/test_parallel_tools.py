@@ -0,0 +1,295 @@
+"""Parallel tool-call gate — independent reads of one agent turn run together (offline, $0).
+
+A model turn that carries several tool_calls used to execute them one after another; a deep
+turn's 3-5 search_vault / read_document calls are each a multi-second Pinecone / Supabase
+round-trip. run_agent now runs a consecutive run of registry.parallel_safe calls on a
+bounded pool (AGENT_TOOL_CONCURRENCY) and folds the results back in call order. A scripted
+model and a sleeping registry stand in for the live model and stores:
+
+  A. REGISTRY: the pure reads (search_vault, read_document, search_knowledge) are parallel-
+     safe; compute / list_metrics / table_lookup / survey_collection are not.
+  B. WALL: 4 reads of 0.2s in one turn finish in ~0.2s, not 0.8s; the pool is bounded.
+  C. DETERMINISM: results finishing in reverse order still land in call order — history,
+     ledger, tool_result events and meta are identical to AGENT_TOOL_CONCURRENCY=1.
+  D. BOUNDARIES: a non-safe call, a T3-blocked call and a repeated signature each end a
+     batch; T3 blocking / notices behave as before.
+  E. FALLBACKS: a registry without parallel_safe, or concurrency 1, runs sequentially;
+     concurrent read_document fresh loads join scope.grids without duplicates.
+
+    python -u eval/test_parallel_tools.py
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.components.agent_core import loop as L  # noqa: E402
+from src.components.agent_core.budgets import Budget  # noqa: E402
+from src.components.agent_core.loop import GateOutcome, run_agent  # noqa: E402
+from src.components.agent_core.model import ModelResponse, ScriptedModel, ToolCall  # noqa: E402
+from src.components.agent_core.registry import REGISTRY, RunScope, ToolRegistry  # noqa: E402
+from src.components.agent_core.tools._envelope import error_result, ok_result  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+# ── doubles ─────────────────────────────────────────────────────────────────────
+class SleepyRegistry(ToolRegistry):
+    """Real parallel_safe policy; execute sleeps per call and records overlap."""
+
+    def __init__(self, delays=None, fail=()):
+        self.delays = delays or {}
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.order: list = []
+
+    def execute(self, call, scope):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delays.get(call.id, 0.05))
+            with self.lock:
+                self.order.append(call.id)
+            if call.id in self.fail:
+                return error_result(f"{call.id} failed")
+            return ok_result(summary=f"{call.name} {call.id}",
+                             data={"id": call.id},
+                             provenance=[{"kind": "span", "doc": f"doc-{call.id}", "page": 1}])
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class SequentialOnly:
+    """A registry double from before parallel_safe existed (schemas + execute only)."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def schemas(self, *a, **k):
+        return self.inner.schemas(*a, **k)
+
+    def execute(self, call, scope):
+        return self.inner.execute(call, scope)
+
+
+def _calls(*specs):
+    return [ToolCall(id=cid, name=name, args=args) for cid, name, args in specs]
+
+
+def _search(cid, q=None):
+    return (cid, "search_vault", {"query": q or f"q-{cid}"})
+
+
+def _passing_gate(draft, ledger):
+    return GateOutcome(passed=True)
+
+
+def _budget():
+    return Budget(mode="standard", model="scripted", max_steps=8, wall_clock_s=60,
+                  token_budget=10**9)
+
+
+def _run(calls_per_turn, registry, concurrency):
+    L.AGENT_TOOL_CONCURRENCY = concurrency
+    script = [ModelResponse(text=f"turn {i}", tool_calls=c) for i, c in enumerate(calls_per_turn)]
+    script.append(ModelResponse(text="done", tool_calls=[]))
+    model = ScriptedModel(script)
+    t0 = time.perf_counter()
+    events = list(run_agent("q?", model=model, scope=RunScope(), budget=_budget(),
+                            registry=registry, gate_fn=_passing_gate))
+    return events, model, time.perf_counter() - t0
+
+
+def _tool_messages(model):
+    last = model.calls[-1]["messages"]
+    out = []
+    for m in last:
+        if isinstance(m.get("content"), list) and m["content"] and m["content"][0].get("type") == "tool_result":
+            out.append(("result", m["content"][0]["tool_use_id"], m["content"][0]["content"]))
+        elif m["role"] == "user" and isinstance(m["content"], str) and m["content"].startswith("["):
+            out.append(("notice", m["content"][:40]))
+    return out
+
+
+# ── A ───────────────────────────────────────────────────────────────────────────
+def section_a():
+    print("\nA. registry policy")
+    safe = {n for n in ("search_vault", "read_document", "search_knowledge", "compute",
+                        "list_metrics", "table_lookup", "survey_collection")
+            if REGISTRY.parallel_safe(n)}
+    check("the pure reads are parallel-safe",
+          safe == {"search_vault", "read_document", "search_knowledge"}, str(safe))
+    check("an unknown tool is not", not REGISTRY.parallel_safe("nope"))
+
+
+# ── B ───────────────────────────────────────────────────────────────────────────
+def section_b():
+    print("\nB. wall time")
+    turn = _calls(*[_search(f"s{i}") for i in range(4)])
+    seq_reg = SleepyRegistry({f"s{i}": 0.2 for i in range(4)})
+    _ev, _m, seq_s = _run([turn], seq_reg, 1)
+    par_reg = SleepyRegistry({f"s{i}": 0.2 for i in range(4)})
+    _ev, _m, par_s = _run([turn], par_reg, 4)
+    print(f"        sequential {seq_s:.2f}s → parallel {par_s:.2f}s")
+    check("4 × 0.2s reads: sequential ≈ 0.8s", seq_s >= 0.75, f"{seq_s:.2f}")
+    check("…parallel ≈ 0.2s", par_s < 0.45, f"{par_s:.2f}")
+    check("all 4 overlapped", par_reg.max_active == 4, str(par_reg.max_active))
+    bounded = SleepyRegistry({f"s{i}": 0.1 for i in range(4)})
+    _run([turn], bounded, 2)
+    check("the pool is bounded by AGENT_TOOL_CONCURRENCY", bounded.max_active == 2,
+          str(bounded.max_active))
+
+
+# ── C ───────────────────────────────────────────────────────────────────────────
+def _comparable(events):
+    """Events minus the tool_call positions (a batch announces its calls together)."""
+    return [e for e in events if e["type"] != "tool_call"]
+
+
+def section_c():
+    print("\nC. determinism")
+    # Reverse completion order: the first call is the slowest.
+    turns = [
+        _calls(_search("a"), _search("b"), _search("c"), _search("d")),
+        _calls(("e", "read_document", {"doc_id": "x"}), _search("f"), _search("g")),
+    ]
+    delays = {"a": 0.2, "b": 0.15, "c": 0.1, "d": 0.01, "e": 0.12, "f": 0.05, "g": 0.01}
+    seq_ev, seq_m, _ = _run(turns, SleepyRegistry(dict(delays), fail={"c"}), 1)
+    par_reg = SleepyRegistry(dict(delays), fail={"c"})
+    par_ev, par_m, _ = _run(turns, par_reg, 4)
+    check("the calls really did finish out of order", par_reg.order[:4] != ["a", "b", "c", "d"],
+          str(par_reg.order))
+    check("history (tool results + notices) identical to the sequential run",
+          _tool_messages(par_m) == _tool_messages(seq_m))
+    check("tool results are in the model's call order",
+          [x[1] for x in _tool_messages(par_m) if x[0] == "result"] == list("abcdefg"))
+    check("tool_result / gate / sources / meta events identical",
+          _comparable(par_ev) == _comparable(seq_ev))
+    sources = [e for e in par_ev if e["type"] == "sources"][0]["sources"]
+    check("ledger order follows call order", [s.get("doc") for s in sources if s.get("doc")]
+          == [f"doc-{x}" for x in "abdefg"], str(sources))
+    calls = [e["name"] for e in par_ev if e["type"] == "tool_call"]
+    check("every call is still announced once", len(calls) == 7)
+    first_result = next(i for i, e in enumerate(par_ev) if e["type"] == "tool_result")
+    check("a batch announces its calls before the first result",
+          sum(1 for e in par_ev[:first_result] if e["type"] == "tool_call") == 4)
+
+
+# ── D ───────────────────────────────────────────────────────────────────────────
+def section_d():
+    print("\nD. batch boundaries")
+    mixed = _calls(_search("a"), _search("b"), ("c", "compute", {}), _search("d"), _search("e"))
+    check("a non-safe call ends the batch: [a, b]",
+          L._parallel_batch(mixed, 0, REGISTRY, {}, 2) == [0, 1])
+    check("…runs alone: [c]", L._parallel_batch(mixed, 2, REGISTRY, {}, 2) == [2])
+    check("…and the reads after it batch again: [d, e]",
+          L._parallel_batch(mixed, 3, REGISTRY, {}, 2) == [3, 4])
+    dup = _calls(_search("a", "same"), _search("b", "other"), _search("c", "same"))
+    check("a repeated signature is not co-batched with its twin",
+          L._parallel_batch(dup, 0, REGISTRY, {}, 2) == [0, 1])
+    blocked = _calls(_search("a"), _search("b", "dead"), _search("c"))
+    sig = L._call_signature(blocked[1])
+    check("a call T3 would block ends the batch",
+          L._parallel_batch(blocked, 0, REGISTRY, {sig: 2}, 2) == [0])
+    L.AGENT_TOOL_CONCURRENCY = 1
+    check("concurrency 1 ⇒ single-call batches", L._parallel_batch(mixed, 0, REGISTRY, {}, 2) == [0])
+    L.AGENT_TOOL_CONCURRENCY = 4
+
+    # T3 end-to-end: the same dead call three turns running is blocked on the 3rd, with
+    # parallel batches around it — same outcome as sequential.
+    dead = ("x", "search_vault", {"query": "nothing"})
+    turns = [_calls(_search("p1"), dead), _calls(_search("p2"), dead), _calls(dead, _search("p3"))]
+    outs = []
+    for conc in (1, 4):
+        reg = SleepyRegistry()
+        reg.fail = {"x"}
+        ev, m, _ = _run(turns, reg, conc)
+        outs.append((_comparable(ev), _tool_messages(m), sorted(reg.order)))
+    check("T3 block after two failures — identical with and without parallelism",
+          outs[0] == outs[1])
+    check("…the 3rd dead call was blocked (not executed) and p3 skipped after the redirect",
+          any(e.get("name") == "t3_circuit_breaker" for e in outs[1][0])
+          and outs[1][2].count("x") == 2 and "p3" not in outs[1][2], str(outs[1][2]))
+
+
+# ── E ───────────────────────────────────────────────────────────────────────────
+def section_e():
+    print("\nE. fallbacks")
+    turn = _calls(*[_search(f"s{i}") for i in range(3)])
+    inner = SleepyRegistry({f"s{i}": 0.1 for i in range(3)})
+    _run([turn], SequentialOnly(inner), 4)
+    check("a registry without parallel_safe runs calls one at a time", inner.max_active == 1)
+    seq = SleepyRegistry({f"s{i}": 0.1 for i in range(3)})
+    _run([turn], seq, 1)
+    check("AGENT_TOOL_CONCURRENCY=1 ⇒ sequential", seq.max_active == 1)
+
+    # Concurrent read_document fresh loads of the same doc join scope.grids once.
+    from src.components.brain import table_intent as TI
+    from src.components.brain.analyst import Grid
+
+    tj = {"headers": ["label", "2024"], "rows": [{"label": "Revenue", "2024": "1"}],
+          "periods": ["2024"], "table_id": "t1"}
+    barrier = threading.Barrier(4)
+
+    def _slow_load(*_a, **_k):
+        try:
+            barrier.wait(timeout=2)
+        except threading.BrokenBarrierError:
+            pass
+        return [Grid(tj, doc="new.pdf", page=3)]
+
+    orig = TI.load_grids_for_docs
+    TI.load_grids_for_docs = _slow_load
+    try:
+        preload = [Grid(tj, doc="old.pdf", page=1)]
+        scope = RunScope(grids=preload, db_client=object(),
+                         filename_by_doc={"d-old": "old.pdf", "d-new": "new.pdf"})
+        reads = [ToolCall(id=f"r{i}", name="read_document", args={"doc_id": "new.pdf"})
+                 for i in range(4)]
+        L.AGENT_TOOL_CONCURRENCY = 4
+        results = L._execute_batch(REGISTRY, reads, scope)
+    finally:
+        TI.load_grids_for_docs = orig
+    check("4 concurrent reads of an unloaded doc all succeed", all(r["ok"] for r in results),
+          str([r.get("error") for r in results]))
+    check("…and join scope.grids exactly once (no duplicates)",
+          [(g.doc, g.page) for g in scope.grids] == [("old.pdf", 1), ("new.pdf", 3)],
+          str([(g.doc, g.page) for g in scope.grids]))
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("  test_parallel_tools")
+    print("=" * 60)
+    _orig = L.AGENT_TOOL_CONCURRENCY
+    try:
+        section_a()
+        section_b()
+        section_c()
+        section_d()
+        section_e()
+    finally:
+        L.AGENT_TOOL_CONCURRENCY = _orig
+    print("\n" + "=" * 60)
+    print(f"  test_parallel_tools: {_passed} passed, {_failed} failed")
+    print("=" * 60)
+    sys.exit(1 if _failed else 0)
@@ -0,0 +1,284 @@
+"""Prompt-prefix caching gate — cacheable prefixes, cache usage, discounted budgets ($0).
+
+Every agent step resends the system prompt, the tool schemas and the growing history.
+AnthropicModel now marks the stable prefix with cache_control breakpoints; OpenAIModel
+keeps the prefix byte-stable and sends a prompt_cache_key; both report cache_read /
+cache_write in usage, and Budget.charge bills those at the vendor's cache rate. Fake SDK
+clients record the exact requests (no network):
+
+  A. ANTHROPIC REQUEST: breakpoints on the last tool, the system prompt, the first user
+     turn and the newest message (≤ 4); the loop's history and the registry schemas are
+     never mutated; AGENT_PROMPT_CACHE=false sends the old request byte-for-byte.
+  B. OPENAI REQUEST: one prompt_cache_key per (model, system, tool set), stable across
+     steps and runs; each step's messages extend the previous step's byte-for-byte.
+  C. USAGE: cache reads / writes surface in ModelResponse.usage ("in" = uncached input,
+     for OpenAI too); no cache activity ⇒ exactly {"in", "out"} as before.
+  D. BUDGET: cached tokens are charged at the discounted rate (Claude read 0.1×, write
+     1.25×; OpenAI read 0.5×); run_agent's meta reports the cache; the rate limiter is
+     settled without Claude cache reads.
+
+    python -u eval/test_prompt_cache.py
+"""
+from __future__ import annotations
+
+import copy
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import src.components.agent_core.model as M  # noqa: E402
+from src.components.agent_core.budgets import Budget  # noqa: E402
+from src.components.agent_core.loop import GateOutcome, run_agent  # noqa: E402
+from src.components.agent_core.model import (  # noqa: E402
+    AnthropicModel, ModelResponse, OpenAIModel, ScriptedModel,
+)
+from src.components.agent_core.registry import RunScope  # noqa: E402
+from src.components.rate_limiter import LLMRateLimiter  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+# ── fake vendor clients ─────────────────────────────────────────────────────────
+_TOOLS = [
+    {"name": "search_vault", "description": "search", "input_schema": {"type": "object"}},
+    {"name": "read_document", "description": "read", "input_schema": {"type": "object"}},
+    {"name": "compute", "description": "math", "input_schema": {"type": "object"}},
+]
+
+
+class _FakeAnthropic:
+    def __init__(self, usage):
+        self.requests = []
+        self.usage = usage
+        self.messages = self
+
+    def create(self, **kw):
+        self.requests.append(copy.deepcopy(kw))
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text="ok")],
+                               usage=SimpleNamespace(**self.usage))
+
+    def stream(self, **kw):
+        raise RuntimeError("no streaming in the fake")   # → invoke fallback
+
+
+class _FakeOpenAI:
+    def __init__(self, cached=0):
+        self.requests = []
+        self.cached = cached
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kw):
+        self.requests.append(copy.deepcopy(kw))
+        usage = SimpleNamespace(prompt_tokens=1200, completion_tokens=50, total_tokens=1250,
+                                prompt_tokens_details=SimpleNamespace(cached_tokens=self.cached))
+        msg = SimpleNamespace(content="ok", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=msg)], usage=usage)
+
+
+def _patched(client):
+    saved = (M.get_client, M.llm_limiter)
+    M.get_client = lambda _provider, _key: client
+    M.llm_limiter = LLMRateLimiter(enabled=False)
+    return saved
+
+
+def _restore(saved):
+    M.get_client, M.llm_limiter = saved
+
+
+def _history():
+    """Prior chat + the run's question + one tool exchange (the loop's Anthropic shape)."""
+    return [
+        {"role": "user", "content": "earlier question"},
+        {"role": "assistant", "content": "earlier answer"},
+        {"role": "user", "content": "What is the cap?"},
+        {"role": "assistant", "content": [
+            {"type": "text", "text": "searching"},
+            {"type": "tool_use", "id": "t1", "name": "search_vault", "input": {"query": "cap"}}]},
+        {"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": "t1", "content": "cap is 2x fees"}]},
+    ]
+
+
+def _breakpoints(obj) -> int:
+    return json.dumps(obj).count('"cache_control"')
+
+
+# ── A ───────────────────────────────────────────────────────────────────────────
+def section_a():
+    print("\nA. Anthropic request breakpoints")
+    fake = _FakeAnthropic({"input_tokens": 10, "output_tokens": 5})
+    saved = _patched(fake)
+    try:
+        msgs = _history()
+        before, tools_before = copy.deepcopy(msgs), copy.deepcopy(_TOOLS)
+        AnthropicModel("claude-x", "k", system="You are a reviewer.").invoke(msgs, _TOOLS)
+        kw = fake.requests[-1]
+        check("last tool schema carries the breakpoint (caches every tool)",
+              "cache_control" in kw["tools"][-1]
+              and not any("cache_control" in t for t in kw["tools"][:-1]))
+        check("system prompt sent as one cached text block",
+              kw["system"] == [{"type": "text", "text": "You are a reviewer.",
+                                "cache_control": {"type": "ephemeral"}}], str(kw["system"]))
+        q = kw["messages"][2]["content"]
+        check("the run's first user turn is a breakpoint (end of the early history)",
+              isinstance(q, list) and q[-1].get("cache_control") and q[-1]["text"] == "What is the cap?")
+        check("the newest message is a breakpoint",
+              kw["messages"][-1]["content"][-1].get("cache_control") == {"type": "ephemeral"})
+        check("earlier chat history untouched",
+              kw["messages"][0] == msgs[0] and kw["messages"][1] == msgs[1])
+        check("at most 4 breakpoints", _breakpoints(kw) == 4, str(_breakpoints(kw)))
+        check("the loop's history and the registry schemas are not mutated",
+              msgs == before and _TOOLS == tools_before)
+
+        AnthropicModel("claude-x", "k").invoke([{"role": "user", "content": "hi"}], [])
+        kw1 = fake.requests[-1]
+        check("first step: question is the one message breakpoint, no system / tools",
+              _breakpoints(kw1) == 1 and "system" not in kw1 and "tools" not in kw1)
+
+        M.AGENT_PROMPT_CACHE = False
+        try:
+            AnthropicModel("claude-x", "k", system="You are a reviewer.").invoke(msgs, _TOOLS)
+        finally:
+            M.AGENT_PROMPT_CACHE = True
+        off = fake.requests[-1]
+        check("AGENT_PROMPT_CACHE=false ⇒ the old request exactly",
+              _breakpoints(off) == 0 and off["system"] == "You are a reviewer."
+              and off["messages"] == msgs and off["tools"] == _TOOLS)
+    finally:
+        _restore(saved)
+
+
+# ── B ───────────────────────────────────────────────────────────────────────────
+def section_b():
+    print("\nB. OpenAI prefix stability + cache key")
+    fake = _FakeOpenAI()
+    saved = _patched(fake)
+    try:
+        msgs = _history()
+        m = OpenAIModel("gpt-4o", "k", system="You are a reviewer.")
+        m.invoke(msgs[:3], _TOOLS)
+        m.invoke(msgs, _TOOLS)
+        OpenAIModel("gpt-4o", "k2", system="You are a reviewer.").invoke(msgs, _TOOLS)
+        OpenAIModel("gpt-4o", "k", system="Another prompt.").invoke(msgs, _TOOLS)
+        OpenAIModel("gpt-4o", "k", system="You are a reviewer.").invoke(msgs, _TOOLS[:2])
+        keys = [r.get("prompt_cache_key") for r in fake.requests]
+        check("prompt_cache_key sent", all(keys), str(keys))
+        check("same model + system + tools ⇒ same key (across steps and runs)",
+              keys[0] == keys[1] == keys[2])
+        check("a different system prompt or tool set ⇒ a different key",
+              keys[3] != keys[0] and keys[4] != keys[0] and keys[3] != keys[4])
+        step1, step2 = fake.requests[0]["messages"], fake.requests[1]["messages"]
+        check("system message first", step2[0] == {"role": "system", "content": "You are a reviewer."})
+        check("each step's messages extend the previous step's byte-for-byte",
+              json.dumps(step2[:len(step1)]) == json.dumps(step1))
+        check("tools serialized identically across steps",
+              json.dumps(fake.requests[0]["tools"]) == json.dumps(fake.requests[1]["tools"]))
+        M.AGENT_PROMPT_CACHE = False
+        try:
+            m.invoke(msgs, _TOOLS)
+        finally:
+            M.AGENT_PROMPT_CACHE = True
+        check("AGENT_PROMPT_CACHE=false ⇒ no cache key", "prompt_cache_key" not in fake.requests[-1])
+    finally:
+        _restore(saved)
+
+
+# ── C ───────────────────────────────────────────────────────────────────────────
+def section_c():
+    print("\nC. cache usage surfaced")
+    for usage, want in (
+        ({"input_tokens": 40, "output_tokens": 9, "cache_read_input_tokens": 3000,
+          "cache_creation_input_tokens": 0}, {"in": 40, "out": 9, "cache_read": 3000}),
+        ({"input_tokens": 40, "output_tokens": 9, "cache_read_input_tokens": 0,
+          "cache_creation_input_tokens": 2500}, {"in": 40, "out": 9, "cache_write": 2500}),
+        ({"input_tokens": 40, "output_tokens": 9}, {"in": 40, "out": 9}),
+    ):
+        saved = _patched(_FakeAnthropic(usage))
+        try:
+            got = AnthropicModel("claude-x", "k").invoke([{"role": "user", "content": "q"}], []).usage
+        finally:
+            _restore(saved)
+        check(f"Anthropic usage {want}", got == want, str(got))
+
+    saved = _patched(_FakeOpenAI(cached=1024))
+    try:
+        got = OpenAIModel("gpt-4o", "k").invoke([{"role": "user", "content": "q"}], []).usage
+    finally:
+        _restore(saved)
+    check("OpenAI cached tokens split out of prompt_tokens",
+          got == {"in": 176, "out": 50, "cache_read": 1024}, str(got))
+    saved = _patched(_FakeOpenAI(cached=0))
+    try:
+        got = OpenAIModel("gpt-4o", "k").invoke([{"role": "user", "content": "q"}], []).usage
+    finally:
+        _restore(saved)
+    check("no cache hit ⇒ exactly {in, out}", got == {"in": 1200, "out": 50}, str(got))
+
+
+# ── D ───────────────────────────────────────────────────────────────────────────
+def section_d():
+    print("\nD. budgets at the discounted rate")
+    b = Budget(mode="grid", model="claude-opus", max_steps=6, wall_clock_s=60, token_budget=30_000)
+    charged = b.charge({"in": 100, "out": 50, "cache_read": 10_000, "cache_write": 2_000})
+    check("Claude: read 0.1×, write 1.25×", charged == 100 + 50 + 1000 + 2500 and b.tokens_used == charged,
+          str(charged))
+    o = Budget(mode="grid", model="gpt-4o", max_steps=6, wall_clock_s=60, token_budget=30_000)
+    check("OpenAI: cached read 0.5×", o.charge({"in": 176, "out": 50, "cache_read": 1024}) == 176 + 50 + 512)
+    r = Budget(mode="grid", model="", max_steps=6, wall_clock_s=60, token_budget=30_000)
+    check("the calling model's vendor wins over an empty budget model",
+          r.charge({"in": 0, "out": 0, "cache_read": 1000}, "claude-sonnet") == 100)
+    plain = Budget(mode="grid", model="claude-opus", max_steps=6, wall_clock_s=60, token_budget=0)
+    check("no cache ⇒ in + out, as before",
+          plain.charge({"in": 7, "out": 3}) == 10 and plain.cache_read_tokens == 0)
+
+    cached_usage = {"in": 200, "out": 40, "cache_read": 20_000}
+    model = ScriptedModel([ModelResponse(text="done", usage=dict(cached_usage))])
+    budget = Budget(mode="standard", model="claude-opus", max_steps=3, wall_clock_s=60,
+                    token_budget=10_000)
+    events = list(run_agent("q?", model=model, scope=RunScope(), budget=budget,
+                            gate_fn=lambda _d, _l: GateOutcome(passed=True)))
+    meta = [e for e in events if e["type"] == "meta"][-1]
+    check("run_agent charges the discounted cost (20k cached ≠ 20k budget)",
+          meta["tokens"] == 200 + 40 + 2000 and not budget.tokens_exhausted(), str(meta))
+    check("…and reports the cache in meta", meta.get("cache") == {"read": 20_000, "write": 0}, str(meta))
+    plain_model = ScriptedModel([ModelResponse(text="done", usage={"in": 5, "out": 1})])
+    meta2 = [e for e in run_agent("q?", model=plain_model, scope=RunScope(),
+                                  budget=Budget(mode="standard", model="x", max_steps=3,
+                                                wall_clock_s=60, token_budget=0),
+                                  gate_fn=lambda _d, _l: GateOutcome(passed=True))
+             if e["type"] == "meta"][-1]
+    check("no cache ⇒ meta unchanged (no cache key)", "cache" not in meta2 and meta2["tokens"] == 6)
+
+    u = SimpleNamespace(input_tokens=100, output_tokens=20, cache_read_input_tokens=9000,
+                        cache_creation_input_tokens=500)
+    check("rate limiter settles Claude calls without cache reads",
+          M._anthropic_rate_tokens(u) == 620)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("  test_prompt_cache")
+    print("=" * 60)
+    section_a()
+    section_b()
+    section_c()
+    section_d()
+    print("\n" + "=" * 60)
+    print(f"  test_prompt_cache: {_passed} passed, {_failed} failed")
+    print("=" * 60)
+    sys.exit(1 if _failed else 0)
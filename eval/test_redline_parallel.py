@@ -0,0 +1,279 @@
+"""Parallel redline gate — playbook rows evaluated concurrently (offline, $0).
+
+A redline is one bounded agent per playbook row against the same target doc; the route and
+build_redline used to await them one after another (a 25-clause playbook = 25× one run).
+Rows now run at most REDLINE_CONCURRENCY at a time and each finding streams as it completes,
+tagged with its row index. A scripted model that sleeps per call stands in for the live one:
+
+  A. PARITY: build_redline at concurrency 4 returns the same findings, in playbook order, as
+     at concurrency 1; a malformed row is an abstain finding, never an exception.
+  B. THROUGHPUT: 12 rows at concurrency 4 finish ≳3× faster than sequentially (benchmark
+     prints rows/minute); never more than `concurrency` rows in flight.
+  C. STREAMING: iter_redline_findings yields every row index exactly once, in completion
+     order, with rows started in playbook order.
+  D. ROUTE: /redline/stream tags every finding with its `row`, streams in completion order,
+     and its redline_done counts are identical to the sequential run's.
+
+    python -u eval/test_redline_parallel.py
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+import warnings
+from pathlib import Path
+
+warnings.filterwarnings("ignore")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import src.components.agent_core.redline as R  # noqa: E402
+from src.components.agent_core.model import ModelResponse, ScriptedModel  # noqa: E402
+from src.components.agent_core.registry import RunScope  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+# ── fixtures ────────────────────────────────────────────────────────────────────
+_STATUSES = ("deviation", "conforming", "missing", "abstain")
+
+
+def _rows(n: int):
+    return [{"clause_topic": f"Topic {i}", "standard_position": f"Standard {i}."} for i in range(n)]
+
+
+def _envelope(topic: str) -> str:
+    status = _STATUSES[int(topic.split()[-1]) % len(_STATUSES)]
+    quoted = status in ("deviation", "conforming")
+    return json.dumps({
+        "status": status,
+        "target_quote": f"The {topic} clause says X." if quoted else None,
+        "deviation": "Differs from standard." if status == "deviation" else None,
+        "suggested_edit": f"Replace {topic} with the standard." if status == "deviation" else None,
+        "rationale": "Per the firm standard position." if quoted else None,
+    })
+
+
+class _Meter:
+    """A model_factory whose models sleep `delay(topic)` and answer per topic."""
+
+    def __init__(self, delay=lambda _topic: 0.0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self, system: str = ""):
+        topic = system.split("Clause topic: ", 1)[1].split("\n", 1)[0]
+
+        def _answer(_messages):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(self.delay(topic))
+            with self.lock:
+                self.active -= 1
+            return ModelResponse(text=_envelope(topic), tool_calls=[])
+        return ScriptedModel([_answer])
+
+
+def _scope():
+    return RunScope(collection_id="c1", doc_ids=["d1"], filenames=["contract.pdf"],
+                    filename_by_doc={"d1": "contract.pdf"})
+
+
+def _shape(findings):
+    return [(f.clause_topic, f.status, f.target_quote, f.suggested_edit, f.source_ref)
+            for f in findings]
+
+
+# ── A ───────────────────────────────────────────────────────────────────────────
+def section_a():
+    print("\nA. parity with the sequential redline")
+    rows = _rows(9)
+    seq = R.build_redline(rows, _Meter(), _scope(), "d1", "contract.pdf", concurrency=1)
+    par = R.build_redline(rows, _Meter(lambda t: 0.01 * (9 - int(t.split()[-1]))), _scope(),
+                          "d1", "contract.pdf", concurrency=4)
+    check("same findings in playbook order", _shape(seq.findings) == _shape(par.findings),
+          str(_shape(par.findings)[:2]))
+    check("every status is exercised",
+          {f.status for f in par.findings} == set(_STATUSES), str({f.status for f in par.findings}))
+    bad = R.build_redline(rows[:2] + [{"standard_position": "no topic"}], _Meter(), _scope(),
+                          "d1", "contract.pdf", concurrency=3)
+    check("a malformed row is an abstain finding (redline completes)",
+          len(bad.findings) == 3 and bad.findings[2].status == "abstain"
+          and "Unexpected error" in (bad.findings[2].rationale or ""))
+
+
+# ── B ───────────────────────────────────────────────────────────────────────────
+def section_b():
+    print("\nB. throughput (ScriptedModel, 0.05s per model call)")
+    rows = _rows(12)
+    walls = {}
+    for conc in (1, 2, 4, 8):
+        meter = _Meter(lambda _t: 0.05)
+        t0 = time.perf_counter()
+        R.build_redline(rows, meter, _scope(), "d1", "contract.pdf", concurrency=conc)
+        wall = time.perf_counter() - t0
+        walls[conc] = (wall, meter.max_active)
+        print(f"        concurrency={conc}: 12 rows in {wall:.2f}s → {12 * 60 / wall:,.0f} rows/min "
+              f"(peak in flight {meter.max_active})")
+    speedup = walls[1][0] / walls[4][0]
+    check("concurrency 4 is ≥3× faster than sequential", speedup >= 3.0, f"{speedup:.2f}×")
+    check("never more than `concurrency` rows in flight",
+          all(peak <= c for c, (_w, peak) in walls.items()), str(walls))
+
+
+# ── C ───────────────────────────────────────────────────────────────────────────
+def section_c():
+    print("\nC. findings stream as they complete")
+    rows = _rows(6)
+    started = []
+    lock = threading.Lock()
+    real = R.build_redline_cell
+
+    def _cell(clause_topic, standard_position, fallback_position, model_factory, scope, doc_name):
+        i = int(clause_topic.split()[-1])
+        with lock:
+            started.append(i)
+        time.sleep(0.08 if i % 3 == 0 else 0.01)
+        return real(clause_topic, standard_position, fallback_position, model_factory, scope, doc_name)
+
+    R.build_redline_cell = _cell
+    try:
+        got = list(R.iter_redline_findings(rows, _Meter(), _scope(), "contract.pdf", concurrency=3))
+    finally:
+        R.build_redline_cell = real
+    order = [i for i, _f in got]
+    check("every row index yielded exactly once", sorted(order) == list(range(6)), str(order))
+    check("yielded in completion order (a slow row 0 does not hold the rest back)",
+          order != list(range(6)) and order[0] != 0, str(order))
+    check("each finding matches its row",
+          all(f.clause_topic == rows[i]["clause_topic"] for i, f in got))
+    check("rows start in playbook order", started == sorted(started), str(started))
+    seq = [i for i, _f in R.iter_redline_findings(rows, _Meter(), _scope(), "contract.pdf",
+                                                   concurrency=1)]
+    check("concurrency 1 yields in playbook order", seq == list(range(6)))
+
+
+# ── D ───────────────────────────────────────────────────────────────────────────
+class _FakeQuery:
+    def select(self, *a, **k):
+        return self
+
+    def in_(self, *a, **k):
+        return self
+
+    def eq(self, *a, **k):
+        return self
+
+    def execute(self):
+        return type("R", (), {"data": [{"id": "d1", "filename": "contract.pdf"}]})()
+
+
+class _FakeSB:
+    user_id = "user-1"
+
+    def __init__(self):
+        self.read_client = self.client = type("C", (), {"table": lambda _s, _n: _FakeQuery()})()
+
+    def get_collection_document_ids(self, cid):
+        return ["d1"]
+
+    def is_vault_screened(self, *a, **k):
+        return False
+
+    def screened_vault_ids(self, *a, **k):
+        return set()
+
+
+def _stream_events(client, rows):
+    r = client.post("/redline/stream", json={"collection_id": "c1", "doc_id": "d1",
+                                             "playbook_rows": rows})
+    events = [json.loads(line[6:]) for line in r.text.splitlines()
+              if line.startswith("data: {")]
+    return r.status_code, events
+
+
+def section_d():
+    print("\nD. /redline/stream")
+    try:
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+    except Exception as exc:  # noqa: BLE001
+        print(f"  SKIP (TestClient unavailable: {exc})")
+        return
+    from src.api.dependencies import get_current_user, get_retrieval_mgr, get_user_config
+    from src.api.routes import redline as redline_routes
+    import src.components.agent_core.model as model_mod
+    import src.components.brain.table_intent as ti
+
+    cfg = type("Cfg", (), {"USE_AGENT_CORE": True, "AGENT_MODEL_STANDARD": "stub-model",
+                           "AGENT_STD_MAX_STEPS": 8, "AGENT_STD_WALL_S": 120.0,
+                           "AGENT_STD_TOKEN_BUDGET": 35_000})()
+    app = FastAPI()
+    app.include_router(redline_routes.router)
+    app.dependency_overrides[get_current_user] = lambda: _FakeSB()
+    app.dependency_overrides[get_user_config] = lambda: cfg
+    app.dependency_overrides[get_retrieval_mgr] = lambda: object()
+
+    saved = (model_mod.build_model, ti.load_grids_for_docs, R.REDLINE_CONCURRENCY)
+    meter = _Meter(lambda t: 0.02 * (8 - int(t.split()[-1])))
+    model_mod.build_model = lambda _mode, _budget, _cfg, system="", **_k: meter(system)
+    ti.load_grids_for_docs = lambda *a, **k: []
+    rows = _rows(8)
+    try:
+        client = TestClient(app)
+        R.REDLINE_CONCURRENCY = 1
+        t0 = time.perf_counter()
+        code1, seq = _stream_events(client, rows)
+        seq_wall = time.perf_counter() - t0
+        R.REDLINE_CONCURRENCY = 4
+        t0 = time.perf_counter()
+        code4, par = _stream_events(client, rows)
+        par_wall = time.perf_counter() - t0
+    finally:
+        model_mod.build_model, ti.load_grids_for_docs, R.REDLINE_CONCURRENCY = saved
+
+    print(f"        sequential {seq_wall:.2f}s · concurrency 4 {par_wall:.2f}s")
+    check("both runs stream 200", code1 == 200 and code4 == 200, f"{code1} {code4}")
+    findings = [e for e in par if e["type"] == "finding"]
+    check("every finding carries its row index",
+          sorted(e["row"] for e in findings) == list(range(8))
+          and all(e["clause_topic"] == rows[e["row"]]["clause_topic"] for e in findings))
+    check("findings stream in completion order (slowest row 0 is not first)",
+          findings[0]["row"] != 0, str([e["row"] for e in findings]))
+    check("sequential run streams in playbook order",
+          [e["row"] for e in seq if e["type"] == "finding"] == list(range(8)))
+    done_seq = [e for e in seq if e["type"] == "redline_done"]
+    done_par = [e for e in par if e["type"] == "redline_done"]
+    check("redline_done counts identical to the sequential run",
+          len(done_par) == 1 and done_par == done_seq, f"{done_par} vs {done_seq}")
+    check("concurrent stream is faster", par_wall < seq_wall * 0.6,
+          f"{par_wall:.2f}s vs {seq_wall:.2f}s")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("  test_redline_parallel")
+    print("=" * 60)
+    section_a()
+    section_b()
+    section_c()
+    section_d()
+    print("\n" + "=" * 60)
+    print(f"  test_redline_parallel: {_passed} passed, {_failed} failed")
+    print("=" * 60)
+    sys.exit(1 if _failed else 0)
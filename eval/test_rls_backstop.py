@@ -69,6 +69,7 @@ class _RecQuery:
     def in_(self, *a, **k): return self
     def order(self, *a, **k): return self
     def limit(self, *a, **k): return self
+    def range(self, *a, **k): return self
 
     def execute(self):
         self._calls.append((self._tag, self._op, self._table))
@@ -0,0 +1,335 @@
+"""Routing-clusters gate — hierarchical (cluster-first) Stage-1 routing (offline, $0).
+
+A vault of ≥ ROUTING_HIERARCHICAL_MIN_DOCS docs with a persisted cluster model (migration 022,
+src/components/routing_clusters.py) is routed by scoring the query against the cluster centroids
+first, then only the docs inside the best clusters. This gate pins the contract:
+
+  A. K-MEANS: deterministic for a seed, K ≈ √n clamped, recovers well-separated topics, an emptied
+     cluster is re-seeded (K stays K), every centroid is unit-norm.
+  B. INCREMENTAL REFRESH: no change ⇒ noop; a few new docs fold into their nearest centroid
+     (incremental, fitted_doc_count kept); removed docs leave; churn past ROUTING_RECLUSTER_FRACTION,
+     a dimension change or K > n ⇒ full re-fit.
+  C. ALIGN + PROBE: persisted assignments are used, an unassigned newcomer goes to its nearest
+     centroid in memory, a doc without an embedding is -1 and ALWAYS a probe candidate; the probe
+     takes clusters until the candidate floor AND the cluster floor are met; sentinels cover every
+     topic inside a mixed cluster; the guard widens a probe that missed the query's topic into the
+     cluster holding it, scoring only candidates + sentinels (the rest of the vault stays unscored).
+  D. PERSISTENCE + ROUTER: load_model reads get_routing_clusters rows (torn write / fault ⇒ None),
+     refresh_vault_clusters skips small / disabled vaults and saves + invalidates otherwise; the router
+     routes hierarchically over a clustered vault (same top docs as flat on a topical query), and flat
+     when the vault is below the threshold, has no model, or the threshold is 0; a tight probe that
+     misses the top docs of a between-topics query is widened by the guard to the flat picks; the
+     index's npz round-trip (Redis tier) keeps the clusters and sentinels.
+  E. SCALE: 10k-doc vault — hierarchical vs flat route latency, mean AND worst-query recall vs flat,
+     and the share of the vault a hierarchical query scores.
+
+    python -u eval/test_routing_clusters.py
+"""
+from __future__ import annotations
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+import src.components.db as dbmod  # noqa: E402
+from src.components import routing_clusters as rc  # noqa: E402
+from src.components.routing_clusters import (  # noqa: E402
+    ClusterModel, choose_k, fit, guard, load_model, probe, refresh, refresh_vault_clusters,
+    spherical_kmeans,
+)
+from src.components.document_router import DocumentRouter  # noqa: E402
+from src.components.routing_index import VaultRoutingIndex, routing_index_cache  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+OWNER = "user-owner"
+VAULT = "vault-V"
+DIM = 32
+rng = np.random.default_rng(11)
+CENTERS = rng.normal(size=(8, DIM)) * 3
+
+
+def _corpus(n, start=0, dim=DIM, pending_every=0):
+    """n docs over 8 well-separated topics (topic = i % 8); every `pending_every`-th has no embedding."""
+    rows = []
+    for i in range(start, start + n):
+        centers = CENTERS if dim == DIM else np.resize(CENTERS, (8, dim))
+        emb = centers[i % 8] + 0.3 * rng.normal(size=dim)
+        pending = pending_every and i % pending_every == 0
+        rows.append({
+            "id": f"doc-{i:05d}", "filename": f"f{i:05d}.pdf", "doc_type": "legal_contract",
+            "summary": None if pending else f"topic {i % 8} clause report",
+            "topic_embedding": None if pending else json.dumps(emb.tolist()),
+        })
+    return rows
+
+
+def _rows_of(model: ClusterModel) -> dict:
+    """A model in the shape db.get_routing_clusters returns."""
+    return {
+        "centroids": [{"cluster_id": j, "centroid": json.dumps(model.centroids[j].tolist()),
+                       "size": int(model.sizes[j]), "fitted_doc_count": model.fitted_doc_count}
+                      for j in range(model.k)],
+        "members": [{"document_id": d, "cluster_id": c} for d, c in model.members.items()],
+    }
+
+
+# ── A. k-means ──
+print("\n── A. spherical k-means ──")
+rows = _corpus(400)
+idx = VaultRoutingIndex.build(rows)
+x = idx.matrix
+c1, a1 = spherical_kmeans(x, choose_k(400), seed=3)
+c2, a2 = spherical_kmeans(x, choose_k(400), seed=3)
+check("A: deterministic for a seed", np.array_equal(c1, c2) and np.array_equal(a1, a2))
+check("A: centroids are unit-norm", np.allclose(np.linalg.norm(c1, axis=1), 1.0, atol=1e-5))
+truth = np.array([i % 8 for i in range(400)])
+pure = all(len(set(truth[a1 == j])) == 1 for j in range(len(c1)) if (a1 == j).any())
+check("A: K = √n over 8 well-separated topics — every cluster is pure (one topic)", pure)
+check("A: K ≈ √n, clamped", choose_k(400) == 20 and choose_k(9) == 4 and choose_k(3) == 3
+      and choose_k(10**7) == rc.ROUTING_CLUSTER_K_MAX, f"{choose_k(400)} {choose_k(9)} {choose_k(3)}")
+dup = np.repeat(x[:2], 10, axis=0)          # 2 distinct points, ask for 5 clusters
+cd, ad = spherical_kmeans(dup, 5, seed=0)
+check("A: an emptied cluster is re-seeded — K stays K", cd.shape[0] == 5 and len(set(ad.tolist())) >= 2)
+
+
+# ── B. incremental refresh ──
+print("\n── B. incremental refresh ──")
+base = _corpus(200)
+m0 = fit(VaultRoutingIndex.build(base))
+m_same, out = refresh(m0, VaultRoutingIndex.build(base))
+check("B: unchanged vault ⇒ noop (same model)", out == "noop" and m_same is m0)
+plus = base + _corpus(10, start=200)
+m1, out = refresh(m0, VaultRoutingIndex.build(plus))
+check("B: 5% new docs ⇒ incremental", out == "incremental", out)
+topic_of_cluster = {}
+for d, c in m0.members.items():
+    topic_of_cluster.setdefault(c, set()).add(int(d[-5:]) % 8)
+check("B: newcomers fold into a cluster of their own topic",
+      all(topic_of_cluster[m1.members[f"doc-{i:05d}"]] == {i % 8} for i in range(200, 210)))
+check("B: incremental keeps fitted_doc_count, sizes track members",
+      m1.fitted_doc_count == m0.fitted_doc_count and int(m1.sizes.sum()) == 210)
+m2, out = refresh(m1, VaultRoutingIndex.build(plus[5:]))
+check("B: removed docs leave the model", out == "incremental" and "doc-00000" not in m2.members
+      and int(m2.sizes.sum()) == 205)
+m3, out = refresh(m0, VaultRoutingIndex.build(base + _corpus(60, start=200)))
+check("B: churn past ROUTING_RECLUSTER_FRACTION ⇒ full re-fit",
+      out == "fit" and m3.fitted_doc_count == 260, f"{out} {m3.fitted_doc_count}")
+m4, out = refresh(m0, VaultRoutingIndex.build(_corpus(200, dim=DIM * 2)))
+check("B: embedding dimension change ⇒ full re-fit", out == "fit" and m4.centroids.shape[1] == DIM * 2)
+check("B: nothing embedded ⇒ no model", refresh(m0, VaultRoutingIndex.build(_corpus(5, pending_every=1)))
+      == (None, "noop"))
+
+
+# ── C. align + probe ──
+print("\n── C. align + probe ──")
+vault = _corpus(240, pending_every=12)
+vidx = VaultRoutingIndex.build(vault)
+model = fit(VaultRoutingIndex.build(vault[:200]))
+cof = model.align(vidx)
+check("C: persisted assignments are used",
+      all(cof[p] == model.members[d] for p, d in enumerate(vidx.doc_ids[:200]) if d in model.members))
+newcomer = {d: p for p, d in enumerate(vidx.doc_ids)}["doc-00201"]
+check("C: an unassigned newcomer gets its nearest centroid",
+      cof[newcomer] == int(model.nearest(vidx.matrix[[vidx.vec_row[newcomer]]])[0]))
+pending_pos = [p for p in range(len(vidx)) if vidx.vec_row[p] < 0]
+check("C: a doc without an embedding is -1", pending_pos and all(cof[p] == -1 for p in pending_pos))
+q = VaultRoutingIndex.build([{"id": "q", "filename": "q", "topic_embedding": json.dumps(CENTERS[3].tolist())}]).matrix[0]
+allpos = list(range(len(vidx)))
+got = probe(model, cof, q, allpos, min_candidates=1, min_clusters=1)
+topic3 = {p for p, d in enumerate(vidx.doc_ids) if int(d[-5:]) % 8 == 3 and vidx.vec_row[p] >= 0}
+check("C: a tight probe returns only the query's topic + every un-embedded doc",
+      {p for p in got if cof[p] >= 0} <= topic3 and set(pending_pos) <= set(got)
+      and len(got) < len(allpos) / 2, f"{len(got)} of {len(allpos)}")
+check("C: a floor of one topic's size probes the whole topic",
+      topic3 <= set(probe(model, cof, q, allpos, min_candidates=len(topic3), min_clusters=1)))
+embedded_in = lambda ps: sum(1 for p in ps if cof[p] >= 0)  # noqa: E731
+wide = probe(model, cof, q, allpos, min_candidates=100, min_clusters=1)
+check("C: the candidate floor widens the probe", embedded_in(wide) >= 100 > embedded_in(got))
+floor = probe(model, cof, q, allpos, min_candidates=1, min_clusters=3)
+check("C: the cluster floor widens the probe",
+      len({int(cof[p]) for p in floor if cof[p] >= 0}) == 3)
+check("C: the probe only returns the given positions",
+      set(probe(model, cof, q, allpos[:50], 10**6, 1)) == set(allpos[:50]))
+
+mixed_c, mixed_a = spherical_kmeans(x, 2, seed=0)          # 2 clusters over 8 topics: both mixed
+mixed = ClusterModel(mixed_c, np.bincount(mixed_a, minlength=2),
+                     {d: int(c) for d, c in zip(idx.doc_ids, mixed_a)}, len(mixed_a))
+sent = mixed.sentinels(idx, mixed.align(idx), per=8)
+check("C: sentinels cover every topic inside a mixed cluster (≤ per per cluster)",
+      all({int(idx.doc_ids[p][-5:]) % 8 for p in sent if mixed_a[p] == c}
+          == set(truth[mixed_a == c].tolist()) for c in range(2))
+      and all((mixed_a[sent] == c).sum() <= 8 for c in range(2)), f"{len(sent)} sentinels")
+
+vidx.attach_clusters(model)
+exact = vidx.cosine_scores(q)
+top5 = set(np.argsort(-np.nan_to_num(exact, nan=-np.inf))[:5].tolist())
+q_other = vidx.matrix[vidx.vec_row[next(p for p in allpos if cof[p] >= 0 and p not in topic3)]]
+wrong = probe(model, cof, q_other, allpos, min_candidates=1, min_clusters=1)   # a probe gone wrong
+cand, gsims, added = guard(vidx, q, allpos, wrong, top=5)
+check("C: the guard widens a probe that missed the query's topic — it now holds the exact top-5",
+      not top5 & set(wrong) and top5 <= set(cand) and added >= 1, f"added={added}")
+check("C: the guard scores only candidates + sentinels, never the whole vault",
+      int((~np.isnan(gsims)).sum()) < int((~np.isnan(exact)).sum())
+      and np.allclose(gsims[cand][~np.isnan(gsims[cand])], exact[cand][~np.isnan(gsims[cand])]))
+check("C: a guard check of 0 (disabled) leaves the probe as it was",
+      guard(vidx, q, allpos, wrong, top=0)[0] == sorted(wrong))
+
+
+# ── D. persistence + router ──
+print("\n── D. persistence + router ──")
+persisted = _rows_of(model)
+lm = load_model(type("M", (), {"get_routing_clusters": lambda self, c: persisted})(), VAULT)
+check("D: load_model round-trips the persisted rows",
+      lm is not None and lm.k == model.k and np.allclose(lm.centroids, model.centroids, atol=1e-5)
+      and lm.members == model.members and lm.fitted_doc_count == model.fitted_doc_count)
+torn = {"centroids": persisted["centroids"][1:], "members": persisted["members"]}
+check("D: a torn write (cluster ids not 0..k-1) ⇒ None",
+      load_model(type("M", (), {"get_routing_clusters": lambda self, c: torn})(), VAULT) is None)
+
+
+def _raise(self, c):
+    raise RuntimeError("db down")
+
+
+check("D: a read fault / a manager without the method ⇒ None (flat scan)",
+      load_model(type("M", (), {"get_routing_clusters": _raise})(), VAULT) is None
+      and load_model(object(), VAULT) is None)
+
+
+class _FakeDB:
+    """The reads load_vault_index + refresh_vault_clusters need, plus the cluster store."""
+    rows: list = []
+    clusters: dict = {}
+    saved: list = []
+
+    def __init__(self, *a, **k):
+        pass
+
+    def get_collection_document_ids(self, cid):
+        return [r["id"] for r in _FakeDB.rows]
+
+    def get_vault_documents(self, cid):
+        return [dict(r) for r in _FakeDB.rows]
+
+    def get_routing_clusters(self, cid):
+        return _FakeDB.clusters
+
+    def save_routing_clusters(self, cid, m):
+        _FakeDB.saved.append(m)
+        _FakeDB.clusters = _rows_of(m)
+
+
+_FakeDB.rows = vault
+check("D: refresh_vault_clusters skips a small vault", refresh_vault_clusters(_FakeDB(), VAULT, 1000) == "small")
+check("D: threshold 0 disables clustering", refresh_vault_clusters(_FakeDB(), VAULT, 0) == "disabled")
+routing_index_cache.put(OWNER, VAULT, VaultRoutingIndex.build(vault, version="v"))
+check("D: first refresh fits + saves + invalidates the cached index",
+      refresh_vault_clusters(_FakeDB(), VAULT, 100) == "fit" and len(_FakeDB.saved) == 1
+      and routing_index_cache.get(OWNER, VAULT, "v") is None)
+check("D: a second refresh of the same vault is a noop",
+      refresh_vault_clusters(_FakeDB(), VAULT, 100) == "noop" and len(_FakeDB.saved) == 1)
+
+
+class _Cfg:
+    ROUTING_TOP_N = 12
+    ROUTING_MMR_LAMBDA = 0.7
+    ROUTING_HIERARCHICAL_MIN_DOCS = 100
+    ROUTING_CLUSTER_PROBE_MIN = 40
+    ROUTING_CLUSTER_PROBE = 1
+    EMBEDDING_MODEL_NAME = "fake-embed"
+    OPENAI_API_KEY = "sk-fake"
+
+
+def _route(query_vec, **overrides):
+    real = dbmod.SupabaseManager
+    dbmod.SupabaseManager = _FakeDB
+    routing_index_cache.clear()
+    try:
+        cfg = _Cfg()
+        for k, v in overrides.items():
+            setattr(cfg, k, v)
+        return DocumentRouter(cfg).route_ranked("clause report", VAULT, OWNER, query_embedding=query_vec)
+    finally:
+        dbmod.SupabaseManager = real
+
+
+qv = (CENTERS[5] + 0.1 * rng.normal(size=DIM)).tolist()
+flat = _route(qv, ROUTING_HIERARCHICAL_MIN_DOCS=0)
+hier = _route(qv)
+topic5 = {r["id"] for r in vault if int(r["id"][-5:]) % 8 == 5}
+check("D: hierarchical route picks the same top docs as flat on a topical query",
+      [d for d, _ in hier][:3] == [d for d, _ in flat][:3] and {d for d, _ in hier[:3]} <= topic5,
+      f"{hier[:3]} vs {flat[:3]}")
+qv2 = (CENTERS[2] + CENTERS[6] + 0.1 * rng.normal(size=DIM)).tolist()
+tight = dict(ROUTING_CLUSTER_PROBE_MIN=1, ROUTING_CLUSTER_PROBE=1)    # one cluster: < 48 embedded docs
+flat2 = _route(qv2, ROUTING_HIERARCHICAL_MIN_DOCS=0)
+check("D: a between-topics query whose tight probe misses the top ⇒ the guard widens it, flat's picks",
+      _route(qv2, ROUTING_CLUSTER_GUARD_CHECK=4, **tight) == flat2
+      and _route(qv2, ROUTING_CLUSTER_GUARD_CHECK=0, **tight) != flat2)
+
+routing_index_cache.clear()
+from src.components.routing_index import load_vault_index  # noqa: E402
+ix = load_vault_index(_FakeDB(), VAULT, OWNER, hierarchical_min_docs=100)
+check("D: a clustered vault's index carries the model + alignment",
+      ix.clusters is not None and ix.cluster_of is not None and (ix.cluster_of >= 0).sum() == 220)
+ix_small = (routing_index_cache.clear(), load_vault_index(_FakeDB(), VAULT, OWNER, hierarchical_min_docs=1000))[1]
+ix_off = (routing_index_cache.clear(), load_vault_index(_FakeDB(), VAULT, OWNER, hierarchical_min_docs=0))[1]
+check("D: below the threshold / threshold 0 ⇒ no clusters attached (flat)",
+      ix_small.clusters is None and ix_off.clusters is None)
+_saved_clusters, _FakeDB.clusters = _FakeDB.clusters, {}
+routing_index_cache.clear()
+check("D: no persisted model ⇒ flat scan",
+      load_vault_index(_FakeDB(), VAULT, OWNER, hierarchical_min_docs=100).clusters is None
+      and _route(qv) == flat)
+_FakeDB.clusters = _saved_clusters
+back = VaultRoutingIndex.from_bytes(ix.to_bytes())
+check("D: npz round-trip (Redis tier) keeps centroids + cluster_of + sentinels",
+      back is not None and back.clusters is not None
+      and np.array_equal(back.cluster_of, ix.cluster_of)
+      and len(ix.sentinels) and np.array_equal(back.sentinels, ix.sentinels)
+      and np.allclose(back.clusters.centroids, ix.clusters.centroids))
+
+
+# ── E. scale ──
+print("\n── E. scale, 10k-doc vault, 256-dim ──")
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import logging  # noqa: E402
+logging.getLogger("src.components.document_router").setLevel(logging.WARNING)
+from hierarchical_routing_recall import synthetic_recall  # noqa: E402
+
+t0 = time.perf_counter()
+r = synthetic_recall(10000, n_queries=60, dim=256, top_n=12)
+print(f"    k={r['k']}  fit {r['fit_s']:.1f}s  flat {r['flat_ms']:.2f} ms/query  "
+      f"hierarchical {r['hier_ms']:.2f} ms/query  recall vs flat {r['recall_vs_flat']:.4f}  "
+      f"scored {r['scored']:.1%} of the vault ({time.perf_counter() - t0:.0f}s)")
+check("E: hierarchical routes a 10k vault faster than the flat scan", r["hier_ms"] < r["flat_ms"])
+check("E: recall vs flat ≥ 0.99", r["recall_vs_flat"] >= 0.99, f"{r['recall_vs_flat']:.4f}")
+check("E: worst-query recall vs flat ≥ 0.9 (the sampled recall guard)", r["worst"] >= 0.9,
+      f"{r['worst']:.2f} (widened {r['widened']:.3f})")
+check("E: a hierarchical query scores under a quarter of the vault", r["scored"] < 0.25,
+      f"{r['scored']:.3f}")
+
+
+# ── tally ──
+print(f"\n{'='*60}")
+print(f"  test_routing_clusters: {_passed} passed, {_failed} failed")
+print(f"{'='*60}")
+sys.exit(0 if _failed == 0 else 1)
@@ -0,0 +1,303 @@
+"""Routing-index gate — the Stage-1 router scores a cached, pre-normalised matrix (offline, $0).
+
+DocumentRouter.route_ranked used to re-fetch every member doc's topic_embedding JSON, json.loads it
+and `_cosine` it doc-by-doc on EVERY collection query. It now routes over a per-vault
+VaultRoutingIndex (src/components/routing_index.py) cached per process and versioned by the vault's
+doc set. This gate pins the contract:
+
+  A. THE INDEX: unit rows, aligned metadata, a doc without (or with a wrong-dimension) embedding is
+     `pending` (keyword-scored), one-matmul cosine ≡ `_cosine` per doc, npz round-trip (no pickle).
+  B. SAME ROUTING: over a synthetic 300-doc vault the indexed router returns exactly what the old
+     per-doc loop (replayed verbatim here) returned — across λ, with and without a Step-D filter.
+  C. CACHE: a repeat query skips the vault-docs read entirely; adding a doc changes the version ⇒
+     rebuild; invalidate_doc / invalidate_vault drop it; TTL=0 disables; a pending vault gets the
+     short TTL; the access gate (member-id read) still runs on EVERY query and no access ⇒ [].
+  D. REDIS (optional tier): a second process (fresh in-process cache) loads the index from Redis;
+     a stale-version Redis entry is ignored.
+  E. LATENCY: 1000-doc vault, per-query JSON parse + Python cosine loop vs a cached-index route.
+
+    python -u eval/test_routing_index.py
+"""
+from __future__ import annotations
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+import src.components.db as dbmod  # noqa: E402
+from src.components import routing_index as ri  # noqa: E402
+from src.components.document_router import (  # noqa: E402
+    DocumentRouter, _cosine, _doc_matches_filter, _keyword_score, _mmr_select,
+    ROUTER_PRENARROW_THRESHOLD,
+)
+from src.components.routing_index import (  # noqa: E402
+    RoutingIndexCache, VaultRoutingIndex, doc_set_version, routing_index_cache,
+)
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+OWNER = "user-owner"
+VAULT = "vault-V"
+DIM = 32
+rng = np.random.default_rng(7)
+
+
+def _corpus(n):
+    """n docs: 8 topic clusters (near-duplicates inside a cluster), every 7th doc un-summarised."""
+    centers = rng.normal(size=(8, DIM))
+    rows = []
+    for i in range(n):
+        emb = centers[i % 8] + 0.15 * rng.normal(size=DIM)
+        rows.append({
+            "id": f"doc-{i:04d}", "filename": f"f{i:04d}.pdf",
+            "doc_type": "legal_contract" if i % 2 else "financial_filing",
+            "fiscal_year": 2021 + i % 3,
+            "summary": None if i % 7 == 0 else f"topic {i % 8} clause report",
+            "topic_embedding": None if i % 7 == 0 else json.dumps(emb.tolist()),
+        })
+    return rows
+
+
+class _FakeDB:
+    """A manager exposing the two reads load_vault_index needs (counts each)."""
+    calls: list = []
+    rows: list = []
+    access = True
+
+    def __init__(self, *a, **k):
+        pass
+
+    def get_collection_document_ids(self, cid):
+        _FakeDB.calls.append("ids")
+        return [r["id"] for r in _FakeDB.rows] if _FakeDB.access else []
+
+    def get_vault_documents(self, cid):
+        _FakeDB.calls.append("vault_docs")
+        return [dict(r) for r in _FakeDB.rows] if _FakeDB.access else []
+
+
+class _Cfg:
+    ROUTING_TOP_N = 12
+    ROUTING_MMR_LAMBDA = 0.7
+    EMBEDDING_MODEL_NAME = "fake-embed"
+    OPENAI_API_KEY = "sk-fake"
+
+
+def _route(query_vec, lam=0.7, metadata_filter=None, query="clause report"):
+    real = dbmod.SupabaseManager
+    dbmod.SupabaseManager = _FakeDB
+    try:
+        cfg = _Cfg()
+        cfg.ROUTING_MMR_LAMBDA = lam
+        return DocumentRouter(cfg).route_ranked(
+            query, VAULT, OWNER, query_embedding=query_vec, metadata_filter=metadata_filter)
+    finally:
+        dbmod.SupabaseManager = real
+
+
+def _reference_route(rows, query_vec, lam=0.7, metadata_filter=None, query="clause report", top_n=12):
+    """The pre-index step 2-6 loop, verbatim: pre-narrow, json.loads + _cosine per doc, MMR."""
+    meta = {r["id"]: r for r in rows}
+    if metadata_filter and len(meta) > ROUTER_PRENARROW_THRESHOLD:
+        narrowed = {d: m for d, m in meta.items() if _doc_matches_filter(m, metadata_filter)}
+        meta = narrowed or meta
+    scored, id_by_fn = [], {}
+    for did, r in meta.items():
+        id_by_fn[r["filename"]] = did
+        emb_raw, vec = r.get("topic_embedding"), None
+        if emb_raw and query_vec:
+            vec = json.loads(emb_raw)
+            score = _cosine(query_vec, vec)
+        else:
+            score = _keyword_score(query, r.get("summary") or r["filename"])
+        scored.append((score, r["filename"], vec))
+    return [(id_by_fn[fn], fn) for fn in _mmr_select(scored, top_n, lambda_relevance=lam)]
+
+
+# ── A. the index ──
+print("\n── A. VaultRoutingIndex ──")
+rows = _corpus(40)
+rows.append({"id": "doc-odd", "filename": "odd.pdf", "summary": "s", "topic_embedding": "[1, 2]"})
+rows.append({"id": "doc-bad", "filename": "bad.pdf", "summary": "s", "topic_embedding": "not json"})
+rows.append({"id": None, "filename": "nameless.pdf"})
+idx = VaultRoutingIndex.build(rows)
+check("A: rows without an id are skipped; metadata stays aligned",
+      len(idx) == 42 and idx.doc_ids[5] == "doc-0005" and idx.filenames[5] == "f0005.pdf"
+      and idx.meta[5]["fiscal_year"] == rows[5]["fiscal_year"])
+check("A: matrix rows are unit-norm float32",
+      idx.matrix.dtype == np.float32 and np.allclose(np.linalg.norm(idx.matrix, axis=1), 1.0, atol=1e-5))
+check("A: un-summarised, wrong-dimension and unparseable embeddings are pending (-1)",
+      idx.vec_row[0] == -1 and idx.vec_row[40] == -1 and idx.vec_row[41] == -1
+      and idx.pending == sum(1 for i in range(40) if i % 7 == 0) + 2, str(idx.pending))
+q = rng.normal(size=DIM).tolist()
+sims = idx.cosine_scores(q)
+ref = [(_cosine(q, json.loads(r["topic_embedding"])) if idx.vec_row[i] >= 0 else None)
+       for i, r in enumerate(rows[:42])]
+check("A: one-matmul cosine ≡ _cosine per doc (NaN where no embedding)",
+      all((np.isnan(sims[i]) if ref[i] is None else abs(sims[i] - ref[i]) < 1e-5) for i in range(42)))
+check("A: a query of the wrong dimension can't be scored (keyword fallback)",
+      idx.cosine_scores([1.0, 0.0]) is None and idx.cosine_scores(None) is None)
+back = VaultRoutingIndex.from_bytes(idx.to_bytes())
+check("A: npz round-trip (allow_pickle=False) preserves everything",
+      back.version == idx.version and back.doc_ids == idx.doc_ids and back.summaries == idx.summaries
+      and np.array_equal(back.matrix, idx.matrix) and np.array_equal(back.vec_row, idx.vec_row))
+check("A: doc-set version is order-independent and moves on membership change",
+      doc_set_version(["b", "a"]) == doc_set_version(["a", "b"]) != doc_set_version(["a", "b", "c"]))
+
+# ── B. same routing as the per-doc loop ──
+print("\n── B. indexed router ≡ per-doc loop ──")
+_FakeDB.rows = _corpus(300)
+_FakeDB.access = True
+all_same = True
+for lam in (1.0, 0.7, 0.4):
+    for mf in (None, {"doc_type": "legal_contract"}, {"fiscal_year": 2022}):
+        for _ in range(3):
+            routing_index_cache.clear()
+            qv = rng.normal(size=DIM).tolist()
+            got = _route(qv, lam=lam, metadata_filter=mf)
+            want = _reference_route(_FakeDB.rows, qv, lam=lam, metadata_filter=mf)
+            if got != want:
+                all_same = False
+                print(f"    mismatch λ={lam} filter={mf}: {got[:3]} vs {want[:3]}")
+check("B: 27 queries × (λ ∈ {1, .7, .4}) × (no filter / doc_type / fiscal_year) route identically",
+      all_same)
+routing_index_cache.clear()
+saved = _FakeDB.rows
+_FakeDB.rows = [dict(r, topic_embedding=None) for r in saved]   # nothing embedded yet ⇒ no query embed
+kw = _route(None, query="topic 3 clause")
+check("B: a vault with no embeddings yet routes by keyword", len(kw) == 12)
+_FakeDB.rows = saved
+
+# ── C. cache ──
+print("\n── C. cache + versioning + invalidation ──")
+routing_index_cache.clear()
+_FakeDB.calls = []
+qv = rng.normal(size=DIM).tolist()
+first = _route(qv)
+second = _route(qv)
+check("C: a repeat query reuses the index (one vault-docs read across two queries)",
+      first == second and _FakeDB.calls.count("vault_docs") == 1, str(_FakeDB.calls))
+check("C: the access gate (member-id read) still runs on EVERY query",
+      _FakeDB.calls.count("ids") == 2)
+_FakeDB.rows = _FakeDB.rows + [{"id": "doc-new", "filename": "new.pdf", "summary": "x",
+                                 "topic_embedding": json.dumps(qv)}]
+_FakeDB.calls = []
+third = _route(qv, lam=1.0)
+check("C: a doc added from ANY process changes the version ⇒ rebuild, and it routes",
+      _FakeDB.calls.count("vault_docs") == 1 and third[0][0] == "doc-new", str(third[:2]))
+_FakeDB.calls = []
+ri.invalidate_doc("doc-new")
+_route(qv)
+check("C: invalidate_doc (re-summarised doc) forces a rebuild", _FakeDB.calls.count("vault_docs") == 1)
+_FakeDB.calls = []
+ri.invalidate_vault(VAULT)
+_route(qv)
+check("C: invalidate_vault (add/remove hook) forces a rebuild", _FakeDB.calls.count("vault_docs") == 1)
+_FakeDB.access = False
+_FakeDB.calls = []
+check("C: no access ⇒ [] even with the vault's index cached", _route(qv) == [] and "vault_docs" not in _FakeDB.calls)
+_FakeDB.access = True
+c = RoutingIndexCache(ttl_s=600, pending_ttl_s=30, use_redis=False)
+pend = VaultRoutingIndex.build(_corpus(10))
+full = VaultRoutingIndex.build([r for r in _corpus(10) if r["topic_embedding"]])
+check("C: a vault with pending docs gets the short TTL; a fully-embedded one the long TTL",
+      c._ttl_for(pend) == 30 and c._ttl_for(full) == 600)
+off = RoutingIndexCache(ttl_s=0, use_redis=False)
+off.put(OWNER, VAULT, full)
+check("C: TTL=0 disables caching", off.get(OWNER, VAULT, full.version) is None)
+c.put(OWNER, VAULT, full)
+check("C: a version mismatch is a miss (never route on a stale doc set)",
+      c.get(OWNER, VAULT, "other-version") is None and c.get(OWNER, VAULT, full.version) is None)
+small = RoutingIndexCache(max_vaults=2, use_redis=False)
+for v in ("v1", "v2", "v3"):
+    small.put(OWNER, v, full)
+check("C: LRU-bounded by vault count", small.stats()["vaults"] == 2
+      and small.get(OWNER, "v1", full.version) is None)
+
+
+# ── D. Redis tier ──
+print("\n── D. optional Redis tier ──")
+class _FakeRedis:
+    def __init__(self):
+        self.kv = {}
+
+    def get(self, k):
+        return self.kv.get(k)
+
+    def setex(self, k, ttl, v):
+        self.kv[k] = v
+
+    def scan_iter(self, pattern, count=100):
+        pre = pattern.rstrip("*")
+        return [k for k in list(self.kv) if k.startswith(pre)]
+
+    def delete(self, *keys):
+        for k in keys:
+            self.kv.pop(k, None)
+
+
+shared = _FakeRedis()
+proc_a = RoutingIndexCache(use_redis=True)
+proc_a._redis = shared
+proc_b = RoutingIndexCache(use_redis=True)
+proc_b._redis = shared
+proc_a.put(OWNER, VAULT, full)
+got_b = proc_b.get(OWNER, VAULT, full.version)
+check("D: another process loads the index from Redis (no rebuild)",
+      got_b is not None and got_b.doc_ids == full.doc_ids and np.array_equal(got_b.matrix, full.matrix))
+proc_c = RoutingIndexCache(use_redis=True)
+proc_c._redis = shared
+check("D: a stale-version Redis entry is ignored", proc_c.get(OWNER, VAULT, "newer-version") is None)
+proc_a.invalidate_vault(VAULT)
+check("D: invalidate_vault clears the Redis copy too", not shared.kv)
+broken = RoutingIndexCache(use_redis=True)
+broken._redis = object()   # every call raises
+broken.put(OWNER, VAULT, full)
+check("D: a Redis fault is a miss / no-op, never an error",
+      broken.get(OWNER, "vault-other", full.version) is None)
+
+
+# ── E. latency ──
+print("\n── E. latency, 1000-doc vault, 1536-dim ──")
+big = []
+for i in range(1000):
+    big.append({"id": f"d{i}", "filename": f"f{i}.pdf", "summary": "s",
+                "topic_embedding": json.dumps(rng.normal(size=1536).round(6).tolist())})
+qv = rng.normal(size=1536).tolist()
+t0 = time.perf_counter()
+for _ in range(3):
+    old_scores = [_cosine(qv, json.loads(r["topic_embedding"])) for r in big]
+old_ms = (time.perf_counter() - t0) * 1000 / 3
+bidx = VaultRoutingIndex.build(big)
+t0 = time.perf_counter()
+for _ in range(3):
+    new_scores = bidx.cosine_scores(qv)
+new_ms = (time.perf_counter() - t0) * 1000 / 3
+print(f"    per-query parse + _cosine loop : {old_ms:8.2f} ms")
+print(f"    cached index, one matmul       : {new_ms:8.2f} ms  ({old_ms / max(new_ms, 1e-9):.0f}×)")
+check("E: identical scores", np.allclose(new_scores, old_scores, atol=1e-5))
+check("E: the cached index scores the vault faster", new_ms < old_ms, f"{new_ms:.2f} vs {old_ms:.2f}")
+
+
+# ── tally ──
+print(f"\n{'='*60}")
+print(f"  test_routing_index: {_passed} passed, {_failed} failed")
+print(f"{'='*60}")
+sys.exit(0 if _failed == 0 else 1)
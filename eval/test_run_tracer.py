@@ -0,0 +1,279 @@
+"""Run tracer gate — streamed journals, latency spans, rotation, offline summary ($0).
+
+RunTracer kept every event in memory and wrote the whole journal in finish(), with no
+timing. It now queues each line to a background writer (bounded queue, drops counted,
+never blocking the run), rotates the trace dir by size, and records a span per model call,
+tool execution and output-gate pass; summarize_journals aggregates p50/p95 offline:
+
+  A. STREAMING: lines reach disk before finish(), run_meta first / health last; the tracer
+     keeps no event list; a stalled disk never blocks record() — overflow is dropped and
+     counted (trace_dropped); AGENT_TRACE_ASYNC=false writes inline.
+  B. SPANS: run_agent(tracer=...) journals a model span per step, a tool span per call
+     (a parallel batch overlaps) and a gate span; the yielded events are unchanged; health
+     carries p50/p95 per kind and per tool.
+  C. ROTATION: closing a journal prunes the oldest ones past AGENT_TRACE_DIR_MAX_MB, never
+     the newest.
+  D. SUMMARY: summarize_journals computes p50/p95 per kind / tool / step (step = wall, so
+     parallel tools aren't double-counted), skips malformed lines; eval/trace_summary.py
+     prints it.
+  E. COMPAT: health keeps every prior key and flag; unserialisable events and malformed
+     records / spans never raise.
+
+    python -u eval/test_run_tracer.py
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_TMP = tempfile.mkdtemp(prefix="trace-gate-")
+os.environ["AGENT_TRACE_DIR"] = _TMP
+
+from src.components.agent_core import loop as L  # noqa: E402
+from src.components.agent_core import tracer as T  # noqa: E402
+from src.components.agent_core.budgets import Budget  # noqa: E402
+from src.components.agent_core.loop import GateOutcome, run_agent  # noqa: E402
+from src.components.agent_core.model import ModelResponse, ScriptedModel, ToolCall  # noqa: E402
+from src.components.agent_core.registry import RunScope, ToolRegistry  # noqa: E402
+from src.components.agent_core.tools._envelope import ok_result  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+def _lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class _SleepyRegistry(ToolRegistry):
+    """Real parallel_safe policy; every call sleeps `delay` s and returns one span."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+
+    def execute(self, call, scope):
+        time.sleep(self.delay)
+        return ok_result(summary=f"{call.name} {call.id}", data={},
+                         provenance=[{"kind": "span", "doc": f"doc-{call.id}", "page": 1}])
+
+
+def _run(tracer=None):
+    script = [
+        ModelResponse(text="looking", tool_calls=[
+            ToolCall(id=f"s{i}", name="search_vault", args={"query": f"q{i}"}) for i in range(3)]),
+        ModelResponse(text="one more", tool_calls=[
+            ToolCall(id="c1", name="compute", args={"op": "sum"})]),
+        ModelResponse(text="done [doc-s0 p.1]", tool_calls=[]),
+    ]
+    budget = Budget(mode="standard", model="scripted", max_steps=8, wall_clock_s=60,
+                    token_budget=10**9)
+    return list(run_agent("q?", model=ScriptedModel(script), scope=RunScope(), budget=budget,
+                          registry=_SleepyRegistry(),
+                          gate_fn=lambda d, l: GateOutcome(passed=True), tracer=tracer))
+
+
+# ── A ───────────────────────────────────────────────────────────────────────────
+def section_a():
+    print("\nA. streamed journal")
+    tr = T.RunTracer(run_id="stream-1", question="q", mode="standard")
+    for i in range(5):
+        tr.record({"type": "agent_step", "n": i})
+    check("flush_journals() drains the queue", T.flush_journals())
+    path = os.path.join(_TMP, "run-stream-1.jsonl")
+    before = _lines(path) if os.path.exists(path) else []
+    check("events are on disk before finish()",
+          [e["type"] for e in before] == ["run_meta"] + ["agent_step"] * 5, str(before))
+    check("the tracer keeps no event list", not hasattr(tr, "events"))
+    h = tr.finish()
+    T.flush_journals()
+    after = _lines(path)
+    check("finish() appends health last and returns the path",
+          after[-1]["type"] == "health" and h["journal"] == path and h["n_events"] == 5)
+
+    # A stalled disk: the writer sleeps per line and the queue holds 2.
+    stalled = T._JournalWriter(maxsize=2)
+    real_append = stalled._append
+    stalled._append = lambda p, line, handles=None: (time.sleep(0.05), real_append(p, line, handles))
+    saved = T._WRITER
+    T._WRITER = stalled
+    try:
+        tr2 = T.RunTracer(run_id="stalled-1", question="q")
+        t0 = time.perf_counter()
+        for i in range(50):
+            tr2.record({"type": "agent_step", "n": i})
+        spent = time.perf_counter() - t0
+        h2 = tr2.finish()
+        stalled.flush(10)
+    finally:
+        T._WRITER = saved
+    print(f"        50 records against a 50 ms/line disk: {spent * 1000:.1f} ms")
+    check("record() never waits on a stalled disk", spent < 0.25, f"{spent:.3f}s")
+    check("overflow is dropped and counted", h2["trace_dropped"] > 0 and stalled.stats["dropped"] > 0,
+          str(stalled.stats))
+    lines2 = _lines(os.path.join(_TMP, "run-stalled-1.jsonl"))
+    check("the health line still lands", lines2[-1]["type"] == "health", str(lines2[-1:]))
+
+    T.AGENT_TRACE_ASYNC = False
+    try:
+        tr3 = T.RunTracer(run_id="sync-1", question="q")
+        tr3.record({"type": "agent_step", "n": 1})
+        inline = _lines(os.path.join(_TMP, "run-sync-1.jsonl"))
+        tr3.finish()
+    finally:
+        T.AGENT_TRACE_ASYNC = True
+    check("AGENT_TRACE_ASYNC=false writes inline", [e["type"] for e in inline] == ["run_meta", "agent_step"])
+
+
+# ── B ───────────────────────────────────────────────────────────────────────────
+def section_b():
+    print("\nB. latency spans")
+    L.AGENT_TOOL_CONCURRENCY = 4
+    tr = T.RunTracer(run_id="spans-1", question="q?")
+    events = _run(tr)
+    for ev in events:
+        tr.record(ev)
+    h = tr.finish()
+    T.flush_journals()
+    spans = [e for e in _lines(h["journal"]) if e["type"] == "span"]
+    kinds = [(s["kind"], s["name"], s["step"]) for s in spans]
+    check("one model span per step", [k for k in kinds if k[0] == "model"]
+          == [("model", "ScriptedModel", 1), ("model", "ScriptedModel", 2), ("model", "ScriptedModel", 3)], str(kinds))
+    tools = [s for s in spans if s["kind"] == "tool"]
+    check("one tool span per call, tagged with its step",
+          sorted((s["name"], s["step"]) for s in tools)
+          == [("compute", 2)] + [("search_vault", 1)] * 3, str(tools))
+    check("a gate span for the output-gate pass",
+          [(s["name"], s["step"], s["ok"]) for s in spans if s["kind"] == "gate"] == [("output", 3, True)])
+    batch = [s for s in tools if s["step"] == 1]
+    check("the parallel batch's spans overlap",
+          max(s["start_ms"] for s in batch) < min(s["end_ms"] for s in batch), str(batch))
+    check("spans are well-formed (start ≤ end, ms ≥ the tool's sleep)",
+          all(s["start_ms"] <= s["end_ms"] for s in spans) and all(s["ms"] >= 45 for s in tools))
+    check("the yielded events are unchanged by tracing",
+          [e for e in _run(None)] == events)
+    lat = h.get("latency", {})
+    check("health carries p50/p95 per kind and per tool",
+          lat.get("model", {}).get("n") == 3 and lat.get("gate", {}).get("n") == 1
+          and lat.get("tools", {}).get("search_vault", {}).get("n") == 3
+          and "p95_ms" in lat["tools"]["search_vault"], str(lat))
+
+
+# ── C ───────────────────────────────────────────────────────────────────────────
+def section_c():
+    print("\nC. size-based rotation")
+    d = tempfile.mkdtemp(prefix="trace-rot-")
+    os.environ["AGENT_TRACE_DIR"] = d
+    saved = T.AGENT_TRACE_DIR_MAX_MB
+    T.AGENT_TRACE_DIR_MAX_MB = 3 / 1024          # 3 KB
+    try:
+        for i in range(6):
+            tr = T.RunTracer(run_id=f"rot-{i}", question="x" * 600)
+            tr.record({"type": "agent_thought", "text": "y" * 600})
+            tr.finish()
+            T.flush_journals()
+            time.sleep(0.02)                     # distinct mtimes
+    finally:
+        T.AGENT_TRACE_DIR_MAX_MB = saved
+        os.environ["AGENT_TRACE_DIR"] = _TMP
+    left = sorted(p.name for p in Path(d).glob("run-*.jsonl"))
+    size = sum(p.stat().st_size for p in Path(d).glob("run-*.jsonl"))
+    check("the directory is pruned under its cap", size <= 3 * 1024, f"{size} B {left}")
+    check("the oldest journals go first; the newest is kept",
+          "run-rot-5.jsonl" in left and "run-rot-0.jsonl" not in left, str(left))
+    check("the writer counts rotations", T.writer_stats()["rotated"] >= 1, str(T.writer_stats()))
+
+
+# ── D ───────────────────────────────────────────────────────────────────────────
+def _journal(d, run_id, spans, mode="standard"):
+    with open(os.path.join(d, f"run-{run_id}.jsonl"), "w") as f:
+        f.write(json.dumps({"type": "run_meta", "run_id": run_id, "mode": mode}) + "\n")
+        for kind, name, step, start, end in spans:
+            f.write(json.dumps({"type": "span", "kind": kind, "name": name, "step": step,
+                                "start_ms": start, "end_ms": end, "ms": end - start}) + "\n")
+        f.write("{not json\n")
+
+
+def section_d():
+    print("\nD. offline summary")
+    d = tempfile.mkdtemp(prefix="trace-sum-")
+    # search_vault: 10..100 ms (10 calls) → p50 50, p95 100. Step 1 of run a: two parallel
+    # tools 0-100 and 10-60 after a 0-0 model → wall 100, not 150.
+    _journal(d, "a", [("model", "m", 1, 0, 0), ("tool", "search_vault", 1, 0, 100),
+                      ("tool", "search_vault", 1, 10, 60), ("model", "m", 2, 100, 300)])
+    _journal(d, "b", [("tool", "search_vault", 1, 0, ms) for ms in (10, 20, 30, 40, 70, 80, 90, 100)]
+             + [("gate", "output", 2, 500, 505)], mode="deep")
+    s = T.summarize_journals([d])
+    sv = s["by_tool"].get("search_vault", {})
+    check("journals / spans counted; malformed lines skipped",
+          s["journals"] == 2 and s["spans"] == 13, str(s))
+    check("per-tool p50/p95", sv.get("n") == 10 and sv.get("p50_ms") == 50 and sv.get("p95_ms") == 100,
+          str(sv))
+    check("per-kind stats", s["by_kind"]["model"]["n"] == 2 and s["by_kind"]["gate"]["n"] == 1)
+    check("per-step wall (parallel tools not double-counted)",
+          s["by_step"][1]["max_ms"] == 100 and s["by_step"][1]["n"] == 2, str(s["by_step"]))
+    check("modes tallied from run_meta", s["modes"] == {"standard": 1, "deep": 1}, str(s["modes"]))
+    out = subprocess.run([sys.executable, "eval/trace_summary.py", d], capture_output=True, text=True,
+                         cwd=str(Path(__file__).resolve().parent.parent))
+    check("eval/trace_summary.py prints the tables",
+          out.returncode == 0 and "By tool" in out.stdout and "search_vault" in out.stdout,
+          out.stderr[-300:])
+
+
+# ── E ───────────────────────────────────────────────────────────────────────────
+def section_e():
+    print("\nE. compatibility")
+    tr = T.RunTracer(run_id="compat-1", question="q")
+    tr.record({"type": "tool_call", "name": "search_vault", "args_summary": "q"})
+    tr.record({"type": "tool_result", "name": "search_vault", "ok": True, "n_provenance": 0})
+    tr.record({"type": "gate", "name": "budget", "pass": False, "detail": "step"})
+    tr.record({"type": "meta", "steps": 2, "tokens": 10, "abstained": True, "obj": object()})
+    tr.record("not a dict")                                  # swallowed
+    tr.add_span("tool", "x", "bad", None)                    # swallowed
+    h = tr.finish()
+    for key in ("run_id", "question", "mode", "n_events", "steps", "tokens", "abstained",
+                "tool_calls", "tool_zero_results", "tool_failures", "gate_failures",
+                "tool_memo_hits", "flags", "clean", "journal"):
+        if key not in h:
+            check(f"health keeps {key}", False)
+            break
+    else:
+        check("health keeps every prior key", True)
+    check("flags still derived (budget + abstain)",
+          any("BUDGET" in f for f in h["flags"]) and any("ABSTAINED" in f for f in h["flags"]),
+          str(h["flags"]))
+    T.flush_journals()
+    check("an unserialisable event is journaled via str()",
+          any(e.get("type") == "meta" and "object" in str(e.get("obj")) for e in _lines(h["journal"])))
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("  test_run_tracer")
+    print("=" * 60)
+    section_a()
+    section_b()
+    section_c()
+    section_d()
+    section_e()
+    print("\n" + "=" * 60)
+    print(f"  test_run_tracer: {_passed} passed, {_failed} failed")
+    print("=" * 60)
+    sys.exit(1 if _failed else 0)
@@ -0,0 +1,257 @@
+"""Speculative preload gate — the first model turn no longer waits for grids (offline, $0).
+
+The agent-core route awaited the per-doc grid preload and the conversation history before
+the first model call. Now a preload.Preload starts both in the background: history is
+awaited just before the run (the first call needs it), grids only by the first tool that
+reads them (registry.execute → scope.await_grids). A sleeping loader stands in for the DB:
+
+  A. PRELOAD: start / wait / stats; a failed, timed-out or never-started load yields its
+     default; saved_ms = load time minus time blocked.
+  B. JOIN: concurrent grid-reading tools join the preload exactly once (no duplicates, no
+     half-joined scope); an already-populated scope is joined de-duplicated.
+  C. REGISTRY: compute / list_metrics / table_lookup / read_document wait and see the full
+     grids; search_vault / search_knowledge run without waiting.
+  D. LOOP: the first model call starts before the grids finish; a run that never needs
+     grids hides the whole load; the meta event carries the preload stats.
+  E. ROUTES: agent-core and workflow routes start the grid preload instead of awaiting it,
+     hand it to RunScope, and await only history; AGENT_SPECULATIVE_PRELOAD=false joins
+     up front.
+
+    python -u eval/test_speculative_preload.py
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.components.agent_core import preload as P  # noqa: E402
+from src.components.agent_core.budgets import Budget  # noqa: E402
+from src.components.agent_core.loop import GateOutcome, run_agent  # noqa: E402
+from src.components.agent_core.model import ModelResponse, ScriptedModel, ToolCall  # noqa: E402
+from src.components.agent_core.registry import RunScope, ToolRegistry  # noqa: E402
+from src.components.agent_core.tools._envelope import ok_result  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+def _grid(doc, page, table=0):
+    return SimpleNamespace(doc=doc, page=page, table_index=table, title=f"{doc} p{page}")
+
+
+def _slow(value, delay):
+    def _load():
+        time.sleep(delay)
+        return value
+    return _load
+
+
+# ── A ───────────────────────────────────────────────────────────────────────────
+def section_a():
+    print("\nA. preload basics")
+    pl = P.Preload()
+    pl.start("history", _slow([{"role": "user", "content": "hi"}], 0.1))
+    pl.start("history", _slow(["ignored"], 0))
+    check("wait returns the load's result (a second start is ignored)",
+          pl.wait("history", []) == [{"role": "user", "content": "hi"}])
+    check("a never-started load yields the default", pl.wait("nope", "dflt") == "dflt")
+
+    def _boom():
+        raise RuntimeError("db down")
+    pl.start("bad", _boom)
+    check("a failed load yields the default", pl.wait("bad", []) == [])
+    pl.start("stuck", _slow(["late"], 0.5))
+    check("a timed-out wait yields the default", pl.wait("stuck", [], timeout=0.05) == [])
+
+    hidden = P.Preload()
+    hidden.start("grids", _slow([1], 0.15))
+    time.sleep(0.2)                                  # other work while it loads
+    hidden.wait("grids")
+    st = hidden.stats()
+    check("a load finished behind other work is saved almost entirely",
+          st["grids"]["done"] and st["grids"]["waited_ms"] < 20 and st["saved_ms"] >= 130, str(st))
+    blocked = P.Preload()
+    blocked.start("grids", _slow([1], 0.15))
+    blocked.wait("grids")
+    st = blocked.stats()
+    check("waiting straight away saves ~nothing", st["saved_ms"] < 20 and st["grids"]["used"], str(st))
+
+
+# ── B ───────────────────────────────────────────────────────────────────────────
+def section_b():
+    print("\nB. joining the grids")
+    fresh = [_grid("a.pdf", p) for p in range(5)]
+    pl = P.Preload()
+    pl.start("grids", _slow(fresh, 0.1))
+    scope_grids: list = []
+    seen: list = []
+
+    def _reader():
+        pl.join_grids(scope_grids)
+        seen.append(len(scope_grids))
+    threads = [threading.Thread(target=_reader) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    check("8 concurrent readers: joined once, each saw the full scope",
+          len(scope_grids) == 5 and seen == [5] * 8, f"{len(scope_grids)} {seen}")
+    check("the usual case keeps the preload's own list order", scope_grids == fresh)
+    pl.join_grids(scope_grids)
+    check("a later join is a no-op", len(scope_grids) == 5)
+
+    pl2 = P.Preload()
+    pl2.start("grids", _slow([_grid("a.pdf", 1), _grid("b.pdf", 2)], 0))
+    populated = [_grid("a.pdf", 1)]
+    pl2.join_grids(populated)
+    check("an already-populated scope is joined without duplicates", len(populated) == 2,
+          str([(g.doc, g.page) for g in populated]))
+    empty: list = []
+    P.Preload().join_grids(empty)
+    check("no grid preload ⇒ nothing to wait for", empty == [])
+
+
+# ── C ───────────────────────────────────────────────────────────────────────────
+class _SpyRegistry(ToolRegistry):
+    """The real execute (grid wait + memo); _dispatch records what the tool saw."""
+
+    def __init__(self):
+        self.seen = {}
+
+    def _dispatch(self, call, scope, joined):
+        self.seen[call.id] = (len(scope.grids), time.monotonic())
+        return ok_result(summary=call.name, data={},
+                         provenance=[{"kind": "span", "doc": "a.pdf", "page": 1}])
+
+
+def section_c():
+    print("\nC. registry waits only where grids are read")
+    for name in ("compute", "list_metrics", "table_lookup", "read_document"):
+        pl = P.Preload()
+        pl.start("grids", _slow([_grid("a.pdf", p) for p in range(3)], 0.1))
+        reg = _SpyRegistry()
+        reg.execute(ToolCall(id="x", name=name, args={"doc_id": "a.pdf"}),
+                    RunScope(preload=pl))
+        check(f"{name} waits and sees every preloaded grid", reg.seen["x"][0] == 3, str(reg.seen))
+    for name in ("search_vault", "search_knowledge"):
+        pl = P.Preload()
+        pl.start("grids", _slow([_grid("a.pdf", 1)], 0.3))
+        reg = _SpyRegistry()
+        t0 = time.monotonic()
+        reg.execute(ToolCall(id="x", name=name, args={"query": "q"}), RunScope(preload=pl))
+        check(f"{name} runs without waiting", reg.seen["x"][1] - t0 < 0.1
+              and not pl.stats()["grids"]["used"], str(pl.stats()))
+
+
+# ── D ───────────────────────────────────────────────────────────────────────────
+class _TimedModel(ScriptedModel):
+    def invoke(self, messages, tools):
+        self.first_call = getattr(self, "first_call", None) or time.monotonic()
+        return super().invoke(messages, tools)
+
+    def stream(self, messages, tools):
+        self.first_call = getattr(self, "first_call", None) or time.monotonic()
+        return super().stream(messages, tools)
+
+
+def _budget():
+    return Budget(mode="standard", model="scripted", max_steps=8, wall_clock_s=60,
+                  token_budget=10**9)
+
+
+def _run(script, scope, registry):
+    model = _TimedModel(script)
+    t0 = time.monotonic()
+    events = list(run_agent("q?", model=model, scope=scope, budget=_budget(), registry=registry,
+                            gate_fn=lambda d, l: GateOutcome(passed=True)))
+    return events, model.first_call - t0
+
+
+def section_d():
+    print("\nD. the loop starts before the grids")
+    pl = P.Preload()
+    pl.start("grids", _slow([_grid("a.pdf", p) for p in range(4)], 0.3))
+    reg = _SpyRegistry()
+    events, first_ms = _run([
+        ModelResponse(text="search", tool_calls=[ToolCall(id="s", name="search_vault",
+                                                          args={"query": "q"})]),
+        ModelResponse(text="sum", tool_calls=[ToolCall(id="c", name="compute", args={"op": "sum"})]),
+        ModelResponse(text="done", tool_calls=[]),
+    ], RunScope(preload=pl), reg)
+    print(f"        first model call after {first_ms * 1000:.1f} ms (grid load 300 ms)")
+    check("the first model call starts immediately", first_ms < 0.1, f"{first_ms:.3f}s")
+    check("search_vault ran on the empty scope, compute on the full one",
+          reg.seen["s"][0] == 0 and reg.seen["c"][0] == 4, str(reg.seen))
+    meta = [e for e in events if e["type"] == "meta"][-1]
+    pre = meta.get("preload", {})
+    check("meta carries the preload stats",
+          pre.get("grids", {}).get("used") is True and pre.get("grids", {}).get("done") is True
+          and "saved_ms" in pre, str(pre))
+
+    pl2 = P.Preload()
+    pl2.start("grids", _slow([_grid("a.pdf", 1)], 0.2))
+    events2, _ = _run([
+        ModelResponse(text="search", tool_calls=[ToolCall(id="s", name="search_vault",
+                                                          args={"query": "q"})]),
+        ModelResponse(text="done", tool_calls=[]),
+    ], RunScope(preload=pl2), _SpyRegistry())
+    pre2 = [e for e in events2 if e["type"] == "meta"][-1].get("preload", {})
+    check("a run that never reads grids never waits for them",
+          pre2.get("grids", {}).get("used") is False and pre2.get("grids", {}).get("waited_ms") == 0,
+          str(pre2))
+    plain = [e for e in _run([ModelResponse(text="done", tool_calls=[])], RunScope(),
+                             _SpyRegistry())[0] if e["type"] == "meta"][-1]
+    check("no preload ⇒ the meta is unchanged", "preload" not in plain, str(plain))
+
+
+# ── E ───────────────────────────────────────────────────────────────────────────
+def section_e():
+    print("\nE. routes")
+    agent = (ROOT / "src/api/routes/agent_core.py").read_text()
+    flow = (ROOT / "src/api/routes/workflows.py").read_text()
+    check("agent-core: the grid preload is started, not awaited",
+          'preload.start("grids", _load_grids)' in agent
+          and "await asyncio.to_thread(_load_grids)" not in agent)
+    check("agent-core: history starts before the query embedding",
+          agent.index('preload.start("history", _load_history)') < agent.index("await _embed_query("))
+    check("agent-core: only history is awaited before the run; RunScope gets the preload",
+          'await asyncio.to_thread(preload.wait, "history", [])' in agent and "preload=preload," in agent)
+    check("workflows: the same speculative grid preload",
+          'preload.start("grids", _load_grids)' in flow and "preload=preload" in flow
+          and "await asyncio.to_thread(_load_grids)" not in flow)
+    check("AGENT_SPECULATIVE_PRELOAD=false joins the grids up front on both routes",
+          all("if not AGENT_SPECULATIVE_PRELOAD:\n" in src
+              and "await asyncio.to_thread(preload.join_grids, grids)" in src
+              for src in (agent, flow)))
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("  test_speculative_preload")
+    print("=" * 60)
+    section_a()
+    section_b()
+    section_c()
+    section_d()
+    section_e()
+    print("\n" + "=" * 60)
+    print(f"  test_speculative_preload: {_passed} passed, {_failed} failed")
+    print("=" * 60)
+    sys.exit(1 if _failed else 0)
@@ -0,0 +1,241 @@
+"""survey_collection parallel retrieval gate — one topic embed, bounded concurrent per-doc
+searches, per-doc latency in the envelope (offline, $0).
+
+survey_collection searched its docs one after another, each `retrieve` re-embedding the SAME
+topic. It now embeds once (RetrievalManager.embed_query) and runs the per-doc searches on a
+bounded pool (SURVEY_RETRIEVE_CONCURRENCY). A stub RM with a fixed per-call latency stands
+in for Pinecone; Brain._map_all_docs is patched so no LLM is called (as in test_tools):
+
+  A. PARITY: the same clusters / provenance as the serial path (concurrency=1), in the
+     filenames order — whichever search finishes first.
+  B. EMBED ONCE: embed_query runs once per survey and every search gets the vector; a
+     manager without embed_query (or a failing embed) still surveys, embedding per call.
+  C. CONCURRENCY: never more than the bound in flight; 12 docs × 50 ms finish well under
+     the serial wall time (the benchmark prints both).
+  D. LATENCY: data["retrieval"] carries per_doc_ms for every doc, the embed ms and the wall.
+  E. FAILURE: a raising doc is non-fatal (the rest survey); a cancelled run searches nothing.
+
+    python -u eval/test_survey_parallel.py
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.components.agent_core.tools import survey as S  # noqa: E402
+from src.components.agent_core.tools.survey import survey_collection  # noqa: E402
+from src.components.brain import map_reduce as _mr  # noqa: E402
+from src.components.brain.claims import Claim, EvidenceSpan, PerDocExtract  # noqa: E402
+from src.components.cancellation import CancelToken  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+class _Doc:
+    def __init__(self, text, md):
+        self.page_content = text
+        self.metadata = md
+
+
+class _RM:
+    """Pinecone stand-in: each retrieve sleeps `delay` s; optional embed_query."""
+
+    def __init__(self, delay=0.0, embed=True, embed_fails=False, boom=()):
+        self.delay = delay
+        self.boom = set(boom)
+        self.embed_fails = embed_fails
+        self.calls = []
+        self.embeds = 0
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        if embed:
+            self.embed_query = self._embed
+
+    def _embed(self, query):
+        with self._lock:
+            self.embeds += 1
+        if self.embed_fails:
+            raise RuntimeError("embeddings down")
+        time.sleep(self.delay)
+        return [0.1, 0.2, 0.3]
+
+    def retrieve(self, query, *args, **kw):
+        with self._lock:
+            self.calls.append((query, args, kw))
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            fname = args[0]
+            if fname in self.boom:
+                raise RuntimeError("pinecone timeout")
+            return [_Doc(f"{fname} is governed by the laws of India",
+                         {"filename": fname, "page_number": 5, "chunk_id": "c1",
+                          "doc_id": f"id-{fname}"})]
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _fake_map_all(query, doc_chunks, on_progress=None, cancel=None):
+    return [PerDocExtract(
+        doc_id=doc_id, filename=fname,
+        claims=[Claim(text=f"{fname}: governed by Indian law",
+                      evidence=[EvidenceSpan(doc_id=doc_id, chunk_id="c1",
+                                             verbatim_span="governed by the laws of India")],
+                      confidence=0.9)],
+    ) for doc_id, (fname, _chunks) in doc_chunks.items()]
+
+
+def _files(n):
+    return [f"doc{i:02d}.pdf" for i in range(n)]
+
+
+def _survey(rm, files, **kw):
+    return survey_collection("governing law", rm, object(), filenames=files,
+                             filename_by_doc={f"id-{f}": f for f in files}, **kw)
+
+
+def _with_concurrency(n, fn):
+    saved = S.SURVEY_RETRIEVE_CONCURRENCY
+    S._retrieve_per_doc.__kwdefaults__["concurrency"] = n
+    try:
+        return fn()
+    finally:
+        S._retrieve_per_doc.__kwdefaults__["concurrency"] = saved
+
+
+# ── A ───────────────────────────────────────────────────────────────────────────
+def section_a():
+    print("\nA. parity with the serial path")
+    files = _files(6)
+    serial = _with_concurrency(1, lambda: _survey(_RM(delay=0.01), files))
+    par = _with_concurrency(4, lambda: _survey(_RM(delay=0.01), files))
+    check("both ok", serial["ok"] and par["ok"], str(par.get("error")))
+    check("same clusters", serial["data"]["clusters"] == par["data"]["clusters"])
+    check("same provenance", serial["provenance"] == par["provenance"])
+    check("clusters keep the filenames order (equal evidence ⇒ MAP order)",
+          [c.get("doc") for c in par["data"]["clusters"]] == files,
+          str([c.get("doc") for c in par["data"]["clusters"]]))
+    rm = _RM()
+    _survey(rm, files)
+    check("breadth settings kept (positional apply_threshold / use_reranker False)",
+          all(c[1][4] is False and c[1][5] is False for c in rm.calls))
+
+
+# ── B ───────────────────────────────────────────────────────────────────────────
+def section_b():
+    print("\nB. the topic is embedded once")
+    rm = _RM()
+    r = _survey(rm, _files(8))
+    check("embed_query called once for 8 docs", rm.embeds == 1, str(rm.embeds))
+    check("every search reuses the vector",
+          len(rm.calls) == 8 and all(c[2].get("query_embedding") == [0.1, 0.2, 0.3]
+                                     for c in rm.calls))
+    check("envelope says embedded_once", r["data"]["retrieval"]["embedded_once"] is True)
+
+    bare = _RM(embed=False)
+    r2 = _survey(bare, _files(3))
+    check("a manager without embed_query still surveys (no vector passed)",
+          r2["ok"] and len(r2["data"]["clusters"]) == 3
+          and all("query_embedding" not in c[2] for c in bare.calls))
+    failing = _RM(embed_fails=True)
+    r3 = _survey(failing, _files(3))
+    check("a failing embed falls back to per-call embedding",
+          r3["ok"] and len(r3["data"]["clusters"]) == 3
+          and r3["data"]["retrieval"]["embedded_once"] is False
+          and all("query_embedding" not in c[2] for c in failing.calls))
+
+
+# ── C ───────────────────────────────────────────────────────────────────────────
+def section_c():
+    print("\nC. bounded concurrency")
+    files = _files(12)
+    rm = _RM(delay=0.05)
+    t0 = time.perf_counter()
+    _with_concurrency(4, lambda: _survey(rm, files))
+    par = time.perf_counter() - t0
+    check("never more than 4 searches in flight", rm.peak <= 4, str(rm.peak))
+    check("the pool actually overlaps searches", rm.peak > 1, str(rm.peak))
+    serial_rm = _RM(delay=0.05)
+    t0 = time.perf_counter()
+    _with_concurrency(1, lambda: _survey(serial_rm, files))
+    ser = time.perf_counter() - t0
+    print(f"        12 docs × 50 ms: serial {ser * 1000:.0f} ms · concurrency 4 {par * 1000:.0f} ms "
+          f"· {ser / par:.1f}×")
+    check("concurrent survey is well under the serial wall time", par < ser * 0.5,
+          f"{par:.3f}s vs {ser:.3f}s")
+    r = _survey(_RM(), _files(2))
+    check("workers never exceed the doc count", r["data"]["retrieval"]["concurrency"] == 2,
+          str(r["data"]["retrieval"]))
+
+
+# ── D ───────────────────────────────────────────────────────────────────────────
+def section_d():
+    print("\nD. per-doc latency in the envelope")
+    files = _files(5)
+    r = _survey(_RM(delay=0.02), files)
+    ret = r["data"].get("retrieval") or {}
+    check("per_doc_ms for every doc, in order", list(ret.get("per_doc_ms", {})) == files,
+          str(ret))
+    check("each per-doc latency reflects its search",
+          all(ms >= 15 for ms in ret.get("per_doc_ms", {}).values()), str(ret.get("per_doc_ms")))
+    check("embed and wall ms reported",
+          ret.get("embed_ms", 0) >= 15 and ret.get("wall_ms", 0) >= ret.get("embed_ms", 0), str(ret))
+    empty = _survey(_RM(), [])
+    check("an empty scope is still an error envelope", not empty["ok"])
+
+
+# ── E ───────────────────────────────────────────────────────────────────────────
+def section_e():
+    print("\nE. failures and cancellation")
+    files = _files(4)
+    r = _survey(_RM(boom={"doc01.pdf"}), files)
+    check("a raising doc is non-fatal; the rest survey",
+          r["ok"] and [c.get("doc") for c in r["data"]["clusters"]]
+          == ["doc00.pdf", "doc02.pdf", "doc03.pdf"], str(r.get("error")))
+    check("the failed doc still reports its latency",
+          "doc01.pdf" in r["data"]["retrieval"]["per_doc_ms"])
+    token = CancelToken()
+    token.cancel("test")
+    rm = _RM()
+    rc = _survey(rm, files, cancel=token)
+    check("a cancelled run searches nothing and returns a clean empty survey",
+          rm.calls == [] and rc["ok"] and rc["data"]["clusters"] == []
+          and "retrieval" in rc["data"], str(rc))
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("  test_survey_parallel")
+    print("=" * 60)
+    _orig_map_all = _mr.Brain._map_all_docs
+    _mr.Brain._map_all_docs = staticmethod(_fake_map_all)
+    try:
+        section_a()
+        section_b()
+        section_c()
+        section_d()
+        section_e()
+    finally:
+        _mr.Brain._map_all_docs = _orig_map_all
+    print("\n" + "=" * 60)
+    print(f"  test_survey_parallel: {_passed} passed, {_failed} failed")
+    print("=" * 60)
+    sys.exit(1 if _failed else 0)
@@ -0,0 +1,196 @@
+"""Context token-budget gate — stored counts, prefix sums, Brain MAP budgeted (offline, $0).
+
+Ingest stamps ``token_count`` on every chunk; ``_apply_token_budget`` (generation) and the
+Brain MAP context both cut a ranked chunk list with one count per chunk and a prefix-sum
+bisect (utils._token_budget_cut):
+
+  A. PARITY: the cut equals the old drop-from-the-tail loop on random inputs — same kept
+     docs, same truncated flag, always at least one doc.
+  B. STORED COUNTS: a stamped token_count is used as-is (no encode), floats included
+     (Pinecone returns numbers as floats); a missing / bad stamp falls back to encoding.
+  C. LINEAR: n legacy chunks cost n encodes (not O(n²)), and a chunk seen again costs none.
+  D. BRAIN MAP: a doc's MAP context is cut to CONTEXT_TOKEN_BUDGET (threaded and asyncio),
+     lowest-ranked chunks first; no budget configured ⇒ unchanged.
+
+    python -u eval/test_token_budget.py
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.documents import Document  # noqa: E402
+
+from src import utils  # noqa: E402
+from src.components.brain.async_brain import AsyncBrain  # noqa: E402
+from src.components.brain.map_cache import MapExtractCache  # noqa: E402
+from src.components.brain.map_reduce import Brain  # noqa: E402
+from src.components.generation import _apply_token_budget  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+def _old_budget(docs, budget):
+    """The pre-prefix-sum algorithm, kept here as the reference."""
+    if not docs:
+        return docs, False
+    total = sum(utils._token_count(d.page_content) for d in docs)
+    if total <= budget:
+        return docs, False
+    kept = list(docs)
+    while len(kept) > 1 and sum(utils._token_count(d.page_content) for d in kept) > budget:
+        kept.pop()
+    return kept, True
+
+
+_WORDS = "revenue grew margin contract clause indemnity payable fiscal quarter notice".split()
+
+
+def _doc(i: int, n_words: int, stamp: bool) -> Document:
+    rng = random.Random(i)
+    text = f"chunk {i}: " + " ".join(rng.choice(_WORDS) for _ in range(n_words))
+    md = {"chunk_id": f"c{i}"}
+    if stamp:
+        md["token_count"] = utils._token_count(text)
+    return Document(page_content=text, metadata=md)
+
+
+# ── A ───────────────────────────────────────────────────────────────────────────
+def section_a():
+    print("\nA. parity with the drop-from-the-tail loop")
+    rng = random.Random(7)
+    mismatches = 0
+    for trial in range(300):
+        docs = [_doc(trial * 100 + j, rng.randint(1, 80), stamp=rng.random() < 0.5)
+                for j in range(rng.randint(0, 12))]
+        budget = rng.randint(0, 400)
+        new, new_flag = _apply_token_budget(docs, budget)
+        old, old_flag = _old_budget(docs, budget)
+        if [d.page_content for d in new] != [d.page_content for d in old] or new_flag != old_flag:
+            mismatches += 1
+    check("300 random (docs, budget) cases cut identically", mismatches == 0, f"{mismatches} differ")
+    one, flag = _apply_token_budget([_doc(1, 500, True)], 10)
+    check("an oversized single doc is kept (never an empty context)", len(one) == 1 and flag)
+    empty, flag = _apply_token_budget([], 10)
+    check("no docs ⇒ no cut", empty == [] and not flag)
+
+
+# ── B ───────────────────────────────────────────────────────────────────────────
+def section_b():
+    print("\nB. stored counts")
+    big_text = Document(page_content="word " * 2000, metadata={"token_count": 3})
+    check("a stamped count is used as-is (no encode)", utils._doc_token_count(big_text) == 3)
+    check("a float stamp (as Pinecone returns it) counts",
+          utils._doc_token_count(Document(page_content="x", metadata={"token_count": 42.0})) == 42)
+    legacy = Document(page_content="revenue grew strongly", metadata={})
+    bad = Document(page_content="revenue grew strongly", metadata={"token_count": "n/a"})
+    want = utils._token_count("revenue grew strongly")
+    check("a legacy chunk (no stamp) is encoded", utils._doc_token_count(legacy) == want)
+    check("a malformed stamp falls back to encoding", utils._doc_token_count(bad) == want)
+    docs = [Document(page_content="a", metadata={"token_count": 60}) for _ in range(5)]
+    kept, flag = _apply_token_budget(docs, 200)
+    check("the budget follows the stamped counts (60×3 ≤ 200 < 60×4)", len(kept) == 3 and flag)
+
+
+# ── C ───────────────────────────────────────────────────────────────────────────
+def section_c():
+    print("\nC. linear encoding")
+    utils._cached_token_count.cache_clear()
+    docs = [_doc(10_000 + i, 40, stamp=False) for i in range(60)]
+    _apply_token_budget(docs, 50)
+    info = utils._cached_token_count.cache_info()
+    check("60 legacy chunks ⇒ 60 encodes for one budget pass", info.misses == 60, str(info))
+    _apply_token_budget(docs, 50)
+    info2 = utils._cached_token_count.cache_info()
+    check("the same chunks again ⇒ no new encode", info2.misses == 60 and info2.hits >= 60, str(info2))
+    stamped = [_doc(20_000 + i, 40, stamp=True) for i in range(60)]
+    _apply_token_budget(stamped, 50)
+    check("stamped chunks ⇒ no encode at all",
+          utils._cached_token_count.cache_info().misses == 60)
+
+
+# ── D ───────────────────────────────────────────────────────────────────────────
+class _Resp:
+    def __init__(self, content):
+        self.content = content
+
+
+class _RecordingMap:
+    def __init__(self):
+        self.contexts: list[str] = []
+
+    def invoke(self, messages):
+        self.contexts.append(messages[1].content)
+        return _Resp(json.dumps([]))
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+class _Cfg:
+    CONTEXT_TOKEN_BUDGET = 100
+
+
+def _map_brain(cls, config):
+    b = cls(config=config)
+    b._map_llm = _RecordingMap()
+    b._map_cache = MapExtractCache(enabled=False)
+    return b
+
+
+def section_d():
+    print("\nD. Brain MAP context budget")
+    chunks = [Document(page_content=f"CHUNK-{i} body", metadata={"chunk_id": f"c{i}", "token_count": 40})
+              for i in range(5)]
+    b = _map_brain(Brain, _Cfg())
+    b._map_single_doc("q?", "d1", "f.pdf", chunks)
+    ctx = b._map_llm.contexts[0]
+    check("threaded MAP sends the top chunks that fit (40+40 ≤ 100)",
+          "CHUNK-0" in ctx and "CHUNK-1" in ctx and "CHUNK-2" not in ctx, ctx[-200:])
+
+    ab = _map_brain(AsyncBrain, _Cfg())
+    asyncio.run(ab._amap_single_doc("q?", "d1", "f.pdf", chunks, ab._map_llm))
+    actx = ab._map_llm.contexts[0]
+    check("asyncio MAP applies the same cut", actx == ctx)
+
+    tiny = _Cfg()
+    tiny.CONTEXT_TOKEN_BUDGET = 1
+    b2 = _map_brain(Brain, tiny)
+    b2._map_single_doc("q?", "d1", "f.pdf", chunks)
+    check("a budget below one chunk still MAPs the top chunk",
+          "CHUNK-0" in b2._map_llm.contexts[0] and "CHUNK-1" not in b2._map_llm.contexts[0])
+
+    b3 = _map_brain(Brain, object())
+    b3._map_single_doc("q?", "d1", "f.pdf", chunks)
+    check("no CONTEXT_TOKEN_BUDGET ⇒ every chunk is sent",
+          all(f"CHUNK-{i}" in b3._map_llm.contexts[0] for i in range(5)))
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("  test_token_budget")
+    print("=" * 60)
+    section_a()
+    section_b()
+    section_c()
+    section_d()
+    print("\n" + "=" * 60)
+    print(f"  test_token_budget: {_passed} passed, {_failed} failed")
+    print("=" * 60)
+    sys.exit(1 if _failed else 0)
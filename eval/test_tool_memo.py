@@ -0,0 +1,302 @@
+"""Tool memo gate — repeated read-only tool calls served once per run / grid job ($0).
+
+Agents re-issue the same search_vault query or read_document of the same doc within a
+run, and across the cells of a grid row; each repeat re-embedded the query and re-hit
+Pinecone / Supabase. registry.ToolMemo now serves those repeats. Fake retrieval / DB
+backends count the real round-trips (no network):
+
+  A. KEYS: (tool, canonicalized args, scope) — argument order / None-valued args don't
+     matter; another doc, filter, owner or retrieval client does; compute & co. are never
+     memoized; read_document also keys on the grids its scope holds.
+  B. HITS: a repeat costs no backend call and returns a fresh copy; failures are never
+     stored; the entry cap holds; concurrent identical calls run once (single-flight).
+  C. RUN: run_agent's repeated search runs once, yet the ledger records the provenance of
+     BOTH steps; the repeat's tool_result is marked cached and RunTracer.health() counts
+     it; AGENT_TOOL_MEMO=false is the old behaviour.
+  D. READ JOIN: a read_document hit in another cell's scope replays the grid join (compute
+     can use the grids), and the same run's repeat after its own join is a hit.
+  E. GRID JOB: a 3-doc × 4-column grid whose columns all search the same phrase makes one
+     retrieval per doc (benchmark prints backend calls and wall time, memo vs none).
+
+    python -u eval/test_tool_memo.py
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import src.components.agent_core.registry as RG  # noqa: E402
+from src.components.agent_core.budgets import Budget  # noqa: E402
+from src.components.agent_core.grid_engine import build_cell, schedule_cells  # noqa: E402
+from src.components.agent_core.loop import GateOutcome, run_agent  # noqa: E402
+from src.components.agent_core.model import ModelResponse, ScriptedModel, ToolCall  # noqa: E402
+from src.components.agent_core.registry import REGISTRY, RunScope, ToolMemo  # noqa: E402
+from src.components.agent_core.review_grid import ColumnKind, GridColumn, GridSpec  # noqa: E402
+from src.components.agent_core.tracer import RunTracer  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+# ── fakes ───────────────────────────────────────────────────────────────────────
+class _FakeRM:
+    """A RetrievalManager stand-in that counts round-trips (optionally slow)."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def retrieve(self, query, *, doc_ids=None, **_kw):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        did = (doc_ids or ["d1"])[0]
+        return [SimpleNamespace(
+            page_content=f"{query}: the laws of England govern this agreement ({did}).",
+            metadata={"filename": f"{did}.pdf", "page_number": 3, "chunk_id": f"{did}-c{i}",
+                      "score": 0.9, "collection_id": "c1", "doc_id": did})
+            for i in range(3)]
+
+    def retrieve_table_chunks(self, *_a, **_k):
+        return []
+
+
+class _Grid:
+    def __init__(self, doc, page, table_id):
+        self.doc, self.page, self.table_id = doc, page, table_id
+        self.summary, self.headers, self.periods, self.units, self.rows = "", ["h"], [], None, []
+
+
+def _scope(rm=None, doc="d1", **kw):
+    return RunScope(collection_id="c1", doc_ids=[doc], filenames=[f"{doc}.pdf"],
+                    filename_by_doc={doc: f"{doc}.pdf"}, retrieval_manager=rm, **kw)
+
+
+def _search(q="governing law", cid="s1", **extra):
+    return ToolCall(id=cid, name="search_vault", args={"query": q, "kind": "text", **extra})
+
+
+# ── A ───────────────────────────────────────────────────────────────────────────
+def section_a():
+    print("\nA. memo keys")
+    rm = _FakeRM()
+    s = _scope(rm)
+    k = ToolMemo.key("search_vault", {"query": "x", "k": 8}, s)
+    check("argument order and None-valued args don't matter",
+          k == ToolMemo.key("search_vault", {"k": 8, "query": "x", "scope": None}, s))
+    check("another query ⇒ another key", k != ToolMemo.key("search_vault", {"query": "y", "k": 8}, s))
+    check("another doc ⇒ another key",
+          k != ToolMemo.key("search_vault", {"query": "x", "k": 8}, _scope(rm, doc="d2")))
+    check("another vault filter ⇒ another key",
+          k != ToolMemo.key("search_vault", {"query": "x", "k": 8}, _scope(rm, filters={"fy": 2023})))
+    check("another vault owner ⇒ another key",
+          k != ToolMemo.key("search_vault", {"query": "x", "k": 8}, _scope(rm, vault_owner="u2")))
+    check("another retrieval client ⇒ another key",
+          k != ToolMemo.key("search_vault", {"query": "x", "k": 8}, _scope(_FakeRM())))
+    check("compute / list_metrics / table_lookup are never memoized",
+          all(ToolMemo.key(n, {}, s) is None for n in ("compute", "list_metrics", "table_lookup")))
+    r1 = ToolMemo.key("read_document", {"doc_id": "d1"}, s)
+    s.grids.append(_Grid("d1.pdf", 2, "t1"))
+    check("read_document keys on the grids its scope holds",
+          r1 != ToolMemo.key("read_document", {"doc_id": "d1"}, s))
+
+
+# ── B ───────────────────────────────────────────────────────────────────────────
+def section_b():
+    print("\nB. hits, copies, failures, cap, single-flight")
+    rm = _FakeRM()
+    s = _scope(rm, memo=ToolMemo())
+    first = REGISTRY.execute(_search(), s)
+    second = REGISTRY.execute(_search(), s)
+    check("a repeat costs no backend call", rm.calls == 1, str(rm.calls))
+    check("the hit is marked and carries the same result",
+          second.pop("_memo_hit", False) and second == first and "_memo_hit" not in first)
+    second["provenance"].clear()
+    third = REGISTRY.execute(_search(), s)
+    check("each hit is a fresh copy (mutating one never reaches the memo)",
+          len(third["provenance"]) == len(first["provenance"]) > 0)
+
+    empty = _scope(None, memo=ToolMemo())       # no retrieval manager ⇒ error envelope
+    REGISTRY.execute(_search(), empty)
+    again = REGISTRY.execute(_search(), empty)
+    check("failed results are never stored", "_memo_hit" not in again
+          and empty.memo.stats()["entries"] == 0)
+
+    capped = _scope(rm, memo=ToolMemo(max_entries=2))
+    for q in ("a", "b", "c"):
+        REGISTRY.execute(_search(q), capped)
+    before = rm.calls
+    REGISTRY.execute(_search("c"), capped)
+    check("the entry cap holds (beyond it calls just run)",
+          capped.memo.stats()["entries"] == 2 and rm.calls == before + 1)
+
+    slow = _FakeRM(delay=0.1)
+    shared = ToolMemo()
+    scopes = [_scope(slow, memo=shared) for _ in range(6)]
+    threads = [threading.Thread(target=REGISTRY.execute, args=(_search(), sc)) for sc in scopes]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    check("6 concurrent identical calls run once", slow.calls == 1, str(slow.calls))
+    check("…5 of them served as hits", shared.stats()["hits"] == 5, str(shared.stats()))
+
+
+# ── C ───────────────────────────────────────────────────────────────────────────
+def _run(rm, *, memo_on=True):
+    model = ScriptedModel([
+        ModelResponse(text="", tool_calls=[_search(cid="s1")]),
+        ModelResponse(text="", tool_calls=[_search(cid="s2")]),
+        ModelResponse(text="England.", tool_calls=[]),
+    ])
+    budget = Budget(mode="standard", model="x", max_steps=6, wall_clock_s=60, token_budget=0)
+    saved = RG.AGENT_TOOL_MEMO
+    RG.AGENT_TOOL_MEMO = memo_on
+    import src.components.agent_core.loop as L
+    saved_loop = L.AGENT_TOOL_MEMO
+    L.AGENT_TOOL_MEMO = memo_on
+    try:
+        return list(run_agent("Which law governs?", model=model, scope=_scope(rm), budget=budget,
+                              gate_fn=lambda _d, _l: GateOutcome(passed=True)))
+    finally:
+        RG.AGENT_TOOL_MEMO, L.AGENT_TOOL_MEMO = saved, saved_loop
+
+
+def section_c():
+    print("\nC. one run: ledger + tracer")
+    rm = _FakeRM()
+    events = _run(rm)
+    results = [e for e in events if e["type"] == "tool_result"]
+    meta = [e for e in events if e["type"] == "meta"][-1]
+    check("the repeated search hit the backend once", rm.calls == 1, str(rm.calls))
+    check("the repeat's tool_result is marked cached (the first is not)",
+          [e.get("cached", False) for e in results] == [False, True])
+    check("both steps' provenance recorded in the ledger",
+          results[0]["n_provenance"] == results[1]["n_provenance"] > 0
+          and meta["n_evidence"] == 2 * results[0]["n_provenance"], str(meta))
+    tracer = RunTracer(run_id="memo-test", question="q")
+    for ev in events:
+        tracer.record(ev)
+    health = tracer.health()
+    check("RunTracer.health() counts the memo hits",
+          health["tool_memo_hits"] == {"search_vault": 1}, str(health["tool_memo_hits"]))
+
+    rm_off = _FakeRM()
+    off = _run(rm_off, memo_on=False)
+    check("AGENT_TOOL_MEMO=false ⇒ every call runs, nothing marked cached",
+          rm_off.calls == 2 and not any(e.get("cached") for e in off))
+    strip = lambda evs: [{k: v for k, v in e.items() if k != "cached"} for e in evs]  # noqa: E731
+    check("otherwise the event stream is identical",
+          strip(events) == strip(off))
+
+
+# ── D ───────────────────────────────────────────────────────────────────────────
+def section_d():
+    print("\nD. read_document join replay")
+    import src.components.brain.table_intent as ti
+    loads = []
+    grids = [_Grid("d1.pdf", 4, "t1"), _Grid("d1.pdf", 5, "t2")]
+
+    def _load(_db, ids, **_kw):
+        loads.append(tuple(ids))
+        return list(grids)
+
+    saved = ti.load_grids_for_docs
+    ti.load_grids_for_docs = _load
+    try:
+        memo = ToolMemo()
+        db = object()
+        a = _scope(db_client=db, memo=memo)
+        b = _scope(db_client=db, memo=memo)
+        read = ToolCall(id="r1", name="read_document", args={"doc_id": "d1.pdf"})
+        ra = REGISTRY.execute(read, a)
+        check("first read loads from the DB and joins the scope",
+              loads == [("d1",)] and len(a.grids) == 2 and ra.get("ok"), str(ra.get("error")))
+        rb = REGISTRY.execute(read, b)
+        check("another cell's identical read is a hit (no DB load)",
+              rb.pop("_memo_hit", False) and len(loads) == 1)
+        check("…and its scope gets the joined grids (compute can use them)",
+              [g.table_id for g in b.grids] == ["t1", "t2"])
+        ra2 = REGISTRY.execute(read, a)
+        check("the same run's repeat after its own join is a hit",
+              ra2.pop("_memo_hit", False) and len(loads) == 1 and len(a.grids) == 2)
+    finally:
+        ti.load_grids_for_docs = saved
+
+
+# ── E ───────────────────────────────────────────────────────────────────────────
+_COLS = [GridColumn(key=k, label=k, prompt=f"Find the {k}.", kind=ColumnKind.CLAUSE)
+         for k in ("gov_law", "jurisdiction", "venue", "disputes")]
+
+
+def _grid(memo_on: bool, delay: float):
+    spec = GridSpec(title="t", collection_id="c1", doc_ids=["d0", "d1", "d2"], columns=_COLS)
+    names = {d: f"{d}.pdf" for d in spec.doc_ids}
+    rm = _FakeRM(delay=delay)
+    memo = ToolMemo() if memo_on else None
+    import src.components.agent_core.loop as L
+    saved = (RG.AGENT_TOOL_MEMO, L.AGENT_TOOL_MEMO)
+    RG.AGENT_TOOL_MEMO = L.AGENT_TOOL_MEMO = memo_on
+
+    def _model():
+        return ScriptedModel([
+            ModelResponse(text="", tool_calls=[_search("governing law clause")]),
+            ModelResponse(text='{"status": "missing", "value": null, "quote": null, '
+                               '"risk": "missing", "note": null}', tool_calls=[]),
+        ])
+
+    def _cell(did, column):
+        return build_cell(did, column, collection_id="c1", model=_model(), filename_by_doc=names,
+                          retrieval_manager=rm, memo=memo)
+
+    t0 = time.perf_counter()
+    try:
+        cells = schedule_cells(spec, _cell, concurrency=2, filename_by_doc=names)
+    finally:
+        RG.AGENT_TOOL_MEMO, L.AGENT_TOOL_MEMO = saved
+    return cells, rm.calls, time.perf_counter() - t0
+
+
+def section_e():
+    print("\nE. a grid job shares one memo (concurrency 2, 0.1s per retrieval)")
+    cells_off, calls_off, wall_off = _grid(False, 0.1)
+    cells_on, calls_on, wall_on = _grid(True, 0.1)
+    print(f"        no memo: {calls_off} retrievals in {wall_off:.2f}s · "
+          f"memo: {calls_on} retrievals in {wall_on:.2f}s")
+    check("one retrieval per doc row (3), not per cell (12)",
+          calls_on == 3 and calls_off == 12, f"{calls_on} vs {calls_off}")
+    check("identical cells either way",
+          [(c.doc_id, c.column_key, c.status) for c in cells_on]
+          == [(c.doc_id, c.column_key, c.status) for c in cells_off])
+    check("the memoized grid is faster", wall_on < wall_off * 0.75, f"{wall_on:.2f}s vs {wall_off:.2f}s")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("  test_tool_memo")
+    print("=" * 60)
+    section_a()
+    section_b()
+    section_c()
+    section_d()
+    section_e()
+    print("\n" + "=" * 60)
+    print(f"  test_tool_memo: {_passed} passed, {_failed} failed")
+    print("=" * 60)
+    sys.exit(1 if _failed else 0)
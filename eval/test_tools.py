@@ -165,7 +165,10 @@ def main() -> int:
         def __init__(self, rows): self._rows = rows
         def select(self, *_a, **_k): return self
         def eq(self, *_a, **_k): return self
+        def in_(self, *_a, **_k): return self
+        def order(self, *_a, **_k): return self
         def limit(self, *_a, **_k): return self
+        def range(self, start, end): self._rows = self._rows[start:end + 1]; return self
         def execute(self): return SimpleNamespace(data=self._rows)
 
     class _FakeDB:
@@ -0,0 +1,316 @@
+"""Vault-documents gate — a vault's doc rows + routing summaries in ONE round-trip (offline, $0).
+
+get_collection_documents used to be accessible_vault_owner → a collection_documents⋈collections join →
+a `documents .in_(ids)` read, and DocumentRouter.route_ranked then read `document_summaries .in_(ids)`
+on every collection query. Both now go through db.SupabaseManager.get_vault_documents — one
+`vault_documents` RPC (migration 021) after the unchanged access gate. This gate pins the contract:
+
+  A. EQUIVALENCE: the RPC rows are exactly the per-table rows (same docs, same columns, summary +
+     topic_embedding merged; a doc with no summary yet is still returned with them None), and
+     get_collection_documents still returns plain document rows.
+  B. ACCESS CONTRACT: accessible_vault_owner still runs FIRST — no access ⇒ [] and the RPC is never
+     called; a staffed member reads the OWNER's docs; another user's doc linked into the vault, or
+     another user's summary row, is never returned.
+  C. FALLBACK: RPC missing (021 unapplied) or faulting ⇒ the per-table reads, byte-identical.
+  D. ROUTER: route_ranked takes the summaries off the joined rows — no document_summaries read.
+  E. LATENCY (200-doc vault, simulated round-trip): the pre-021 read sequence vs get_vault_documents.
+
+    python -u eval/test_vault_documents.py
+"""
+from __future__ import annotations
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.components.db import SupabaseManager  # noqa: E402
+from src.components.document_router import DocumentRouter  # noqa: E402
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+OWNER = "user-owner"
+OTHER = "user-other"
+VAULT = "vault-V"
+N_DOCS = 200
+RTT_S = 0.004   # simulated PostgREST round-trip for section E
+
+
+# ── A fake PostgREST client over in-memory tables + the vault_documents RPC (counts every read) ──
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, world, table):
+        self._w, self._t = world, table
+        self._eq: dict = {}
+        self._in: dict = {}
+
+    def select(self, *_a, **_k):
+        return self
+
+    def eq(self, col, val):
+        self._eq[col] = str(val)
+        return self
+
+    def in_(self, col, vals):
+        self._in[col] = {str(v) for v in vals}
+        return self
+
+    def limit(self, *_a, **_k):
+        return self
+
+    def _match(self, r):
+        for col, val in self._eq.items():
+            if col == "collections.user_id":   # the `collections!inner(user_id)` join
+                coll = next((c for c in self._w.tables["collections"]
+                             if c["id"] == r.get("collection_id")), None)
+                if not coll or coll["user_id"] != val:
+                    return False
+            elif str(r.get(col)) != val:
+                return False
+        return all(str(r.get(col)) in vals for col, vals in self._in.items())
+
+    def execute(self):
+        self._w.round_trip(self._t)
+        return _Result([dict(r) for r in self._w.tables.get(self._t, []) if self._match(r)])
+
+
+class _Rpc:
+    def __init__(self, world, name, params):
+        self._w, self._n, self._p = world, name, params
+
+    def execute(self):
+        self._w.round_trip(f"rpc:{self._n}")
+        if self._n != "vault_documents" or self._w.rpc_missing:
+            raise RuntimeError(f"PGRST202: Could not find the function public.{self._n}")
+        if self._w.rpc_fault:
+            raise RuntimeError("simulated RPC timeout")
+        # The SQL in 021, row for row: members of p_collection in a vault owned by p_owner, docs
+        # owned by p_owner, LEFT JOIN the owner's summaries.
+        t, owner, cid = self._w.tables, self._p["p_owner"], self._p["p_collection"]
+        if not any(c["id"] == cid and c["user_id"] == owner for c in t["collections"]):
+            return _Result([])
+        members = {cd["document_id"] for cd in t["collection_documents"] if cd["collection_id"] == cid}
+        out = []
+        for d in t["documents"]:
+            if d["id"] not in members or d["user_id"] != owner:
+                continue
+            row = dict(d)
+            if self._p.get("p_with_summaries", True):
+                s = next((s for s in t["document_summaries"]
+                          if s["document_id"] == d["id"] and s["user_id"] == owner), None)
+                row["summary"] = s["summary"] if s else None
+                row["topic_embedding"] = s["topic_embedding"] if s else None
+            out.append(row)
+        return _Result(out)
+
+
+class _World:
+    def __init__(self, n_docs=6, rtt_s=0.0):
+        self.reads: list = []
+        self.rtt_s = rtt_s
+        self.rpc_missing = False
+        self.rpc_fault = False
+        docs, summaries = [], []
+        for i in range(n_docs):
+            did = f"doc-{i:03d}"
+            docs.append({"id": did, "user_id": OWNER, "filename": f"f{i:03d}.pdf",
+                         "status": "completed", "doc_type": "legal_contract", "fiscal_year": 2023})
+            if i % 3:   # every third doc has no routing summary yet
+                emb = [1.0 if j == i % 4 else 0.0 for j in range(4)]
+                summaries.append({"document_id": did, "user_id": OWNER,
+                                  "summary": f"summary of {did}", "topic_embedding": json.dumps(emb)})
+        # Another user's doc linked into the vault, and another user's summary for an owner doc —
+        # the owner scoping must drop both.
+        docs.append({"id": "doc-foreign", "user_id": OTHER, "filename": "foreign.pdf",
+                     "status": "completed"})
+        summaries.append({"document_id": "doc-001", "user_id": OTHER,
+                          "summary": "NOT THE OWNER'S", "topic_embedding": "[0,0,0,1]"})
+        self.tables = {
+            "collections": [{"id": VAULT, "user_id": OWNER, "firm_id": None},
+                            {"id": "vault-other", "user_id": OTHER, "firm_id": None}],
+            "collection_documents": [{"collection_id": VAULT, "document_id": d["id"]} for d in docs],
+            "documents": docs,
+            "document_summaries": summaries,
+        }
+
+    def round_trip(self, what):
+        self.reads.append(what)
+        if self.rtt_s:
+            time.sleep(self.rtt_s)
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, name, params):
+        return _Rpc(self, name, params)
+
+
+def _mgr(world, user=OWNER):
+    m = SupabaseManager.__new__(SupabaseManager)
+    m._user = type("U", (), {"id": user, "email": f"{user}@x", "user_metadata": {}})()
+    m.client = world
+    m._access_token = None
+    m._read_client = None
+    m._authz_cache = None
+    return m
+
+
+def _legacy_vault_documents(m, collection_id):
+    """The pre-021 read sequence, verbatim: gate → member-id join → documents → summaries."""
+    owner = m.accessible_vault_owner(collection_id)
+    if not owner:
+        return []
+    doc_ids = m.get_collection_document_ids(collection_id)
+    if not doc_ids:
+        return []
+    docs = m.client.table("documents").select("*").in_("id", doc_ids).eq("user_id", owner).execute().data
+    rows = m.client.table("document_summaries").select(
+        "document_id, summary, topic_embedding"
+    ).in_("document_id", doc_ids).eq("user_id", owner).execute().data
+    summaries = {r["document_id"]: r for r in rows}
+    for d in docs:
+        d["summary"] = (summaries.get(d["id"]) or {}).get("summary")
+        d["topic_embedding"] = (summaries.get(d["id"]) or {}).get("topic_embedding")
+    return docs
+
+
+def _by_id(rows):
+    return sorted(rows, key=lambda r: r["id"])
+
+
+# ── A. equivalence ──
+print("\n── A. RPC rows ≡ per-table rows ──")
+w = _World()
+legacy = _legacy_vault_documents(_mgr(w), VAULT)
+w = _World()
+rpc_rows = _mgr(w).get_vault_documents(VAULT)
+check("A: same doc set, same columns, same summary/topic_embedding",
+      _by_id(rpc_rows) == _by_id(legacy), f"{len(rpc_rows)} vs {len(legacy)}")
+check("A: a doc with no summary yet is still returned (summary/topic_embedding None)",
+      any(r["id"] == "doc-000" and r["summary"] is None and r["topic_embedding"] is None
+          for r in rpc_rows))
+w = _World()
+plain = _mgr(w).get_collection_documents(VAULT)
+w2 = _World()
+m2 = _mgr(w2)
+old_plain = m2.client.table("documents").select("*").in_(
+    "id", m2.get_collection_document_ids(VAULT)).eq("user_id", OWNER).execute().data
+check("A: get_collection_documents returns plain document rows (no summary keys), same set",
+      _by_id(plain) == _by_id(old_plain) and all("topic_embedding" not in d for d in plain))
+
+# ── B. access contract ──
+print("\n── B. access gate unchanged ──")
+w = _World()
+m = _mgr(w, user="user-stranger")
+m.accessible_vault_owner = lambda cid: None
+check("B: no access ⇒ [] and the RPC is never called",
+      m.get_vault_documents(VAULT) == [] and not any(r.startswith("rpc:") for r in w.reads),
+      str(w.reads))
+w = _World()
+m = _mgr(w, user="user-para")
+m.accessible_vault_owner = lambda cid: OWNER   # staffed: the gate resolved the OWNER
+staffed = m.get_vault_documents(VAULT)
+check("B: a staffed member reads the OWNER's docs",
+      len(staffed) == 6 and all(d["user_id"] == OWNER for d in staffed))
+check("B: another user's doc linked into the vault is never returned",
+      all(d["id"] != "doc-foreign" for d in staffed))
+check("B: another user's summary row never rides along",
+      all(d.get("summary") != "NOT THE OWNER'S" for d in staffed))
+w = _World()
+check("B: the owner cannot be pointed at someone else's vault through the RPC",
+      _mgr(w).get_vault_documents("vault-other") == [])
+
+# ── C. fallback ──
+print("\n── C. RPC missing / faulting ⇒ per-table reads ──")
+for label, attr in (("missing (021 unapplied)", "rpc_missing"), ("faulting", "rpc_fault")):
+    w = _World()
+    setattr(w, attr, True)
+    rows = _mgr(w).get_vault_documents(VAULT)
+    check(f"C: RPC {label} ⇒ identical rows from the per-table path",
+          _by_id(rows) == _by_id(legacy) and "document_summaries" in w.reads, str(w.reads))
+
+# ── D. router ──
+print("\n── D. route_ranked reads summaries off the joined rows ──")
+
+
+class _Cfg:
+    ROUTING_TOP_N = 3
+    ROUTING_MMR_LAMBDA = 1.0
+    EMBEDDING_MODEL_NAME = "fake-embed"
+    OPENAI_API_KEY = "sk-fake"
+
+
+def _route(world):
+    import src.components.db as dbmod
+    from src.components.routing_index import routing_index_cache
+    routing_index_cache.clear()   # each world is a fresh vault — never route off another's index
+    real = dbmod.SupabaseManager
+
+    class _Bound(real):
+        def __new__(cls, *a, **k):
+            return _mgr(world)
+
+        def __init__(self, *a, **k):
+            pass
+
+    dbmod.SupabaseManager = _Bound
+    try:
+        return DocumentRouter(_Cfg()).route_doc_ids(
+            "q", VAULT, OWNER, query_embedding=[1.0, 0.0, 0.0, 0.0])
+    finally:
+        dbmod.SupabaseManager = real
+
+
+w = _World()
+routed = _route(w)
+w_old = _World()
+w_old.rpc_missing = True
+routed_old = _route(w_old)
+check("D: the router issues no separate document_summaries read",
+      "document_summaries" not in w.reads, str(w.reads))
+check("D: same routing decision as the per-table path", routed == routed_old and routed,
+      f"{routed} vs {routed_old}")
+check("D: the top pick is the doc whose topic embedding matches the query",
+      routed and routed[0] in {"doc-004", "doc-008"}, str(routed))
+
+# ── E. latency ──
+print(f"\n── E. latency, {N_DOCS}-doc vault, {RTT_S * 1000:.0f} ms simulated round-trip ──")
+w = _World(n_docs=N_DOCS, rtt_s=RTT_S)
+t0 = time.perf_counter()
+old_rows = _legacy_vault_documents(_mgr(w), VAULT)
+old_ms, old_trips = (time.perf_counter() - t0) * 1000, len(w.reads)
+w = _World(n_docs=N_DOCS, rtt_s=RTT_S)
+t0 = time.perf_counter()
+new_rows = _mgr(w).get_vault_documents(VAULT)
+new_ms, new_trips = (time.perf_counter() - t0) * 1000, len(w.reads)
+print(f"    pre-021 : {old_trips} round-trips  {old_ms:6.1f} ms")
+print(f"    021 RPC : {new_trips} round-trips  {new_ms:6.1f} ms  ({old_ms / max(new_ms, 1e-9):.1f}× faster)")
+check(f"E: same {N_DOCS} rows", _by_id(new_rows) == _by_id(old_rows) and len(new_rows) == N_DOCS)
+check("E: the RPC path is gate + ONE data read (was gate + three)",
+      new_trips == 2 and old_trips == 4, f"{new_trips} vs {old_trips}")
+check("E: faster than the pre-021 sequence", new_ms < old_ms, f"{new_ms:.1f} vs {old_ms:.1f}")
+
+
+# ── tally ──
+print(f"\n{'='*60}")
+print(f"  test_vault_documents: {_passed} passed, {_failed} failed")
+print(f"{'='*60}")
+sys.exit(0 if _failed == 0 else 1)
@@ -0,0 +1,336 @@
+"""Batched-verification gate — the Brain VERIFY step packs claims into few calls (offline, $0).
+
+`verify_claims` used to make one verifier call per claim and `verify_reduce_output` one per
+answer sentence — 75 round-trips for a 12-doc / 60-claim / 15-sentence run. Both now batch
+(BRAIN_VERIFY_BATCH_SIZE items per call, per-item verdicts) after a deterministic verbatim
+pre-pass. This gate pins the contract with a scripted verifier (no API):
+
+  A. PRE-PASS: a claim restating a span found word-for-word in its cited chunk is accepted with
+     no call; a paraphrase, a span not in the chunk, a number not in the span, a dropped
+     negation or conditional/carve-out qualifier, swapped figures, or no chunk lookup all go
+     to the LLM.
+  B. BATCHING: 30 claims → 3 calls at batch size 12; every per-item verdict lands on the right
+     claim (order preserved) and matches the per-claim verifier exactly; batch size 1 = legacy.
+  C. FALLBACK: malformed JSON / a raised call ⇒ every item re-checked singly; an omitted id or
+     an out-of-range confidence ⇒ ONLY that item falls back; a claim with no evidence is dropped.
+  D. REDUCE SENTENCES: 15 sentences → 2 calls, same groundedness + unsupported list as per-item.
+  E. BRAIN RUN: 12 docs × 5 claims + a 15-sentence answer through Brain.run with scripted models
+     — calls + wall time batched vs per-item, and the stats surface on BrainResult.
+
+    python -u eval/test_verifier_batch.py
+"""
+from __future__ import annotations
+
+import json
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.documents import Document  # noqa: E402
+
+from src.components.brain import verifier as V  # noqa: E402
+from src.components.brain.claims import Claim, EvidenceSpan  # noqa: E402
+from src.components.brain.map_reduce import Brain  # noqa: E402
+from src.components.brain.verifier import (  # noqa: E402
+    VerifyStats, verify_claims, verify_reduce_output,
+)
+
+_passed = 0
+_failed = 0
+
+
+def check(name: str, cond: bool, detail: str = ""):
+    global _passed, _failed
+    if cond:
+        _passed += 1
+        print(f"  PASS  {name}")
+    else:
+        _failed += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+class _Resp:
+    def __init__(self, content):
+        self.content = content
+
+
+def _conf(text: str) -> float:
+    """The scripted verdict: anything mentioning "unsupported" fails, everything else passes."""
+    return 0.1 if "unsupported" in text.lower() else 0.9
+
+
+class ScriptedVerifier:
+    """Answers single and batched verifier prompts deterministically; `mode` breaks batches."""
+
+    def __init__(self, latency_s: float = 0.0, mode: str = "ok"):
+        self.latency_s = latency_s
+        self.mode = mode
+        self.calls: list[str] = []
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        system, user = messages[0].content, messages[1].content
+        with self._lock:
+            self.calls.append("batch" if '"verdicts"' in system else "single")
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        if '"verdicts"' not in system:
+            text = re.search(r"(?:CLAIM|SENTENCE FROM THE ANSWER):\s*\n?(.*)", user).group(1)
+            return _Resp(json.dumps({"verdict": "x", "confidence": _conf(text)}))
+        if self.mode == "garbage":
+            return _Resp("Sure! Here are the verdicts: supported, supported, ...")
+        if self.mode == "raise":
+            raise TimeoutError("verifier timed out")
+        if "ITEM 1" in user:
+            items = re.findall(r"ITEM (\d+)\nCLAIM: (.*)", user)
+        else:
+            items = re.findall(r"^(\d+)\. (.*)$", user.split("SENTENCES FROM THE ANSWER:")[1], re.M)
+        verdicts = [{"id": int(i), "verdict": "x", "confidence": _conf(t)} for i, t in items]
+        if self.mode == "omit_2":
+            verdicts = [v for v in verdicts if v["id"] != 2]
+        if self.mode == "bad_conf_3":
+            verdicts[2]["confidence"] = 7
+        return _Resp("```json\n" + json.dumps({"verdicts": verdicts}) + "\n```")
+
+
+def _claims(n: int, bad_every: int = 4) -> list[Claim]:
+    return [
+        Claim(text=f"Claim {i} is {'unsupported' if i % bad_every == 0 else 'fine'} by the memo.",
+              evidence=[EvidenceSpan(doc_id=f"d{i % 3}", chunk_id=f"c{i}", verbatim_span=f"span {i}")])
+        for i in range(n)
+    ]
+
+
+def _state(claims):
+    return [(c.text, c.verified, round(c.confidence, 3)) for c in claims]
+
+
+# ── A. verbatim pre-pass ──
+print("\n── A. verbatim pre-pass ──")
+chunk = "The Supplier shall deliver 1,200 units by 31 March 2024.  Late delivery incurs a 2% penalty."
+texts = {("d", "c1"): chunk}
+lookup = lambda ev: texts.get((ev.doc_id, ev.chunk_id))  # noqa: E731
+
+
+def _one(text, span, doc="d", chunk_id="c1"):
+    return Claim(text=text, evidence=[EvidenceSpan(doc_id=doc, chunk_id=chunk_id, verbatim_span=span)])
+
+
+restate = _one("The Supplier shall deliver 1,200 units by 31 March 2024.",
+               "The Supplier shall deliver 1,200   units by 31 March 2024.")
+paraphrase = _one("The vendor must ship twelve hundred units before April.",
+                  "The Supplier shall deliver 1,200 units by 31 March 2024.")
+not_in_chunk = _one("The Supplier shall deliver 1,500 units.", "The Supplier shall deliver 1,500 units.")
+extra_number = _one("Late delivery incurs a 5% penalty.", "Late delivery incurs a 2% penalty.")
+llm = ScriptedVerifier()
+stats = VerifyStats()
+ok, dropped = verify_claims([restate, paraphrase, not_in_chunk, extra_number], llm,
+                            chunk_text=lookup, stats=stats)
+check("A: a restated verbatim quote is auto-accepted without a call",
+      restate.verified and restate.confidence == V.AUTO_ACCEPT_CONFIDENCE and stats.auto_accepted == 1)
+check("A: paraphrase / span not in chunk / number not in span go to the LLM",
+      stats.items == 4 and len(llm.calls) == 1 and llm.calls == ["batch"], f"{llm.calls}")
+llm2 = ScriptedVerifier()
+fresh = _one(restate.text, restate.evidence[0].verbatim_span)
+verify_claims([fresh], llm2)
+check("A: no chunk lookup ⇒ no auto-accept (one LLM call)", llm2.calls == ["single"])
+check("A: a span citing another chunk is not auto-accepted",
+      not V._verbatim_supported(_one(restate.text, restate.evidence[0].verbatim_span, chunk_id="c9"), lookup))
+
+texts[("d", "c2")] = ("The seller shall not be liable for indirect losses.  Revenue was $40 million in "
+                      "2023 and $25 million in 2022.  The buyer shall pay within 30 days.")
+negated = _one("The seller shall be liable for indirect losses.",
+               "The seller shall not be liable for indirect losses.", chunk_id="c2")
+swapped = _one("Revenue was $25 million in 2023 and $40 million in 2022.",
+               "Revenue was $40 million in 2023 and $25 million in 2022.", chunk_id="c2")
+cut_number = _one("The buyer shall pay.", "The buyer shall pay within 30 days.", chunk_id="c2")
+llm3 = ScriptedVerifier()
+stats3 = VerifyStats()
+verify_claims([negated, swapped, cut_number], llm3, chunk_text=lookup, stats=stats3)
+check("A: a claim dropping the span's negation is not auto-accepted",
+      not V._verbatim_supported(negated, lookup) and negated.confidence != V.AUTO_ACCEPT_CONFIDENCE)
+check("A: swapped figures (same words and numbers, wrong order) are not auto-accepted",
+      not V._verbatim_supported(swapped, lookup) and swapped.confidence != V.AUTO_ACCEPT_CONFIDENCE)
+check("A: a contiguous run that leaves out the span's number is not auto-accepted",
+      not V._verbatim_supported(cut_number, lookup))
+check("A: all three go to the verifier call",
+      stats3.auto_accepted == 0 and stats3.items == 3 and llm3.calls == ["batch"], f"{llm3.calls}")
+
+texts[("d", "c3")] = ("The buyer shall pay the fee only if invoiced.  The seller is liable unless "
+                      "notified in writing.  Licensee may sublicense, subject to prior consent.  "
+                      "All assets transfer except the Brand.  The deposit is refundable provided "
+                      "the goods are returned.")
+qualified = [
+    _one("The buyer shall pay the fee", "The buyer shall pay the fee only if invoiced.", chunk_id="c3"),
+    _one("The seller is liable", "The seller is liable unless notified in writing.", chunk_id="c3"),
+    _one("Licensee may sublicense", "Licensee may sublicense, subject to prior consent.", chunk_id="c3"),
+    _one("All assets transfer", "All assets transfer except the Brand.", chunk_id="c3"),
+    _one("The deposit is refundable",
+         "The deposit is refundable provided the goods are returned.", chunk_id="c3"),
+]
+check("A: a run that drops an 'only if' / 'unless' / 'subject to' / 'except' / 'provided' "
+      "qualifier is not auto-accepted",
+      not any(V._verbatim_supported(q, lookup) for q in qualified),
+      str([q.text for q in qualified if V._verbatim_supported(q, lookup)]))
+llm4 = ScriptedVerifier()
+stats4 = VerifyStats()
+verify_claims(qualified, llm4, chunk_text=lookup, stats=stats4)
+check("A: qualified claims all go to the verifier call",
+      stats4.auto_accepted == 0 and stats4.items == len(qualified) and llm4.calls == ["batch"],
+      f"{llm4.calls}")
+check("A: a contiguous run of a span with nothing material left out is still accepted",
+      V._verbatim_supported(_one("The seller shall not be liable",
+                                 "The seller shall not be liable for indirect losses.", chunk_id="c2"),
+                            lookup))
+
+
+# ── B. batching ──
+print("\n── B. batching ──")
+ref = _claims(30)
+verify_claims(ref, ScriptedVerifier(), batch_size=1)
+llm = ScriptedVerifier()
+stats = VerifyStats()
+batched = _claims(30)
+ok, dropped = verify_claims(batched, llm, stats=stats, batch_size=12)
+check("B: 30 claims → 3 batch calls", llm.calls == ["batch"] * 3, f"{llm.calls}")
+check("B: per-item verdicts match the per-claim verifier exactly", _state(batched) == _state(ref))
+check("B: verified/dropped keep input order",
+      [c.text for c in ok] == [c.text for c in batched if c.verified]
+      and [c.text for c in dropped] == [c.text for c in batched if not c.verified] and len(dropped) == 8)
+check("B: stats count items / calls / calls saved",
+      stats.items == 30 and stats.llm_calls == 3 and stats.batch_calls == 3 and stats.calls_saved == 27)
+legacy = ScriptedVerifier()
+verify_claims(_claims(5), legacy, batch_size=1)
+check("B: batch size 1 ⇒ one call per claim (legacy)", legacy.calls == ["single"] * 5)
+old_chars = V.VERIFY_BATCH_MAX_CHARS
+V.VERIFY_BATCH_MAX_CHARS = 200
+llm = ScriptedVerifier()
+verify_claims(_claims(12), llm, batch_size=12)
+V.VERIFY_BATCH_MAX_CHARS = old_chars
+check("B: the char budget splits a large batch", len(llm.calls) > 1, f"{llm.calls}")
+
+
+# ── C. per-item fallback ──
+print("\n── C. per-item fallback ──")
+for mode in ("garbage", "raise"):
+    llm = ScriptedVerifier(mode=mode)
+    stats = VerifyStats()
+    cl = _claims(6)
+    verify_claims(cl, llm, stats=stats, batch_size=12)
+    check(f"C: {mode} batch ⇒ every item re-checked singly, verdicts intact",
+          llm.calls == ["batch"] + ["single"] * 6 and stats.fallback_items == 6
+          and _state(cl) == _state(ref[:6]), f"{llm.calls}")
+llm = ScriptedVerifier(mode="omit_2")
+cl = _claims(6)
+verify_claims(cl, llm, batch_size=12)
+check("C: an omitted id ⇒ only that item falls back",
+      llm.calls == ["batch", "single"] and _state(cl) == _state(ref[:6]), f"{llm.calls}")
+llm = ScriptedVerifier(mode="bad_conf_3")
+cl = _claims(6)
+verify_claims(cl, llm, batch_size=12)
+check("C: an out-of-range confidence ⇒ only that item falls back",
+      llm.calls == ["batch", "single"] and _state(cl) == _state(ref[:6]), f"{llm.calls}")
+cl = _claims(4) + [Claim(text="No evidence at all.")]
+llm = ScriptedVerifier()
+ok, dropped = verify_claims(cl, llm, batch_size=12)
+check("C: a claim with no evidence is dropped without a call",
+      dropped[-1].text == "No evidence at all." and dropped[-1].confidence == 0.0 and llm.calls == ["batch"])
+
+
+# ── D. REDUCE-output sentences ──
+print("\n── D. REDUCE-output sentences ──")
+facts = _claims(10)
+answer = " ".join(
+    f"Sentence number {i} states an {'unsupported' if i % 5 == 0 else 'grounded'} point here." for i in range(15)
+)
+per_item_llm, batch_llm = ScriptedVerifier(), ScriptedVerifier()
+g1, u1 = verify_reduce_output(answer, facts, per_item_llm, batch_size=1)
+stats = VerifyStats()
+g2, u2 = verify_reduce_output(answer, facts, batch_llm, batch_size=12, stats=stats)
+check("D: 15 sentences → 2 calls (per-item: 15)", len(batch_llm.calls) == 2 and len(per_item_llm.calls) == 15)
+check("D: same groundedness and unsupported sentences as per-item",
+      g1 == g2 and u1 == u2 and len(u2) == 3, f"{g1} {g2} {u2}")
+llm = ScriptedVerifier(mode="omit_2")
+g3, u3 = verify_reduce_output(answer, facts, llm, batch_size=12)
+check("D: a sentence the batch omitted is re-checked singly", (g3, u3) == (g1, u1)
+      and llm.calls.count("single") == 2, f"{llm.calls}")
+
+
+# ── E. Brain.run end-to-end ──
+print("\n── E. Brain.run, 12 docs × 5 claims + 15-sentence answer, 40 ms/verifier call ──")
+N_DOCS, PER_DOC = 12, 5
+
+
+class ScriptedMap:
+    def invoke(self, messages):
+        doc = re.search(r"Document \[(\S+) \|", messages[1].content).group(1)
+        items = []
+        for j in range(PER_DOC):
+            if j == 0:   # verbatim restatement of the chunk ⇒ auto-accepted
+                items.append({"claim": f"Fee schedule {doc} sets rate {j}.",
+                              "verbatim_span": f"Fee schedule {doc} sets rate {j}.", "confidence": 0.9})
+            else:
+                items.append({"claim": f"Document {doc} point {j} is "
+                                       f"{'unsupported' if j == 4 else 'supported'} by the text.",
+                              "verbatim_span": f"{doc} discusses point {j}", "confidence": 0.8})
+        return _Resp(json.dumps(items))
+
+
+class ScriptedReduce:
+    def invoke(self, messages):
+        body = " ".join(f"Finding {i} is a grounded conclusion [Source: f.pdf]." for i in range(15))
+        return _Resp(body + "\n\n## Confidence\n0.9 — consistent")
+
+
+doc_chunks = {
+    f"doc{d}": (f"f{d}.pdf", [Document(
+        page_content=f"Fee schedule doc{d} sets rate 0. doc{d} discusses point 1 through 4.",
+        metadata={"chunk_id": f"doc{d}-c0"})])
+    for d in range(N_DOCS)
+}
+
+
+def _run(batch_size, prepass=True):
+    """batch_size=1 without the pre-pass is the pre-batching verifier, call for call."""
+    old, old_lookup = V.VERIFY_BATCH_SIZE, Brain.__dict__["_chunk_text_lookup"]
+    V.VERIFY_BATCH_SIZE = batch_size
+    if not prepass:
+        Brain._chunk_text_lookup = staticmethod(lambda dc: None)
+    try:
+        brain = Brain(config=object())
+        brain._map_llm, brain._reduce_llm = ScriptedMap(), ScriptedReduce()
+        brain._verify_llm = ScriptedVerifier(latency_s=0.04)
+        t0 = time.perf_counter()
+        res = brain.run("What are the fees?", doc_chunks)
+        return res, brain._verify_llm.calls, (time.perf_counter() - t0) * 1000
+    finally:
+        V.VERIFY_BATCH_SIZE, Brain._chunk_text_lookup = old, old_lookup
+
+
+old_res, old_calls, old_ms = _run(1, prepass=False)
+new_res, new_calls, new_ms = _run(12)
+print(f"    per-item : {len(old_calls):3d} verifier calls  {old_ms:7.1f} ms")
+print(f"    batched  : {len(new_calls):3d} verifier calls  {new_ms:7.1f} ms  "
+      f"(auto-accepted {new_res.verify_stats['auto_accepted']}, "
+      f"est. saved {new_res.verify_stats['est_saved_ms']} ms)")
+check("E: same verified claims and answer as the per-item verifier",
+      sorted(c.text for c in new_res.claims) == sorted(c.text for c in old_res.claims)
+      and new_res.answer == old_res.answer and len(new_res.claims) == N_DOCS * 4)
+check("E: 75 per-item calls → a handful of batched calls",
+      len(old_calls) == N_DOCS * PER_DOC + 15 and len(new_calls) <= 8, f"{len(old_calls)} → {len(new_calls)}")
+check("E: verify wall time drops", new_ms < old_ms / 3, f"{new_ms:.0f} vs {old_ms:.0f}")
+vs = new_res.verify_stats
+check("E: stats on BrainResult (and in to_dict)",
+      vs["items"] == 75 and vs["auto_accepted"] == N_DOCS and vs["llm_calls"] == len(new_calls)
+      and vs["calls_saved"] == 75 - len(new_calls) and new_res.to_dict()["verify"] == vs)
+
+
+# ── tally ──
+print(f"\n{'='*60}")
+print(f"  test_verifier_batch: {_passed} passed, {_failed} failed")
+print(f"{'='*60}")
+sys.exit(0 if _failed == 0 else 1)
@@ -0,0 +1,55 @@
+"""Trace summary — where agent runs spend their seconds, across run journals ($0, offline).
+
+Every traced run (the agent-core and workflow routes, agentcore_eval, abstain_autopsy)
+journals a `span` line per model call, tool execution and output-gate pass
+(agent_core/tracer.py). This reads those journals and prints p50 / p95 / max latency per
+span kind, per tool, per model and per agent step — the step figure is the step's wall
+time (first span start → last span end), so parallel tool calls are not double-counted.
+
+    python -u eval/trace_summary.py                      # the trace dir (AGENT_TRACE_DIR)
+    python -u eval/trace_summary.py /tmp/docquery_traces/run-ab12.jsonl other_dir/
+    python -u eval/trace_summary.py --json               # the raw summary dict
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.components.agent_core.tracer import summarize_journals  # noqa: E402
+
+
+def _table(title: str, rows: dict) -> None:
+    if not rows:
+        return
+    print(f"\n{title}")
+    print(f"  {'':<24} {'n':>6} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10} {'total s':>9}")
+    for name, st in rows.items():
+        print(f"  {str(name)[:24]:<24} {st['n']:>6} {st['p50_ms']:>10.1f} {st['p95_ms']:>10.1f} "
+              f"{st['max_ms']:>10.1f} {st['total_ms'] / 1000:>9.1f}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("paths", nargs="*", help="journal files and/or directories")
+    ap.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = ap.parse_args()
+
+    summary = summarize_journals(args.paths or None)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    print(f"{summary['journals']} journal(s), {summary['spans']} span(s) · modes {summary['modes']}")
+    if not summary["spans"]:
+        print("no spans — journals written before span tracing, or an empty trace dir")
+        return 0
+    _table("By kind", summary["by_kind"])
+    _table("By tool", summary["by_tool"])
+    _table("By model", summary["by_model"])
+    _table("By step", {f"step {k}": v for k, v in summary["by_step"].items()})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -526,6 +526,14 @@ function ChatPageInner({ scopedCollectionId, conversationId, analysisMode = "sta
         // Live thinking-step state machine, mirrored into the message.
         const brainStart = Date.now();
         let relevantCount = 0;
+        let cachedCount = 0;
+        let sentencesChecked = 0;
+        let sentencesFlagged = 0;
+        const groundDetail = () =>
+          sentencesChecked === 0
+            ? "Checking sentences as they are written"
+            : `${sentencesChecked} sentence${sentencesChecked !== 1 ? "s" : ""} checked` +
+              (sentencesFlagged ? ` · ${sentencesFlagged} flagged` : "");
         let steps: ThinkingStep[] = [
           { id: "route", label: "Routing", detail: "Selecting relevant documents", status: "active" },
           { id: "read", label: "Reading documents", status: "pending" },
@@ -597,17 +605,33 @@ function ChatPageInner({ scopedCollectionId, conversationId, analysisMode = "sta
             },
             onBrainMap: (ev) => {
               if (ev.relevant) relevantCount += 1;
-              setStep("read", { status: "active", detail: `${ev.progress ?? ""} · ${relevantCount} relevant` });
+              if (ev.cached) cachedCount += 1;
+              setStep("read", {
+                status: "active",
+                detail: `${ev.progress ?? ""} · ${relevantCount} relevant` + (cachedCount ? ` · ${cachedCount} reused` : ""),
+              });
             },
             onBrainVerify: (total, verified) => {
               setStep("read", { status: "done" });
               setStep("verify", { status: "active", detail: `Verified ${verified} of ${total} claim${total !== 1 ? "s" : ""}` });
             },
+            onBrainSentence: () => {
+              sentencesChecked += 1;
+              setStep("ground", { status: "active", detail: groundDetail() });
+            },
+            onBrainRetract: () => {
+              sentencesChecked += 1;
+              sentencesFlagged += 1;
+              setStep("ground", { status: "active", detail: groundDetail() });
+            },
             onBrainReduce: (docsRelevant, groundedness, unsupported) => {
               setStep("verify", { status: "done" });
-              // The §4a.3-step-2 answer-entailment check has already run by the time
-              // brain_reduce fires. Surface its result as its own trust step.
-              if (groundedness !== undefined) {
+              // REDUCE streams: the first brain_reduce opens synthesis while the §4a.3-step-2
+              // answer-entailment check runs sentence by sentence; the closing one carries its
+              // result, surfaced as its own trust step.
+              if (groundedness === undefined) {
+                setStep("ground", { status: "active", detail: groundDetail() });
+              } else {
                 const pct = Math.round(groundedness * 100);
                 const allGrounded = !unsupported;
                 setStep("ground", {
@@ -616,8 +640,6 @@ function ChatPageInner({ scopedCollectionId, conversationId, analysisMode = "sta
                     ? `All sentences grounded (${pct}%)`
                     : `${unsupported} sentence${unsupported !== 1 ? "s" : ""} flagged · ${pct}% grounded`,
                 });
-              } else {
-                setStep("ground", { status: "done" });
               }
               setStep("synth", { status: "active", detail: `Merging ${docsRelevant} source${docsRelevant !== 1 ? "s" : ""}` });
             },
@@ -13,6 +13,7 @@ export interface StreamEvent {
     | "sources" | "token" | "error" | "done" | "status" | "meta" | "sub_queries" | "web_search"
     // Brain (map-reduce) step events — emitted by /query/brain/stream
     | "brain_start" | "brain_analyst" | "brain_map" | "brain_verify" | "brain_reduce" | "brain_meta"
+    | "brain_sentence" | "brain_retract"
     // Agent-core loop events (§3.6) — emitted by /query/agentcore/stream
     | "agent_step" | "agent_thought" | "tool_call" | "tool_result" | "gate" | "artifact"
     // Live generation preview (the UX fix): incremental text as the model writes it. The
@@ -47,12 +48,18 @@ export interface StreamEvent {
   filename?: string;          // brain_map
   claims?: number;            // brain_map (claims extracted from this doc)
   relevant?: boolean;         // brain_map
+  cached?: boolean;           // brain_map (extract served by the MAP cache — no MAP call)
   progress?: string;          // brain_map (e.g. "3/12")
   claims_total?: number;      // brain_verify
   claims_verified?: number;   // brain_verify
   docs_relevant?: number;     // brain_reduce
   groundedness?: number;      // brain_reduce (0-1: fraction of answer sentences entailed by verified claims)
   unsupported?: number;       // brain_reduce (count of answer sentences not entailed)
+  streaming?: boolean;        // brain_reduce (REDUCE started; grounding totals follow when done)
+  done?: boolean;             // brain_verify / brain_reduce closing event
+  index?: number;             // brain_sentence / brain_retract (sentence position in the answer)
+  grounded?: boolean;         // brain_sentence
+  reason?: string;            // brain_retract
   confidence?: number;        // brain_meta (0-1)
   abstained?: boolean;        // brain_meta
   coverage?: BrainCoverage;   // brain_meta
@@ -63,6 +70,7 @@ export interface BrainCoverage {
   docs_read: number;
   docs_relevant: number;
   docs_failed: number;
+  docs_cached?: number;
 }
 
 export interface StreamCallbacks {
@@ -330,9 +338,14 @@ export async function streamAgenticQuery(
 export interface BrainStreamCallbacks extends StreamCallbacks {
   onBrainStart?: (docsRouted: number) => void;
   onBrainAnalyst?: (figures: number) => void;
-  onBrainMap?: (ev: { filename?: string; claims?: number; relevant?: boolean; progress?: string }) => void;
+  onBrainMap?: (ev: { filename?: string; claims?: number; relevant?: boolean; cached?: boolean; progress?: string }) => void;
   onBrainVerify?: (claimsTotal: number, claimsVerified: number) => void;
+  // Fires twice on a streamed REDUCE: at start (no groundedness yet) and when every sentence is checked.
   onBrainReduce?: (docsRelevant: number, groundedness?: number, unsupported?: number) => void;
+  // A finished answer sentence was checked while the rest streams: grounded, or retracted
+  // (already shown, but not entailed by the verified claims).
+  onBrainSentence?: (index: number, text: string) => void;
+  onBrainRetract?: (index: number, text: string) => void;
   onBrainMeta?: (meta: { confidence: number; abstained: boolean; coverage?: BrainCoverage }) => void;
 }
 
@@ -414,6 +427,7 @@ export async function streamBrainQuery(
                 filename: event.filename,
                 claims: event.claims,
                 relevant: event.relevant,
+                cached: event.cached,
                 progress: event.progress,
               });
               break;
@@ -423,6 +437,12 @@ export async function streamBrainQuery(
             case "brain_reduce":
               callbacks.onBrainReduce?.(event.docs_relevant ?? 0, event.groundedness, event.unsupported);
               break;
+            case "brain_sentence":
+              callbacks.onBrainSentence?.(event.index ?? 0, event.text ?? "");
+              break;
+            case "brain_retract":
+              callbacks.onBrainRetract?.(event.index ?? 0, event.text ?? "");
+              break;
             case "brain_meta":
               callbacks.onBrainMeta?.({
                 confidence: event.confidence ?? 0,
@@ -201,6 +201,10 @@ async def get_current_user(
     # the service-role `sb.client`. A null token (shouldn't happen post-verify) just keeps the
     # service-role fallback, so nothing breaks.
     sb.attach_access_token(token)
+    # Opt this request's manager into the short-TTL cross-request authz-context cache (firm + role +
+    # screens + delegations + staffing in one RPC, reused for a few seconds — see authz_cache.py).
+    from src.components.authz_cache import authz_cache
+    sb._authz_cache = authz_cache
     return sb
 
 
@@ -256,6 +260,37 @@ def resolve_membership(sb, firm_id: str | None = None):
         return _memo[_key]
 
     uid = sb.user_id
+
+    # ONE-ROUND-TRIP PATH (latency): db.authz_context returns firm + role + screens + delegations +
+    # staffing from a single RPC, shared with accessible_vault_owner / is_vault_screened for the rest
+    # of the request and cached across requests for a few seconds (authz_cache — busted by every
+    # screen/staffing/role/delegation write). A fault here drops to the per-field reads below, which
+    # keep their own degrade semantics; the wall's load-bearing check (assert_vault_not_screened)
+    # never rides a cross-request cached context.
+    ctx_fn = getattr(sb, "authz_context", None)
+    if callable(ctx_fn):
+        try:
+            ctx = ctx_fn(firm_id=firm_id) if firm_id else ctx_fn()
+        except Exception as e:
+            logger.debug("resolve_membership: authz context failed, using per-field reads: %s", e)
+            ctx = None
+        if ctx is not None:
+            firm = ctx.get("firm") or {}
+            role = firm.get("role") or "managing_partner"
+            resolved_firm = firm.get("id") or firm_id
+            membership = authz.Membership(
+                user_id=str(uid) if uid else "",
+                firm_id=str(resolved_firm) if resolved_firm else "",
+                role=role,
+                caps=authz.caps_for_role(role),
+                screened_vault_ids=frozenset(ctx.get("screened_vault_ids") or ()),
+                delegated_verbs=frozenset(ctx.get("delegated_verbs") or ()),
+                matter_vault_ids=frozenset(ctx.get("matter_vault_ids") or ()),
+            )
+            if _memo is not None:
+                _memo[_key] = membership
+            return membership
+
     role = "managing_partner"
     resolved_firm = firm_id
     try:
@@ -355,7 +390,9 @@ def assert_vault_not_screened(sb, collection_id: str | None) -> None:
     # AUDIT FIX #3 (fail-closed wall at the vault-entry point): check the screen DIRECTLY here, not
     # only via the (resilient) membership set. db.is_vault_screened re-raises on a LIVE query fault
     # (only a missing table degrades to "no wall"); we treat ANY fault as SCREENED — a DB blip must
-    # deny entry to a possibly-walled matter, never silently open it.
+    # deny entry to a possibly-walled matter, never silently open it. (When this request already
+    # read the screens from the DB via authz_context, is_vault_screened answers from that fresh set
+    # instead of re-querying; a cross-request cached context always gets the direct query.)
     try:
         directly_screened = sb.is_vault_screened(
             str(collection_id), user_id=membership.user_id or None, firm_id=membership.firm_id or None
@@ -39,6 +39,7 @@ from src.api.dependencies import (
     assert_vault_not_screened,
 )
 from src.api.schemas import QueryRequest
+from src.components.cancellation import CancelToken, guard_stream
 from src.components.config import Config
 
 # Reuse the brain route's proven collection→filenames resolver and the query embed +
@@ -183,6 +184,35 @@ async def agentcore_query_stream(
             # elsewhere by setting only what the loop reads — body.question).
             body.question = composed
 
+    # ── Speculative preloads (preload.py): history starts now and overlaps the embed +
+    # routing below; the grid preload starts once routing has picked the docs and is only
+    # awaited by the first tool that reads grids — the first model turn starts without it.
+    from src.components.agent_core.preload import AGENT_SPECULATIVE_PRELOAD, Preload
+    preload = Preload()
+
+    # ── Conversation memory (G5 Ask polish): thread PRIOR turns into the run so a
+    # follow-up ("what about 2022?", "and the termination clause?") resolves against the
+    # conversation, not from scratch. The loop already accepts `history` — we only load it.
+    # Prior turns are READ-ONLY context; the current question is appended by the loop and
+    # the current turn is persisted by `_saving_stream_wrapper` AFTER the stream, so it is
+    # NOT yet in `get_messages` (no duplication). Bounded to the recent turns to keep the
+    # context (and cost) in check; off the event loop (blocking DB read).
+    _conv_id_for_history = getattr(body, "conversation_id", None)
+    if _conv_id_for_history:
+        def _load_history():
+            try:
+                rows = sb.get_messages(_conv_id_for_history) or []
+                msgs = [
+                    {"role": r.get("role"), "content": r.get("content") or ""}
+                    for r in rows
+                    if r.get("role") in ("user", "assistant") and (r.get("content") or "").strip()
+                ]
+                return msgs[-12:]  # ~6 recent turns — enough for follow-ups, bounded cost
+            except Exception as exc:  # noqa: BLE001 — memory is best-effort; a fresh run still works
+                logger.warning("[agentcore] history load failed (%s) — running without memory", exc)
+                return []
+        preload.start("history", _load_history)
+
     # ── Scope assembly (async, off the loop) — mirror the brain route ──────────────
     query_embedding: list = []
     try:
@@ -224,7 +254,7 @@ async def agentcore_query_stream(
         scoped_doc_ids = doc_ids
 
     # Preload the table grids for this scope ONCE (the spine already shares grids; this is
-    # the §I2 grid-preload lever). Off the event loop — load_grids does blocking DB reads.
+    # the §I2 grid-preload lever). On a preload thread — load_grids does blocking DB reads.
     def _load_grids():
         try:
             from src.components.brain.table_intent import load_grids_for_docs
@@ -250,34 +280,21 @@ async def agentcore_query_stream(
             return []
 
     # Skip the (slow, sequential) grid preload for a prose/legal draft — it has no numeric
-    # tables to consult, so the fetch is pure cold-start latency for those matters.
-    grids = [] if skip_grids else await asyncio.to_thread(_load_grids)
+    # tables to consult, so the fetch is pure cold-start latency for those matters. Otherwise
+    # it loads speculatively: the run starts now and a grid-reading tool awaits it.
+    grids: list = []
     if skip_grids:
         logger.info("[agentcore] prose-draft — skipped grid preload (no numeric tables needed)")
+    else:
+        preload.start("grids", _load_grids)
+        if not AGENT_SPECULATIVE_PRELOAD:
+            await asyncio.to_thread(preload.join_grids, grids)
 
-    # ── Conversation memory (G5 Ask polish): thread PRIOR turns into the run so a
-    # follow-up ("what about 2022?", "and the termination clause?") resolves against the
-    # conversation, not from scratch. The loop already accepts `history` — we only load it.
-    # Prior turns are READ-ONLY context; the current question is appended by the loop and
-    # the current turn is persisted by `_saving_stream_wrapper` AFTER the stream, so it is
-    # NOT yet in `get_messages` (no duplication). Bounded to the recent turns to keep the
-    # context (and cost) in check; off the event loop (blocking DB read).
+    # History was started before scope assembly; it has loaded alongside the embed + routing
+    # (and the grids). The first model call needs it, so this is the one preload awaited.
     history: list[dict] = []
-    _conv_id_for_history = getattr(body, "conversation_id", None)
     if _conv_id_for_history:
-        def _load_history():
-            try:
-                rows = sb.get_messages(_conv_id_for_history) or []
-                msgs = [
-                    {"role": r.get("role"), "content": r.get("content") or ""}
-                    for r in rows
-                    if r.get("role") in ("user", "assistant") and (r.get("content") or "").strip()
-                ]
-                return msgs[-12:]  # ~6 recent turns — enough for follow-ups, bounded cost
-            except Exception as exc:  # noqa: BLE001 — memory is best-effort; a fresh run still works
-                logger.warning("[agentcore] history load failed (%s) — running without memory", exc)
-                return []
-        history = await asyncio.to_thread(_load_history)
+        history = await asyncio.to_thread(preload.wait, "history", [])
 
     # ── G8.7 knowledge-source chips → SERVER-SIDE gate ─────────────────────────────
     # `body.sources` (a subset of {"vault","statutes","caselaw"}) decides which authorities
@@ -347,6 +364,9 @@ async def agentcore_query_stream(
         config=user_config,
         # G8.7: the source-chip instrument allow-list enforced in search_knowledge.
         kb_instrument_types=kb_instrument_types,
+        # The in-flight grid preload: compute / list_metrics / table_lookup / read_document
+        # wait for it on first use (registry.execute); the meta reports the time saved.
+        preload=preload,
     )
     budget = budget_for(mode, user_config)
     # G5: deep mode gets the Deep Analysis overlay (sectioned report + breadth-first
@@ -388,6 +408,10 @@ async def agentcore_query_stream(
     from src.components.agent_core.loop import make_question_gate
     gate_fn = make_question_gate(body.question, sectioned=(mode in ("deep", "draft")))
 
+    # One CancelToken per request: guard_stream fires it when the client disconnects, and the
+    # loop (plus survey_collection's MAP fan-out) stops before its next model / tool call.
+    cancel = CancelToken()
+
     def _agent_stream():
         try:
             for ev in run_agent(
@@ -400,6 +424,8 @@ async def agentcore_query_stream(
                 registry=REGISTRY,
                 gate_fn=gate_fn,
                 tools=run_tools,            # G8.7: vault-off strips vault tools; None = default
+                cancel=cancel,
+                tracer=tracer,              # model / tool / gate latency spans → the journal
             ):
                 tracer.record(ev)  # durable journal + health (never raises)
                 # Also log compactly to the API stdout for live tailing — but NOT the
@@ -431,13 +457,18 @@ async def agentcore_query_stream(
 
     conversation_id = getattr(body, "conversation_id", None)
     return StreamingResponse(
-        _saving_stream_wrapper(
-            _agent_stream(),
-            sb,
-            conversation_id,
-            body.question,
-            is_agentic=True,
-            retrieval_docs_count=len(scoped_doc_ids),
+        guard_stream(
+            _saving_stream_wrapper(
+                _agent_stream(),
+                sb,
+                conversation_id,
+                body.question,
+                is_agentic=True,
+                retrieval_docs_count=len(scoped_doc_ids),
+                cancel=cancel,
+            ),
+            cancel,
+            request.is_disconnected,
         ),
         media_type="text/event-stream",
     )
@@ -32,6 +32,7 @@ from src.api.dependencies import (
     limiter,
     require_cap,
 )
+from src.components.cancellation import CancelToken, guard_stream, is_cancelled
 from src.components.config import Config
 from src.components.metrics import queries_total, retrieval_docs, cache_hits, cache_misses, cache_latency
 from src.api.routes.audit import log_audit
@@ -176,93 +177,132 @@ def _owner_scoped_retrieval_mgr(sb, collection_id, user_config, retrieval_mgr):
     return retrieval_mgr
 
 
-def _saving_stream_wrapper(
-    inner_gen, sb, conversation_id: str, question: str,
-    is_agentic: bool = False, is_cache_hit: bool = False,
-    retrieval_docs_count: int = 0, web_search_used: bool = False,
-    history_len: int | None = None,
-):
-    """Wrap an SSE generator to capture tokens and save messages to DB after streaming.
-
-    Intercepts 'token' events to collect the full answer text.
-    After the stream ends ([DONE]), saves both the user question and
-    assistant response to the conversation in the database.
-    Also logs the query to query_logs for analytics.
-    """
-    collected_tokens = []
-    collected_sources = []
-    t_start = time.perf_counter()
+class _StreamCapture:
+    """What the saving wrappers collect from an SSE stream: answer tokens, sources, and the
+    cache-hit / web-search flags. Shared by the sync and async wrappers below."""
 
-    for chunk in inner_gen:
-        yield chunk  # Forward to client immediately
+    def __init__(self, is_cache_hit: bool = False, web_search_used: bool = False):
+        self.tokens: list = []
+        self.sources: list = []
+        self.is_cache_hit = is_cache_hit
+        self.web_search_used = web_search_used
+        self.t_start = time.perf_counter()
 
+    def observe(self, chunk: str) -> None:
         # Parse the SSE line to capture tokens
         line = chunk.strip()
         if not line.startswith("data: ") or line == "data: [DONE]":
-            continue
+            return
         try:
             data = json.loads(line[6:])
             if data.get("type") == "token" and data.get("content"):
-                collected_tokens.append(data["content"])
+                self.tokens.append(data["content"])
             elif data.get("type") == "sources":
-                collected_sources = data.get("sources", [])
+                self.sources = data.get("sources", [])
             elif data.get("type") == "meta" and data.get("cache_hit"):
-                is_cache_hit = True
+                self.is_cache_hit = True
             elif data.get("type") == "web_search":
-                web_search_used = True
+                self.web_search_used = True
         except (json.JSONDecodeError, KeyError):
             pass
 
-    # Stream finished — save messages to DB
-    full_answer = "".join(collected_tokens)
-    latency_ms = int((time.perf_counter() - t_start) * 1000)
+    def persist(self, sb, conversation_id: str, question: str, is_agentic: bool,
+                retrieval_docs_count: int, history_len: int | None) -> None:
+        """Stream finished — save the messages (blocking) and fire off the analytics."""
+        full_answer = "".join(self.tokens)
+        latency_ms = int((time.perf_counter() - self.t_start) * 1000)
+        collected_sources = self.sources
+        is_cache_hit, web_search_used = self.is_cache_hit, self.web_search_used
 
-    if conversation_id and full_answer:
-        try:
-            # B4: one bulk INSERT + one updated_at bump instead of 2×(insert+update).
-            sb.save_messages(conversation_id, [
-                {"role": "user", "content": question},
-                {"role": "assistant", "content": full_answer, "sources": collected_sources},
-            ])
-            # Auto-title on the first turn. Use the caller-provided history length
-            # so we don't re-read the whole message list just to count it.
-            is_first_turn = (
-                history_len == 0 if history_len is not None
-                else len(sb.get_messages(conversation_id)) <= 2
-            )
-            if is_first_turn:
-                sb.auto_title_conversation(conversation_id, question)
-        except Exception as e:
-            logger.warning("Failed to save streamed messages: %s", e)
-
-    # B4: analytics (query_logs + audit) are non-critical and would otherwise hold
-    # the streaming connection/thread open after [DONE]. Fire-and-forget them.
-    def _write_analytics():
-        try:
-            sb.client.table("query_logs").insert({
-                "user_id": sb.user_id,
-                "conversation_id": conversation_id,
-                "question": question[:2000],
-                "answer_length": len(full_answer),
-                "sources_count": len(collected_sources),
-                "retrieval_docs_count": retrieval_docs_count,
+        if conversation_id and full_answer:
+            try:
+                # B4: one bulk INSERT + one updated_at bump instead of 2×(insert+update).
+                sb.save_messages(conversation_id, [
+                    {"role": "user", "content": question},
+                    {"role": "assistant", "content": full_answer, "sources": collected_sources},
+                ])
+                # Auto-title on the first turn. Use the caller-provided history length
+                # so we don't re-read the whole message list just to count it.
+                is_first_turn = (
+                    history_len == 0 if history_len is not None
+                    else len(sb.get_messages(conversation_id)) <= 2
+                )
+                if is_first_turn:
+                    sb.auto_title_conversation(conversation_id, question)
+            except Exception as e:
+                logger.warning("Failed to save streamed messages: %s", e)
+
+        # B4: analytics (query_logs + audit) are non-critical and would otherwise hold
+        # the streaming connection/thread open after [DONE]. Fire-and-forget them.
+        def _write_analytics():
+            try:
+                sb.client.table("query_logs").insert({
+                    "user_id": sb.user_id,
+                    "conversation_id": conversation_id,
+                    "question": question[:2000],
+                    "answer_length": len(full_answer),
+                    "sources_count": len(collected_sources),
+                    "retrieval_docs_count": retrieval_docs_count,
+                    "latency_ms": latency_ms,
+                    "cache_hit": is_cache_hit,
+                    "agentic": is_agentic,
+                    "web_search_used": web_search_used,
+                }).execute()
+            except Exception as e:
+                logger.warning("Failed to log query analytics: %s", e)
+
+            action = "query.agentic" if is_agentic else "query.ask"
+            log_audit(sb, action, "conversation", conversation_id, {
+                "question": question[:500],
                 "latency_ms": latency_ms,
                 "cache_hit": is_cache_hit,
-                "agentic": is_agentic,
                 "web_search_used": web_search_used,
-            }).execute()
-        except Exception as e:
-            logger.warning("Failed to log query analytics: %s", e)
+            })
+
+        threading.Thread(target=_write_analytics, daemon=True).start()
+
+
+def _saving_stream_wrapper(
+    inner_gen, sb, conversation_id: str, question: str,
+    is_agentic: bool = False, is_cache_hit: bool = False,
+    retrieval_docs_count: int = 0, web_search_used: bool = False,
+    history_len: int | None = None, cancel=None,
+):
+    """Wrap an SSE generator to capture tokens and save messages to DB after streaming.
+
+    Intercepts 'token' events to collect the full answer text.
+    After the stream ends ([DONE]), saves both the user question and
+    assistant response to the conversation in the database.
+    Also logs the query to query_logs for analytics.
+    A run cut short by ``cancel`` (the client disconnected) saves nothing — a half
+    answer must not land in the conversation.
+    """
+    capture = _StreamCapture(is_cache_hit, web_search_used)
+    for chunk in inner_gen:
+        yield chunk  # Forward to client immediately
+        capture.observe(chunk)
+    if is_cancelled(cancel):
+        return
+    capture.persist(sb, conversation_id, question, is_agentic, retrieval_docs_count, history_len)
 
-        action = "query.agentic" if is_agentic else "query.ask"
-        log_audit(sb, action, "conversation", conversation_id, {
-            "question": question[:500],
-            "latency_ms": latency_ms,
-            "cache_hit": is_cache_hit,
-            "web_search_used": web_search_used,
-        })
 
-    threading.Thread(target=_write_analytics, daemon=True).start()
+async def _asaving_stream_wrapper(
+    inner_gen, sb, conversation_id: str, question: str,
+    is_agentic: bool = False, is_cache_hit: bool = False,
+    retrieval_docs_count: int = 0, web_search_used: bool = False,
+    history_len: int | None = None, cancel=None,
+):
+    """``_saving_stream_wrapper`` for an async SSE generator (the asyncio Brain). The DB
+    save runs on a worker thread so it never blocks the event loop. A disconnect cancels
+    the stream before [DONE] — nothing is saved, exactly as with the sync wrapper."""
+    capture = _StreamCapture(is_cache_hit, web_search_used)
+    async for chunk in inner_gen:
+        yield chunk
+        capture.observe(chunk)
+    if is_cancelled(cancel):
+        return
+    await asyncio.to_thread(capture.persist, sb, conversation_id, question, is_agentic,
+                            retrieval_docs_count, history_len)
 
 # ── Module-level caches ───────────────────────────────────────────────────────
 # SemanticCache: pool one instance per user — avoids opening a new Redis TCP
@@ -1123,19 +1163,23 @@ async def brain_query_stream(
 ):
     """Stage-2 Brain: map-reduce synthesis over a collection with SSE step streaming.
 
-    Requires body.collection_id.  Returns brain_start → brain_map (per doc) →
-    brain_verify → brain_reduce → sources → token* → brain_meta → [DONE] events.
+    Requires body.collection_id.  Returns brain_start → brain_map / brain_verify (per doc,
+    interleaved as MAP and VERIFY pipeline; brain_analyst whenever the Analyst lands) →
+    brain_verify(done) → brain_reduce → sources → token* interleaved with brain_sentence /
+    brain_retract (REDUCE streams; each sentence is grounded as it completes) →
+    brain_reduce(done) → brain_meta → [DONE] events.
 
     This endpoint is the 'synthesis / multi-doc' path.  It:
       1. Uses Stage-1 router to pick top-N docs.
       2. Runs MAP in parallel (one LLM call per doc, cheap model).
       3. Runs VERIFY (independent model) claim-by-claim — before synthesis.
-      4. Runs REDUCE (one call, strong model) over the verified claims.
+      4. Runs REDUCE (one streamed call, strong model) over the verified claims.
       5. Streams all events back to the client.
 
     Non-regression: single-doc / simple queries should use /query/stream instead.
     """
     from src.components.brain.map_reduce import Brain
+    from src.components.brain.async_brain import AsyncBrain
 
     # Opt-in gate (Phase 4): the Brain path is off by default.  Set USE_BRAIN=true.
     if not getattr(user_config, "USE_BRAIN", False):
@@ -1229,17 +1273,17 @@ async def brain_query_stream(
             yield "data: [DONE]\n\n"
         return StreamingResponse(_no_chunks(), media_type="text/event-stream")
 
-    brain = Brain(user_config)
+    use_async = getattr(user_config, "BRAIN_ASYNC", False)
+    brain = AsyncBrain(user_config) if use_async else Brain(user_config)
 
     # ── Phase 4.3: deterministic Analyst (§4b) — intent-gated so non-numeric
     # questions pay ZERO added latency and the path is identical to before.
-    # Wrapped in asyncio.to_thread so the blocking Supabase queries + LLM call
-    # don't freeze the event loop (the Analyst is additive / non-critical).
-    analyst_block = None
-    analyst_count = 0
-
+    # Not awaited here: run_stream starts it on its own thread as the stream opens,
+    # runs it alongside MAP + VERIFY and joins it just before REDUCE, so the
+    # blocking Supabase queries + LLM call no longer sit in front of brain_start
+    # (the Analyst is additive / non-critical).
     def _run_analyst_sync():
-        """Run the Analyst pipeline off the event loop (sync, in a worker thread)."""
+        """Run the Analyst pipeline (sync, on the Brain's analyst thread)."""
         _block = None
         _count = 0
         try:
@@ -1255,9 +1299,11 @@ async def brain_query_stream(
             if not grids:
                 return _block, _count
             from langchain_openai import ChatOpenAI
+            from src.components.rate_limiter import llm_limit_kwargs
             spec_llm = ChatOpenAI(
                 model=user_config.LLM_MODEL_NAME, temperature=0.0,
                 api_key=user_config.OPENAI_API_KEY, request_timeout=30,
+                **llm_limit_kwargs("openai", user_config.LLM_MODEL_NAME, est_tokens=1500),
             )
 
             results = analyze(body.question, grids, spec_llm)
@@ -1276,33 +1322,39 @@ async def brain_query_stream(
             logger.warning("[brain] Analyst step skipped: %s", exc)
         return _block, _count
 
-    try:
-        analyst_block, analyst_count = await asyncio.to_thread(_run_analyst_sync)
-    except Exception as exc:
-        logger.warning("[brain] Analyst thread failed: %s", exc)
-        analyst_block, analyst_count = None, 0
-
-    # Pass the sync generator straight to StreamingResponse — Starlette iterates it
+    # BRAIN_ASYNC (opt-in): the asyncio Brain runs on the event loop — no worker threads
+    # parked on LLM sockets, and a client disconnect cancels the in-flight calls.
+    # Otherwise (the default) pass the sync generator straight to StreamingResponse — Starlette iterates it
     # in a worker thread, so the blocking MAP/REDUCE/VERIFY work stays off the event
     # loop (matches /query/stream and the other streaming endpoints in this file).
-    # Wrapped in _saving_stream_wrapper so the Q&A persists to the conversation
+    # Wrapped in a saving wrapper so the Q&A persists to the conversation
     # (collects token/sources from the stream; brain_* events pass through untouched).
+    # guard_stream fires the request's CancelToken when the client disconnects, so no
+    # further MAP / VERIFY / REDUCE call is started for a closed tab (cancellation.py).
     conversation_id = getattr(body, "conversation_id", None)
+    run_stream = brain.arun_stream if use_async else brain.run_stream
+    wrapper = _asaving_stream_wrapper if use_async else _saving_stream_wrapper
+    cancel = CancelToken()
     return StreamingResponse(
-        _saving_stream_wrapper(
-            brain.run_stream(
+        guard_stream(
+            wrapper(
+                run_stream(
+                    body.question,
+                    doc_chunks,
+                    user_id=sb.user_id,
+                    collection_id=collection_id,
+                    conversation_id=conversation_id,
+                    analyst_fn=_run_analyst_sync,
+                    cancel=cancel,
+                ),
+                sb,
+                conversation_id,
                 body.question,
-                doc_chunks,
-                user_id=sb.user_id,
-                collection_id=collection_id,
-                conversation_id=conversation_id,
-                analyst_block=analyst_block,
-                analyst_count=analyst_count,
+                retrieval_docs_count=len(doc_chunks),
+                cancel=cancel,
             ),
-            sb,
-            conversation_id,
-            body.question,
-            retrieval_docs_count=len(doc_chunks),
+            cancel,
+            request.is_disconnected,
         ),
         media_type="text/event-stream",
     )
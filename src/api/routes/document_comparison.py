@@ -13,6 +13,7 @@ from src.api.dependencies import (
     get_current_user, get_user_config, get_retrieval_mgr, get_generator, require_cap,
 )
 from src.components.config import Config
+from src.components.rate_limiter import llm_limit_kwargs
 from src.logger import get_logger
 
 router = APIRouter()
@@ -122,6 +123,7 @@ Your summary here."""),
         temperature=0.0,
         api_key=user_config.OPENAI_API_KEY,
         request_timeout=30,
+        **llm_limit_kwargs("openai", user_config.LLM_MODEL_NAME, est_tokens=6000),
     )
 
     try:
@@ -52,7 +52,11 @@ async def health_check():
     all_ok = supabase_ok and pinecone_ok
     status = "ok" if all_ok else "degraded"
 
-    from src.components.circuit_breaker import get_openai_breaker, get_pinecone_breaker
+    from src.components.circuit_breaker import (
+        get_anthropic_breaker, get_openai_breaker, get_pinecone_breaker,
+    )
+    from src.components.rate_limiter import llm_limiter
+    from src.components import cancellation
     openai_breaker = get_openai_breaker()
     pinecone_breaker = get_pinecone_breaker()
 
@@ -65,6 +69,9 @@ async def health_check():
         },
         "circuit_breakers": {
             "openai": openai_breaker.status,
+            "anthropic": get_anthropic_breaker().status,
             "pinecone": pinecone_breaker.status,
         },
+        "llm_rate_limiter": llm_limiter.stats(),
+        "cancellation": cancellation.stats(),
     }
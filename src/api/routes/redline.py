@@ -7,9 +7,12 @@ the review-grid route.
 
 Cost: N paid agent runs (one per clause topic). The route enforces a hard ceiling
 on clause topics per run. Small contracts only; Jeel's explicit go per live run.
+The runs are concurrent — at most REDLINE_CONCURRENCY (agent_core.redline) at a time —
+so findings stream in COMPLETION order; each carries its playbook `row` index for the
+client to order by.
 
 Shape of `finding` events:
-  {"type": "finding", "clause_topic": str, "status": str,
+  {"type": "finding", "row": int, "clause_topic": str, "status": str,
    "target_quote": str|null, "deviation": str|null,
    "suggested_edit": str|null, "rationale": str|null, "grounded": bool}
 
@@ -148,7 +151,7 @@ async def redline_stream(
         try:
             from src.components.agent_core.model import build_model
             from src.components.agent_core.budgets import budget_for
-            from src.components.agent_core.redline import build_redline_cell
+            from src.components.agent_core.redline import REDLINE_CONCURRENCY, run_redline_row
             from src.components.agent_core.registry import RunScope
 
             # Preload the target doc's grids ONCE (shared across every clause-topic cell).
@@ -194,28 +197,40 @@ async def redline_stream(
 
             counts: Dict[str, int] = {"deviation": 0, "conforming": 0, "missing": 0, "abstain": 0}
 
-            for row in body.playbook_rows:
-                finding = await asyncio.to_thread(
-                    build_redline_cell,
-                    row["clause_topic"],
-                    row["standard_position"],
-                    row.get("fallback_position"),
-                    model_factory,
-                    scope,
-                    doc_name,
-                )
-                counts[finding.status] = counts.get(finding.status, 0) + 1
-                yield _sse({
-                    "type": "finding",
-                    "clause_topic": finding.clause_topic,
-                    "status": finding.status,
-                    "target_quote": finding.target_quote,
-                    "deviation": finding.deviation,
-                    "suggested_edit": finding.suggested_edit,
-                    "rationale": finding.rationale,
-                    "playbook_standard": finding.playbook_standard,
-                    "grounded": finding.grounded,
-                })
+            # Every row is its own bounded agent run on a worker thread; the semaphore keeps
+            # at most REDLINE_CONCURRENCY in flight (rows start in playbook order) and each
+            # finding streams the moment it completes. The counts tally is order-free, so
+            # redline_done is the same as the sequential run's.
+            gate = asyncio.Semaphore(REDLINE_CONCURRENCY)
+
+            async def _one(i: int, row: Dict[str, Any]):
+                async with gate:
+                    return i, await asyncio.to_thread(
+                        run_redline_row, row, model_factory, scope, doc_name,
+                    )
+
+            tasks = [asyncio.create_task(_one(i, row)) for i, row in enumerate(body.playbook_rows)]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    i, finding = await next_done
+                    counts[finding.status] = counts.get(finding.status, 0) + 1
+                    yield _sse({
+                        "type": "finding",
+                        "row": i,
+                        "clause_topic": finding.clause_topic,
+                        "status": finding.status,
+                        "target_quote": finding.target_quote,
+                        "deviation": finding.deviation,
+                        "suggested_edit": finding.suggested_edit,
+                        "rationale": finding.rationale,
+                        "playbook_standard": finding.playbook_standard,
+                        "grounded": finding.grounded,
+                    })
+            finally:
+                # Client gone (generator closed): rows still waiting on the semaphore never
+                # start. A row already on its thread finishes, but nothing new is paid for.
+                for t in tasks:
+                    t.cancel()
 
             yield _sse({
                 "type": "redline_done",
@@ -8,8 +8,10 @@ assembly (collection → filenames → doc map → preloaded grids).
 
 COST SAFETY: a grid is N×M PAID agent runs. The route enforces a hard cell ceiling
 (`_MAX_GRID_CELLS`) and runs cells with a tight per-cell budget (grid_engine). Cells run
-sequentially here (simple, resumable-friendly, predictable cost); a worker/pool fan-out
-is a later Track-I optimization.
+through grid_engine.schedule_cells, at most GRID_CELL_CONCURRENCY at a time (the total
+cost is unchanged — the same N×M runs, just not one after another), submitted row by
+row; each `cell` event carries `row`/`col`/`row_done` so the UI can place it and fill
+the grid top to bottom.
 
 This is the first multi-run (and therefore potentially multi-dollar) endpoint. It is
 purely additive until the flag is on.
@@ -27,6 +29,7 @@ from fastapi.responses import StreamingResponse
 
 from src.api.dependencies import get_current_user, get_user_config, get_retrieval_mgr, limiter, require_cap, assert_vault_not_screened
 from src.api.schemas import ReviewGridRequest
+from src.components.cancellation import CancelToken, guard_stream
 from src.components.config import Config
 
 router = APIRouter()
@@ -134,14 +137,9 @@ async def review_grid_stream(
     # ── Preload grids for the whole doc set ONCE (shared across every cell) ─────────
     def _load_grids_by_doc() -> Dict[str, List[Any]]:
         try:
-            from src.components.brain.table_intent import load_grids_for_docs
-            by_doc: Dict[str, List[Any]] = {}
-            for did in requested:
-                grids = load_grids_for_docs(
-                    sb, [did], question=None, filename_by_doc=filename_by_doc, per_doc_top=20,
-                )
-                by_doc[did] = grids or []
-            return by_doc
+            from src.components.brain.table_intent import load_grids_by_doc
+            # One batched table-chunk fetch for every doc (grid_store), not one per doc.
+            return load_grids_by_doc(sb, requested, filename_by_doc=filename_by_doc, per_doc_top=20)
         except Exception as exc:  # noqa: BLE001 — grids best-effort; cells degrade to read
             logger.warning("[review-grid] grid preload failed: %s", exc)
             return {}
@@ -151,15 +149,20 @@ async def review_grid_stream(
     # ── Build a model factory (fresh model per cell, no shared state) ───────────────
     from src.components.agent_core.budgets import budget_for
     from src.components.agent_core.model import build_model
-    from src.components.agent_core.grid_engine import build_cell
+    from src.components.agent_core.grid_engine import (
+        GRID_CELL_CONCURRENCY, build_cell, schedule_cells,
+    )
+    from src.components.rate_limiter import Priority
 
     # Cells use the "grid" tool set but the STANDARD model tier (one focused extraction
     # each). budget_for("standard") gives the configured model id; build_model wires the
     # vendor client. We build one model and reuse it across cells (it is stateless per
-    # invoke); a failure to build → degrade the whole grid cleanly.
+    # invoke, so concurrent cells can share it); a failure to build → degrade the whole grid cleanly. Cell calls are BATCH
+    # priority on the shared LLM rate limiter, so a big grid never spends chat's headroom.
     grid_budget = budget_for("standard", user_config)
     try:
-        model = build_model("standard", grid_budget, user_config, system="")
+        model = build_model("standard", grid_budget, user_config, system="",
+                            priority=Priority.BATCH)
         model_id = grid_budget.model
     except Exception as exc:  # noqa: BLE001
         logger.warning("[review-grid] model build failed (%s) — degrading", exc)
@@ -173,39 +176,63 @@ async def review_grid_stream(
         return StreamingResponse(_degraded(), media_type="text/event-stream")
 
     # ── Stream: grid_start → cell* → grid_done ─────────────────────────────────────
-    # The cell loop is BLOCKING (each build_cell runs a sync agent loop). Run it in a
-    # worker thread and hand results back through a queue the async generator drains, so
-    # the event loop stays free (mirrors how the other streaming routes offload work).
+    # The cell scheduler is BLOCKING (each build_cell runs a sync agent loop, on the
+    # scheduler's bounded pool). Run it in a worker thread and hand results back through a
+    # queue the async generator drains, so the event loop stays free (mirrors how the other
+    # streaming routes offload work). Cancelling the awaiting task does not stop that
+    # thread, so the scheduler checks the request's CancelToken before starting each cell
+    # (and build_cell between agent steps): a closed tab stops the grid instead of paying
+    # for every remaining cell.
+    cancel = CancelToken()
+
     def _run_all_cells(emit) -> Dict[str, int]:
-        from src.components.agent_core.review_grid import GridResult, CellStatus
-        cells = []
-        for did in spec.doc_ids:
-            for column in spec.columns:
-                cell = build_cell(
-                    did, column,
-                    collection_id=collection_id,
-                    model=model,
-                    filename_by_doc=filename_by_doc,
-                    grids_by_doc=grids_by_doc,
-                    retrieval_manager=retrieval_mgr,
-                    db_client=sb,
-                    model_id=model_id,
-                )
-                cells.append(cell)
-                emit({
-                    "type": "cell",
-                    "doc_id": cell.doc_id,
-                    "doc_name": cell.doc_name,
-                    "column_key": cell.column_key,
-                    "status": cell.status.value,
-                    "value": cell.value,
-                    "quote": cell.quote,
-                    "risk": cell.risk.value,
-                    "note": cell.note,
-                    "abstain_reason": cell.abstain_reason,  # unparsed|no_evidence|ambiguous
-                    "provenance": cell.provenance,
-                    "verified": cell.is_verified,
-                })
+        from src.components.agent_core.registry import AGENT_TOOL_MEMO, ToolMemo
+        from src.components.agent_core.review_grid import GridResult
+
+        from src.components.agent_core.doc_context import DocContexts
+
+        # One tool memo for the job: a row's cells share their repeated searches / reads.
+        memo = ToolMemo() if AGENT_TOOL_MEMO else None
+        # One warm retrieval pool per doc, built by the row's first cell.
+        contexts = DocContexts(spec.columns, retrieval_mgr, filename_by_doc=filename_by_doc,
+                               grids_by_doc=grids_by_doc)
+
+        def _run_cell(did, column):
+            # grids_by_doc was preloaded once above; every column of a doc shares its list.
+            return build_cell(
+                did, column,
+                collection_id=collection_id,
+                model=model,
+                filename_by_doc=filename_by_doc,
+                grids_by_doc=grids_by_doc,
+                retrieval_manager=retrieval_mgr,
+                db_client=sb,
+                model_id=model_id,
+                cancel=cancel,
+                memo=memo,
+                doc_context=contexts.get(did),
+            )
+
+        def _on_cell(cell, hint) -> None:
+            emit({
+                "type": "cell",
+                "doc_id": cell.doc_id,
+                "doc_name": cell.doc_name,
+                "column_key": cell.column_key,
+                "status": cell.status.value,
+                "value": cell.value,
+                "quote": cell.quote,
+                "risk": cell.risk.value,
+                "note": cell.note,
+                "abstain_reason": cell.abstain_reason,  # unparsed|no_evidence|ambiguous
+                "provenance": cell.provenance,
+                "verified": cell.is_verified,
+                **hint,  # row / col / row_done — placement hints (cells land out of order)
+            })
+
+        cells = schedule_cells(spec, _run_cell, concurrency=GRID_CELL_CONCURRENCY,
+                               filename_by_doc=filename_by_doc, on_cell=_on_cell,
+                               cancel=cancel)
         return GridResult(spec=spec, cells=cells).coverage()
 
     async def _stream():
@@ -243,4 +270,5 @@ async def review_grid_stream(
             task.cancel()
         yield "data: [DONE]\n\n"
 
-    return StreamingResponse(_stream(), media_type="text/event-stream")
+    return StreamingResponse(guard_stream(_stream(), cancel, request.is_disconnected),
+                             media_type="text/event-stream")
@@ -30,6 +30,7 @@ from src.api.dependencies import (
     assert_vault_not_screened,
 )
 from src.api.schemas import WorkflowRunRequest
+from src.components.cancellation import CancelToken, guard_stream
 from src.components.config import Config
 
 # Reuse the proven scope helpers (same semantics as agent-core / review-grid).
@@ -103,17 +104,20 @@ async def run_workflow_stream(
 
     if run.shape == "grid":
         return await _run_grid_workflow(
-            template, run, body, sb, user_config, retrieval_mgr, metadata_filter
+            template, run, body, sb, user_config, retrieval_mgr, metadata_filter,
+            is_disconnected=request.is_disconnected,
         )
     # report (Draft) and output (Output) both ride a single run_agent — they differ only in
     # the gate (per-section vs whole-answer), resolved from the shape inside the report path.
     return await _run_report_workflow(
-        template, run, body, sb, user_config, retrieval_mgr, metadata_filter
+        template, run, body, sb, user_config, retrieval_mgr, metadata_filter,
+        is_disconnected=request.is_disconnected,
     )
 
 
 # ── REPORT shape — one run_agent, mirroring the agent-core route ──────────────────
-async def _run_report_workflow(template, run, body, sb, user_config, retrieval_mgr, metadata_filter):
+async def _run_report_workflow(template, run, body, sb, user_config, retrieval_mgr, metadata_filter,
+                               is_disconnected=None):
     """A single bounded agent run shaped by the template overlay; the per-section gate binds
     the artifact. This is the agent-core route with (a) the composed question + overlay from
     the template and (b) the template's tool_subset threaded to the loop. No new engine."""
@@ -157,7 +161,14 @@ async def _run_report_workflow(template, run, body, sb, user_config, retrieval_m
             logger.warning("[workflow] grid preload failed: %s", exc)
             return []
 
-    grids = await asyncio.to_thread(_load_grids)
+    # Speculative, as in the agent-core route: the run starts now and the first grid-reading
+    # tool awaits the preload (preload.py).
+    from src.components.agent_core.preload import AGENT_SPECULATIVE_PRELOAD, Preload
+    preload = Preload()
+    preload.start("grids", _load_grids)
+    grids: list = []
+    if not AGENT_SPECULATIVE_PRELOAD:
+        await asyncio.to_thread(preload.join_grids, grids)
 
     from src.components.agent_core.registry import RunScope, REGISTRY
     from src.components.agent_core.budgets import budget_for
@@ -176,7 +187,7 @@ async def _run_report_workflow(template, run, body, sb, user_config, retrieval_m
         filenames=list(filename_filters), grids=grids,
         retrieval_manager=retrieval_mgr, db_client=sb,
         filename_by_doc=filename_by_doc, question=question,
-        filters=metadata_filter, config=user_config,
+        filters=metadata_filter, config=user_config, preload=preload,
     )
     # Budget/model from the template's base_mode (reuse — report = standard/deep tier).
     budget = budget_for(run.base_mode if run.base_mode in ("standard", "deep") else "standard",
@@ -198,6 +209,10 @@ async def _run_report_workflow(template, run, body, sb, user_config, retrieval_m
     import uuid as _uuid
     tracer = RunTracer(run_id=_uuid.uuid4().hex[:12], question=question, mode=f"workflow:{template.id}")
 
+    # The request's CancelToken — fired by guard_stream on a client disconnect; the loop
+    # stops before its next model / tool call (mirrors the agent-core route).
+    cancel = CancelToken()
+
     def _agent_stream():
         try:
             yield _sse({"type": "meta", "workflow": template.id, "shape": run.shape,
@@ -207,6 +222,8 @@ async def _run_report_workflow(template, run, body, sb, user_config, retrieval_m
                 system_prompt=sys_prompt, registry=REGISTRY,
                 gate_fn=gate_fn,                 # per-section (report) or whole-answer (output)
                 tools=run.tool_subset,           # G7: the template's restricted tool subset
+                cancel=cancel,
+                tracer=tracer,                   # latency spans → the journal
             ):
                 tracer.record(ev)
                 # Mirror the agent-core route: log each event compactly so a workflow run
@@ -229,16 +246,21 @@ async def _run_report_workflow(template, run, body, sb, user_config, retrieval_m
         yield "data: [DONE]\n\n"
 
     return StreamingResponse(
-        _saving_stream_wrapper(
-            _agent_stream(), sb, body.conversation_id, question,
-            is_agentic=True, retrieval_docs_count=len(scoped_doc_ids),
+        guard_stream(
+            _saving_stream_wrapper(
+                _agent_stream(), sb, body.conversation_id, question,
+                is_agentic=True, retrieval_docs_count=len(scoped_doc_ids), cancel=cancel,
+            ),
+            cancel,
+            is_disconnected,
         ),
         media_type="text/event-stream",
     )
 
 
 # ── GRID shape — fan out the template's fixed columns, mirroring the review-grid route ─
-async def _run_grid_workflow(template, run, body, sb, user_config, retrieval_mgr, metadata_filter):
+async def _run_grid_workflow(template, run, body, sb, user_config, retrieval_mgr, metadata_filter,
+                             is_disconnected=None):
     """The template fixes the columns (clause topics); the PROVEN review-grid engine runs
     them. Reuses the per-item loop + ceiling + per-cell grid gate verbatim — only the column
     source differs (the template, not the request). Streams grid_start → cell* → grid_done."""
@@ -285,13 +307,9 @@ async def _run_grid_workflow(template, run, body, sb, user_config, retrieval_mgr
 
     def _load_grids_by_doc() -> Dict[str, List[Any]]:
         try:
-            from src.components.brain.table_intent import load_grids_for_docs
-            by_doc: Dict[str, List[Any]] = {}
-            for did in requested:
-                by_doc[did] = load_grids_for_docs(
-                    sb, [did], question=None, filename_by_doc=filename_by_doc, per_doc_top=20,
-                ) or []
-            return by_doc
+            from src.components.brain.table_intent import load_grids_by_doc
+            # One batched table-chunk fetch for every doc (grid_store), not one per doc.
+            return load_grids_by_doc(sb, requested, filename_by_doc=filename_by_doc, per_doc_top=20)
         except Exception as exc:  # noqa: BLE001 — grids best-effort
             logger.warning("[workflow-grid] grid preload failed: %s", exc)
             return {}
@@ -300,11 +318,15 @@ async def _run_grid_workflow(template, run, body, sb, user_config, retrieval_mgr
 
     from src.components.agent_core.budgets import budget_for
     from src.components.agent_core.model import build_model
-    from src.components.agent_core.grid_engine import build_cell
+    from src.components.agent_core.grid_engine import (
+        GRID_CELL_CONCURRENCY, build_cell, schedule_cells,
+    )
+    from src.components.rate_limiter import Priority
 
     grid_budget = budget_for("standard", user_config)
     try:
-        model = build_model("standard", grid_budget, user_config, system="")
+        model = build_model("standard", grid_budget, user_config, system="",
+                            priority=Priority.BATCH)
         model_id = grid_budget.model
     except Exception as exc:  # noqa: BLE001 — degrade cleanly
         logger.warning("[workflow-grid] model build failed (%s) — degrading", exc)
@@ -325,7 +347,8 @@ async def _run_grid_workflow(template, run, body, sb, user_config, retrieval_mgr
     from src.components.agent_core.grid_engine import _SECOND_VERIFY_SYSTEM
 
     def _verify_model_factory():
-        return build_model("standard", grid_budget, user_config, system=_SECOND_VERIFY_SYSTEM)
+        return build_model("standard", grid_budget, user_config, system=_SECOND_VERIFY_SYSTEM,
+                           priority=Priority.BATCH)
 
     try:
         # Probe once so a broken verify-model degrades cleanly here, not per-cell.
@@ -335,40 +358,58 @@ async def _run_grid_workflow(template, run, body, sb, user_config, retrieval_mgr
         logger.warning("[workflow-grid] T4 verify-model unavailable (%s) — skipping second verify", exc)
         verify_factory = None
 
+    # Checked before each cell starts (and by build_cell between agent steps) — the worker
+    # thread outlives a cancelled task, so a closed tab must stop it explicitly.
+    cancel = CancelToken()
+
     def _run_all_cells(emit) -> Dict[str, int]:
+        from src.components.agent_core.registry import AGENT_TOOL_MEMO, ToolMemo
         from src.components.agent_core.review_grid import CellStatus
         from src.components.agent_core.workflows import _step_failure_detail
-        cells = []
-        step_index = 0
-        for did in spec.doc_ids:
-            for column in spec.columns:
-                cell = build_cell(
-                    did, column, collection_id=body.collection_id, model=model,
-                    filename_by_doc=filename_by_doc, grids_by_doc=grids_by_doc,
-                    retrieval_manager=retrieval_mgr, db_client=sb, model_id=model_id,
-                    model_factory=verify_factory,
+
+        from src.components.agent_core.doc_context import DocContexts
+
+        memo = ToolMemo() if AGENT_TOOL_MEMO else None   # shared by the job's cells
+        contexts = DocContexts(spec.columns, retrieval_mgr, filename_by_doc=filename_by_doc,
+                               grids_by_doc=grids_by_doc)   # one warm pool per doc row
+
+        def _run_cell(did, column):
+            return build_cell(
+                did, column, collection_id=body.collection_id, model=model,
+                filename_by_doc=filename_by_doc, grids_by_doc=grids_by_doc,
+                retrieval_manager=retrieval_mgr, db_client=sb, model_id=model_id,
+                model_factory=verify_factory, cancel=cancel, memo=memo,
+                doc_context=contexts.get(did),
+            )
+
+        def _on_cell(cell, hint) -> None:
+            # The step index is the cell's row-major position — stable whichever order the
+            # scheduler's cells complete in.
+            step_index = hint["row"] * len(spec.columns) + hint["col"]
+            # S-C: when a cell abstains or errors, include a structured step_failure
+            # payload naming WHICH step failed and WHY — not a blanket message.
+            step_failure = None
+            if cell.status in (CellStatus.ABSTAIN, CellStatus.ERROR):
+                step_label = (
+                    f"doc:{cell.doc_name or cell.doc_id} / col:{cell.column_key}"
                 )
-                cells.append(cell)
-                # S-C: when a cell abstains or errors, include a structured step_failure
-                # payload naming WHICH step failed and WHY — not a blanket message.
-                step_failure = None
-                if cell.status in (CellStatus.ABSTAIN, CellStatus.ERROR):
-                    step_label = (
-                        f"doc:{cell.doc_name or cell.doc_id} / col:{cell.column_key}"
-                    )
-                    reason = cell.abstain_reason or cell.note or "unknown"
-                    step_failure = _step_failure_detail(step_label, reason, step_index)
-                emit({
-                    "type": "cell", "doc_id": cell.doc_id, "doc_name": cell.doc_name,
-                    "column_key": cell.column_key, "status": cell.status.value,
-                    "value": cell.value, "quote": cell.quote, "risk": cell.risk.value,
-                    "note": cell.note, "abstain_reason": cell.abstain_reason,
-                    "provenance": cell.provenance, "verified": cell.is_verified,
-                    # S-C: step_failure is None for found/missing/conforming cells
-                    # (not a failure), and a structured dict for abstain/error cells.
-                    "step_failure": step_failure,
-                })
-                step_index += 1
+                reason = cell.abstain_reason or cell.note or "unknown"
+                step_failure = _step_failure_detail(step_label, reason, step_index)
+            emit({
+                "type": "cell", "doc_id": cell.doc_id, "doc_name": cell.doc_name,
+                "column_key": cell.column_key, "status": cell.status.value,
+                "value": cell.value, "quote": cell.quote, "risk": cell.risk.value,
+                "note": cell.note, "abstain_reason": cell.abstain_reason,
+                "provenance": cell.provenance, "verified": cell.is_verified,
+                # S-C: step_failure is None for found/missing/conforming cells
+                # (not a failure), and a structured dict for abstain/error cells.
+                "step_failure": step_failure,
+                **hint,  # row / col / row_done — placement hints (cells land out of order)
+            })
+
+        cells = schedule_cells(spec, _run_cell, concurrency=GRID_CELL_CONCURRENCY,
+                               filename_by_doc=filename_by_doc, on_cell=_on_cell,
+                               cancel=cancel)
         return GridResult(spec=spec, cells=cells).coverage()
 
     async def _stream():
@@ -407,4 +448,5 @@ async def _run_grid_workflow(template, run, body, sb, user_config, retrieval_mgr
             task.cancel()
         yield "data: [DONE]\n\n"
 
-    return StreamingResponse(_stream(), media_type="text/event-stream")
+    return StreamingResponse(guard_stream(_stream(), cancel, is_disconnected),
+                             media_type="text/event-stream")
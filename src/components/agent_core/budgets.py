@@ -8,7 +8,24 @@ from config (env-overridable); this module only shapes them per mode.
 
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+# What a cached prompt token costs relative to a fresh one, per vendor: (read, write).
+# Claude bills a cache read at 0.1× and a (5-minute) cache write at 1.25×; OpenAI bills a
+# cached prefix at ≤0.5× (0.5× on the 4o line, less on newer ones) and has no write
+# surcharge. Budgets charge at these rates so a cached run isn't counted at full price.
+_CACHE_RATES: Dict[str, Tuple[float, float]] = {
+    "anthropic": (float(os.getenv("AGENT_CACHE_READ_RATE_ANTHROPIC", "0.1")),
+                  float(os.getenv("AGENT_CACHE_WRITE_RATE_ANTHROPIC", "1.25"))),
+    "openai": (float(os.getenv("AGENT_CACHE_READ_RATE_OPENAI", "0.5")), 1.0),
+}
+
+
+def cache_rates(model_id: Optional[str]) -> Tuple[float, float]:
+    """(read, write) cost multipliers for a model id's vendor (claude* → Anthropic)."""
+    return _CACHE_RATES["anthropic" if (model_id or "").startswith("claude") else "openai"]
 
 
 @dataclass
@@ -22,7 +39,25 @@ class Budget:
 
     # mutable counters the loop updates as it runs
     steps_used: int = 0
-    tokens_used: int = 0
+    tokens_used: int = 0          # cost-weighted: cached prompt tokens at the cache rate
+    cache_read_tokens: int = 0    # raw counts, for reporting
+    cache_write_tokens: int = 0
+
+    def charge(self, usage: Optional[Dict[str, int]], model_id: Optional[str] = None) -> int:
+        """Add one model call's usage ({"in","out"} + optional "cache_read"/"cache_write")
+        to tokens_used and return the charge. Cached tokens count at the vendor's cache
+        rate for `model_id` (default: this budget's model)."""
+        usage = usage or {}
+        read = int(usage.get("cache_read", 0) or 0)
+        write = int(usage.get("cache_write", 0) or 0)
+        charged = int(usage.get("in", 0) or 0) + int(usage.get("out", 0) or 0)
+        if read or write:
+            read_rate, write_rate = cache_rates(model_id or self.model)
+            charged += round(read * read_rate + write * write_rate)
+            self.cache_read_tokens += read
+            self.cache_write_tokens += write
+        self.tokens_used += charged
+        return charged
 
     def step_exhausted(self) -> bool:
         return self.steps_used >= self.max_steps
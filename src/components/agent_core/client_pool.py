@@ -0,0 +1,119 @@
+"""Process-wide vendor SDK clients for the agent-core models (keep-alive, HTTP/2).
+
+WHY: AnthropicModel / OpenAIModel used to build a fresh SDK client on EVERY invoke/stream.
+Each client owns its own httpx connection pool (and SSL context), so every agent step paid
+client construction + a new TCP/TLS handshake — and a grid / redline run makes hundreds of
+those calls. The SDK clients are thread-safe and stateless per request, so one per
+(provider, api_key) can serve every run in the process.
+
+`get_client(provider, api_key)` returns the shared `anthropic.Anthropic` / `openai.OpenAI`
+for that key, built on a tuned `httpx.Client`:
+  • keep-alive connections (AGENT_HTTP_MAX_KEEPALIVE idle, kept AGENT_HTTP_KEEPALIVE_S);
+  • at most AGENT_HTTP_MAX_CONNECTIONS per client — enough for a concurrent grid fan-out;
+  • HTTP/2 (AGENT_HTTP2, on by default) when `h2` is installed — TLS endpoints negotiate
+    it via ALPN, so concurrent cells multiplex over one connection; plain-http falls back
+    to HTTP/1.1 keep-alive.
+
+Per-call timeouts and retries stay the SDK's own. A client is rebuilt after a fork (a child
+must not share its parent's sockets) or when the SDK class itself changed (tests patch it).
+AGENT_CLIENT_POOL=false restores the old fresh-client-per-call behaviour. The vendor SDKs
+are imported lazily, exactly as model.py did — importing this module costs nothing.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import os
+import threading
+from typing import Any, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+AGENT_CLIENT_POOL: bool = os.getenv("AGENT_CLIENT_POOL", "true").lower() == "true"
+AGENT_HTTP2: bool = os.getenv("AGENT_HTTP2", "true").lower() == "true"
+AGENT_HTTP_MAX_CONNECTIONS: int = int(os.getenv("AGENT_HTTP_MAX_CONNECTIONS", "100"))
+AGENT_HTTP_MAX_KEEPALIVE: int = int(os.getenv("AGENT_HTTP_MAX_KEEPALIVE", "20"))
+AGENT_HTTP_KEEPALIVE_S: float = float(os.getenv("AGENT_HTTP_KEEPALIVE_S", "60"))
+
+_clients: Dict[Tuple[str, str], Tuple[int, Any, Any]] = {}   # key → (pid, sdk class, client)
+_clients_lock = threading.Lock()
+_stats = {"created": 0, "reused": 0}
+
+
+def _sdk_class(provider: str):
+    if provider == "anthropic":
+        import anthropic  # lazy
+        return anthropic.Anthropic
+    import openai  # lazy
+    return openai.OpenAI
+
+
+def _http_client():
+    """The tuned httpx transport one pooled SDK client owns."""
+    import httpx
+
+    http2 = AGENT_HTTP2 and importlib.util.find_spec("h2") is not None
+    return httpx.Client(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=AGENT_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=AGENT_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=AGENT_HTTP_KEEPALIVE_S,
+        ),
+        # The SDK passes its own per-request timeout; this only bounds a bare connect.
+        timeout=httpx.Timeout(600.0, connect=10.0),
+        follow_redirects=True,
+    )
+
+
+def _build(cls, api_key: str):
+    try:
+        return cls(api_key=api_key, http_client=_http_client())
+    except TypeError:
+        # A wrapped / stand-in constructor that doesn't take http_client: its own transport.
+        return cls(api_key=api_key)
+
+
+def get_client(provider: str, api_key: str):
+    """The shared SDK client for (provider, api_key) — "anthropic" or "openai"."""
+    cls = _sdk_class(provider)
+    if not AGENT_CLIENT_POOL:
+        return cls(api_key=api_key)
+    key = (provider, api_key)
+    pid = os.getpid()
+    with _clients_lock:
+        entry = _clients.get(key)
+        if entry is not None and entry[0] == pid and entry[1] is cls:
+            _stats["reused"] += 1
+            return entry[2]
+        client = _build(cls, api_key)
+        _clients[key] = (pid, cls, client)
+        _stats["created"] += 1
+    if entry is not None and entry[0] == pid:
+        _close(entry[2])
+    return client
+
+
+def _close(client) -> None:
+    try:
+        close = getattr(client, "close", None)
+        if close is not None:
+            close()
+    except Exception as exc:  # noqa: BLE001 — closing is best-effort
+        logger.debug("[client_pool] close failed: %s", exc)
+
+
+def close_clients() -> None:
+    """Close and forget every pooled client (tests, shutdown, a rotated key)."""
+    with _clients_lock:
+        entries = list(_clients.values())
+        _clients.clear()
+    for pid, _cls, client in entries:
+        if pid == os.getpid():
+            _close(client)
+
+
+def stats() -> Dict[str, int]:
+    with _clients_lock:
+        return {"clients": len(_clients), **_stats}
@@ -0,0 +1,271 @@
+"""Warm per-document retrieval context for review-grid rows.
+
+Every cell of a grid row is its own agent over the SAME document, and each one searched
+that document from scratch: a 10-column row = 10 near-identical `search_vault` passes
+(query embedding + Pinecone + optional rerank) over one contract. A `DocContext` is built
+ONCE per row instead — the first cell of the doc builds it, its siblings wait and reuse it:
+
+  • a dense candidate pool: one `retrieve` of the doc's top GRID_DOC_POOL_K chunks for a
+    seed query made of all the grid's column prompts, plus one `retrieve_table_chunks`
+    pool (GRID_DOC_TABLE_POOL_K);
+  • the doc's parsed grids (the route's one preload), which seed every cell's scope.
+
+A cell's `search_vault` scoped to exactly this doc is then served by `PoolRetriever`, a
+RetrievalManager stand-in that re-scores the pool locally — so the adapter's envelope,
+grading and expansion are unchanged. The local ranking is the cell query's BM25 (the scorer
+hybrid_retrieval uses) blended with each chunk's dense score from the pool retrieval, over
+the chunks BM25 matches. It
+falls back to the live manager when the pool can't answer: no pool chunk matches the query
+at all (even when the pool holds the whole doc — BM25 has nothing to rank), or the pool is
+a truncated top-N and fewer than GRID_DOC_MIN_COVERAGE of the query's terms occur in it. A
+search the model narrows (another doc, a metadata filter) goes live as before.
+
+Page reads stay on read_document's exact page-scoped DB fetch: a top-N pool cannot answer
+"pages 40-45" completely. Building is best-effort — a failure means no context (the cells
+search live, exactly as before); nothing here raises into a cell. Off by default —
+GRID_DOC_CONTEXT=true turns it on.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Opt-in until pool-served cells have shown parity with live search on real grids
+# (eval/test_doc_context.py section E checks it on a fixture).
+GRID_DOC_CONTEXT: bool = os.getenv("GRID_DOC_CONTEXT", "false").lower() == "true"
+GRID_DOC_POOL_K: int = int(os.getenv("GRID_DOC_POOL_K", "64"))
+GRID_DOC_TABLE_POOL_K: int = int(os.getenv("GRID_DOC_TABLE_POOL_K", "24"))
+GRID_DOC_MIN_COVERAGE: float = float(os.getenv("GRID_DOC_MIN_COVERAGE", "0.6"))
+# Weight of a pool chunk's dense (seed-query) score next to the cell query's scaled BM25.
+GRID_DOC_DENSE_WEIGHT: float = float(os.getenv("GRID_DOC_DENSE_WEIGHT", "0.3"))
+
+_SEED_MAX_CHARS = 1500
+_WORD = re.compile(r"[a-z0-9]+")
+# Query words that say nothing about WHERE in the doc the answer is.
+_STOP_WORDS = """a an and any are as at be by clause document does for from has have in is
+it its of on or provide provides section state states that the this to under what which who
+with find identify extract""".split()
+_SUFFIXES = ("ations", "ation", "ities", "ity", "ings", "ing", "ies", "ed", "s")
+
+
+def _stem(word: str) -> str:
+    """A light suffix strip — "governing"/"governed" → "govern", "laws" → "law" — so the
+    lexical re-score meets the dense search's paraphrase tolerance halfway."""
+    for suf in _SUFFIXES:
+        if word.endswith(suf) and len(word) - len(suf) >= 3:
+            return word[: -len(suf)]
+    return word
+
+
+_STOP = frozenset(_stem(w) for w in _STOP_WORDS)
+
+
+def _terms(text: str) -> List[str]:
+    return [_stem(w) for w in _WORD.findall((text or "").lower())]
+
+
+def _content_terms(text: str) -> List[str]:
+    return [t for t in dict.fromkeys(_terms(text)) if len(t) > 2 and t not in _STOP]
+
+
+class _Pool:
+    """One ranked chunk pool with its BM25 index (built lazily, once)."""
+
+    def __init__(self, docs: Sequence[Any], k: int):
+        self.docs = list(docs)
+        self.complete = len(self.docs) < k          # the doc had fewer chunks than asked
+        self._tokens = [_terms(getattr(d, "page_content", "") or "") for d in self.docs]
+        self._vocab = set().union(*self._tokens) if self._tokens else set()
+        self._bm25 = None
+        self._lock = threading.Lock()
+
+    def coverage(self, query: str) -> float:
+        terms = _content_terms(query)
+        if not terms:
+            return 1.0
+        return sum(1 for t in terms if t in self._vocab) / len(terms)
+
+    def rank(self, query: str, k: int) -> Optional[List[Any]]:
+        """The pool's top-k for `query`, or None when the pool can't answer it alone."""
+        if not self.docs:
+            return [] if self.complete else None
+        with self._lock:
+            if self._bm25 is None:
+                from rank_bm25 import BM25Okapi
+                self._bm25 = BM25Okapi(self._tokens)
+            scores = self._bm25.get_scores(_terms(query))
+        matched = [i for i, s in enumerate(scores) if s > 0]
+        # Nothing in the pool shares a term with the query: BM25 can't rank it and the pool's
+        # dense order belongs to the SEED query — only a live search can, complete pool or not.
+        if not matched:
+            return None
+        if not self.complete and self.coverage(query) < GRID_DOC_MIN_COVERAGE:
+            return None
+        # Blend this query's BM25 (scaled to its best match) with the chunk's dense score for
+        # the seed query (GRID_DOC_DENSE_WEIGHT). The seed spans EVERY column, so its order is
+        # a weak prior for one cell — rank fusion at equal weight let it outrank the cell's
+        # clear lexical match — but it still breaks near-ties the way the live search would.
+        # Only matching chunks are kept.
+        top = max(scores[i] for i in matched)
+        dense = self._dense()
+        fused = {i: scores[i] / top + GRID_DOC_DENSE_WEIGHT * dense[i] for i in matched}
+        order = sorted(matched, key=lambda i: (-fused[i], i))
+        return [_unscored(self.docs[i]) for i in order[:k]]
+
+    def _dense(self) -> List[float]:
+        """Each chunk's dense relevance to the seed query in [0, 1]: its retrieval score
+        min-max scaled over the pool, or its pool position when the scores aren't there."""
+        raw = [(getattr(d, "metadata", None) or {}).get("score") for d in self.docs]
+        if all(isinstance(x, (int, float)) for x in raw) and max(raw) > min(raw):
+            lo, hi = min(raw), max(raw)
+            return [(x - lo) / (hi - lo) for x in raw]
+        n = len(self.docs)
+        return [1.0 - i / n for i in range(n)]
+
+
+def _unscored(doc: Any) -> Any:
+    """A copy of a pool chunk without the seed query's score (meaningless for this query)."""
+    md = {k: v for k, v in (getattr(doc, "metadata", None) or {}).items()
+          if k not in ("score", "relevance_score")}
+    try:
+        return doc.__class__(page_content=doc.page_content, metadata=md)
+    except Exception:  # noqa: BLE001 — a Document-like we can't rebuild: share it as is
+        return doc
+
+
+@dataclass
+class DocContext:
+    """The warm retrieval context of one document, shared by its row's cells."""
+    doc_id: str
+    doc_name: str
+    text_pool: _Pool
+    table_pool: _Pool
+    grids: List[Any] = field(default_factory=list)
+    stats: Dict[str, int] = field(default_factory=lambda: {"local": 0, "live": 0})
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def serves(self, merged_scope: Dict[str, Any]) -> bool:
+        """Does a search_vault call with this (merged) scope target exactly this doc?"""
+        if merged_scope.get("filters"):
+            return False
+        ids = merged_scope.get("doc_ids")
+        if ids:
+            return list(ids) == [self.doc_id]
+        names = merged_scope.get("filenames")
+        return bool(names) and list(names) == [self.doc_name]
+
+    def retriever(self, live: Any) -> "PoolRetriever":
+        return PoolRetriever(self, live)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+
+class PoolRetriever:
+    """RetrievalManager stand-in for one doc: pool first, the live manager as fallback."""
+
+    def __init__(self, ctx: DocContext, live: Any):
+        self.ctx = ctx
+        self.live = live
+
+    def _mine(self, doc_ids, metadata_filter) -> bool:
+        return not metadata_filter and (not doc_ids or list(doc_ids) == [self.ctx.doc_id])
+
+    def retrieve(self, query, *, doc_ids=None, metadata_filter=None, top_k=None, **kw):
+        if self._mine(doc_ids, metadata_filter):
+            hits = self.ctx.text_pool.rank(query, top_k or 8)
+            if hits is not None:
+                self.ctx._count("local")
+                return hits
+        self.ctx._count("live")
+        return self.live.retrieve(query, doc_ids=doc_ids, metadata_filter=metadata_filter,
+                                  top_k=top_k, **kw)
+
+    def retrieve_table_chunks(self, query, *, doc_ids=None, metadata_filter=None, k=8, **kw):
+        if self._mine(doc_ids, metadata_filter):
+            hits = self.ctx.table_pool.rank(query, k)
+            if hits is not None:
+                self.ctx._count("local")
+                return hits
+        self.ctx._count("live")
+        return self.live.retrieve_table_chunks(query, doc_ids=doc_ids,
+                                               metadata_filter=metadata_filter, k=k, **kw)
+
+
+def seed_query(columns: Sequence[Any]) -> str:
+    """One query naming every column's topic — the pool has to cover the whole row."""
+    parts = [f"{getattr(c, 'label', '')}: {getattr(c, 'prompt', '')}".strip(": ") for c in columns]
+    return "; ".join(p for p in parts if p)[:_SEED_MAX_CHARS]
+
+
+def build_doc_context(doc_id: str, doc_name: str, retrieval_manager: Any, query: str,
+                      grids: Optional[List[Any]] = None) -> Optional[DocContext]:
+    """Fetch the doc's candidate pools (one text + one table retrieval). None on failure."""
+    if retrieval_manager is None or not doc_id:
+        return None
+    try:
+        text = retrieval_manager.retrieve(
+            query, doc_ids=[doc_id], top_k=GRID_DOC_POOL_K,
+            apply_threshold=False, use_reranker=False,
+        ) or []
+        tables = retrieval_manager.retrieve_table_chunks(
+            query, doc_ids=[doc_id], k=GRID_DOC_TABLE_POOL_K,
+        ) or []
+    except Exception as exc:  # noqa: BLE001 — no context ⇒ the cells search live
+        logger.warning("[doc_context] pool for %s failed: %s", doc_name or doc_id, exc)
+        return None
+    logger.info("[doc_context] %s: %d text + %d table chunks pooled",
+                doc_name or doc_id, len(text), len(tables))
+    return DocContext(doc_id=doc_id, doc_name=doc_name,
+                      text_pool=_Pool(text, GRID_DOC_POOL_K),
+                      table_pool=_Pool(tables, GRID_DOC_TABLE_POOL_K),
+                      grids=list(grids or []))
+
+
+class DocContexts:
+    """One DocContext per document of a grid job, built on first use (once, even when a
+    row's cells ask at the same moment — the others wait for the builder)."""
+
+    def __init__(self, columns: Sequence[Any], retrieval_manager: Any, *,
+                 filename_by_doc: Optional[Dict[str, str]] = None,
+                 grids_by_doc: Optional[Dict[str, Any]] = None):
+        self.query = seed_query(columns)
+        self.retrieval_manager = retrieval_manager
+        self.filename_by_doc = filename_by_doc or {}
+        self.grids_by_doc = grids_by_doc or {}
+        self._built: Dict[str, Optional[DocContext]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, doc_id: str) -> Optional[DocContext]:
+        if not GRID_DOC_CONTEXT:
+            return None
+        with self._lock:
+            if doc_id in self._built:
+                return self._built[doc_id]
+            doc_lock = self._locks.setdefault(doc_id, threading.Lock())
+        with doc_lock:
+            with self._lock:
+                if doc_id in self._built:
+                    return self._built[doc_id]
+            ctx = build_doc_context(doc_id, self.filename_by_doc.get(doc_id, doc_id),
+                                    self.retrieval_manager, self.query,
+                                    grids=self.grids_by_doc.get(doc_id))
+            with self._lock:
+                self._built[doc_id] = ctx
+            return ctx
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            ctxs = [c for c in self._built.values() if c is not None]
+        return {"docs": len(ctxs),
+                "local": sum(c.stats["local"] for c in ctxs),
+                "live": sum(c.stats["live"] for c in ctxs)}
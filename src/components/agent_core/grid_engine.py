@@ -10,9 +10,9 @@ grounded — otherwise it ABSTAINs or reports MISSING. No silent wrong cells.
 The model is injected (a `model_factory()` returning a fresh `BaseModel` per cell), so
 this is unit-testable with a scripted model and never makes a live call in tests.
 
-Concurrency is the caller's concern (the route runs cells on a thread pool / worker);
-this module exposes both `build_cell` (one cell, pure) and `build_grid` (sequential
-convenience). Never raises — a cell that errors becomes a GridCell(status=ERROR).
+This module exposes `build_cell` (one cell, pure), `schedule_cells` (the bounded-concurrency
+cell scheduler the routes drive) and `build_grid` (the convenience driver over it, sequential
+by default). Never raises — a cell that errors becomes a GridCell(status=ERROR).
 """
 
 from __future__ import annotations
@@ -20,12 +20,15 @@ from __future__ import annotations
 import json
 import logging
 import os
-from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.components.cancellation import is_cancelled
 
 from .budgets import Budget
 from .ledger import EvidenceLedger
 from .loop import GateOutcome, run_agent
-from .registry import REGISTRY, RunScope
+from .registry import AGENT_TOOL_MEMO, REGISTRY, RunScope, ToolMemo
 from .review_grid import (
     CellStatus,
     ColumnKind,
@@ -47,6 +50,12 @@ _GRID_CELL_TOKEN_BUDGET = 30_000   # hard per-cell token ceiling (cost guard ×
 # T4 — de-correlated second verify: off = byte-identical to pre-T4.
 _SECOND_VERIFY = os.environ.get("GRID_SECOND_VERIFY", "1") != "0"
 
+# Cells in flight at once in the routes' scheduler. Each cell is an independent agent run
+# (own scope, own ledger), so N×M cells are embarrassingly parallel; the bound keeps a big
+# grid from flooding the shared LLM rate limiter (cells run at BATCH priority there anyway).
+# 1 = the old one-cell-at-a-time loop.
+GRID_CELL_CONCURRENCY = max(1, int(os.environ.get("GRID_CELL_CONCURRENCY", "4")))
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 # The per-cell system prompt — forces cite-or-abstain + a strict JSON answer.
@@ -418,6 +427,12 @@ def _second_verify_cell(cell: GridCell, model_factory: Callable[[], Any]) -> Gri
 # Cell + grid drivers.
 # ──────────────────────────────────────────────────────────────────────────────
 
+def _cancelled_cell(doc_id: str, doc_name: str, column: GridColumn) -> GridCell:
+    """The cell for a run the client walked away from (never shown; keeps the grid whole)."""
+    return GridCell(doc_id=doc_id, column_key=column.key, doc_name=doc_name,
+                    status=CellStatus.ERROR, note="cancelled")
+
+
 def build_cell(
     doc_id: str,
     column: GridColumn,
@@ -430,6 +445,9 @@ def build_cell(
     db_client: Any = None,
     model_id: str = "",
     model_factory: Optional[Callable[[], Any]] = None,
+    cancel=None,
+    memo: Optional[ToolMemo] = None,
+    doc_context: Any = None,
 ) -> GridCell:
     """Run ONE bounded agent for a single (doc, column) and return its GridCell.
 
@@ -438,8 +456,18 @@ def build_cell(
     document so the agent cannot read others. `retrieval_manager` + `db_client` enable
     `search_vault` (needed to find clause text in a PROSE document — without them a
     contract grid abstains every cell).
+    `cancel` (a cancellation.CancelToken) stops the cell's agent between steps; a cell
+    cancelled before or during its run comes back as an ERROR cell noted "cancelled"
+    and gets no second-verify pass.
+    `memo` (a registry.ToolMemo) is the grid job's shared tool memo: a search or read
+    another column of this doc already ran is served from it. None ⇒ a per-cell memo.
+    `doc_context` (a doc_context.DocContext) is the row's warm retrieval context: it seeds
+    the cell's grids and serves its single-doc searches from the row's candidate pool.
     """
     doc_name = filename_by_doc.get(doc_id, doc_id)
+    if is_cancelled(cancel):
+        cancel.skip("grid_cell")
+        return _cancelled_cell(doc_id, doc_name, column)
     scope = RunScope(
         collection_id=collection_id,
         doc_ids=[doc_id],
@@ -447,9 +475,13 @@ def build_cell(
         filename_by_doc={doc_id: doc_name} if doc_name else {},
         # the run's live grid list the tools read (read_document/compute join into this);
         # seeded with this doc's preloaded table grids (empty for a prose contract).
-        grids=list((grids_by_doc or {}).get(doc_id, []) or []),
+        grids=list(doc_context.grids if doc_context is not None
+                   else (grids_by_doc or {}).get(doc_id, []) or []),
         retrieval_manager=retrieval_manager,
         db_client=db_client,
+        cancel=cancel,
+        memo=memo,
+        doc_context=doc_context,
     )
 
     budget = Budget(
@@ -469,6 +501,7 @@ def build_cell(
             budget=budget,
             system_prompt=_cell_system_prompt(column, doc_name),
             gate_fn=grid_gate,
+            cancel=cancel,
         ):
             events.append(ev)
     except Exception as exc:  # noqa: BLE001 — a cell never crashes the grid
@@ -476,6 +509,8 @@ def build_cell(
         return GridCell(doc_id=doc_id, column_key=column.key, doc_name=doc_name,
                         status=CellStatus.ERROR, note=f"cell error: {exc}")
 
+    if is_cancelled(cancel):
+        return _cancelled_cell(doc_id, doc_name, column)
     cell = _cell_from_run(doc_id, doc_name, column, events)
 
     # T4: de-correlated second-verify pass on FOUND clause cells only.
@@ -492,6 +527,95 @@ def build_cell(
     return cell
 
 
+def schedule_cells(
+    spec: GridSpec,
+    run_cell: Callable[[str, GridColumn], GridCell],
+    *,
+    concurrency: int = GRID_CELL_CONCURRENCY,
+    filename_by_doc: Optional[Dict[str, str]] = None,
+    on_cell: Optional[Callable[[GridCell, Dict[str, Any]], None]] = None,
+    cancel=None,
+) -> List[GridCell]:
+    """Run every (doc × column) cell through `run_cell` with at most `concurrency` in flight,
+    returning the cells in row-major (spec) order.
+
+    Cells are SUBMITTED row-major through a sliding window — a row's columns all start before
+    the next row's — so rows complete roughly top to bottom and the UI fills row by row rather
+    than scattering cells across the grid. `on_cell(cell, hint)` is called on the calling
+    thread as each cell completes (completion order, so no lock is needed in the callback);
+    `hint` = {"row", "col", "row_done"} places the cell and says when its row is full.
+
+    Once `cancel` fires nothing more is submitted: every unstarted cell is a "cancelled" ERROR
+    cell (counted as avoided, never reported through on_cell) and the in-flight ones stop at
+    their next agent step. `concurrency` 1 runs inline on the calling thread — the old
+    sequential loop, call for call. `run_cell` should not raise (build_cell never does); if it
+    does, that cell becomes an ERROR cell.
+    """
+    names = filename_by_doc or {}
+    plan: List[Tuple[int, int, str, GridColumn]] = [
+        (r, c, did, column)
+        for r, did in enumerate(spec.doc_ids)
+        for c, column in enumerate(spec.columns)
+    ]
+    cells: List[Optional[GridCell]] = [None] * len(plan)
+    left_in_row = [len(spec.columns)] * len(spec.doc_ids)
+
+    def _run(i: int) -> GridCell:
+        _r, _c, did, column = plan[i]
+        try:
+            return run_cell(did, column)
+        except Exception as exc:  # noqa: BLE001 — a cell never crashes the grid
+            logger.warning("[grid] cell (%s × %s) raised: %s", names.get(did, did), column.key, exc)
+            return GridCell(doc_id=did, column_key=column.key, doc_name=names.get(did, did),
+                            status=CellStatus.ERROR, note=f"cell error: {exc}")
+
+    def _done(i: int, cell: GridCell) -> None:
+        cells[i] = cell
+        r, c, _did, _column = plan[i]
+        left_in_row[r] -= 1
+        if on_cell is not None:
+            try:
+                on_cell(cell, {"row": r, "col": c, "row_done": left_in_row[r] == 0})
+            except Exception:  # noqa: BLE001 — progress callback must never break the grid
+                logger.debug("[grid] on_cell callback raised; ignoring")
+
+    def _cancel_rest(start: int) -> None:
+        rest = [i for i in range(start, len(plan)) if cells[i] is None]
+        if rest:
+            cancel.skip("grid_cell", len(rest))
+            logger.info("[grid] cancelled — %d cell(s) not run", len(rest))
+        for i in rest:
+            _r, _c, did, column = plan[i]
+            cells[i] = _cancelled_cell(did, names.get(did, did), column)
+
+    if concurrency <= 1 or len(plan) <= 1:
+        for i in range(len(plan)):
+            if is_cancelled(cancel):
+                _cancel_rest(i)
+                break
+            _done(i, _run(i))
+        return [c for c in cells if c is not None]
+
+    nxt = 0
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(plan)),
+                            thread_name_prefix="grid-cell") as pool:
+        in_flight: Dict[Any, int] = {}
+        while nxt < len(plan) or in_flight:
+            while nxt < len(plan) and len(in_flight) < concurrency and not is_cancelled(cancel):
+                in_flight[pool.submit(_run, nxt)] = nxt
+                nxt += 1
+            if nxt < len(plan) and is_cancelled(cancel):
+                _cancel_rest(nxt)
+                nxt = len(plan)
+            if not in_flight:
+                break
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            # Report simultaneous finishers in plan order (keeps a row's cells together).
+            for fut in sorted(finished, key=in_flight.__getitem__):
+                _done(in_flight.pop(fut), fut.result())
+    return [c for c in cells if c is not None]
+
+
 def build_grid(
     spec: GridSpec,
     *,
@@ -500,30 +624,42 @@ def build_grid(
     grids_by_doc: Optional[Dict[str, Any]] = None,
     model_id: str = "",
     on_cell: Optional[Callable[[GridCell], None]] = None,
+    cancel=None,
+    concurrency: int = 1,
 ) -> GridResult:
-    """Fill the whole grid sequentially (the route may instead fan cells out across a
-    pool; this is the simple, deterministic driver used by tests and small grids).
+    """Fill the whole grid through `schedule_cells` — sequentially by default (the simple,
+    deterministic driver used by tests and small grids); pass `concurrency` (e.g.
+    GRID_CELL_CONCURRENCY) to fan cells out across a bounded pool.
 
     `model_factory` returns a FRESH model per cell (no shared mutable state across the
-    fan-out). `on_cell`, if given, is called as each cell completes (for streaming
-    progress to the UI).
+    fan-out); it is called on the worker, so a cancelled grid builds no further model.
+    `grids_by_doc` is loaded once by the caller and each doc's list is shared by all of
+    that doc's columns (build_cell seeds each cell's scope with its own shallow copy).
+    `on_cell`, if given, is called as each cell completes (for streaming progress to the
+    UI). Once `cancel` fires every remaining cell is a "cancelled" ERROR cell (counted as
+    avoided, no model built or called). One ToolMemo serves the whole job, so a row's cells
+    share their repeated searches / reads.
     """
-    cells: List[GridCell] = []
-    for doc_id in spec.doc_ids:
-        for column in spec.columns:
-            cell = build_cell(
-                doc_id, column,
-                collection_id=spec.collection_id,
-                model=model_factory(),
-                filename_by_doc=filename_by_doc,
-                grids_by_doc=grids_by_doc,
-                model_id=model_id,
-                model_factory=model_factory,
-            )
-            cells.append(cell)
-            if on_cell is not None:
-                try:
-                    on_cell(cell)
-                except Exception:  # noqa: BLE001 — progress callback must never break the grid
-                    logger.debug("[grid] on_cell callback raised; ignoring")
+    memo = ToolMemo() if AGENT_TOOL_MEMO else None
+
+    def _run_cell(doc_id: str, column: GridColumn) -> GridCell:
+        return build_cell(
+            doc_id, column,
+            collection_id=spec.collection_id,
+            model=model_factory(),
+            filename_by_doc=filename_by_doc,
+            grids_by_doc=grids_by_doc,
+            model_id=model_id,
+            model_factory=model_factory,
+            cancel=cancel,
+            memo=memo,
+        )
+
+    cells = schedule_cells(
+        spec, _run_cell,
+        concurrency=concurrency,
+        filename_by_doc=filename_by_doc,
+        on_cell=(lambda cell, _hint: on_cell(cell)) if on_cell is not None else None,
+        cancel=cancel,
+    )
     return GridResult(spec=spec, cells=cells)
@@ -28,16 +28,26 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+import os
+import time
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, Iterator, List, Optional, Set
 
+from src.components.cancellation import is_cancelled
+
 from .budgets import Budget
 from .ledger import EvidenceLedger
 from .model import BaseModel, ModelResponse, ToolCall
-from .registry import REGISTRY, RunScope
+from .registry import AGENT_TOOL_MEMO, REGISTRY, RunScope, ToolMemo
 
 logger = logging.getLogger(__name__)
 
+# Parallel-safe tool calls of ONE model turn (registry.parallel_safe — the pure reads:
+# search_vault / read_document / search_knowledge) run on up to this many threads. A deep
+# turn typically issues 3-5 of them, each a multi-second Pinecone / Supabase round-trip.
+# 1 ⇒ strictly sequential (the old behaviour).
+AGENT_TOOL_CONCURRENCY = int(os.environ.get("AGENT_TOOL_CONCURRENCY", "4"))
+
 
 # ── Output-gate hook (A3 replaces the body; A2 ships a passthrough stub) ─────────
 
@@ -129,6 +139,56 @@ def _tool_result_message(call: ToolCall, result: Dict[str, Any]) -> Dict[str, An
     }
 
 
+def _call_signature(call: ToolCall) -> str:
+    """T3: normalized (tool, args) signature of a call, for repeat detection."""
+    raw = json.dumps({"n": call.name, "a": call.args}, sort_keys=True, default=str)
+    return hashlib.md5(raw.encode()).hexdigest()[:12]  # noqa: S324 — not security
+
+
+def _parallel_batch(calls: List[ToolCall], start: int, registry,
+                    failed_sigs: Dict[str, int], repeat_cap: int) -> List[int]:
+    """Indexes of the calls from `start` on that may run together: the consecutive run of
+    parallel-safe calls, stopping before any call T3 would block now and before a repeat of
+    a signature already in the run (whether THAT one is blocked depends on its twin's
+    result). Always at least `[start]`; a registry without `parallel_safe` ⇒ sequential."""
+    is_safe = getattr(registry, "parallel_safe", None)
+    if AGENT_TOOL_CONCURRENCY <= 1 or is_safe is None:
+        return [start]
+    batch: List[int] = []
+    sigs: Set[str] = set()
+    for j in range(start, len(calls)):
+        sig = _call_signature(calls[j])
+        if not is_safe(calls[j].name) or failed_sigs.get(sig, 0) >= repeat_cap or sig in sigs:
+            break
+        batch.append(j)
+        sigs.add(sig)
+    return batch or [start]
+
+
+def _no_span(*_args, **_kw) -> None:
+    """Span sink of an untraced run."""
+
+
+def _execute(registry, call: ToolCall, scope: RunScope, span=_no_span,
+             step: Optional[int] = None) -> Dict[str, Any]:
+    """registry.execute, timed as a `tool` span (on the thread that ran it)."""
+    t0 = time.monotonic()
+    result = registry.execute(call, scope)
+    span("tool", call.name, t0, time.monotonic(), step=step, ok=bool(result.get("ok")),
+         cached=bool(result.get("_memo_hit")))
+    return result
+
+
+def _execute_batch(registry, calls: List[ToolCall], scope: RunScope, span=_no_span,
+                   step: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Run `calls` concurrently (bounded by AGENT_TOOL_CONCURRENCY); results in call order."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = max(1, min(AGENT_TOOL_CONCURRENCY, len(calls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent-tool") as pool:
+        return list(pool.map(lambda c: _execute(registry, c, scope, span, step), calls))
+
+
 def _assistant_message(resp: ModelResponse) -> Dict[str, Any]:
     """Reconstruct the assistant turn (text + tool_use blocks) for the message history."""
     content: List[Dict[str, Any]] = []
@@ -152,6 +212,8 @@ def run_agent(
     registry=REGISTRY,
     gate_fn: Optional[Callable[[str, EvidenceLedger], GateOutcome]] = None,
     tools: Optional[List[str]] = None,
+    cancel=None,
+    tracer=None,
 ) -> Iterator[Dict[str, Any]]:
     """Drive one agent run, yielding §3.6 events. `model` is injected (live or scripted).
 
@@ -160,8 +222,31 @@ def run_agent(
     wraps up with whatever is gated + an explicit abstain. A model API error is retried
     once by the caller's model wrapper; an unrecoverable one degrades (the route falls
     back to Brain — that's A4). This function never raises into the generator consumer.
+
+    `cancel` (a cancellation.CancelToken; defaults to `scope.cancel`) is checked before
+    every model call, between streamed deltas and before every tool call. Once it fires
+    (the SSE client disconnected) the run stops at once: a `cancelled` gate, then a meta
+    with cancelled=True — no further model or tool call, no output gate, no sources.
+
+    `tracer` (a tracer.RunTracer, optional) receives a latency span for every model call,
+    tool execution and output-gate pass. The yielded events are the same either way.
     """
-    import time
+    span = getattr(tracer, "add_span", None) or _no_span
+    model_name = getattr(model, "model", None) or type(model).__name__
+
+    if cancel is None:
+        cancel = getattr(scope, "cancel", None)
+    elif getattr(scope, "cancel", None) is None:
+        scope.cancel = cancel   # tools (survey_collection's MAP) honour the same token
+    if isinstance(scope, RunScope) and scope.memo is None and AGENT_TOOL_MEMO:
+        scope.memo = ToolMemo()   # repeated read-only calls of this run are served from it
+
+    def _cancelled(step: int) -> Iterator[Dict[str, Any]]:
+        cancel.skip("agent_step")   # the model call the run would have made next
+        yield {"type": "gate", "name": "cancelled", "pass": False,
+               "detail": f"client disconnected at step {step} — run stopped"}
+        yield {"type": "meta", "mode": budget.mode, "steps": step,
+               "tokens": budget.tokens_used, "abstained": True, "cancelled": True}
 
     # T2: thread the question into the gate so verify_completeness knows which entities
     # were asked for. Callers that inject a custom gate_fn keep their own behavior.
@@ -207,6 +292,9 @@ def run_agent(
         return budget.wall_clock_s > 0 and (time.monotonic() - started) >= budget.wall_clock_s
 
     while True:
+        if is_cancelled(cancel):
+            yield from _cancelled(budget.steps_used)
+            return
         # Budget gate BEFORE each model call (§3.2): no silent overspend — steps,
         # tokens, AND wall clock are all hard ceilings.
         if budget.step_exhausted() or budget.tokens_exhausted() or _wall_exhausted():
@@ -269,6 +357,7 @@ def run_agent(
             return final_resp
 
         resp = None
+        t_model = time.monotonic()
         try:
             try:
                 gen = _run_stream()
@@ -280,12 +369,16 @@ def run_agent(
                         break
                     if kind == "delta" and payload:
                         yield {"type": "token_delta", "text": payload}
+                    if is_cancelled(cancel):
+                        gen.close()   # abandons the model stream mid-answer
+                        break
             except Exception as first_exc:  # noqa: BLE001 — one retry for transient API blips
                 logger.warning("[agent_core.loop] model.stream failed at step %d (retrying once): %s",
                                step, first_exc)
                 resp = model.invoke(messages, tool_schemas)
         except Exception as exc:  # noqa: BLE001 — surfaced as a degrade signal to the caller
             logger.warning("[agent_core.loop] model call failed at step %d: %s", step, exc)
+            span("model", model_name, t_model, time.monotonic(), step=step, ok=False)
             _consecutive_model_errors += 1
             yield {"type": "gate", "name": "model_error", "pass": False, "detail": str(exc)}
             final_text = None
@@ -301,10 +394,20 @@ def run_agent(
                    "error": f"model_error: {exc}", "degrade": True}
             return
 
+        if is_cancelled(cancel):
+            span("model", model_name, t_model, time.monotonic(), step=step, ok=False,
+                 cancelled=True)
+            yield from _cancelled(step)
+            return
+
         if resp is None:  # stream produced no 'done' — treat as a model error / degrade
             resp = model.invoke(messages, tool_schemas)
+        usage = resp.usage or {}
+        span("model", model_name, t_model, time.monotonic(), step=step, ok=True,
+             tokens_in=usage.get("in"), tokens_out=usage.get("out"))
 
-        budget.tokens_used += (resp.usage or {}).get("in", 0) + (resp.usage or {}).get("out", 0)
+        # Cached prompt tokens (prompt-prefix caching, model.py) count at the vendor's cache rate.
+        budget.charge(resp.usage, getattr(model, "model", None))
         if resp.text:
             yield {"type": "agent_thought", "text": resp.text[:500]}
 
@@ -312,11 +415,15 @@ def run_agent(
         messages.append(_assistant_message(resp))
 
         if resp.wants_tools:
-            for call in resp.tool_calls:
+            # Several parallel-safe calls in a row run concurrently (_parallel_batch); their
+            # results are then folded in below ONE BY ONE, in the model's call order, through
+            # exactly the sequential path — so history, ledger, T3 signatures and the
+            # tool_result events are the same as a sequential run. Only the tool_call events
+            # of a batch are emitted together, up front, when it starts.
+            prefetched: Dict[int, Dict[str, Any]] = {}
+            for i, call in enumerate(resp.tool_calls):
                 # T3: compute a normalized signature for this call to detect repeats.
-                _raw_sig = json.dumps({"n": call.name, "a": call.args}, sort_keys=True,
-                                      default=str)
-                _call_sig = hashlib.md5(_raw_sig.encode()).hexdigest()[:12]  # noqa: S324 — not security
+                _call_sig = _call_signature(call)
 
                 # T3: if this exact call already failed _REPEAT_CAP times, redirect instead
                 # of executing again — the model is stuck in a loop and will burn the budget.
@@ -336,14 +443,34 @@ def run_agent(
                     messages.append({"role": "user", "content": redirect_msg})
                     break  # inject the redirect and let the model respond to it
 
-                yield {"type": "tool_call", "name": call.name,
-                       "args_summary": _args_summary(call.args)}
-                result = registry.execute(call, scope)
+                if is_cancelled(cancel):
+                    yield from _cancelled(step)
+                    return
+                if i in prefetched:
+                    result = prefetched.pop(i)   # announced + run with its batch
+                else:
+                    batch = _parallel_batch(resp.tool_calls, i, registry, _failed_sigs, _REPEAT_CAP)
+                    for j in batch:
+                        yield {"type": "tool_call", "name": resp.tool_calls[j].name,
+                               "args_summary": _args_summary(resp.tool_calls[j].args)}
+                    if len(batch) > 1:
+                        results = _execute_batch(registry, [resp.tool_calls[j] for j in batch], scope,
+                                                 span, step)
+                        prefetched.update(zip(batch, results))
+                        result = prefetched.pop(i)
+                    else:
+                        result = _execute(registry, call, scope, span, step)
+                # A memo hit is a fresh copy of an earlier result: its provenance is recorded
+                # into this run's ledger at this step, exactly like a live call's.
+                memo_hit = bool(result.pop("_memo_hit", False))
                 ok = bool(result.get("ok"))
                 n_prov = ledger.record(call.name, step, result.get("provenance"))
-                yield {"type": "tool_result", "name": call.name,
-                       "ok": ok, "summary": result.get("summary", ""),
-                       "n_provenance": n_prov}
+                tool_ev = {"type": "tool_result", "name": call.name,
+                           "ok": ok, "summary": result.get("summary", ""),
+                           "n_provenance": n_prov}
+                if memo_hit:
+                    tool_ev["cached"] = True
+                yield tool_ev
                 messages.append(_tool_result_message(call, result))
 
                 # T3: track failed/zero-prov calls for the circuit-breaker.
@@ -388,6 +515,7 @@ def run_agent(
         # No tool calls → the model thinks it's done. Run the output gates (A3).
         # A raising gate_fn fails CLOSED (withhold) — same contract as _default_gate.
         draft = resp.text or ""
+        t_gate = time.monotonic()
         try:
             outcome = gate_fn(draft, ledger)
         except Exception as exc:  # noqa: BLE001
@@ -397,6 +525,7 @@ def run_agent(
                 failures=[{"name": "gates_unavailable", "detail": str(exc)}],
                 redacted_draft=_GATE_UNAVAILABLE_TEXT,
             )
+        span("gate", "output", t_gate, time.monotonic(), step=step, ok=bool(outcome.passed))
         for f in (outcome.failures or []):
             yield {"type": "gate", "name": f.get("name", "gate"), "pass": False,
                    "detail": f.get("detail", "")}
@@ -444,6 +573,13 @@ def run_agent(
     yield {"type": "sources", "sources": ledger.to_sources()}
     if final_text is not None:
         yield {"type": "token", "text": final_text}
-    yield {"type": "meta", "mode": budget.mode, "steps": budget.steps_used,
-           "tokens": budget.tokens_used, "abstained": abstained,
-           "n_evidence": len(ledger.entries)}
+    meta = {"type": "meta", "mode": budget.mode, "steps": budget.steps_used,
+            "tokens": budget.tokens_used, "abstained": abstained,
+            "n_evidence": len(ledger.entries)}
+    if budget.cache_read_tokens or budget.cache_write_tokens:
+        meta["cache"] = {"read": budget.cache_read_tokens, "write": budget.cache_write_tokens}
+    # The route's speculative preload: load time hidden behind the run vs time spent waiting.
+    preload = getattr(scope, "preload", None)
+    if preload is not None:
+        meta["preload"] = preload.stats()
+    yield meta
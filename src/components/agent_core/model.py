@@ -14,14 +14,41 @@ Uniform shapes the loop consumes:
     ModelResponse(text: str|None, tool_calls: list[ToolCall], usage: {in,out})
 
 `anthropic` is imported LAZILY inside `AnthropicModel.invoke` — importing this module
-costs nothing and needs no API key (the gates don't).
+costs nothing and needs no API key (the gates don't). Live calls share one pooled SDK
+client per (provider, api_key) from client_pool (keep-alive + HTTP/2), so a step no
+longer pays client construction and a fresh TLS handshake.
+
+Every live call goes through the shared LLM rate limiter (rate_limiter.py) at the model's
+`priority` — charged prompt estimate + max_tokens, settled to the reported usage.
+
+Prompt-prefix caching (AGENT_PROMPT_CACHE, on by default). Every step resends the system
+prompt, the tool schemas and the growing history — and a grid/redline fan-out resends the
+same tools hundreds of times. Claude caches only what the request marks: AnthropicModel
+puts `cache_control` breakpoints on the last tool schema, the system prompt, the run's
+first user turn (the end of the stable "early history") and the newest message, so each
+step reads everything before it from cache. OpenAI caches the longest repeated prefix
+automatically: OpenAIModel keeps the prefix byte-stable (system, then history in order,
+tools unchanged) and sends a `prompt_cache_key` per (model, system, tool set) so runs
+sharing it land on the same cache. Either way `usage` carries `cache_read` /
+`cache_write` (present only when non-zero), with "in" = UNCACHED input tokens, and
+Budget.charge bills them at the vendor's cache rate.
 """
 
 from __future__ import annotations
 
+import hashlib
+import os
 from dataclasses import dataclass, field
 from typing import Any, Callable, Dict, List, Optional
 
+from src.components.rate_limiter import Priority, estimate_tokens, llm_limiter
+
+from .client_pool import get_client
+
+AGENT_PROMPT_CACHE: bool = os.getenv("AGENT_PROMPT_CACHE", "true").lower() == "true"
+
+_EPHEMERAL = {"type": "ephemeral"}
+
 
 @dataclass
 class ToolCall:
@@ -32,6 +59,7 @@ class ToolCall:
 
 @dataclass
 class ModelResponse:
+    # usage: {"in": uncached input, "out": output} + "cache_read" / "cache_write" when non-zero
     text: Optional[str] = None
     tool_calls: List[ToolCall] = field(default_factory=list)
     usage: Dict[str, int] = field(default_factory=lambda: {"in": 0, "out": 0})
@@ -48,6 +76,12 @@ class BaseModel:
     def invoke(self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> ModelResponse:  # noqa: D401
         raise NotImplementedError
 
+    def _rate_slot(self, provider: str, messages: List[Dict[str, Any]],
+                   tools: List[Dict[str, Any]]):
+        """Rate-limiter slot for one live call: prompt estimate + max output, at self.priority."""
+        est = estimate_tokens([getattr(self, "system", None), messages, tools])
+        return llm_limiter.slot(provider, self.model, est + self.max_tokens, self.priority)
+
     def stream(self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]):
         """Stream a response. Yields ("delta", text) tuples as text is generated, then a
         final ("done", ModelResponse). The DEFAULT implementation calls invoke() and emits
@@ -61,6 +95,99 @@ class BaseModel:
         yield ("done", resp)
 
 
+# ── Prompt-prefix caching helpers ───────────────────────────────────────────────
+
+def _with_breakpoint(message: Dict[str, Any]) -> Dict[str, Any]:
+    """A copy of `message` whose last content block carries a cache breakpoint (string
+    content becomes one text block). The loop's own history is never mutated."""
+    content = message.get("content")
+    if isinstance(content, str):
+        if not content:
+            return message
+        blocks = [{"type": "text", "text": content}]
+    elif isinstance(content, list) and content:
+        blocks = list(content)
+    else:
+        return message
+    blocks[-1] = {**blocks[-1], "cache_control": _EPHEMERAL}
+    return {**message, "content": blocks}
+
+
+def _anthropic_cache(kwargs: Dict[str, Any], first_user: int) -> Dict[str, Any]:
+    """Mark the stable prefix of a Messages request cacheable — at most 4 breakpoints:
+    last tool (caches every tool schema), the system prompt, the run's first user turn,
+    and the newest message (so the next step reads this step's whole prefix)."""
+    if not AGENT_PROMPT_CACHE:
+        return kwargs
+    out = dict(kwargs)
+    tools = out.get("tools")
+    if tools:
+        out["tools"] = list(tools[:-1]) + [{**tools[-1], "cache_control": _EPHEMERAL}]
+    if out.get("system"):
+        out["system"] = [{"type": "text", "text": out["system"], "cache_control": _EPHEMERAL}]
+    messages = list(out.get("messages") or [])
+    for i in {first_user, len(messages) - 1}:
+        if 0 <= i < len(messages):
+            messages[i] = _with_breakpoint(messages[i])
+    out["messages"] = messages
+    return out
+
+
+def _first_user_turn(messages: List[Dict[str, Any]]) -> int:
+    """Index of the run's question: the first user turn after any prior-chat history, i.e.
+    the last plain-string user message before the first tool exchange."""
+    idx = -1
+    for i, m in enumerate(messages):
+        if m.get("role") == "user" and isinstance(m.get("content"), str):
+            idx = i
+        elif m.get("role") == "assistant" and isinstance(m.get("content"), list) and \
+                any(b.get("type") == "tool_use" for b in m["content"]):
+            break
+    return idx
+
+
+def _anthropic_usage(u) -> Dict[str, int]:
+    usage = {
+        "in": (getattr(u, "input_tokens", 0) or 0) if u else 0,
+        "out": (getattr(u, "output_tokens", 0) or 0) if u else 0,
+    }
+    read = (getattr(u, "cache_read_input_tokens", 0) or 0) if u else 0
+    write = (getattr(u, "cache_creation_input_tokens", 0) or 0) if u else 0
+    if read:
+        usage["cache_read"] = read
+    if write:
+        usage["cache_write"] = write
+    return usage
+
+
+def _anthropic_rate_tokens(u) -> int:
+    """Tokens a call counts against the provider's limits: cache READS are exempt from
+    Anthropic's input-token rate limit, cache writes are not."""
+    usage = _anthropic_usage(u)
+    return usage["in"] + usage["out"] + usage.get("cache_write", 0)
+
+
+def _openai_usage(u) -> Dict[str, int]:
+    """OpenAI reports cached tokens INSIDE prompt_tokens; split them out so "in" means
+    uncached input for both vendors."""
+    prompt = (getattr(u, "prompt_tokens", 0) or 0) if u else 0
+    details = getattr(u, "prompt_tokens_details", None) if u else None
+    cached = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+    usage = {"in": prompt - cached,
+             "out": (getattr(u, "completion_tokens", 0) or 0) if u else 0}
+    if cached:
+        usage["cache_read"] = cached
+    return usage
+
+
+def _prompt_cache_key(model: str, system: Optional[str], tools: List[Dict[str, Any]]) -> str:
+    """Routing key for OpenAI's prefix cache: runs with the same model, system prompt and
+    tool set share a prefix, so send them to the same cache."""
+    names = ",".join(t.get("function", {}).get("name", "") for t in tools or [])
+    digest = hashlib.sha256(f"{model}\x00{system or ''}\x00{names}".encode()).hexdigest()
+    return f"dq-{digest[:32]}"
+
+
 # ── Live Anthropic (Claude) — native tool use ───────────────────────────────────
 
 class AnthropicModel(BaseModel):
@@ -72,17 +199,17 @@ class AnthropicModel(BaseModel):
     """
 
     def __init__(self, model: str, api_key: str, *, max_tokens: int = 4096,
-                 system: Optional[str] = None, temperature: float = 0.0):
+                 system: Optional[str] = None, temperature: float = 0.0,
+                 priority: Priority = Priority.INTERACTIVE):
         self.model = model
         self.api_key = api_key
         self.max_tokens = max_tokens
         self.system = system
         self.temperature = temperature
+        self.priority = priority
 
     def invoke(self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> ModelResponse:
-        import anthropic  # lazy — no import/key cost unless a live call happens
-
-        client = anthropic.Anthropic(api_key=self.api_key)
+        client = get_client("anthropic", self.api_key)  # lazy SDK import, pooled client
         kwargs: Dict[str, Any] = {
             "model": self.model,
             "max_tokens": self.max_tokens,
@@ -95,8 +222,13 @@ class AnthropicModel(BaseModel):
             # Registry schemas are {name, description, input_schema} — already the
             # Anthropic tool shape, so they pass straight through.
             kwargs["tools"] = tools
+        kwargs = _anthropic_cache(kwargs, _first_user_turn(messages))
 
-        resp = client.messages.create(**kwargs)
+        with self._rate_slot("anthropic", messages, tools) as rate:
+            resp = client.messages.create(**kwargs)
+            u = getattr(resp, "usage", None)
+            if u:
+                rate.used(_anthropic_rate_tokens(u))
 
         text_parts: List[str] = []
         tool_calls: List[ToolCall] = []
@@ -110,14 +242,10 @@ class AnthropicModel(BaseModel):
                     name=getattr(block, "name", ""),
                     args=getattr(block, "input", {}) or {},
                 ))
-        usage = getattr(resp, "usage", None)
         return ModelResponse(
             text="".join(text_parts) or None,
             tool_calls=tool_calls,
-            usage={
-                "in": getattr(usage, "input_tokens", 0) if usage else 0,
-                "out": getattr(usage, "output_tokens", 0) if usage else 0,
-            },
+            usage=_anthropic_usage(getattr(resp, "usage", None)),
         )
 
     def stream(self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]):
@@ -125,9 +253,7 @@ class AnthropicModel(BaseModel):
         final message (text + tool_use + usage) into a ModelResponse, then ("done", resp).
         Falls back to the base (invoke-once) path on any streaming error so a run never dies
         on a stream hiccup."""
-        import anthropic  # lazy
-
-        client = anthropic.Anthropic(api_key=self.api_key)
+        client = get_client("anthropic", self.api_key)
         kwargs: Dict[str, Any] = {
             "model": self.model,
             "max_tokens": self.max_tokens,
@@ -138,13 +264,18 @@ class AnthropicModel(BaseModel):
             kwargs["system"] = self.system
         if tools:
             kwargs["tools"] = tools
+        kwargs = _anthropic_cache(kwargs, _first_user_turn(messages))
 
         try:
-            with client.messages.stream(**kwargs) as stream:
+            with self._rate_slot("anthropic", messages, tools) as rate, \
+                    client.messages.stream(**kwargs) as stream:
                 for text in stream.text_stream:        # incremental text deltas
                     if text:
                         yield ("delta", text)
                 final = stream.get_final_message()
+                u = getattr(final, "usage", None)
+                if u:
+                    rate.used(_anthropic_rate_tokens(u))
         except Exception:  # noqa: BLE001 — never die on a stream error; fall back to invoke
             yield from super().stream(messages, tools)
             return
@@ -161,14 +292,10 @@ class AnthropicModel(BaseModel):
                     name=getattr(block, "name", ""),
                     args=getattr(block, "input", {}) or {},
                 ))
-        usage = getattr(final, "usage", None)
         yield ("done", ModelResponse(
             text="".join(text_parts) or None,
             tool_calls=tool_calls,
-            usage={
-                "in": getattr(usage, "input_tokens", 0) if usage else 0,
-                "out": getattr(usage, "output_tokens", 0) if usage else 0,
-            },
+            usage=_anthropic_usage(getattr(final, "usage", None)),
         ))
 
 
@@ -186,12 +313,14 @@ class OpenAIModel(BaseModel):
     """
 
     def __init__(self, model: str, api_key: str, *, max_tokens: int = 4096,
-                 system: Optional[str] = None, temperature: float = 0.0):
+                 system: Optional[str] = None, temperature: float = 0.0,
+                 priority: Priority = Priority.INTERACTIVE):
         self.model = model
         self.api_key = api_key
         self.max_tokens = max_tokens
         self.system = system
         self.temperature = temperature
+        self.priority = priority
 
     # -- shape adapters (Anthropic-style ⇄ OpenAI-style) --------------------------
 
@@ -268,9 +397,8 @@ class OpenAIModel(BaseModel):
 
     def invoke(self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> ModelResponse:
         import json as _json
-        from openai import OpenAI  # lazy
 
-        client = OpenAI(api_key=self.api_key)
+        client = get_client("openai", self.api_key)  # lazy SDK import, pooled client
         kwargs: Dict[str, Any] = {
             "model": self.model,
             "messages": self._messages_to_openai(messages),
@@ -278,6 +406,8 @@ class OpenAIModel(BaseModel):
         oai_tools = self._tools_to_openai(tools)
         if oai_tools:
             kwargs["tools"] = oai_tools
+        if AGENT_PROMPT_CACHE:
+            kwargs["prompt_cache_key"] = _prompt_cache_key(self.model, self.system, oai_tools)
 
         # GPT-5 / o-series reasoning models renamed `max_tokens`→`max_completion_tokens`
         # and only accept the default temperature (1). The 4.x chat models use the old
@@ -290,7 +420,11 @@ class OpenAIModel(BaseModel):
             kwargs["max_tokens"] = self.max_tokens
             kwargs["temperature"] = self.temperature
 
-        resp = client.chat.completions.create(**kwargs)
+        with self._rate_slot("openai", messages, tools) as rate:
+            resp = client.chat.completions.create(**kwargs)
+            u = getattr(resp, "usage", None)
+            if u:
+                rate.used(getattr(u, "total_tokens", 0))
         choice = resp.choices[0].message
 
         tool_calls: List[ToolCall] = []
@@ -301,14 +435,10 @@ class OpenAIModel(BaseModel):
                 args = {}
             tool_calls.append(ToolCall(id=tc.id, name=tc.function.name, args=args))
 
-        usage = getattr(resp, "usage", None)
         return ModelResponse(
             text=(choice.content or None),
             tool_calls=tool_calls,
-            usage={
-                "in": getattr(usage, "prompt_tokens", 0) if usage else 0,
-                "out": getattr(usage, "completion_tokens", 0) if usage else 0,
-            },
+            usage=_openai_usage(getattr(resp, "usage", None)),
         )
 
     def stream(self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]):
@@ -316,9 +446,8 @@ class OpenAIModel(BaseModel):
         fragments (name/arguments arrive split across chunks) and usage, then ("done", resp).
         Falls back to invoke-once on any stream error."""
         import json as _json
-        from openai import OpenAI  # lazy
 
-        client = OpenAI(api_key=self.api_key)
+        client = get_client("openai", self.api_key)  # lazy SDK import, pooled client
         kwargs: Dict[str, Any] = {
             "model": self.model,
             "messages": self._messages_to_openai(messages),
@@ -328,6 +457,8 @@ class OpenAIModel(BaseModel):
         oai_tools = self._tools_to_openai(tools)
         if oai_tools:
             kwargs["tools"] = oai_tools
+        if AGENT_PROMPT_CACHE:
+            kwargs["prompt_cache_key"] = _prompt_cache_key(self.model, self.system, oai_tools)
         if self._is_reasoning_model(self.model):
             kwargs["max_completion_tokens"] = self.max_tokens
         else:
@@ -337,32 +468,34 @@ class OpenAIModel(BaseModel):
         text_parts: List[str] = []
         # tool calls arrive as fragments keyed by index: {idx: {"id","name","args_str"}}
         tc_acc: Dict[int, Dict[str, str]] = {}
-        usage_in = usage_out = 0
+        usage: Dict[str, int] = {"in": 0, "out": 0}
         try:
-            for chunk in client.chat.completions.create(**kwargs):
-                ch_usage = getattr(chunk, "usage", None)
-                if ch_usage:
-                    usage_in = getattr(ch_usage, "prompt_tokens", 0) or usage_in
-                    usage_out = getattr(ch_usage, "completion_tokens", 0) or usage_out
-                choices = getattr(chunk, "choices", None) or []
-                if not choices:
-                    continue
-                delta = choices[0].delta
-                piece = getattr(delta, "content", None)
-                if piece:
-                    text_parts.append(piece)
-                    yield ("delta", piece)
-                for tc in (getattr(delta, "tool_calls", None) or []):
-                    i = tc.index
-                    slot = tc_acc.setdefault(i, {"id": "", "name": "", "args": ""})
-                    if getattr(tc, "id", None):
-                        slot["id"] = tc.id
-                    fn = getattr(tc, "function", None)
-                    if fn:
-                        if getattr(fn, "name", None):
-                            slot["name"] = fn.name
-                        if getattr(fn, "arguments", None):
-                            slot["args"] += fn.arguments
+            with self._rate_slot("openai", messages, tools) as rate:
+                for chunk in client.chat.completions.create(**kwargs):
+                    ch_usage = getattr(chunk, "usage", None)
+                    if ch_usage:
+                        usage = _openai_usage(ch_usage)   # the final chunk carries it
+                    choices = getattr(chunk, "choices", None) or []
+                    if not choices:
+                        continue
+                    delta = choices[0].delta
+                    piece = getattr(delta, "content", None)
+                    if piece:
+                        text_parts.append(piece)
+                        yield ("delta", piece)
+                    for tc in (getattr(delta, "tool_calls", None) or []):
+                        i = tc.index
+                        slot = tc_acc.setdefault(i, {"id": "", "name": "", "args": ""})
+                        if getattr(tc, "id", None):
+                            slot["id"] = tc.id
+                        fn = getattr(tc, "function", None)
+                        if fn:
+                            if getattr(fn, "name", None):
+                                slot["name"] = fn.name
+                            if getattr(fn, "arguments", None):
+                                slot["args"] += fn.arguments
+                if any(usage.values()):
+                    rate.used(sum(usage.values()))
         except Exception:  # noqa: BLE001 — never die on a stream error; fall back to invoke
             yield from super().stream(messages, tools)
             return
@@ -379,7 +512,7 @@ class OpenAIModel(BaseModel):
         yield ("done", ModelResponse(
             text="".join(text_parts) or None,
             tool_calls=tool_calls,
-            usage={"in": usage_in, "out": usage_out},
+            usage=usage,
         ))
 
 
@@ -411,7 +544,8 @@ class ScriptedModel(BaseModel):
         return item
 
 
-def build_model(mode: str, budget, config, *, system: Optional[str] = None) -> BaseModel:
+def build_model(mode: str, budget, config, *, system: Optional[str] = None,
+                priority: Optional[Priority] = None) -> BaseModel:
     """Construct the live model for a run from config, routing by model-id prefix.
 
     Multi-vendor (§3.1): `claude*` → AnthropicModel (the production target),
@@ -419,8 +553,16 @@ def build_model(mode: str, budget, config, *, system: Optional[str] = None) -> B
     The loop is vendor-neutral; switching vendors = changing `AGENT_MODEL_*` env vars,
     not code. Raises a clear error if the relevant vendor key is missing — the loop
     catches it and degrades (§3.2). Tests inject a ScriptedModel directly instead.
+
+    Models are cheap value objects: every model built for the same vendor key — across
+    cells, rows and runs — calls through the same pooled SDK client (client_pool).
+
+    `priority` is the rate-limiter class of the run's calls: INTERACTIVE (a user is waiting)
+    unless given, or BATCH for mode "grid". Grid-scale callers pass BATCH explicitly.
     """
     model_id = budget.model
+    if priority is None:
+        priority = Priority.BATCH if mode == "grid" else Priority.INTERACTIVE
 
     if model_id.startswith("claude"):
         key = getattr(config, "ANTHROPIC_API_KEY", "") or ""
@@ -429,7 +571,7 @@ def build_model(mode: str, budget, config, *, system: Optional[str] = None) -> B
                 "ANTHROPIC_API_KEY is not set — cannot run a live agent loop on Claude. "
                 "Set it, point AGENT_MODEL_* at an OpenAI id, or inject a model in tests."
             )
-        return AnthropicModel(model_id, key, system=system)
+        return AnthropicModel(model_id, key, system=system, priority=priority)
 
     # OpenAI (gpt-*, o-*, or any non-claude id) — the dev-now path.
     key = getattr(config, "OPENAI_API_KEY", "") or ""
@@ -437,4 +579,4 @@ def build_model(mode: str, budget, config, *, system: Optional[str] = None) -> B
         raise RuntimeError(
             f"OPENAI_API_KEY is not set — cannot run a live agent loop on {model_id!r}."
         )
-    return OpenAIModel(model_id, key, system=system)
+    return OpenAIModel(model_id, key, system=system, priority=priority)
@@ -0,0 +1,133 @@
+"""Speculative run preloads — start the slow scope loads, await them only when needed.
+
+The agent-core route used to finish two blocking loads before the first model call: the
+per-doc table-grid preload (`load_grids_for_docs(per_doc_top=20)`, sequential DB reads —
+seconds on a big vault) and the conversation history. Most first turns don't touch grids
+at all (the model searches first), so that wait was pure cold-start latency.
+
+A `Preload` starts each load on a background thread the moment its inputs are known:
+
+  • "history" is started before query embedding and routing, and awaited just before the
+    run (the first model call needs it) — it overlaps the scope assembly;
+  • "grids" is started after routing and NOT awaited by the route. The run begins with an
+    empty `scope.grids`; the first tool that reads grids (compute / list_metrics /
+    table_lookup / read_document — registry.execute calls `scope.await_grids()`) blocks
+    on it and joins the result into the scope exactly once. Every such tool therefore sees
+    the same grids it would have seen before.
+
+`stats()` reports each load's duration, how long the run actually blocked on it and the
+total `saved_ms` (load time hidden behind other work) — run_agent puts it in the meta
+event. A failed or timed-out load yields its default (grids: []), as the old best-effort
+preload did. AGENT_SPECULATIVE_PRELOAD=false makes the routes await everything up front.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+AGENT_SPECULATIVE_PRELOAD: bool = os.getenv("AGENT_SPECULATIVE_PRELOAD", "true").lower() == "true"
+AGENT_PRELOAD_WORKERS: int = int(os.getenv("AGENT_PRELOAD_WORKERS", "16"))
+AGENT_PRELOAD_TIMEOUT_S: float = float(os.getenv("AGENT_PRELOAD_TIMEOUT_S", "120"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=AGENT_PRELOAD_WORKERS,
+                                           thread_name_prefix="agent-preload")
+        return _executor
+
+
+class Preload:
+    """Named background loads for one run. Thread-safe; `wait` never raises."""
+
+    def __init__(self) -> None:
+        self._futures: Dict[str, Future] = {}
+        self._started: Dict[str, float] = {}
+        self._load_ms: Dict[str, float] = {}
+        self._waited_ms: Dict[str, float] = {}
+        self._joined: set = set()
+        self._lock = threading.Lock()
+        self._join_lock = threading.Lock()
+
+    def start(self, name: str, fn: Callable[[], Any]) -> None:
+        """Run `fn()` in the background under `name` (a second start is ignored)."""
+        with self._lock:
+            if name in self._futures:
+                return
+            self._started[name] = time.monotonic()
+            self._futures[name] = _pool().submit(self._timed, name, fn)
+
+    def _timed(self, name: str, fn: Callable[[], Any]) -> Any:
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self._load_ms[name] = (time.monotonic() - self._started[name]) * 1000
+
+    def wait(self, name: str, default: Any = None,
+             timeout: float = AGENT_PRELOAD_TIMEOUT_S) -> Any:
+        """Block until `name` has loaded and return its result (`default` when it was never
+        started, failed or timed out). The blocked time is counted against the savings."""
+        with self._lock:
+            future = self._futures.get(name)
+        if future is None:
+            return default
+        t0 = time.monotonic()
+        try:
+            return future.result(timeout=timeout)
+        except Exception as exc:  # noqa: BLE001 — a preload is best-effort
+            logger.warning("[agentcore.preload] %s preload unavailable: %s", name,
+                           exc or type(exc).__name__)
+            return default
+        finally:
+            with self._lock:
+                self._waited_ms[name] = (self._waited_ms.get(name, 0.0)
+                                         + (time.monotonic() - t0) * 1000)
+
+    def join_grids(self, scope_grids: List[Any], name: str = "grids") -> None:
+        """Join the `name` preload into `scope_grids` once; concurrent callers wait for the
+        first join to finish (so no tool ever reads a half-joined scope)."""
+        with self._lock:
+            if name in self._joined or name not in self._futures:
+                return
+        with self._join_lock:
+            if name in self._joined:
+                return
+            fresh = self.wait(name, default=[]) or []
+            if fresh:
+                if scope_grids:
+                    from .tools.read import join_scope_grids
+                    join_scope_grids(scope_grids, fresh)
+                else:
+                    scope_grids.extend(fresh)      # the usual case: exactly the old preload
+            with self._lock:
+                self._joined.add(name)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per load: its duration (or the time it has run so far) and the time the run was
+        blocked on it; `saved_ms` = the load time hidden behind other work."""
+        now = time.monotonic()
+        out: Dict[str, Any] = {}
+        saved = 0.0
+        with self._lock:
+            for name, started in self._started.items():
+                done = name in self._load_ms
+                ms = self._load_ms[name] if done else (now - started) * 1000
+                waited = self._waited_ms.get(name, 0.0)
+                out[name] = {"ms": round(ms, 1), "waited_ms": round(waited, 1),
+                             "done": done, "used": name in self._waited_ms}
+                saved += max(0.0, ms - waited)
+        out["saved_ms"] = round(saved, 1)
+        return out
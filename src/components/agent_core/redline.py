@@ -17,14 +17,20 @@ a MISSING or ABSTAIN finding — the honest answer, never a hallucination.
 
 The model is injected (model_factory), so this is fully offline-testable without a
 live API call.
+
+Playbook rows are independent (each is its own bounded agent over the same one-doc scope),
+so they run concurrently — at most REDLINE_CONCURRENCY at a time — and findings come back
+tagged with their row index; `build_redline` still returns them in playbook order.
 """
 
 from __future__ import annotations
 
 import json
 import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from .budgets import Budget
 from .loop import run_agent, GateOutcome
@@ -37,6 +43,11 @@ _REDLINE_MAX_STEPS = 8
 _REDLINE_WALL_S = 120.0
 _REDLINE_TOKEN_BUDGET = 35_000
 
+# Playbook rows evaluated at once. The rows share one read-only scope (the tools' grid
+# joins are lock-guarded), so the only cost of going wider is LLM rate-limiter pressure.
+# 1 = the old one-row-at-a-time loop.
+REDLINE_CONCURRENCY = max(1, int(os.environ.get("REDLINE_CONCURRENCY", "4")))
+
 
 @dataclass
 class RedlineFinding:
@@ -204,6 +215,63 @@ def build_redline_cell(
     )
 
 
+def run_redline_row(
+    row: Dict[str, Any],
+    model_factory: Callable,
+    scope: RunScope,
+    doc_name: str,
+) -> RedlineFinding:
+    """`build_redline_cell` for one playbook row. Never raises — a malformed row or an
+    unexpected error becomes an abstain finding for that topic."""
+    try:
+        return build_redline_cell(
+            row["clause_topic"],
+            row["standard_position"],
+            row.get("fallback_position"),
+            model_factory,
+            scope,
+            doc_name,
+        )
+    except Exception as exc:
+        logger.warning("[redline] cell error '%s': %s", row.get("clause_topic"), exc)
+        return RedlineFinding(
+            clause_topic=row.get("clause_topic", "unknown"),
+            status="abstain", target_quote=None, deviation=None,
+            suggested_edit=None, rationale=f"Unexpected error: {exc}",
+            playbook_standard=row.get("standard_position", ""),
+        )
+
+
+def iter_redline_findings(
+    playbook_rows: List[Dict[str, Any]],
+    model_factory: Callable,
+    scope: RunScope,
+    doc_name: str,
+    *,
+    concurrency: int = REDLINE_CONCURRENCY,
+) -> Iterator[Tuple[int, RedlineFinding]]:
+    """Yield `(row_index, finding)` for every playbook row as each completes, with at most
+    `concurrency` rows in flight (rows start in playbook order). `concurrency` 1 runs them
+    inline, in order. Never raises."""
+    if concurrency <= 1 or len(playbook_rows) <= 1:
+        for i, row in enumerate(playbook_rows):
+            yield i, run_redline_row(row, model_factory, scope, doc_name)
+        return
+
+    nxt = 0
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(playbook_rows)),
+                            thread_name_prefix="redline-row") as pool:
+        in_flight: Dict[Any, int] = {}
+        while nxt < len(playbook_rows) or in_flight:
+            while nxt < len(playbook_rows) and len(in_flight) < concurrency:
+                fut = pool.submit(run_redline_row, playbook_rows[nxt], model_factory, scope, doc_name)
+                in_flight[fut] = nxt
+                nxt += 1
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in sorted(finished, key=in_flight.__getitem__):
+                yield in_flight.pop(fut), fut.result()
+
+
 def build_redline(
     playbook_rows: List[Dict[str, Any]],
     model_factory: Callable,
@@ -211,29 +279,18 @@ def build_redline(
     doc_id: str,
     doc_name: str,
     playbook_id: Optional[str] = None,
+    *,
+    concurrency: int = REDLINE_CONCURRENCY,
 ) -> RedlineResult:
     """Run the full redline for one document against a set of playbook rows.
 
-    Runs cells sequentially (same discipline as build_grid). Never raises.
+    Rows run concurrently (`iter_redline_findings`); findings are returned in playbook
+    order. Never raises.
     """
     result = RedlineResult(doc_id=doc_id, doc_name=doc_name, playbook_id=playbook_id)
-    for row in playbook_rows:
-        try:
-            finding = build_redline_cell(
-                clause_topic=row["clause_topic"],
-                standard_position=row["standard_position"],
-                fallback_position=row.get("fallback_position"),
-                model_factory=model_factory,
-                scope=scope,
-                doc_name=doc_name,
-            )
-            result.findings.append(finding)
-        except Exception as exc:
-            logger.warning("[redline] cell error '%s': %s", row.get("clause_topic"), exc)
-            result.findings.append(RedlineFinding(
-                clause_topic=row.get("clause_topic", "unknown"),
-                status="abstain", target_quote=None, deviation=None,
-                suggested_edit=None, rationale=f"Unexpected error: {exc}",
-                playbook_standard=row.get("standard_position", ""),
-            ))
+    by_row: Dict[int, RedlineFinding] = dict(
+        iter_redline_findings(playbook_rows, model_factory, scope, doc_name,
+                              concurrency=concurrency)
+    )
+    result.findings = [by_row[i] for i in range(len(playbook_rows))]
     return result
@@ -8,12 +8,22 @@ chips" work (§3.3): a tool the mode doesn't allow is simply not offered to the
 
 `execute` NEVER raises — the adapters are `@safe_tool`, and the registry guards
 unknown tools / bad args with an error envelope too (the §3.2 contract).
+
+Read-only results are memoized per run (or per grid job) through the scope's `ToolMemo`:
+agents re-issue the same search / read within a run and across the cells of a grid row,
+and each repeat re-embedded the query and re-hit Pinecone / Supabase. See ToolMemo.
 """
 
 from __future__ import annotations
 
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from .model import ToolCall
 from .tools import (
@@ -27,6 +37,12 @@ from .tools import (
     table_lookup as table_tool,
 )
 from .tools._envelope import error_result
+from .tools.read import join_scope_grids, scope_grid_keys
+
+logger = logging.getLogger(__name__)
+
+AGENT_TOOL_MEMO: bool = os.getenv("AGENT_TOOL_MEMO", "true").lower() == "true"
+AGENT_TOOL_MEMO_MAX: int = int(os.getenv("AGENT_TOOL_MEMO_MAX", "256"))   # entries per memo
 
 
 @dataclass
@@ -64,6 +80,24 @@ class RunScope:
     # allow-list, so the agent physically cannot retrieve a source the user turned off — the
     # chip gates the backend, not just the UI. None ⇒ no restriction (all in-scope types).
     kb_instrument_types: Optional[List[str]] = None
+    # The request's cancellation.CancelToken (fired when the SSE client disconnects).
+    # run_agent checks it between steps; tools that fan out LLM work (survey_collection's
+    # Brain MAP) pass it down so a closed tab stops paying. None ⇒ never cancelled.
+    cancel: Any = None
+    # The run's (or grid job's) ToolMemo — repeated read-only calls are served from it.
+    # run_agent installs a fresh one when None; a grid job shares one across its cells.
+    memo: Optional["ToolMemo"] = None
+    # A review-grid cell's warm doc_context.DocContext (its row's shared candidate pool):
+    # search_vault scoped to exactly that doc is re-scored locally against it. None ⇒ live.
+    doc_context: Any = None
+    # The route's speculative preload.Preload: `grids` may still be loading when the run
+    # starts. The grid-reading tools call await_grids() first. None ⇒ `grids` is complete.
+    preload: Any = None
+
+    def await_grids(self) -> None:
+        """Block until the speculative grid preload (if any) has joined `grids`."""
+        if self.preload is not None:
+            self.preload.join_grids(self.grids)
 
     def scope_dict(self) -> Dict[str, Any]:
         d: Dict[str, Any] = {
@@ -114,9 +148,149 @@ _MODE_TOOLS = {
 }
 
 
+# Tools the loop may run CONCURRENTLY when one model turn calls several (loop.py batches a
+# run of consecutive parallel-safe calls). Each is a pure read — a Pinecone / Supabase
+# round-trip that neither reads nor writes the run's mutable state, except read_document's
+# de-duplicated join into scope.grids, which it does under a lock. compute / list_metrics /
+# table_lookup read scope.grids (in-memory, fast) and so stay sequential after a read that
+# may grow it; survey_collection fans out LLM work of its own.
+_PARALLEL_SAFE = frozenset({"search_vault", "read_document", "search_knowledge"})
+
+
+# Tools whose result is a pure function of (args, scope) — safe to serve from the memo.
+# read_document's one side effect (joining fresh grids into scope.grids) is replayed on a
+# hit; compute / list_metrics / table_lookup read the mutable scope.grids and are cheap.
+_MEMOIZABLE = frozenset({"search_vault", "read_document", "search_knowledge",
+                         "survey_collection"})
+
+# Tools that read scope.grids — they wait for a speculative grid preload (preload.py).
+_GRID_TOOLS = frozenset({"compute", "list_metrics", "table_lookup", "read_document"})
+
+
+class ToolMemo:
+    """Read-only tool results for the lifetime of one run or one grid job.
+
+    Keyed by (tool name, canonicalized args, scope fingerprint): the vault scope, filters,
+    owner, KB allow-list, question, filename map and the identity of the live retrieval /
+    db clients — so two cells of different docs (or two tenants) can never share an entry.
+    read_document also keys on the grids its scope already holds (its result depends on
+    them). Only ok results are stored, deep-copied in and out: a hit hands the loop a fresh
+    envelope, which it records into the run's EvidenceLedger at the current step exactly as
+    a live call would. Concurrent identical calls (a grid row's cells asking the same thing
+    at once) run once — the others wait for it. At most `max_entries` are kept; beyond
+    that calls simply run. Thread-safe; never raises into the registry.
+    """
+
+    def __init__(self, max_entries: int = AGENT_TOOL_MEMO_MAX):
+        self.max_entries = max_entries
+        self._entries: Dict[str, tuple] = {}        # key → (result, grids joined by the call)
+        self._pending: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(name: str, args: Dict[str, Any], scope: "RunScope") -> Optional[str]:
+        """The memo key for a call, or None when the tool isn't memoizable."""
+        if name not in _MEMOIZABLE:
+            return None
+        fp = {
+            "tool": name,
+            "args": {k: v for k, v in (args or {}).items() if v is not None},
+            "scope": scope.scope_dict(),
+            "owner": scope.vault_owner,
+            "kb_types": scope.kb_instrument_types,
+            "question": scope.question,
+            "names": scope.filename_by_doc,
+            "deps": [id(scope.retrieval_manager), id(scope.kb_retrieval_manager),
+                     id(scope.db_client), id(scope.config)],
+        }
+        if name == "read_document":
+            fp["grids"] = scope_grid_keys(scope.grids)
+        raw = json.dumps(fp, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()  # noqa: S324 — not security
+
+    def _hit(self, key: str, scope: "RunScope") -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self.hits += 1
+        result, joined = entry
+        if joined and scope.grids is not None:
+            join_scope_grids(scope.grids, joined)
+        out = copy.deepcopy(result)
+        out["_memo_hit"] = True
+        return out
+
+    def run(self, name: str, args: Dict[str, Any], scope: "RunScope",
+            fn: Callable[[Optional[List[Any]]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Serve `name(args)` from the memo, or run `fn(joined)` once and remember it.
+        `fn` receives a list to collect the grids the call joins into the scope."""
+        try:
+            key = self.key(name, args, scope)
+        except Exception as exc:  # noqa: BLE001 — an unkeyable call just runs
+            logger.debug("[registry.memo] unkeyable %s call: %s", name, exc)
+            key = None
+        if key is None:
+            return fn(None)
+        while True:
+            hit = self._hit(key, scope)
+            if hit is not None:
+                return hit
+            with self._lock:
+                if key in self._entries:
+                    continue
+                waiter = self._pending.get(key)
+                if waiter is None:
+                    self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+            waiter.wait(timeout=120)
+            with self._lock:
+                if key not in self._entries:          # the leader failed or timed out
+                    self.misses += 1
+                    return fn(None)
+        joined: List[Any] = []
+        try:
+            result = fn(joined)
+            if result.get("ok"):
+                self._store(key, result, joined)
+                if name == "read_document":
+                    # The call may have grown scope.grids; the same read from the grown
+                    # scope (the model's usual repeat) returns these same grids.
+                    after = self.key(name, args, scope)
+                    if after and after != key:
+                        self._store(after, result, joined)
+            return result
+        finally:
+            with self._lock:
+                ev = self._pending.pop(key, None)
+            if ev is not None:
+                ev.set()
+
+    def _store(self, key: str, result: Dict[str, Any], joined: List[Any]) -> None:
+        try:
+            entry = (copy.deepcopy(result), list(joined))
+        except Exception as exc:  # noqa: BLE001 — an uncopyable result just isn't memoized
+            logger.debug("[registry.memo] not storing result: %s", exc)
+            return
+        with self._lock:
+            if key in self._entries or len(self._entries) < self.max_entries:
+                self._entries[key] = entry
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
 class ToolRegistry:
     """Schemas + dispatch. One instance per process is fine (stateless besides config)."""
 
+    def parallel_safe(self, name: str) -> bool:
+        """May a call to tool `name` run concurrently with other parallel-safe calls?"""
+        return name in _PARALLEL_SAFE
+
     def schemas(self, mode: str, *, tools: Optional[List[str]] = None,
                 include_knowledge: bool = False) -> List[Dict[str, Any]]:
         """The tool schemas exposed for a run, in the model's native tool shape.
@@ -151,7 +325,25 @@ class ToolRegistry:
         return out
 
     def execute(self, call: ToolCall, scope: RunScope) -> Dict[str, Any]:
-        """Dispatch one ToolCall to its adapter with scope-injected deps. Never raises."""
+        """Dispatch one ToolCall to its adapter with scope-injected deps. Never raises.
+
+        With a `scope.memo`, a repeated read-only call is served from it — the result then
+        carries `_memo_hit: True`, which the loop pops before recording it. A grid-reading
+        tool first waits for the run's speculative grid preload (before the memo key, which
+        for read_document depends on the grids)."""
+        if call.name in _GRID_TOOLS and getattr(scope, "preload", None) is not None:
+            scope.await_grids()
+        memo = getattr(scope, "memo", None)
+        if memo is not None and AGENT_TOOL_MEMO:
+            try:
+                return memo.run(call.name, call.args or {}, scope,
+                                lambda joined: self._dispatch(call, scope, joined))
+            except Exception as exc:  # noqa: BLE001 — a memo fault must never fail the call
+                logger.warning("[registry.memo] bypassed for %s: %s", call.name, exc)
+        return self._dispatch(call, scope, None)
+
+    def _dispatch(self, call: ToolCall, scope: RunScope,
+                  joined: Optional[List[Any]]) -> Dict[str, Any]:
         name = call.name
         args = call.args or {}
         try:
@@ -192,6 +384,7 @@ class ToolRegistry:
                     # Live (2026-06-11) the model read the right doc but compute
                     # couldn't see it — "document not in scope".
                     scope_grids=scope.grids,
+                    joined=joined,
                 )
 
             if name == "search_knowledge":
@@ -225,6 +418,7 @@ class ToolRegistry:
                     filename_by_doc=scope.filename_by_doc,
                     k_docs=args.get("k_docs"),
                     per_doc_k=args.get("per_doc_k", 8),
+                    cancel=scope.cancel,
                 )
 
             if name == "search_vault":
@@ -259,9 +453,13 @@ class ToolRegistry:
                 # UI's filter (e.g. "FY2023 only" must hold even if the model omits it).
                 if scope.filters:
                     merged["filters"] = {**(model_scope.get("filters") or {}), **scope.filters}
+                manager = scope.retrieval_manager
+                ctx = scope.doc_context
+                if ctx is not None and manager is not None and ctx.serves(merged):
+                    manager = ctx.retriever(manager)   # the row's pool first, live fallback
                 return search_tool(
                     args.get("query", ""),
-                    scope.retrieval_manager,
+                    manager,
                     scope=merged,
                     k=args.get("k", 8),
                     kind=args.get("kind", "both"),
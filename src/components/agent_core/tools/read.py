@@ -17,10 +17,15 @@ Gate: extraction benchmark (the grids themselves, exists, 100%); `eval/test_tool
 
 from __future__ import annotations
 
+import threading
 from typing import Any, Dict, List, Optional
 
 from ._envelope import error_result, ok_result, safe_tool
 
+# The loop may run several read_document calls of one turn concurrently (registry
+# _PARALLEL_SAFE); their joins into the shared scope grid list must not interleave.
+_SCOPE_GRIDS_LOCK = threading.Lock()
+
 SCHEMA: Dict[str, Any] = {
     "name": "read_document",
     "description": (
@@ -61,6 +66,33 @@ def _grid_to_json(g: Any) -> Dict[str, Any]:
     }
 
 
+def _grid_key(g: Any):
+    return (getattr(g, "doc", None), getattr(g, "page", None), getattr(g, "table_id", None))
+
+
+def join_scope_grids(scope_grids: List[Any], fresh: List[Any]) -> List[Any]:
+    """Append the grids of `fresh` not already in `scope_grids` (same doc/page/table) and
+    return the ones joined. Also used by the registry's tool memo to replay a cached read's
+    join into another run's scope."""
+    added: List[Any] = []
+    with _SCOPE_GRIDS_LOCK:
+        seen = {_grid_key(g) for g in scope_grids}
+        for g in fresh:
+            k = _grid_key(g)
+            if k not in seen:
+                scope_grids.append(g)
+                seen.add(k)
+                added.append(g)
+    return added
+
+
+def scope_grid_keys(scope_grids: Optional[List[Any]]) -> List[str]:
+    """A stable, sorted view of which grids a scope holds (the tool memo's read_document key)."""
+    with _SCOPE_GRIDS_LOCK:
+        keys = [_grid_key(g) for g in scope_grids or []]
+    return sorted(repr(k) for k in keys)
+
+
 def _parse_page_range(page_range: Optional[str]):
     if not page_range:
         return None
@@ -86,10 +118,12 @@ def read_document(
     table_grids: bool = True,
     scope_grids: Optional[List[Any]] = None,
     owner_id: Optional[str] = None,
+    joined: Optional[List[Any]] = None,
 ) -> Dict[str, Any]:
     """Read grids (+ optional page text) for `doc_id`; return the §3.3 envelope.
 
     Provenance lists one span per grid (doc/page) so the ledger records what was read.
+    `joined`, when given, receives the grids this call newly joined into `scope_grids`.
     """
     if not doc_id and not grids:
         return error_result("read_document requires a 'doc_id' (or pre-loaded grids)")
@@ -125,14 +159,9 @@ def read_document(
             owner_id=owner_id,  # F2m: shared matter ⇒ read the owner's chunks
         )
         if fresh and scope_grids is not None:
-            seen = {(getattr(g, "doc", None), getattr(g, "page", None),
-                     getattr(g, "table_id", None)) for g in scope_grids}
-            for g in fresh:
-                k = (getattr(g, "doc", None), getattr(g, "page", None),
-                     getattr(g, "table_id", None))
-                if k not in seen:
-                    scope_grids.append(g)
-                    seen.add(k)
+            added = join_scope_grids(scope_grids, fresh)
+            if joined is not None:
+                joined.extend(added)
         return fresh
 
     def _doc_like(grid_doc: Any, want: str) -> bool:
@@ -149,7 +178,8 @@ def read_document(
         # Pre-loaded path: the run scope already holds grids. Honor the model's doc_id
         # against the grids' doc labels (the model knows docs by the filename it saw in
         # search results).
-        loaded = list(grids)
+        with _SCOPE_GRIDS_LOCK:
+            loaded = list(grids)
         if doc_id:
             scoped = [g for g in loaded if _doc_like(getattr(g, "doc", None), doc_id)]
             if scoped:
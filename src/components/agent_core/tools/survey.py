@@ -29,10 +29,22 @@ the one end-to-end deep run (Jeel's go).
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.components.cancellation import is_cancelled
 
 from ._envelope import error_result, ok_result, safe_tool
 
+logger = logging.getLogger(__name__)
+
+# Per-document retrievals in flight at once. Each is one Pinecone round-trip (I/O-bound);
+# the bound keeps a 40-doc vault from opening 40 connections at the same moment.
+SURVEY_RETRIEVE_CONCURRENCY = max(1, int(os.environ.get("SURVEY_RETRIEVE_CONCURRENCY", "8")))
+
 SCHEMA: Dict[str, Any] = {
     "name": "survey_collection",
     "description": (
@@ -89,21 +101,50 @@ def _span_from_evidence(ev: Any, filename_by_doc: Dict[str, str]) -> Dict[str, A
     }
 
 
+def _embed_once(query: str, retrieval_manager: Any) -> Tuple[Optional[list], float]:
+    """Embed the topic once for every per-doc search → (embedding or None, ms). None when
+    the manager can't (a stub, or the embed call failed) — each retrieve then embeds."""
+    embed = getattr(retrieval_manager, "embed_query", None)
+    if embed is None:
+        return None, 0.0
+    t0 = time.perf_counter()
+    try:
+        return embed(query), (time.perf_counter() - t0) * 1000
+    except Exception as exc:  # noqa: BLE001 — fall back to the per-call embed
+        logger.warning("[survey] topic embed failed (%s) — embedding per doc", exc)
+        return None, 0.0
+
+
 def _retrieve_per_doc(
     query: str,
     retrieval_manager: Any,
     filenames: List[str],
     per_doc_k: int,
-) -> Dict[str, tuple]:
-    """Broad per-document retrieval → `{doc_id: (filename, [chunks])}` for the MAP step.
+    *,
+    concurrency: int = SURVEY_RETRIEVE_CONCURRENCY,
+    cancel: Any = None,
+) -> Tuple[Dict[str, tuple], Dict[str, Any]]:
+    """Broad per-document retrieval → (`{doc_id: (filename, [chunks])}` for the MAP step,
+    the retrieval timings for the envelope).
 
     Mirrors the breadth retrieval the Brain path uses (chat.py): per-file retrieve with
     `apply_threshold=False` (MAP+the gate handle precision; the 0.30 similarity floor
     drops valid cross-doc chunks) and `use_reranker=False` (the local CrossEncoder
     timed out under concurrent load and silently dropped whole docs). A per-file failure
-    is non-fatal — that doc simply contributes nothing, like a Brain MAP miss."""
-    doc_chunks: Dict[str, tuple] = {}
-    for fname in filenames:
+    is non-fatal — that doc simply contributes nothing, like a Brain MAP miss.
+
+    The topic is embedded ONCE and every file's search reuses the vector; the per-file
+    searches run `concurrency` at a time. Results keep the `filenames` order (the MAP order),
+    whichever finishes first. Once `cancel` fires no further file is searched."""
+    t_start = time.perf_counter()
+    embedding, embed_ms = _embed_once(query, retrieval_manager)
+    extra = {"query_embedding": embedding} if embedding is not None else {}
+    per_doc_ms: Dict[str, float] = {}
+
+    def _one(fname: str) -> list:
+        if is_cancelled(cancel):
+            return []
+        t0 = time.perf_counter()
         try:
             chunks = retrieval_manager.retrieve(
                 query,
@@ -113,13 +154,33 @@ def _retrieve_per_doc(
                 per_doc_k,    # top_k
                 False,        # apply_threshold=False
                 False,        # use_reranker=False
+                **extra,
             )
         except Exception:  # noqa: BLE001 — a dead doc is non-fatal (quorum logic)
             chunks = []
+        per_doc_ms[fname] = round((time.perf_counter() - t0) * 1000, 1)
+        return chunks or []
+
+    workers = max(1, min(concurrency, len(filenames)))
+    if workers == 1:
+        results = [_one(f) for f in filenames]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="survey-retrieve") as pool:
+            results = list(pool.map(_one, filenames))
+
+    doc_chunks: Dict[str, tuple] = {}
+    for fname, chunks in zip(filenames, results):
         if chunks:
             doc_id = chunks[0].metadata.get("doc_id", fname)
             doc_chunks[doc_id] = (fname, chunks)
-    return doc_chunks
+    timings = {
+        "wall_ms": round((time.perf_counter() - t_start) * 1000, 1),
+        "embed_ms": round(embed_ms, 1),
+        "embedded_once": embedding is not None,
+        "concurrency": workers,
+        "per_doc_ms": {f: per_doc_ms[f] for f in filenames if f in per_doc_ms},
+    }
+    return doc_chunks, timings
 
 
 @safe_tool
@@ -132,12 +193,16 @@ def survey_collection(
     filename_by_doc: Optional[Dict[str, str]] = None,
     k_docs: Optional[int] = None,
     per_doc_k: int = 8,
+    cancel: Any = None,
 ) -> Dict[str, Any]:
     """Survey the whole vault; return §3.3 envelope with cited evidence CLUSTERS.
 
     `retrieval_manager` is the live `RetrievalManager`; `config` is the user Config the
     demoted Brain MAP step runs on. `filenames` is the vault's routed doc set (one
     cluster per relevant doc). Returns evidence, never a written answer; never raises.
+    `cancel` is the run's CancelToken, handed to the MAP fan-out (docs not yet mapped when
+    the client disconnects are skipped) and checked before each per-doc search.
+    `data["retrieval"]` reports the topic embed, the wall time and each doc's search ms.
     """
     if not query:
         return error_result("survey_collection requires a non-empty 'query'")
@@ -164,19 +229,24 @@ def survey_collection(
     per_doc_k = max(1, int(per_doc_k or 8))
 
     # ── Broad pass: per-doc retrieval → the demoted Brain MAP step (NO reduce) ───────
-    doc_chunks = _retrieve_per_doc(query, retrieval_manager, filenames, per_doc_k)
+    doc_chunks, retrieval = _retrieve_per_doc(query, retrieval_manager, filenames, per_doc_k,
+                                              cancel=cancel)
     if not doc_chunks:
         # No relevant content anywhere — a clean, honest survey result (not an error).
         return ok_result(
             summary=f"survey_collection {query!r}: no relevant passages across {len(filenames)} doc(s)",
-            data={"clusters": [], "docs_surveyed": len(filenames), "docs_with_evidence": 0},
+            data={"clusters": [], "docs_surveyed": len(filenames), "docs_with_evidence": 0,
+                  "retrieval": retrieval},
             provenance=[],
         )
 
     from src.components.brain.map_reduce import Brain
 
     brain = Brain(config)
-    extracts = brain._map_all_docs(query, doc_chunks)  # the demoted map step — evidence only
+    # The demoted map step — evidence only. `cancel` only when the run has a token, so the
+    # call is exactly the pre-cancellation one otherwise (and MAP stand-ins keep working).
+    extracts = brain._map_all_docs(query, doc_chunks,
+                                   **({"cancel": cancel} if cancel is not None else {}))
 
     # ── Shape per-doc extracts into ranked, cited clusters (one per doc) ─────────────
     # A "cluster" is the natural survey unit: a document's relevant claims, each carrying
@@ -227,6 +297,8 @@ def survey_collection(
             "clusters": clusters,
             "docs_surveyed": len(filenames),
             "docs_with_evidence": docs_with_evidence,
+            # Per-doc retrieval latency (ms) + the one topic embed, for tracing slow docs.
+            "retrieval": retrieval,
         },
         provenance=all_provenance,
     )
@@ -13,22 +13,47 @@ So the next loose end shows up in the journal + health flags, not after five UI
 Pure bookkeeping — never raises into the loop (a tracer failure must never break a run).
 
 Journal path: <TRACE_DIR>/run-<id>.jsonl  (TRACE_DIR = AGENT_TRACE_DIR env or /tmp/
-docquery_traces). One JSON object per line; the last line is the `health` summary.
+docquery_traces). One JSON object per line; the first is `run_meta`, the last is the
+`health` summary.
+
+The journal is STREAMED, not built in memory: each event is queued as it is recorded and a
+background writer thread appends it (one process-wide writer, a bounded queue of
+AGENT_TRACE_QUEUE lines). Recording never waits on the disk — when the queue is full the
+line is dropped and counted (`trace_dropped` in health). The health line itself waits
+briefly for room. When a journal is closed the writer prunes the oldest journals until the
+directory is under AGENT_TRACE_DIR_MAX_MB (size-based rotation). AGENT_TRACE_ASYNC=false
+writes each line inline instead.
+
+Latency SPANS: the loop (run_agent(tracer=...)) times every model call, tool execution and
+output-gate pass and hands them to `add_span`; each becomes a `span` line with its start /
+end offset from the run start (ms). health carries the run's p50/p95 per kind and per
+tool; `summarize_journals` (CLI: eval/trace_summary.py) aggregates the same across journals.
 """
 
 from __future__ import annotations
 
+import glob
 import json
 import logging
+import math
 import os
+import queue
+import threading
+import time
 from collections import Counter, defaultdict
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 logger = logging.getLogger(__name__)
 
 _DEFAULT_DIR = "/tmp/docquery_traces"
 
+AGENT_TRACE_ASYNC: bool = os.getenv("AGENT_TRACE_ASYNC", "true").lower() == "true"
+AGENT_TRACE_QUEUE: int = int(os.getenv("AGENT_TRACE_QUEUE", "10000"))
+AGENT_TRACE_DIR_MAX_MB: float = float(os.getenv("AGENT_TRACE_DIR_MAX_MB", "256"))
+
+_CLOSE_WAIT_S = 1.0   # how long finish() waits for queue room for the health line
+
 
 def _trace_dir() -> str:
     d = os.environ.get("AGENT_TRACE_DIR", _DEFAULT_DIR)
@@ -39,19 +64,196 @@ def _trace_dir() -> str:
     return d
 
 
+def _rotate(directory: str, keep: Iterable[str] = ()) -> int:
+    """Delete the oldest run journals until `directory` is under AGENT_TRACE_DIR_MAX_MB.
+    Journals still open (`keep`) are never deleted. Returns how many were removed."""
+    cap = AGENT_TRACE_DIR_MAX_MB * 1024 * 1024
+    keep = set(keep)
+    files = []
+    for path in glob.glob(os.path.join(directory, "run-*.jsonl")):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _m, size, _p in files)
+    removed = 0
+    for _mtime, size, path in sorted(files):
+        if total <= cap:
+            break
+        if path in keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+class _JournalWriter:
+    """The process-wide background journal writer: a bounded queue drained by one daemon
+    thread that appends lines to their journal files (kept open until the run closes)."""
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self.maxsize = maxsize or AGENT_TRACE_QUEUE
+        self.stats = {"written": 0, "dropped": 0, "journals": 0, "rotated": 0}
+        self._q: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def _ensure(self) -> queue.Queue:
+        with self._lock:
+            # A forked child must not inherit its parent's (dead) writer thread.
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._q = queue.Queue(maxsize=self.maxsize)
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, args=(self._q,),
+                                                name="trace-writer", daemon=True)
+                self._thread.start()
+            return self._q
+
+    def _enqueue(self, item: tuple, wait: bool) -> bool:
+        try:
+            self._ensure().put(item, block=wait, timeout=_CLOSE_WAIT_S if wait else None)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.stats["dropped"] += 1
+            return False
+
+    def write(self, path: str, line: str, wait: bool = False) -> bool:
+        """Queue one journal line (never blocks unless `wait`). False = dropped."""
+        if not AGENT_TRACE_ASYNC:
+            with self._sync_lock:
+                self._append(path, line)
+            return True
+        return self._enqueue(("line", path, line), wait)
+
+    def close(self, path: str) -> None:
+        """Close `path` once its queued lines are written, then rotate its directory."""
+        if not AGENT_TRACE_ASYNC:
+            self._closed(path)
+            return
+        self._enqueue(("close", path, None), True)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every line queued so far is on disk (tests, shutdown)."""
+        if not AGENT_TRACE_ASYNC:
+            return True
+        done = threading.Event()
+        if not self._enqueue(("flush", None, done), True):
+            return False
+        return done.wait(timeout)
+
+    # ── the writer thread ──
+    def _append(self, path: str, line: str, handles: Optional[Dict[str, Any]] = None) -> None:
+        if handles is None:
+            with open(path, "a") as f:
+                f.write(line + "\n")
+        else:
+            f = handles.get(path)
+            if f is None:
+                f = handles[path] = open(path, "a")
+            f.write(line + "\n")
+        with self._lock:
+            self.stats["written"] += 1
+
+    def _closed(self, path: str, open_paths: Iterable[str] = ()) -> None:
+        removed = _rotate(os.path.dirname(path), keep=open_paths)
+        with self._lock:
+            self.stats["journals"] += 1
+            self.stats["rotated"] += removed
+
+    def _run(self, q: queue.Queue) -> None:
+        handles: Dict[str, Any] = {}
+        while True:
+            batch = [q.get()]
+            while True:          # drain what's there, then flush once per batch
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            for kind, path, payload in batch:
+                try:
+                    if kind == "line":
+                        self._append(path, payload, handles)
+                    elif kind == "close":
+                        f = handles.pop(path, None)
+                        if f is not None:
+                            f.close()
+                        self._closed(path, open_paths=handles)
+                    elif kind == "flush":
+                        for f in handles.values():
+                            f.flush()
+                        payload.set()
+                except Exception as exc:  # noqa: BLE001 — a bad line/disk never kills the writer
+                    logger.warning("[agentcore.tracer] journal write failed: %s", exc)
+            for f in handles.values():
+                try:
+                    f.flush()
+                except Exception:  # noqa: BLE001
+                    pass
+
+
+_WRITER = _JournalWriter()
+
+
+def flush_journals(timeout: float = 5.0) -> bool:
+    """Block until every journal line recorded so far is written (tests, shutdown)."""
+    return _WRITER.flush(timeout)
+
+
+def writer_stats() -> Dict[str, int]:
+    with _WRITER._lock:
+        return dict(_WRITER.stats)
+
+
+def _pct(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of `values` (non-empty)."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def _latency(values: List[float]) -> Dict[str, float]:
+    return {"n": len(values), "p50_ms": round(_pct(values, 50), 1),
+            "p95_ms": round(_pct(values, 95), 1), "max_ms": round(max(values), 1),
+            "total_ms": round(sum(values), 1)}
+
+
+def _span_latency(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """p50/p95 per span kind (model / tool / gate) and per tool."""
+    by_kind: Dict[str, List[float]] = defaultdict(list)
+    by_tool: Dict[str, List[float]] = defaultdict(list)
+    for sp in spans:
+        by_kind[sp.get("kind", "?")].append(sp.get("ms", 0.0))
+        if sp.get("kind") == "tool":
+            by_tool[sp.get("name", "?")].append(sp.get("ms", 0.0))
+    out: Dict[str, Any] = {k: _latency(v) for k, v in by_kind.items()}
+    if by_tool:
+        out["tools"] = {k: _latency(v) for k, v in sorted(by_tool.items())}
+    return out
+
+
 @dataclass
 class RunTracer:
-    """Accumulates every event of one run, persists a JSONL journal, computes health.
+    """Streams every event of one run to its JSONL journal, times spans, computes health.
 
-    The loop calls `record(event)` on each §3.6 event it yields. `finish()` writes the
-    journal + returns the health summary (also yielded as a `trace_health` event so the
-    UI/route can surface it). Designed to be wrapped around the loop generator so NO loop
-    code changes except one `tracer.record(ev)` per yielded event.
+    The loop calls `record(event)` on each §3.6 event it yields; the event is queued for
+    the journal and folded into the rolling health signals — nothing else is kept, so a
+    long deep run costs O(distinct tools) memory, not O(events). `add_span` records one
+    timed model call / tool execution / gate pass (run_agent(tracer=...) calls it).
+    `finish()` appends the health summary, closes the journal and returns health (also
+    yielded as a `trace_health` event so the UI/route can surface it). Designed to be
+    wrapped around the loop generator so NO loop code changes except one
+    `tracer.record(ev)` per yielded event. Thread-safe (tool spans come from workers).
     """
     run_id: str
     question: str = ""
     mode: str = "standard"
-    events: List[Dict[str, Any]] = field(default_factory=list)
 
     # rolling signals (so health is O(events), no second pass)
     _tool_calls: Counter = field(default_factory=Counter)
@@ -59,30 +261,76 @@ class RunTracer:
     _tool_fail: Counter = field(default_factory=Counter)       # ok=false
     _call_sigs: Counter = field(default_factory=Counter)       # (name,args) repeats
     _gate_fails: Counter = field(default_factory=Counter)
+    _memo_hits: Counter = field(default_factory=Counter)      # served from the tool memo
     _last_args: Dict[str, str] = field(default_factory=dict)
+    _n_events: int = 0
+    _last_meta: Dict[str, Any] = field(default_factory=dict)
+    _budget_hit: bool = False
+    _spans: List[Dict[str, Any]] = field(default_factory=list)  # compact: kind/name/ms only
+    _dropped: int = 0
+    _path: Optional[str] = None
+    _t0: float = field(default_factory=time.monotonic)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def _journal(self, obj: Dict[str, Any], wait: bool = False) -> None:
+        """Queue one line (caller holds _lock, so run_meta is always the first line)."""
+        if self._path is None:
+            self._path = os.path.join(_trace_dir(), f"run-{self.run_id}.jsonl")
+            head = json.dumps({"type": "run_meta", "run_id": self.run_id,
+                               "question": self.question, "mode": self.mode}, default=str)
+            if not _WRITER.write(self._path, head):
+                self._dropped += 1
+        if not _WRITER.write(self._path, json.dumps(obj, default=str), wait=wait):
+            self._dropped += 1
 
     def record(self, ev: Dict[str, Any]) -> None:
         try:
-            self.events.append(ev)
-            t = ev.get("type")
-            if t == "tool_call":
-                name = ev.get("name", "?")
-                self._tool_calls[name] += 1
-                sig = f"{name}:{ev.get('args_summary', '')}"
-                self._call_sigs[sig] += 1
-            elif t == "tool_result":
-                name = ev.get("name", "?")
-                if not ev.get("ok"):
-                    self._tool_fail[name] += 1
-                elif (ev.get("n_provenance") or 0) == 0:
-                    self._tool_zero[name] += 1
-            elif t == "gate" and ev.get("pass") is False:
-                self._gate_fails[ev.get("name", "?")] += 1
+            with self._lock:
+                self._n_events += 1
+                t = ev.get("type")
+                if t == "tool_call":
+                    name = ev.get("name", "?")
+                    self._tool_calls[name] += 1
+                    sig = f"{name}:{ev.get('args_summary', '')}"
+                    self._call_sigs[sig] += 1
+                elif t == "tool_result":
+                    name = ev.get("name", "?")
+                    if ev.get("cached"):
+                        self._memo_hits[name] += 1
+                    if not ev.get("ok"):
+                        self._tool_fail[name] += 1
+                    elif (ev.get("n_provenance") or 0) == 0:
+                        self._tool_zero[name] += 1
+                elif t == "gate":
+                    if ev.get("pass") is False:
+                        self._gate_fails[ev.get("name", "?")] += 1
+                    if ev.get("name") == "budget":
+                        self._budget_hit = True
+                elif t == "meta":
+                    self._last_meta = ev
+                self._journal(ev)
+        except Exception:  # noqa: BLE001 — never break the run
+            pass
+
+    def add_span(self, kind: str, name: str, start: float, end: float,
+                 step: Optional[int] = None, **attrs: Any) -> None:
+        """Record one timed unit of work. `start`/`end` are time.monotonic() readings;
+        the journal gets their offsets from the run start plus the duration (ms)."""
+        try:
+            ms = round((end - start) * 1000, 1)
+            span = {"type": "span", "kind": kind, "name": name, "step": step,
+                    "start_ms": round((start - self._t0) * 1000, 1),
+                    "end_ms": round((end - self._t0) * 1000, 1), "ms": ms, **attrs}
+            with self._lock:
+                self._spans.append({"kind": kind, "name": name, "ms": ms})
+                self._journal(span)
         except Exception:  # noqa: BLE001 — never break the run
             pass
 
     def health(self) -> Dict[str, Any]:
         """Auto-flag the loose-end signals. Empty `flags` = a clean run."""
+        with self._lock:
+            spans = list(self._spans)
         flags: List[str] = []
         # A tool that NEVER produced provenance across all its calls = likely-dead wiring
         # (the BUG-F signature: search_vault table always 0).
@@ -98,16 +346,16 @@ class RunTracer:
                 flags.append(f"repeated identical call ×{n}: {sig[:120]} — model not self-healing")
         if self._gate_fails:
             flags.append(f"gate failures: {dict(self._gate_fails)}")
-        meta = next((e for e in reversed(self.events) if e.get("type") == "meta"), {})
+        meta = self._last_meta
         if meta.get("abstained"):
             flags.append("run ABSTAINED (no verified answer shipped)")
-        if any(e.get("type") == "gate" and e.get("name") == "budget" for e in self.events):
+        if self._budget_hit:
             flags.append("BUDGET EXHAUSTED before finishing")
         return {
             "run_id": self.run_id,
             "question": self.question[:200],
             "mode": self.mode,
-            "n_events": len(self.events),
+            "n_events": self._n_events,
             "steps": meta.get("steps"),
             "tokens": meta.get("tokens"),
             "abstained": meta.get("abstained"),
@@ -115,22 +363,24 @@ class RunTracer:
             "tool_zero_results": dict(self._tool_zero),
             "tool_failures": dict(self._tool_fail),
             "gate_failures": dict(self._gate_fails),
+            # Repeated read-only calls answered by the run's tool memo (no re-embed / re-query).
+            "tool_memo_hits": dict(self._memo_hits),
+            # Where the run's seconds went: p50/p95 per span kind and per tool.
+            "latency": _span_latency(spans),
+            "trace_dropped": self._dropped,
             "flags": flags,
             "clean": not flags,
         }
 
     def finish(self) -> Dict[str, Any]:
-        """Persist the JSONL journal (events + final health line) and return health."""
+        """Append the health line, close the journal and return health. The write itself
+        happens on the writer thread — finish() only waits (briefly) for queue room."""
         h = self.health()
         try:
-            path = os.path.join(_trace_dir(), f"run-{self.run_id}.jsonl")
-            with open(path, "w") as f:
-                f.write(json.dumps({"type": "run_meta", "run_id": self.run_id,
-                                    "question": self.question, "mode": self.mode},
-                                   default=str) + "\n")
-                for ev in self.events:
-                    f.write(json.dumps(ev, default=str) + "\n")
-                f.write(json.dumps({"type": "health", **h}, default=str) + "\n")
+            with self._lock:
+                self._journal({"type": "health", **h}, wait=True)
+                path = self._path
+            _WRITER.close(path)
             h["journal"] = path
             if h["flags"]:
                 logger.warning("[agentcore.health] run %s FLAGGED: %s", self.run_id, h["flags"])
@@ -140,3 +390,71 @@ class RunTracer:
         except Exception as exc:  # noqa: BLE001
             logger.warning("[agentcore.tracer] journal write failed: %s", exc)
         return h
+
+
+# ── Offline summary across journals ─────────────────────────────────────────────
+
+def _journal_paths(paths: Iterable[str]) -> List[str]:
+    out: List[str] = []
+    for p in paths:
+        if os.path.isdir(p):
+            out.extend(sorted(glob.glob(os.path.join(p, "run-*.jsonl"))))
+        elif os.path.exists(p):
+            out.append(p)
+    return out
+
+
+def summarize_journals(paths: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Aggregate span latency across run journals → p50/p95 per kind, per tool, per step.
+
+    `paths` are journal files and/or directories (default: the trace dir). A step's
+    latency is its wall time — first span start to last span end — so parallel tool calls
+    are not double-counted. Unreadable files and malformed lines are skipped.
+    """
+    files = _journal_paths(paths if paths is not None else [_trace_dir()])
+    by_kind: Dict[str, List[float]] = defaultdict(list)
+    by_tool: Dict[str, List[float]] = defaultdict(list)
+    by_model: Dict[str, List[float]] = defaultdict(list)
+    by_step: Dict[int, List[float]] = defaultdict(list)
+    modes: Counter = Counter()
+    runs = 0
+    n_spans = 0
+    for path in files:
+        steps: Dict[int, List[float]] = {}
+        try:
+            with open(path) as f:
+                lines = f.readlines()
+        except OSError:
+            continue
+        runs += 1
+        for line in lines:
+            try:
+                ev = json.loads(line)
+            except ValueError:
+                continue
+            if ev.get("type") == "run_meta":
+                modes[ev.get("mode") or "?"] += 1
+            if ev.get("type") != "span" or not isinstance(ev.get("ms"), (int, float)):
+                continue
+            n_spans += 1
+            kind, ms = ev.get("kind", "?"), float(ev["ms"])
+            by_kind[kind].append(ms)
+            if kind == "tool":
+                by_tool[ev.get("name", "?")].append(ms)
+            elif kind == "model":
+                by_model[ev.get("name", "?")].append(ms)
+            step = ev.get("step")
+            if isinstance(step, int) and "start_ms" in ev and "end_ms" in ev:
+                lo, hi = steps.get(step, (ev["start_ms"], ev["end_ms"]))
+                steps[step] = (min(lo, ev["start_ms"]), max(hi, ev["end_ms"]))
+        for step, (lo, hi) in steps.items():
+            by_step[step].append(hi - lo)
+    return {
+        "journals": runs,
+        "spans": n_spans,
+        "modes": dict(modes),
+        "by_kind": {k: _latency(v) for k, v in sorted(by_kind.items())},
+        "by_tool": {k: _latency(v) for k, v in sorted(by_tool.items())},
+        "by_model": {k: _latency(v) for k, v in sorted(by_model.items())},
+        "by_step": {k: _latency(v) for k, v in sorted(by_step.items())},
+    }
@@ -11,6 +11,7 @@ from langchain_core.output_parsers import StrOutputParser
 from langchain_core.documents import Document
 
 from src.components.config import Config
+from src.components.rate_limiter import llm_limit_kwargs
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -36,6 +37,7 @@ class AgenticRetriever:
             temperature=0.0,
             api_key=config.OPENAI_API_KEY,
             request_timeout=20,
+            **llm_limit_kwargs("openai", config.LLM_MODEL_NAME, est_tokens=800),
         )
 
     def decompose_query(self, query: str) -> List[str]:
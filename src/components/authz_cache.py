@@ -0,0 +1,161 @@
+"""Short-TTL, process-level cache for the resolved AUTHZ CONTEXT (firm + role + screens +
+delegations + staffing) of a user.
+
+WHY: every authenticated request builds a fresh SupabaseManager, and resolve_membership /
+accessible_vault_owner / the retrieval-layer wall then each re-read firm_memberships, screens,
+delegations and matter_memberships — 4-8 PostgREST round-trips per request before any real work.
+The per-request memo on `sb` (dependencies.resolve_membership) only collapses repeats WITHIN one
+request. This cache collapses them ACROSS requests for a few seconds, keyed by (user_id, firm_id).
+
+Correctness contract (T7 — a revoked role / new screen takes effect on the NEXT request):
+  • Explicit invalidation: every write that changes an authz input (create/remove screen, staff /
+    un-staff a matter, role change, offboard, delegation grant/revoke, invite accept) calls
+    invalidate_user / invalidate_firm from db.py, so the NEXT request in this process re-resolves.
+  • TTL (AUTHZ_CACHE_TTL_S, default 5s) bounds staleness across processes (other API replicas /
+    the Celery worker never see this process's invalidations).
+  • The ETHICAL WALL never trusts a cross-request hit: db.is_vault_screened answers from the
+    context only when it was fetched from the DB in THIS request; a cached context is re-checked
+    directly (and fails closed on a fault), so a new screen still blocks on the next request on
+    every replica.
+  • Fail closed: any error inside the cache is a MISS (the DB is authoritative), and a context
+    whose screen lookup faulted is never stored. A put that races an invalidation (the resolve
+    started before the write landed) is dropped via the epoch check, so a stale context can never
+    be re-inserted after the write that invalidated it.
+
+AUTHZ_CACHE_TTL_S=0 disables the cross-request layer (byte-identical to pre-cache resolution).
+PURE in-memory: no DB, no network. Thread-safe (the API runs sync handlers on a thread pool).
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+AUTHZ_CACHE_TTL_S: float = float(os.getenv("AUTHZ_CACHE_TTL_S", "5"))
+# Bounded so a burst of distinct users can't grow the cache without limit (LRU-evicted).
+AUTHZ_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTHZ_CACHE_MAX_ENTRIES", "5000"))
+
+# The key used when the caller asks for the user's ACTIVE (primary) firm rather than a named one.
+ACTIVE_FIRM = "__active__"
+
+
+class AuthzContextCache:
+    """TTL + LRU cache of resolved authz contexts with epoch-guarded invalidation.
+
+    A context is a plain dict (see SupabaseManager.authz_context): {"firm": {...}, "screened_vault_ids",
+    "delegated_verbs", "matter_vault_ids"}. Callers take `epoch()` BEFORE the DB fetch and pass it to
+    `put`; any invalidation in between bumps the epoch and the put is discarded.
+    """
+
+    def __init__(self, ttl_s: float = AUTHZ_CACHE_TTL_S, max_entries: int = AUTHZ_CACHE_MAX_ENTRIES):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple[str, str], tuple[float, dict]]" = OrderedDict()
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_s > 0
+
+    @staticmethod
+    def key(user_id: str, firm_id: Optional[str]) -> tuple[str, str]:
+        return (str(user_id), str(firm_id) if firm_id else ACTIVE_FIRM)
+
+    def epoch(self) -> int:
+        with self._lock:
+            return self._epoch
+
+    def get(self, user_id: str, firm_id: Optional[str]) -> Optional[dict]:
+        """The cached context, or None on a miss / expiry / disabled cache / any internal error."""
+        if not (self.enabled and user_id):
+            return None
+        try:
+            k = self.key(user_id, firm_id)
+            with self._lock:
+                hit = self._entries.get(k)
+                if hit is None or hit[0] <= time.monotonic():
+                    if hit is not None:
+                        del self._entries[k]
+                    self.misses += 1
+                    return None
+                self._entries.move_to_end(k)
+                self.hits += 1
+                return hit[1]
+        except Exception as e:  # noqa: BLE001 — fail closed: a broken cache is a miss, never a grant
+            logger.warning("authz cache get failed, resolving from the DB: %s", e)
+            return None
+
+    def put(self, user_id: str, firm_id: Optional[str], ctx: dict, epoch: int) -> None:
+        """Store `ctx` unless an invalidation happened since `epoch` was taken. Never raises."""
+        if not (self.enabled and user_id and ctx is not None):
+            return
+        try:
+            expires = time.monotonic() + self.ttl_s
+            with self._lock:
+                if epoch != self._epoch:
+                    return                    # raced a write — the fetched context may be stale
+                self._entries[self.key(user_id, firm_id)] = (expires, ctx)
+                self._entries.move_to_end(self.key(user_id, firm_id))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        except Exception as e:  # noqa: BLE001 — caching is an optimization; skip on fault
+            logger.warning("authz cache put skipped: %s", e)
+
+    def invalidate_user(self, user_id: Optional[str]) -> None:
+        """Drop every cached context for `user_id` (all firms). Called after a write that changes
+        ONE user's authz inputs (screen, staffing, membership)."""
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += 1
+            if not user_id:
+                return
+            uid = str(user_id)
+            for k in [k for k in self._entries if k[0] == uid]:
+                del self._entries[k]
+
+    def invalidate_firm(self, firm_id: Optional[str]) -> None:
+        """Drop every cached context that resolved to `firm_id`. Called after a write whose effect
+        fans out across a firm (a role change re-bounds every delegation the member granted)."""
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += 1
+            if not firm_id:
+                self._entries.clear()
+                return
+            fid = str(firm_id)
+            stale = [k for k, (_, ctx) in self._entries.items()
+                     if k[1] == fid or str(((ctx or {}).get("firm") or {}).get("id") or "") == fid]
+            for k in stale:
+                del self._entries[k]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "invalidations": self.invalidations, "ttl_s": self.ttl_s}
+
+
+# Process-wide singleton (one per API worker process / Celery worker).
+authz_cache = AuthzContextCache()
+
+
+def invalidate_user(user_id: Optional[str]) -> None:
+    authz_cache.invalidate_user(user_id)
+
+
+def invalidate_firm(firm_id: Optional[str]) -> None:
+    authz_cache.invalidate_firm(firm_id)
@@ -0,0 +1,377 @@
+"""
+asyncio-native Brain — the same MAP → VERIFY → REDUCE run as ``Brain.run_stream``, on the
+event loop instead of worker threads.
+
+Why: a threaded Brain run holds one Starlette worker thread for the SSE generator, up to
+LLM_CONCURRENCY pool threads for MAP + VERIFY, the grounder's pool during REDUCE and an
+Analyst thread — a dozen threads parked on HTTP sockets per concurrent user. Here every
+LLM call is a coroutine (``ainvoke`` / ``astream``) on the event loop:
+
+  - MAP and VERIFY run as asyncio tasks on the same pipelined schedule as the threaded
+    path (``_MapVerifyLedger``: MAP first, verifier batches coalesced across docs, at most
+    LLM_CONCURRENCY jobs in flight per run). Each run also owns an ``asyncio.Semaphore``
+    of that size around its calls — the batch verifier's per-item fallbacks fan out
+    concurrently here, and still never exceed the run's budget.
+  - One process-wide semaphore per event loop (BRAIN_ASYNC_MAX_INFLIGHT) caps the Brain's
+    in-flight LLM calls across ALL concurrent runs, so N users cannot open N × budget
+    sockets to the provider at once (the shared rate limiter — rate_limiter.py — still
+    paces requests/tokens per minute on top of this).
+  - The LangChain clients are shared process-wide per (role, model, API key) rather than
+    built per request; LangChain's OpenAI client already keeps one pooled httpx transport
+    per timeout, so concurrent runs reuse warm connections.
+  - REDUCE streams with ``astream`` and grounds each finished sentence on the loop
+    (``AsyncSentenceGrounder``); the Analyst — sync Supabase + one LLM call — is the only
+    part left on a thread (``asyncio.to_thread``), as are MAP-cache round-trips.
+  - Cancellation is cooperative: when the SSE client disconnects, Starlette cancels the
+    response task (or closes this generator) and every in-flight MAP / VERIFY / grounding
+    task is cancelled with it — their HTTP requests are abandoned instead of running to
+    completion for nobody. A ``cancel`` token (cancellation.py) additionally stops new
+    work being handed out and counts what was skipped, like the threaded path.
+
+The event protocol is identical, byte for byte: both drivers emit through ``_StreamRun``.
+``AsyncBrain`` is a ``Brain`` — ``run`` (the non-streaming eval path) is unchanged.
+
+Opt-in: the chat route uses it only when BRAIN_ASYNC=true (config.py); the threaded
+``Brain.run_stream`` is the default.
+
+Usage (an ``async def`` route):
+    brain = AsyncBrain(config)
+    return StreamingResponse(brain.arun_stream(query, doc_chunks, ...))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Optional
+
+from langchain_core.documents import Document
+
+from src.components.brain.claims import PerDocExtract
+from src.components.brain.map_reduce import (
+    Brain, LLM_CONCURRENCY, _AnswerRelease, _MapVerifyLedger, _NOTHING_RELEVANT_ANSWER,
+    _SSE_DONE, _StreamRun, _parse_reduce_answer,
+)
+from src.components.brain.verifier import (
+    ABSTAIN_THRESHOLD, AsyncSentenceGrounder, VerifyStats, averify_claim_batch,
+)
+from src.components.cancellation import CancelToken, is_cancelled
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Ceiling on the Brain's in-flight LLM calls per event loop, across every concurrent run.
+BRAIN_ASYNC_MAX_INFLIGHT = int(os.environ.get("BRAIN_ASYNC_MAX_INFLIGHT", "64"))
+
+_loop_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients: dict[tuple, object] = {}
+_clients_lock = threading.Lock()
+
+
+def _inflight_limit() -> asyncio.Semaphore:
+    """The running loop's process-wide LLM-call semaphore (one per loop: an asyncio
+    primitive must not be shared across loops, e.g. between test runs)."""
+    loop = asyncio.get_running_loop()
+    sem = _loop_limits.get(loop)
+    if sem is None:
+        sem = _loop_limits[loop] = asyncio.Semaphore(max(1, BRAIN_ASYNC_MAX_INFLIGHT))
+    return sem
+
+
+async def _once(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+class _Bounded:
+    """An LLM whose ``ainvoke`` / ``astream`` hold every given semaphore for the call."""
+
+    def __init__(self, llm, *limits: asyncio.Semaphore):
+        self._llm = llm
+        self._limits = limits
+
+    async def ainvoke(self, messages):
+        for sem in self._limits:
+            await sem.acquire()
+        try:
+            return await self._llm.ainvoke(messages)
+        finally:
+            for sem in self._limits:
+                sem.release()
+
+    async def astream(self, messages):
+        for sem in self._limits:
+            await sem.acquire()
+        try:
+            if hasattr(self._llm, "astream"):
+                stream = self._llm.astream(messages)
+                async with aclosing(stream):
+                    async for chunk in stream:
+                        yield getattr(chunk, "content", chunk)
+            else:
+                yield (await self._llm.ainvoke(messages)).content
+        finally:
+            for sem in self._limits:
+                sem.release()
+
+
+class AsyncBrain(Brain):
+    """``Brain`` whose streaming run is a coroutine pipeline (see module docstring)."""
+
+    # ── shared clients ────────────────────────────────────────────────────────
+
+    def _shared(self, role: str, model_attr: str, build: Callable[[], object]):
+        key = (role, getattr(self.config, model_attr, None),
+               getattr(self.config, "OPENAI_API_KEY", None))
+        with _clients_lock:
+            llm = _clients.get(key)
+            if llm is None:
+                llm = _clients[key] = build()
+        return llm
+
+    def _get_map_llm(self):
+        if self._map_llm is None:
+            self._map_llm = self._shared("map", "LLM_MODEL_NAME", super()._get_map_llm)
+        return self._map_llm
+
+    def _get_reduce_llm(self):
+        if self._reduce_llm is None:
+            self._reduce_llm = self._shared("reduce", "REDUCE_LLM_MODEL", super()._get_reduce_llm)
+        return self._reduce_llm
+
+    def _get_verify_llm(self):
+        if self._verify_llm is None:
+            self._verify_llm = self._shared("verify", "VERIFY_LLM_MODEL", super()._get_verify_llm)
+        return self._verify_llm
+
+    # ── MAP ───────────────────────────────────────────────────────────────────
+
+    async def _amap_single_doc(
+        self, query: str, doc_id: str, filename: str, chunks: list[Document], llm,
+    ) -> PerDocExtract:
+        """``_map_single_doc`` on the loop: cache round-trips on a thread, MAP via ainvoke."""
+        if not chunks:
+            return PerDocExtract(doc_id=doc_id, filename=filename, nothing_relevant=True)
+
+        chunks = self._map_budget(filename, chunks)
+        cache = self._map_cache
+        use_cache = getattr(cache, "enabled", True)
+        salt = self._map_salt(filename)
+        if use_cache:
+            hit = await asyncio.to_thread(cache.get, query, doc_id, chunks, salt)
+            if hit is not None:
+                hit.cached = True
+                logger.info("[Brain MAP] %s: %d claims from the MAP cache", filename, len(hit.claims))
+                return hit
+        try:
+            raw = (await llm.ainvoke(self._map_request(query, doc_id, filename, chunks))).content
+            extract = self._parse_map_output(raw, doc_id, filename, chunks)
+        except Exception as exc:
+            logger.warning("[Brain MAP] Failed for %s: %s", filename, exc)
+            extract = PerDocExtract(doc_id=doc_id, filename=filename, error=str(exc))
+        if use_cache:
+            await asyncio.to_thread(cache.put, query, doc_id, chunks, extract, salt)
+        return extract
+
+    async def _amap_verify_pipeline(
+        self,
+        query: str,
+        doc_chunks: dict[str, tuple[str, list[Document]]],
+        stats: VerifyStats,
+        limit: asyncio.Semaphore,
+        side_task: Optional[asyncio.Future] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> AsyncIterator[tuple[str, Optional[PerDocExtract], int]]:
+        """``_map_verify_pipeline`` as asyncio tasks — same schedule, same events.
+
+        Closing the generator (or cancelling its consumer) cancels every in-flight task;
+        once ``cancel`` fires no new job starts, and the jobs never started are counted."""
+        global_limit = _inflight_limit()
+        map_llm = _Bounded(self._get_map_llm(), limit, global_limit)
+        verify_llm = _Bounded(self._get_verify_llm(), limit, global_limit)
+        ledger = _MapVerifyLedger(doc_chunks, self._chunk_text_lookup(doc_chunks), stats)
+        budget = max(1, LLM_CONCURRENCY)
+        stats.workers = budget
+        inflight: dict = {}
+
+        def _fill():
+            while len(inflight) < budget and not is_cancelled(cancel):
+                job = ledger.next_job()
+                if job is None:
+                    break
+                kind, tag, arg = job
+                if kind == "map":
+                    coro = self._amap_single_doc(query, tag, *arg, map_llm)
+                else:
+                    coro = averify_claim_batch(arg, verify_llm, ABSTAIN_THRESHOLD, stats)
+                inflight[asyncio.ensure_future(coro)] = job
+
+        try:
+            _fill()
+            while inflight and not is_cancelled(cancel):
+                watched = [*inflight, side_task] if side_task is not None else list(inflight)
+                done, _ = await asyncio.wait(watched, return_when=asyncio.FIRST_COMPLETED)
+                events: list[tuple[str, Optional[PerDocExtract], int]] = []
+                for task in done:
+                    if task is side_task:
+                        side_task = None
+                        events.append(("side_task", None, 0))
+                        continue
+                    events.extend(ledger.settle(inflight.pop(task), task))
+                _fill()
+                for event in events:
+                    yield event
+        finally:
+            for task in inflight:
+                task.cancel()
+            if is_cancelled(cancel):
+                maps, batches = ledger.abandon()
+                cancel.skip("brain_map", maps)
+                cancel.skip("brain_verify", batches)
+        ledger.finish()
+
+    # ── REDUCE ────────────────────────────────────────────────────────────────
+
+    async def _areduce_stream(
+        self,
+        query: str,
+        extracts: list[PerDocExtract],
+        verified_claims: list,
+        analyst_block: Optional[str],
+        stats: VerifyStats,
+        limit: asyncio.Semaphore,
+        cancel: Optional[CancelToken] = None,
+    ) -> AsyncIterator[tuple[str, object]]:
+        """``_reduce_stream`` on the loop: ``astream`` + an ``AsyncSentenceGrounder``."""
+        global_limit = _inflight_limit()
+        relevant, system, user = self._reduce_prompt(query, extracts, analyst_block)
+        grounder = AsyncSentenceGrounder(
+            verified_claims, _Bounded(self._get_verify_llm(), limit, global_limit), stats=stats,
+            cancel=cancel,
+        )
+        out = _AnswerRelease(grounder)
+        confidence = 0.0 if not relevant else None
+
+        if not relevant:
+            pieces = _once(_NOTHING_RELEVANT_ANSWER)
+        else:
+            from langchain_core.messages import SystemMessage, HumanMessage
+
+            # REDUCE holds only the process-wide slot: it runs after MAP + VERIFY, and the
+            # grounder checks sentences on the run's budget while it streams.
+            pieces = _Bounded(self._get_reduce_llm(), global_limit).astream(
+                [SystemMessage(content=system), HumanMessage(content=user)])
+        try:
+            try:
+                async with aclosing(pieces):
+                    async for piece in pieces:
+                        if is_cancelled(cancel):
+                            return   # aclosing ends the model stream; finally drops the checks
+                        delta = out.add(piece)
+                        if delta:
+                            yield "token", delta
+                        for verdict in grounder.poll():
+                            yield "grounded", verdict
+            except Exception as exc:
+                logger.error("[Brain REDUCE] Stream failed: %s", exc)
+                out.fail(self._reduce_fallback(relevant))
+                confidence = 0.4
+
+            delta = out.release(final=True)
+            if delta:
+                yield "token", delta
+            grounder.close()
+            async for verdict in grounder.drain():
+                yield "grounded", verdict
+        finally:
+            grounder.shutdown()   # no-op once drained; cancels the checks on a disconnect
+        if confidence is None:
+            confidence = _parse_reduce_answer(out.raw)[1]
+        yield "done", (out.answer, confidence, grounder.groundedness, grounder.unsupported)
+
+    # ── Streaming run ─────────────────────────────────────────────────────────
+
+    async def arun_stream(
+        self,
+        query: str,
+        doc_chunks: dict[str, tuple[str, list[Document]]],
+        user_id: Optional[str] = None,
+        collection_id: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        analyst_block: Optional[str] = None,
+        analyst_count: int = 0,
+        spine_abstain: Optional[str] = None,
+        analyst_fn: Optional[Callable[[], tuple[Optional[str], int]]] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> AsyncIterator[str]:
+        """Async generator of the SSE events ``Brain.run_stream`` emits (same arguments,
+        same events in the same order rules — see its docstring).
+
+        The Analyst (``analyst_fn``) starts on a thread as the stream opens and is awaited
+        alongside MAP + VERIFY. On a client disconnect the generator is cancelled / closed
+        at its current ``await``; the ``finally`` blocks below and in the stage generators
+        cancel every outstanding LLM task, and a still-running Analyst is left to finish
+        on its thread with its result dropped (as the threaded path does). ``cancel`` is
+        honoured between jobs exactly as in ``run_stream``."""
+        t0 = time.perf_counter()
+        analyst_task = (asyncio.ensure_future(asyncio.to_thread(analyst_fn))
+                        if analyst_fn is not None else None)
+        limit = asyncio.Semaphore(max(1, LLM_CONCURRENCY))
+        run = _StreamRun(self, query, doc_chunks, t0, analyst_block, analyst_count, spine_abstain)
+        try:
+            for line in run.start(analyst_pending=analyst_task is not None):
+                yield line
+
+            stages = self._amap_verify_pipeline(query, doc_chunks, run.stats, limit,
+                                                side_task=analyst_task, cancel=cancel)
+            async with aclosing(stages):
+                async for kind, ext, n in stages:
+                    if kind == "side_task":
+                        for line in run.analyst(*self._join_analyst(analyst_task)):
+                            yield line
+                        analyst_task = None
+                    else:
+                        for line in run.stage(kind, ext, n):
+                            yield line
+            assembled = run.assembled()
+            if run.skip_reduce(cancel):
+                return
+            for line in assembled:
+                yield line
+
+            # Join point: REDUCE is the Analyst's only consumer. Still running ⇒ wait here.
+            if analyst_task is not None:
+                await asyncio.wait([analyst_task])
+                for line in run.analyst(*self._join_analyst(analyst_task)):
+                    yield line
+                analyst_task = None
+
+            if not run.reduces:
+                for line in run.unreduced():
+                    yield line
+            else:
+                if run.skip_reduce(cancel):
+                    return
+                for line in run.reduce_open():
+                    yield line
+                reduce = self._areduce_stream(query, *run.reduce_inputs(), limit, cancel)
+                async with aclosing(reduce):
+                    async for kind, payload in reduce:
+                        for line in run.reduce_event(kind, payload):
+                            yield line
+                if is_cancelled(cancel):
+                    return
+                for line in run.reduce_close():
+                    yield line
+
+            yield run.meta()
+            await asyncio.to_thread(run.record, user_id, collection_id, conversation_id)
+            yield _SSE_DONE
+        finally:
+            if analyst_task is not None:
+                analyst_task.cancel()   # the thread finishes on its own; its result is dropped
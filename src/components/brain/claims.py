@@ -68,6 +68,7 @@ class PerDocExtract:
     claims: list[Claim] = field(default_factory=list)
     nothing_relevant: bool = False   # True when the doc had no relevant content
     error: str | None = None         # set if MAP failed for this doc (non-fatal)
+    cached: bool = False             # served from the MAP extract cache (no MAP call made)
 
     def to_dict(self) -> dict:
         return {
@@ -78,6 +79,16 @@ class PerDocExtract:
             "error": self.error,
         }
 
+    @classmethod
+    def from_dict(cls, d: dict) -> "PerDocExtract":
+        return cls(
+            doc_id=d["doc_id"],
+            filename=d.get("filename", ""),
+            claims=[Claim.from_dict(c) for c in d.get("claims", [])],
+            nothing_relevant=d.get("nothing_relevant", False),
+            error=d.get("error"),
+        )
+
 
 @dataclass
 class BrainResult:
@@ -93,8 +104,11 @@ class BrainResult:
     docs_read: int = 0
     docs_relevant: int = 0
     docs_failed: int = 0
+    docs_cached: int = 0             # docs whose MAP extract came from the MAP cache
     # Per-doc extracts (for audit/debugging)
     per_doc_extracts: list[PerDocExtract] = field(default_factory=list)
+    # VERIFY-stage cost accounting (verifier.VerifyStats.to_dict): calls made vs saved
+    verify_stats: dict = field(default_factory=dict)
 
     def to_dict(self) -> dict:
         return {
@@ -109,5 +123,7 @@ class BrainResult:
                 "docs_read": self.docs_read,
                 "docs_relevant": self.docs_relevant,
                 "docs_failed": self.docs_failed,
+                "docs_cached": self.docs_cached,
             },
+            "verify": self.verify_stats,
         }
@@ -0,0 +1,337 @@
+"""Structured-grid store — a doc's parsed table grids, cached per process.
+
+WHY: load_grids_for_docs (table_intent) used to query ``document_chunks`` once per doc_id,
+sequentially, and ``json.loads`` every ``table_json`` into an analyst.Grid — on every
+request. The Brain Analyst, every agent ``read_document`` fresh load and the review-grid /
+workflow preload all pay it, for tables that only change when the doc is re-ingested.
+
+GridStore keeps, per (owner, doc_id): the doc's table rows already parsed — the table_json
+dict, a ready Grid, page, filename, the row content and the statement flag — in an LRU
+bounded by memory (GRID_STORE_MAX_MB, estimated from the serialized table_json + content).
+Docs that miss are fetched together in ONE ``in_("document_id", …)`` query (batches of
+_IN_BATCH ids), instead of one round-trip per doc. PostgREST silently caps every response at
+its max-rows (1000 on Supabase), which a 100-doc batch of table chunks easily passes, so each
+batch is read in ``.range()`` pages of GRID_STORE_PAGE_ROWS ordered by (document_id,
+chunk_index) until a short page comes back. A batch whose paging fails part-way is dropped
+whole — a doc is never returned, let alone cached, with only some of its rows.
+
+Versioning / invalidation (never serve a re-ingested doc's old tables):
+  • An entry is stamped with the doc's INGEST GENERATION and only served while that
+    generation is unchanged. The generation is a per-doc counter bumped by invalidate_doc —
+    called from db.save_document_chunks (a (re-)ingest replaces the chunk rows) and
+    db.delete_document_record. In-process it is a dict; with Redis (GRID_STORE_REDIS, on by
+    default) it is also an INCR'd key, read for all requested docs in one MGET, so a
+    re-ingest in the worker is seen by every API replica on its next request.
+  • A doc with NO table rows is not cached: the worker flips a doc to ready before it saves
+    the chunk rows, so "no tables yet" must stay a miss.
+  • TTL (GRID_STORE_TTL_S, default 900s) bounds everything else — e.g. Redis unreachable.
+
+Keyed by the RESOLVED owner (the caller, or the authorised matter owner for a shared read —
+see load_grids_for_docs): an entry only ever holds rows fetched with ``.eq("user_id", owner)``
+and is only looked up under that same scope. A client with no user (offline / tests) is
+never cached. GRID_STORE_TTL_S=0 disables the store (every call fetches — byte-identical).
+Thread-safe; any Redis error is a miss on the generation tier only — the DB is authoritative.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+GRID_STORE_TTL_S: float = float(os.getenv("GRID_STORE_TTL_S", "900"))
+GRID_STORE_MAX_MB: float = float(os.getenv("GRID_STORE_MAX_MB", "64"))
+GRID_STORE_REDIS: bool = os.getenv("GRID_STORE_REDIS", "true").lower() == "true"
+# After a Redis error the generation tier stays off this long (TTL still bounds staleness).
+GRID_STORE_BACKOFF_S: float = float(os.getenv("GRID_STORE_BACKOFF_S", "30"))
+
+_GEN_PREFIX = "docquery:grid_gen:"
+# Doc ids per `in_()` query — keeps the PostgREST URL well under proxy limits.
+_IN_BATCH = 100
+# Rows per ranged request. Must not exceed the server's max-rows (PostgREST truncates a larger
+# response without an error, and a short page is read as the last one).
+GRID_STORE_PAGE_ROWS: int = int(os.getenv("GRID_STORE_PAGE_ROWS", "1000"))
+
+
+@dataclass(frozen=True)
+class TableRow:
+    """One stored table chunk, parsed once. ``grid`` carries the chunk's own filename; a
+    caller that names the doc differently builds its own Grid from ``table_json``."""
+
+    table_json: Dict[str, Any]
+    grid: Any
+    page: Optional[int]
+    filename: Optional[str]
+    content: str
+    statement: bool
+
+
+def _parse_rows(rows) -> List[TableRow]:
+    """document_chunks rows (one doc) → TableRow list, skipping non-table / unparseable rows."""
+    from src.components.brain.analyst import Grid
+    from src.components.brain.table_intent import _looks_like_statement
+
+    out: List[TableRow] = []
+    for r in rows:
+        md = r.get("metadata") or {}
+        if md.get("chunk_type") != "table":
+            continue
+        raw = md.get("table_json")
+        if not raw:
+            continue
+        try:
+            tj = json.loads(raw) if isinstance(raw, str) else raw
+        except Exception:
+            continue
+        out.append(TableRow(
+            table_json=tj,
+            grid=Grid(tj, doc=md.get("filename"), page=md.get("page_number")),
+            page=md.get("page_number"),
+            filename=md.get("filename"),
+            content=r.get("content", "") or "",
+            statement=_looks_like_statement(tj),
+        ))
+    return out
+
+
+def _row_bytes(rows) -> int:
+    """Rough resident size of a doc's table rows: serialized table_json + content."""
+    n = 0
+    for r in rows:
+        md = r.get("metadata") or {}
+        raw = md.get("table_json")
+        n += len(raw) if isinstance(raw, str) else len(json.dumps(raw or {}))
+        n += len(r.get("content") or "")
+    return n
+
+
+def _query(reader, doc_ids: List[str], owner: Optional[str], tables_only: bool,
+           start: int, page: int):
+    q = reader.table("document_chunks").select("document_id,content,metadata")
+    q = q.eq("document_id", doc_ids[0]) if len(doc_ids) == 1 else q.in_("document_id", doc_ids)
+    if tables_only:
+        q = q.eq("metadata->>chunk_type", "table")
+    if owner:
+        q = q.eq("user_id", owner)
+    # (document_id, chunk_index) is unique — a stable order, so pages never skip or repeat a row.
+    q = q.order("document_id").order("chunk_index")
+    return q.range(start, start + page - 1).execute().data
+
+
+def _fetch_all(reader, doc_ids: List[str], owner: Optional[str], tables_only: bool) -> list:
+    """Every matching row, GRID_STORE_PAGE_ROWS at a time until a short page. Raises if any
+    page fails — the caller never sees part of a batch."""
+    page = max(1, GRID_STORE_PAGE_ROWS)
+    rows: list = []
+    while True:
+        got = _query(reader, doc_ids, owner, tables_only, len(rows), page) or []
+        rows.extend(got)
+        if len(got) < page:
+            return rows
+
+
+def fetch_table_rows(reader, doc_ids: List[str], owner: Optional[str]) -> Dict[str, list]:
+    """Raw table rows for ``doc_ids`` (doc_id → rows, in chunk order), one paged query per
+    _IN_BATCH ids. A doc whose fetch failed — on any page — is absent from the result, so
+    every doc returned is complete. Never raises."""
+    by_doc: Dict[str, list] = {}
+    for i in range(0, len(doc_ids), _IN_BATCH):
+        batch = doc_ids[i:i + _IN_BATCH]
+        # Pull ONLY table chunks (metadata is JSONB), not every chunk: on an 8-doc collection
+        # the naive "select all chunks, filter in Python" loaded ~2600 rows of text per
+        # numeric query. Falls back to the full (equally paged) pull if the filter fails.
+        try:
+            rows = _fetch_all(reader, batch, owner, tables_only=True)
+        except Exception:
+            try:
+                rows = _fetch_all(reader, batch, owner, tables_only=False)
+            except Exception as exc:
+                logger.warning("[grid_store] grid load failed for %d doc(s) %s: %s",
+                               len(batch), batch[:3], exc)
+                continue
+        for did in batch:
+            by_doc[did] = []
+        for r in rows:
+            did = str(r.get("document_id") or (batch[0] if len(batch) == 1 else ""))
+            if did in by_doc:
+                by_doc[did].append(r)
+    return by_doc
+
+
+@dataclass
+class _Entry:
+    version: tuple
+    expires_at: float
+    tables: List[TableRow]
+    nbytes: int
+
+
+class GridStore:
+    """Memory-bounded LRU of parsed table grids keyed by (owner, doc_id), generation-checked."""
+
+    def __init__(
+        self,
+        ttl_s: float = GRID_STORE_TTL_S,
+        max_mb: float = GRID_STORE_MAX_MB,
+        use_redis: bool = GRID_STORE_REDIS,
+        client=None,
+    ):
+        self.ttl_s = ttl_s
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.use_redis = use_redis
+        self._redis = client
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple[str, str], _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._gen: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_s > 0 and self.max_bytes > 0
+
+    # ── Redis generation tier ───────────────────────────────────────────────────
+    def _redis_client(self):
+        if not self.use_redis or time.monotonic() < self._down_until:
+            return None
+        if self._redis is None:
+            try:
+                import redis as redis_lib
+                self._redis = redis_lib.from_url(
+                    os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                    decode_responses=True, socket_connect_timeout=1, socket_timeout=1,
+                )
+            except Exception as exc:
+                logger.warning("[grid_store] Redis unavailable — in-process generations only: %s", exc)
+                self.use_redis = False
+                return None
+        return self._redis
+
+    def _backoff(self, op: str, exc: Exception) -> None:
+        self._down_until = time.monotonic() + GRID_STORE_BACKOFF_S
+        logger.debug("[grid_store] Redis %s failed — generation tier off for %.0fs: %s",
+                     op, GRID_STORE_BACKOFF_S, exc)
+
+    def _versions(self, doc_ids: List[str]) -> Dict[str, tuple]:
+        """doc_id → (in-process generation, Redis generation or None), Redis read in one MGET."""
+        shared: List[Optional[str]] = [None] * len(doc_ids)
+        r = self._redis_client()
+        if r is not None:
+            try:
+                shared = list(r.mget([f"{_GEN_PREFIX}{d}" for d in doc_ids]))
+            except Exception as exc:
+                self._backoff("mget", exc)
+        with self._lock:
+            return {d: (self._gen.get(d, 0), g) for d, g in zip(doc_ids, shared)}
+
+    # ── read path ───────────────────────────────────────────────────────────────
+    def tables_for_docs(self, reader, doc_ids, owner: Optional[str]) -> Dict[str, List[TableRow]]:
+        """Parsed table rows for ``doc_ids`` (doc_id → rows), scoped to ``owner``. Cached docs
+        are served from memory; the rest come from ONE batched fetch. A doc whose fetch
+        failed is absent. Never raises."""
+        unique = list(dict.fromkeys(str(d) for d in doc_ids or []))
+        if not unique:
+            return {}
+        if not owner or not self.enabled:
+            fetched = fetch_table_rows(reader, unique, owner)
+            return {d: _parse_rows(rows) for d, rows in fetched.items()}
+
+        versions = self._versions(unique)
+        now = time.monotonic()
+        out: Dict[str, List[TableRow]] = {}
+        missing: List[str] = []
+        with self._lock:
+            for did in unique:
+                key = (str(owner), did)
+                entry = self._entries.get(key)
+                if entry is not None and entry.version == versions[did] and entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    out[did] = entry.tables
+                    continue
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                missing.append(did)
+        if missing:
+            # Only fully-paged docs come back (a failed page drops its whole batch), so every
+            # doc stored below holds ALL its table rows — never a truncated prefix.
+            fetched = fetch_table_rows(reader, missing, owner)
+            with self._lock:
+                self.fetches += 1
+            for did, rows in fetched.items():
+                tables = _parse_rows(rows)
+                out[did] = tables
+                if tables:
+                    self._store((str(owner), did), versions[did], tables, _row_bytes(rows))
+        return out
+
+    def _store(self, key, version, tables, nbytes) -> None:
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(version, time.monotonic() + self.ttl_s, tables, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key) -> None:
+        # Caller holds the lock.
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+    # ── invalidation ────────────────────────────────────────────────────────────
+    def invalidate_doc(self, doc_id: Optional[str]) -> None:
+        """Drop this doc's grids for every owner and bump its ingest generation (here and,
+        with Redis, for every other process)."""
+        if not doc_id:
+            return
+        did = str(doc_id)
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == did]:
+                self._drop(key)
+            self._gen[did] = self._gen.get(did, 0) + 1
+            self.invalidations += 1
+        r = self._redis_client()
+        if r is not None:
+            try:
+                pipe = r.pipeline()
+                pipe.incr(f"{_GEN_PREFIX}{did}")
+                # Far longer than any entry can live; the key only has to outlast the TTL.
+                pipe.expire(f"{_GEN_PREFIX}{did}", max(86400, int(self.ttl_s * 4)))
+                pipe.execute()
+            except Exception as exc:
+                self._backoff("incr (TTL bounds it)", exc)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"docs": len(self._entries), "bytes": self._bytes, "hits": self.hits,
+                    "misses": self.misses, "fetches": self.fetches,
+                    "invalidations": self.invalidations}
+
+
+# Process-wide singleton (the API serves from it; the worker only ever invalidates).
+grid_store = GridStore()
+
+
+def invalidate_doc(doc_id: Optional[str]) -> None:
+    grid_store.invalidate_doc(doc_id)
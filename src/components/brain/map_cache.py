@@ -0,0 +1,174 @@
+"""MAP extract cache — a doc's parsed MAP result, reused across rephrasings and follow-ups.
+
+WHY: users iterate on a collection question (rephrase it, ask it again after reading the
+answer), and every Brain run re-sent the same top chunks of the same docs to the MAP LLM.
+On a 20-doc vault that is 20 MAP calls per iteration for extracts that only change when the
+question or the retrieved context does.
+
+Key (all four must match — anything else is a miss):
+  • the NORMALISED question  — case, punctuation, whitespace and a handful of filler words
+                               ("what is the …?" ≡ "What's the …") folded away; word order is
+                               kept (an extract is question-specific — "A acquired B" is not
+                               "B acquired A");
+  • doc_id;
+  • a hash of the chunk set sent — the chunk_ids in prompt order (chunk_ids are content-
+    addressed: sha1(file, type, index, text), data_ingestion._stable_id). A chunk without one
+    contributes a hash of its text. So a follow-up whose retrieval moved for some docs pays
+    MAP only for THOSE docs;
+  • a salt — MAP model + MAP prompt version + filename (both are part of the MAP prompt).
+Value: PerDocExtract.to_dict() as MAP produced it (before VERIFY touches the claims), JSON.
+Failed MAPs (extract.error) are never stored.
+
+Invalidation: keys are prefixed by doc_id, so re-ingesting or deleting a doc drops all of its
+entries (invalidate_doc — called from the ingest worker and db.delete_document_record). The
+content-addressed chunk hash already stops a changed doc from matching; the explicit drop
+also clears extracts whose text hash didn't move. TTL (BRAIN_MAP_CACHE_TTL_S, default 6h)
+bounds everything else.
+
+Redis-only (REDIS_URL), shared by every API replica. BRAIN_MAP_CACHE=false disables it. Any
+Redis error is a miss / a skipped write — the MAP LLM is authoritative, as with
+SemanticCache and the routing_index Redis tier.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Optional
+
+from src.components.brain.claims import PerDocExtract
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+BRAIN_MAP_CACHE: bool = os.getenv("BRAIN_MAP_CACHE", "true").lower() == "true"
+BRAIN_MAP_CACHE_TTL_S: int = int(os.getenv("BRAIN_MAP_CACHE_TTL_S", str(6 * 3600)))
+# After a Redis error the cache stays off this long, so an unreachable Redis costs one connect
+# timeout per window instead of one per doc per query.
+BRAIN_MAP_CACHE_BACKOFF_S: float = float(os.getenv("BRAIN_MAP_CACHE_BACKOFF_S", "30"))
+
+_PREFIX = "docquery:map_extract:"
+
+# Filler that never changes what a MAP extract should contain.
+_FILLER = frozenset({
+    "a", "an", "the", "please", "can", "could", "would", "you", "tell", "me", "us",
+    "what", "whats", "is", "are", "was", "were", "do", "does", "did",
+})
+
+
+def normalize_question(question: str) -> str:
+    """Fold case, punctuation, whitespace and filler words; keep word order."""
+    words = re.findall(r"[a-z0-9$%€£]+(?:[.,][0-9]+)*", (question or "").lower().replace("'", ""))
+    return " ".join(w for w in words if w not in _FILLER)
+
+
+def chunk_set_hash(chunks) -> str:
+    """Order-sensitive hash of the chunks MAP is shown (their content-addressed chunk_ids)."""
+    h = hashlib.sha1()
+    for c in chunks or []:
+        cid = (getattr(c, "metadata", None) or {}).get("chunk_id")
+        if not cid:
+            cid = "text:" + hashlib.sha1((getattr(c, "page_content", "") or "").encode()).hexdigest()
+        h.update(str(cid).encode())
+        h.update(b"\0")
+    return h.hexdigest()[:20]
+
+
+class MapExtractCache:
+    """Redis-backed PerDocExtract cache keyed by (normalised question, doc_id, chunk set, salt)."""
+
+    def __init__(self, enabled: bool = BRAIN_MAP_CACHE, ttl_s: int = BRAIN_MAP_CACHE_TTL_S,
+                 client=None):
+        self.enabled = enabled and ttl_s > 0
+        self.ttl_s = ttl_s
+        self._redis = client
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _client(self):
+        if not self.enabled or time.monotonic() < self._down_until:
+            return None
+        if self._redis is None:
+            try:
+                import redis as redis_lib
+                self._redis = redis_lib.from_url(
+                    os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                    decode_responses=False, socket_connect_timeout=1, socket_timeout=1,
+                )
+            except Exception as exc:
+                logger.warning("[map_cache] Redis unavailable — MAP cache off: %s", exc)
+                self.enabled = False
+                return None
+        return self._redis
+
+    @staticmethod
+    def key(question: str, doc_id: str, chunks, salt: str = "") -> str:
+        q = hashlib.sha1(f"{normalize_question(question)}\0{salt}".encode()).hexdigest()[:20]
+        return f"{_PREFIX}{doc_id}:{q}:{chunk_set_hash(chunks)}"
+
+    def get(self, question: str, doc_id: str, chunks, salt: str = "") -> Optional[PerDocExtract]:
+        r = self._client()
+        if r is None:
+            return None
+        try:
+            raw = r.get(self.key(question, doc_id, chunks, salt))
+            ext = PerDocExtract.from_dict(json.loads(raw)) if raw else None
+        except Exception as exc:
+            self._backoff("get", exc)
+            ext = None
+        with self._lock:
+            if ext is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return ext
+
+    def put(self, question: str, doc_id: str, chunks, extract: PerDocExtract, salt: str = "") -> None:
+        if extract.error is not None:
+            return
+        r = self._client()
+        if r is None:
+            return
+        try:
+            r.setex(self.key(question, doc_id, chunks, salt), self.ttl_s,
+                    json.dumps(extract.to_dict()))
+            with self._lock:
+                self.writes += 1
+        except Exception as exc:
+            self._backoff("put", exc)
+
+    def invalidate_doc(self, doc_id: Optional[str]) -> int:
+        """Drop every cached extract of this doc (re-ingested / deleted). Returns keys dropped."""
+        r = self._client() if doc_id else None
+        if r is None:
+            return 0
+        try:
+            keys = list(r.scan_iter(f"{_PREFIX}{doc_id}:*", count=200))
+            if keys:
+                r.delete(*keys)
+            return len(keys)
+        except Exception as exc:
+            self._backoff("invalidate (TTL bounds it)", exc)
+            return 0
+
+    def _backoff(self, op: str, exc: Exception) -> None:
+        self._down_until = time.monotonic() + BRAIN_MAP_CACHE_BACKOFF_S
+        logger.debug("[map_cache] %s failed — cache off for %.0fs: %s", op, BRAIN_MAP_CACHE_BACKOFF_S, exc)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "writes": self.writes}
+
+
+# Process-wide singleton (the API serves from it; the worker only ever invalidates).
+map_extract_cache = MapExtractCache()
+
+
+def invalidate_doc(doc_id: Optional[str]) -> None:
+    map_extract_cache.invalidate_doc(doc_id)
@@ -27,12 +27,14 @@ Non-regression guarantee:
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import time
 import logging
 import traceback
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from typing import Iterator, Optional, Callable
 
 from langchain_core.documents import Document
@@ -41,8 +43,14 @@ from src.components.config import Config
 from src.components.brain.claims import (
     Claim, EvidenceSpan, PerDocExtract, BrainResult,
 )
-from src.components.brain.verifier import verify_claims, verify_reduce_output, ABSTAIN_THRESHOLD
+from src.components.brain.map_cache import map_extract_cache
+from src.components.cancellation import CancelToken, is_cancelled
+from src.components.brain.verifier import (
+    verify_reduce_output, ABSTAIN_THRESHOLD, VerifyStats,
+    plan_verification, take_batch, verify_claim_batch, SentenceGrounder,
+)
 from src.logger import get_logger
+from src.utils import _token_budget_cut
 
 logger = get_logger(__name__)
 
@@ -50,6 +58,10 @@ logger = get_logger(__name__)
 # ── Default concurrency / quorum ──────────────────────────────────────────────
 MAP_CONCURRENCY = int(os.environ.get("BRAIN_MAP_CONCURRENCY", "4"))  # parallel MAP workers
 MAP_QUORUM = 0.90        # proceed to REDUCE if ≥ 90% of docs MAP'd successfully
+# One bounded budget for MAP + VERIFY LLM calls in the pipelined run (_map_verify_pipeline):
+# a doc's claims are verified as soon as its MAP lands, on the same workers, so the verifier
+# works through the MAP tail instead of idling behind the slowest doc.
+LLM_CONCURRENCY = int(os.environ.get("BRAIN_LLM_CONCURRENCY", str(MAP_CONCURRENCY)))
 
 # Confidence below this → Brain abstains rather than guessing
 BRAIN_ABSTAIN_THRESHOLD = 0.45
@@ -96,6 +108,12 @@ def _map_messages(question: str, doc_id: str, filename: str, context: str) -> tu
     return system, user
 
 
+# Part of the MAP cache key: editing the MAP prompt retires every cached extract.
+_MAP_PROMPT_VERSION = hashlib.sha1(
+    "\0".join(_map_messages("{q}", "{d}", "{f}", "{c}")).encode()
+).hexdigest()[:10]
+
+
 def _reduce_messages(question: str, n_docs: int, extracts: str,
                      has_computed: bool = False) -> tuple[str, str]:
     # Phase 4.3: when the Analyst has pre-computed figures, the LLM must NOT do
@@ -146,6 +164,26 @@ def _reduce_messages(question: str, n_docs: int, extracts: str,
     return system, user
 
 
+_CONFIDENCE_MARKER = "## Confidence"
+_NOTHING_RELEVANT_ANSWER = "I couldn't find relevant information across the documents for this question."
+
+
+def _parse_reduce_answer(raw_answer: str) -> tuple[str, float]:
+    """Split REDUCE output into (answer, confidence) at its trailing "## Confidence" section."""
+    confidence = 0.7  # default
+    answer = raw_answer
+    if _CONFIDENCE_MARKER in raw_answer:
+        parts = raw_answer.rsplit(_CONFIDENCE_MARKER, 1)
+        answer = parts[0].strip()
+        conf_text = parts[1].strip()
+        import re
+        m = re.search(r"(\d+\.?\d*)", conf_text)
+        if m:
+            val = float(m.group(1))
+            confidence = val if val <= 1.0 else val / 100.0
+    return answer, confidence
+
+
 def _clean_snippet(text: str, limit: int = 300) -> str:
     """Make a verbatim span presentable: collapse whitespace/newlines (PDF table
     extraction leaves '\\n\\n' artifacts like 'Total revenue\\n\\n211,915'), strip,
@@ -217,6 +255,315 @@ def _locate_evidence(span: str, chunks: list, fallback_doc_id: str) -> tuple[str
     return "", fallback_doc_id
 
 
+def _sse(payload: dict) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+class _AnswerRelease:
+    """What of a streamed REDUCE answer may go out yet (shared by the sync + async REDUCE).
+
+    The trailing "## Confidence" section never goes out, a line that opens with "|" (table
+    row) or "#" (heading — possibly that section) is held until it is complete, a partial
+    marker prefix at the end is held, and leading/trailing whitespace is trimmed — so the
+    concatenated deltas equal ``answer`` exactly. Every released delta is fed to the grounder.
+    """
+
+    def __init__(self, grounder):
+        self.grounder = grounder
+        self.raw = ""
+        self.released = 0
+
+    def add(self, piece) -> str:
+        self.raw += piece or ""
+        return self.release()
+
+    def fail(self, fallback: str) -> None:
+        """The model failed: nothing went out yet ⇒ the degraded answer replaces it."""
+        if not self.released:
+            self.raw = fallback
+
+    def release(self, final: bool = False) -> str:
+        raw = self.raw
+        cut = raw.find(_CONFIDENCE_MARKER)
+        visible = (raw if cut < 0 else raw[:cut]).lstrip()
+        end = len(visible.rstrip())
+        if not final and cut < 0:
+            nl = visible.rfind("\n", 0, end)
+            if visible[nl + 1:end].lstrip().startswith(("|", "#")):
+                end = len(visible[:nl + 1].rstrip())
+            for k in range(len(_CONFIDENCE_MARKER) - 1, 0, -1):
+                if visible[:end].endswith(_CONFIDENCE_MARKER[:k]):
+                    end -= k
+                    break
+        if end > self.released:
+            delta, self.released = visible[self.released:end], end
+            self.grounder.feed(delta)
+            return delta
+        return ""
+
+    @property
+    def answer(self) -> str:
+        return self.raw.lstrip()[:self.released]
+
+
+class _MapVerifyLedger:
+    """Book-keeping for one pipelined MAP → VERIFY run, whoever executes the jobs.
+
+    ``next_job`` hands out work MAP-first — ("map", doc_id, (filename, chunks)) or
+    ("verify", [doc_id per claim], [Claim, ...]), one verifier batch coalesced across docs
+    (``take_batch``) — and ``settle`` takes a finished job's future / task back and returns
+    the ("map" | "verify", extract, n) events it completes. Used by
+    ``Brain._map_verify_pipeline`` (thread pool) and the asyncio driver (async_brain), so
+    both schedule and count identically.
+    """
+
+    def __init__(self, doc_chunks: dict[str, tuple[str, list[Document]]],
+                 chunk_text: Callable[[EvidenceSpan], Optional[str]], stats: VerifyStats):
+        self.chunk_text = chunk_text
+        self.stats = stats
+        self.map_queue = deque(doc_chunks.items())
+        self.verify_queue: deque = deque()   # (doc_id, Claim) awaiting a verdict
+        self.extract_of: dict[str, PerDocExtract] = {}
+        self.outstanding: dict[str, int] = {}
+        self.maps_done = self.verified_docs = 0
+        self.last_map_t = self.last_verify_t = None
+
+    def next_job(self) -> Optional[tuple]:
+        if self.map_queue:
+            doc_id, filename_chunks = self.map_queue.popleft()
+            return "map", doc_id, filename_chunks
+        if self.verify_queue:
+            tagged = take_batch(self.verify_queue)
+            return "verify", [d for d, _c in tagged], [c for _d, c in tagged]
+        return None
+
+    def settle(self, job: tuple, fut) -> list[tuple[str, Optional[PerDocExtract], int]]:
+        kind, tag, arg = job
+        events: list[tuple[str, Optional[PerDocExtract], int]] = []
+        if kind == "map":
+            doc_id = tag
+            try:
+                ext = fut.result()
+            except Exception as exc:
+                ext = PerDocExtract(doc_id=doc_id, filename=arg[0], error=str(exc))
+            self.extract_of[doc_id] = ext
+            self.maps_done += 1
+            self.last_map_t = time.perf_counter()
+            events.append(("map", ext, self.maps_done))
+            pending = [c for b in plan_verification(
+                ext.claims if ext.error is None else [],
+                chunk_text=self.chunk_text, stats=self.stats,
+            ) for c in b]
+            if pending:
+                self.outstanding[doc_id] = len(pending)
+                self.verify_queue.extend((doc_id, c) for c in pending)
+            else:
+                self.verified_docs += 1
+                events.append(("verify", ext, self.verified_docs))
+        else:
+            try:
+                fut.result()
+            except Exception as exc:  # verify_claim_batch is non-fatal; belt + braces
+                logger.warning("[Brain VERIFY] batch failed (non-fatal): %s", exc)
+                for c in arg:
+                    c.confidence, c.verified = 0.5, False
+            self.last_verify_t = time.perf_counter()
+            for d in dict.fromkeys(tag):   # the batch's docs, first-seen order
+                self.outstanding[d] -= tag.count(d)
+                if not self.outstanding[d]:
+                    self.verified_docs += 1
+                    events.append(("verify", self.extract_of[d], self.verified_docs))
+        return events
+
+    def abandon(self) -> tuple[int, int]:
+        """Drop the work not yet handed out (the client went away): (maps, verify batches)
+        that will now never be called."""
+        maps = len(self.map_queue)
+        self.map_queue.clear()
+        batches = 0
+        while self.verify_queue:
+            take_batch(self.verify_queue)
+            batches += 1
+        return maps, batches
+
+    def finish(self) -> None:
+        """Record the VERIFY time that ran past the last MAP (what VERIFY still cost)."""
+        if self.last_map_t is not None and self.last_verify_t is not None:
+            self.stats.add(wall_ms=max(0, int((self.last_verify_t - self.last_map_t) * 1000)))
+
+
+_SSE_DONE = "data: [DONE]\n\n"
+
+
+class _StreamRun:
+    """One streaming Brain run: its running state and every SSE event it emits.
+
+    ``Brain._run_stream_body`` (threads) and ``AsyncBrain.arun_stream`` (asyncio tasks) only
+    decide how the stages are driven; the events, cumulative counts, abstention rule and
+    ledger write all come from here, so both paths put the same bytes on the wire. Each step
+    method returns the SSE lines for that step, in order.
+    """
+
+    def __init__(self, brain: "Brain", query: str,
+                 doc_chunks: dict[str, tuple[str, list[Document]]], t0: float,
+                 analyst_block: Optional[str], analyst_count: int,
+                 spine_abstain: Optional[str]):
+        self.brain = brain
+        self.query = query
+        self.doc_chunks = doc_chunks
+        self.t0 = t0
+        self.analyst_block = analyst_block
+        self.analyst_count = analyst_count
+        self.spine_abstain = spine_abstain
+        self.docs_routed = len(doc_chunks)
+        self.stats = VerifyStats()
+        self.by_doc: dict[str, PerDocExtract] = {}
+        self.claims_seen = self.claims_ok = 0
+        self.answer, self.confidence, self.abstained = "", 0.0, False
+        self.groundedness, self.unsupported = 1.0, []
+
+    def start(self, analyst_pending: bool) -> list[str]:
+        out = [_sse({'type': 'brain_start', 'docs_routed': self.docs_routed})]
+        # Announce the Analyst as its own step so its work is visible (not just a backend
+        # log line) — right away when the caller precomputed it, else when it finishes.
+        if not analyst_pending and self.analyst_count > 0:
+            out.append(_sse({'type': 'brain_analyst', 'figures': self.analyst_count}))
+        return out
+
+    def analyst(self, block: Optional[str], count: int) -> list[str]:
+        """The concurrent Analyst landed (joined by the driver)."""
+        self.analyst_block, self.analyst_count = block, count
+        return [_sse({'type': 'brain_analyst', 'figures': count})] if count > 0 else []
+
+    def stage(self, kind: str, ext: PerDocExtract, n: int) -> list[str]:
+        """A doc finished MAP ("map") or had every claim judged ("verify"). Counts are
+        cumulative; the closing brain_verify (done=True) carries the full totals."""
+        if kind == "map":
+            self.by_doc[ext.doc_id] = ext
+            return [_sse({'type': 'brain_map', 'filename': ext.filename, 'claims': len(ext.claims), 'relevant': not ext.nothing_relevant and not ext.error, 'cached': ext.cached, 'progress': f'{n}/{self.docs_routed}'})]
+        doc_claims = ext.claims if ext.error is None else []
+        self.claims_seen += len(doc_claims)
+        self.claims_ok += sum(1 for c in doc_claims if c.verified)
+        return [_sse({'type': 'brain_verify', 'filename': ext.filename, 'claims_total': self.claims_seen, 'claims_verified': self.claims_ok, 'progress': f'{n}/{self.docs_routed}'})]
+
+    def assembled(self) -> list[str]:
+        """MAP + VERIFY are done: assemble in ``doc_chunks`` order, close the verify step."""
+        extracts, all_claims, self.verified, _dropped = self.brain._assemble(self.doc_chunks, self.by_doc)
+        self.docs_read = len([e for e in extracts if e.error is None])
+        self.docs_relevant = len([e for e in extracts if not e.nothing_relevant and not e.error])
+        self.docs_failed = len([e for e in extracts if e.error is not None])
+        self.docs_cached = len([e for e in extracts if e.cached])
+        self.sources = self.brain._build_sources(self.verified, self.doc_chunks)
+        return [_sse({'type': 'brain_verify', 'claims_total': len(all_claims), 'claims_verified': len(self.verified), 'auto_accepted': self.stats.auto_accepted, 'llm_calls': self.stats.llm_calls, 'done': True})]
+
+    @property
+    def reduces(self) -> bool:
+        """Whether REDUCE runs at all (not on a spine withhold, nor without verified claims)."""
+        return not self.spine_abstain and bool(self.verified)
+
+    def skip_reduce(self, cancel: Optional[CancelToken]) -> bool:
+        """The client went away before REDUCE started: count the REDUCE call it would have
+        made (none when it wouldn't run anyway) and tell the driver to stop."""
+        if not is_cancelled(cancel):
+            return False
+        if self.reduces:
+            cancel.skip("brain_reduce")
+        return True
+
+    def unreduced(self) -> Iterator[str]:
+        """No REDUCE: a single brain_reduce, then sources and the replayed fixed answer."""
+        if self.spine_abstain:
+            # C4 enforcement (§5.5): the spine's self-monitor flagged the numeric reasoning
+            # → binary WITHHOLD; skip REDUCE so no rejected figure is synthesised. A withheld
+            # number beats a confident wrong one (§4a). The old path no longer ships the wrong
+            # answer the monitor just caught.
+            answer, confidence = _spine_withhold_message(self.spine_abstain), 0.0
+        else:
+            answer, confidence = (
+                "I couldn't verify any claims against the source documents for this "
+                "question, so I can't give a grounded answer.",
+                0.0,
+            )
+        yield _sse({'type': 'brain_reduce', 'docs_relevant': self.docs_relevant, 'groundedness': 1.0, 'unsupported': 0})
+
+        abstained = confidence < BRAIN_ABSTAIN_THRESHOLD
+        # a spine withhold is already a clean refusal — don't wrap it as "preliminary".
+        if abstained and not self.spine_abstain:
+            answer = (
+                "I can only partially answer this question based on the available documents. "
+                f"Here is what I found, but please treat it as preliminary:\n\n{answer}"
+            )
+        self.answer, self.confidence, self.abstained = answer, confidence, abstained
+        yield _sse({'type': 'sources', 'sources': self.sources})
+        yield from self.brain._replay_answer(answer)
+
+    # Streamed REDUCE: tokens go out as the model writes them and every finished sentence is
+    # checked against the verified claims while the rest is still being generated (§4a.3
+    # step 2, incrementally). Sources are known before REDUCE (they come from the verified
+    # claims), so they lead; each checked sentence then gets a brain_sentence (grounded) or a
+    # brain_retract (not entailed — the client flags text it already shows). The closing
+    # brain_reduce carries the same groundedness / unsupported totals the one-shot check
+    # produced, and confidence keeps its meaning: REDUCE's own confidence × groundedness.
+    def reduce_open(self) -> list[str]:
+        return [
+            _sse({'type': 'brain_reduce', 'docs_relevant': self.docs_relevant, 'streaming': True}),
+            _sse({'type': 'sources', 'sources': self.sources}),
+        ]
+
+    def reduce_inputs(self) -> tuple:
+        """(extracts, verified_claims, analyst_block, stats) — the REDUCE stream's inputs."""
+        return (self.brain._group_claims_by_doc(self.verified, self.doc_chunks),
+                self.verified, self.analyst_block, self.stats)
+
+    def reduce_event(self, kind: str, payload) -> list[str]:
+        if kind == "token":
+            return [_sse({'type': 'token', 'content': payload})]
+        if kind == "grounded":
+            idx, sentence, ok = payload
+            if ok:
+                return [_sse({'type': 'brain_sentence', 'index': idx, 'text': sentence, 'grounded': True})]
+            return [_sse({'type': 'brain_retract', 'index': idx, 'text': sentence, 'reason': 'unsupported'})]
+        self.answer, self.confidence, self.groundedness, self.unsupported = payload
+        return []
+
+    def reduce_close(self) -> list[str]:
+        self.confidence *= self.groundedness
+        out = [_sse({'type': 'brain_reduce', 'docs_relevant': self.docs_relevant, 'groundedness': round(self.groundedness, 2), 'unsupported': len(self.unsupported), 'done': True})]
+
+        self.abstained = self.confidence < BRAIN_ABSTAIN_THRESHOLD
+        if self.abstained:
+            # The answer has already streamed, so the "preliminary" caveat the one-shot
+            # path prepends is appended as a closing note instead.
+            notice = (
+                "\n\n_I can only partially answer this question based on the available "
+                "documents — please treat the answer above as preliminary._"
+            )
+            self.answer += notice
+            out.append(_sse({'type': 'token', 'content': notice}))
+        return out
+
+    def meta(self) -> str:
+        """The closing brain_meta event (also fixes the run's wall time for the ledger)."""
+        self.elapsed_ms = int((time.perf_counter() - self.t0) * 1000)
+        self.brain._log_verify_stats(self.stats)
+        return _sse({'type': 'brain_meta', 'confidence': self.confidence, 'abstained': self.abstained, 'coverage': {'docs_routed': self.docs_routed, 'docs_read': self.docs_read, 'docs_relevant': self.docs_relevant, 'docs_failed': self.docs_failed, 'docs_cached': self.docs_cached}, 'verify': self.stats.to_dict()})
+
+    def record(self, user_id: Optional[str], collection_id: Optional[str],
+               conversation_id: Optional[str]) -> None:
+        """Best-effort coverage-ledger write for the finished run (after ``meta``)."""
+        result = BrainResult(
+            answer=self.answer, claims=self.verified, confidence=self.confidence,
+            abstained=self.abstained, sources=self.sources, docs_routed=self.docs_routed,
+            docs_read=self.docs_read, docs_relevant=self.docs_relevant,
+            docs_failed=self.docs_failed, docs_cached=self.docs_cached,
+            verify_stats=self.stats.to_dict(),
+        )
+        self.brain._record_ledger(
+            result, self.query, user_id, collection_id, conversation_id,
+            self.elapsed_ms,
+        )
+
+
 class Brain:
     """Stage-2 map-reduce synthesis Brain.
 
@@ -233,21 +580,25 @@ class Brain:
         self._map_llm = None    # cheap model for MAP (gpt-4o-mini)
         self._reduce_llm = None  # larger model for REDUCE (gpt-4o or claude)
         self._verify_llm = None  # independent model for VERIFY
+        self._map_cache = map_extract_cache  # Redis MAP extract cache (map_cache.py)
 
     def _get_map_llm(self):
         if self._map_llm is None:
             from langchain_openai import ChatOpenAI
+            from src.components.rate_limiter import llm_limit_kwargs
             self._map_llm = ChatOpenAI(
                 model=self.config.LLM_MODEL_NAME,  # gpt-4o-mini by default
                 temperature=0.0,
                 api_key=self.config.OPENAI_API_KEY,
                 request_timeout=45,
+                **llm_limit_kwargs("openai", self.config.LLM_MODEL_NAME, est_tokens=3000),
             )
         return self._map_llm
 
     def _get_reduce_llm(self):
         if self._reduce_llm is None:
             from langchain_openai import ChatOpenAI
+            from src.components.rate_limiter import llm_limit_kwargs
             # REDUCE uses a stronger model; fall back to the same model if not configured
             reduce_model = getattr(self.config, "REDUCE_LLM_MODEL", None) or "gpt-4o"
             self._reduce_llm = ChatOpenAI(
@@ -255,19 +606,25 @@ class Brain:
                 temperature=0.1,
                 api_key=self.config.OPENAI_API_KEY,
                 request_timeout=90,
+                **llm_limit_kwargs("openai", reduce_model, est_tokens=8000),
             )
         return self._reduce_llm
 
     def _get_verify_llm(self):
         if self._verify_llm is None:
             from langchain_openai import ChatOpenAI
+            from src.components.rate_limiter import llm_limit_kwargs
             # Verifier uses a different model from REDUCE to de-correlate errors (§4a.3)
             verify_model = getattr(self.config, "VERIFY_LLM_MODEL", None) or "gpt-4o-mini"
+            # JSON mode: every verifier prompt (single and batched) answers with one JSON
+            # object, so a batch's per-item verdict list comes back structurally valid.
             self._verify_llm = ChatOpenAI(
                 model=verify_model,
                 temperature=0.0,
                 api_key=self.config.OPENAI_API_KEY,
                 request_timeout=30,
+                model_kwargs={"response_format": {"type": "json_object"}},
+                **llm_limit_kwargs("openai", verify_model, est_tokens=1500),
             )
         return self._verify_llm
 
@@ -280,64 +637,117 @@ class Brain:
         filename: str,
         chunks: list[Document],
     ) -> PerDocExtract:
-        """Extract claims from a single document's chunks."""
+        """Extract claims from a single document's chunks.
+
+        Served from the MAP extract cache when this doc was already MAP'd for the same
+        (normalised) question over the same chunk set — a rephrase or follow-up only pays
+        MAP for docs whose retrieved context moved. Fresh extracts are cached before VERIFY
+        touches their claims; the returned extract has ``cached=True`` on a hit.
+        """
         if not chunks:
             return PerDocExtract(doc_id=doc_id, filename=filename, nothing_relevant=True)
 
+        chunks = self._map_budget(filename, chunks)
+        salt = self._map_salt(filename)
+        hit = self._map_cache.get(query, doc_id, chunks, salt)
+        if hit is not None:
+            hit.cached = True
+            logger.info("[Brain MAP] %s: %d claims from the MAP cache", filename, len(hit.claims))
+            return hit
+        extract = self._map_extract(query, doc_id, filename, chunks)
+        self._map_cache.put(query, doc_id, chunks, extract, salt)
+        return extract
+
+    def _map_budget(self, filename: str, chunks: list[Document]) -> list[Document]:
+        """Invariant R2 for MAP: trim a doc's ranked chunks (lowest-ranked first, never
+        below one) so the MAP context fits ``CONTEXT_TOKEN_BUDGET`` — the budget
+        generation already applies; MAP used to send whatever retrieval returned. Sums
+        the ingest-stamped ``token_count``s (utils._token_budget_cut)."""
+        budget = getattr(self.config, "CONTEXT_TOKEN_BUDGET", None)
+        if not budget or not chunks:
+            return chunks
+        keep, total = _token_budget_cut(chunks, budget)
+        if keep < len(chunks):
+            logger.info("[Brain MAP] %s: context %d tokens > budget %d — %d/%d chunks kept",
+                        filename, total, budget, keep, len(chunks))
+        return chunks[:keep]
+
+    def _map_salt(self, filename: str) -> str:
+        """MAP-cache salt: a model / prompt / filename change must not serve an old extract."""
+        return f"{getattr(self.config, 'LLM_MODEL_NAME', '')}|{_MAP_PROMPT_VERSION}|{filename}"
+
+    @staticmethod
+    def _map_request(query: str, doc_id: str, filename: str, chunks: list[Document]) -> list:
+        """[system, user] messages for one doc's MAP call."""
+        from langchain_core.messages import SystemMessage, HumanMessage
+
         context = "\n---\n".join(
             f"[chunk {c.metadata.get('chunk_id', i)}]\n{c.page_content}"
             for i, c in enumerate(chunks)
         )
+        system, user = _map_messages(query, doc_id, filename, context)
+        return [SystemMessage(content=system), HumanMessage(content=user)]
 
-        try:
-            from langchain_core.messages import SystemMessage, HumanMessage
+    @staticmethod
+    def _parse_map_output(
+        raw: str, doc_id: str, filename: str, chunks: list[Document],
+    ) -> PerDocExtract:
+        """MAP model output → PerDocExtract. Raises on a malformed response (caller degrades)."""
+        raw = (raw or "").strip()
+        if raw.upper() == "NOTHING_RELEVANT":
+            return PerDocExtract(doc_id=doc_id, filename=filename, nothing_relevant=True)
 
-            system, user = _map_messages(query, doc_id, filename, context)
-            raw = self._get_map_llm().invoke(
-                [SystemMessage(content=system), HumanMessage(content=user)]
-            ).content
+        # Parse JSON claims
+        if raw.startswith("```"):
+            raw = raw.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
+        items = json.loads(raw)
+
+        claims = []
+        for item in items:
+            claim_text = item.get("claim", "").strip()
+            span = item.get("verbatim_span", "").strip()
+            conf = float(item.get("confidence", 0.8))
+            if not claim_text:
+                continue
+            # Attribute the evidence to the chunk the span actually came from,
+            # not blindly to chunk[0] — so the Trust UI can highlight the span
+            # in the right source chunk.
+            ev_chunk_id, ev_doc_id = _locate_evidence(span, chunks, doc_id)
+            claims.append(Claim(
+                text=claim_text,
+                evidence=[EvidenceSpan(
+                    doc_id=ev_doc_id,
+                    chunk_id=ev_chunk_id,
+                    verbatim_span=span,
+                )] if span else [],
+                confidence=conf,
+                derivation="extracted",
+            ))
 
-            raw = (raw or "").strip()
-            if raw.upper() == "NOTHING_RELEVANT":
-                return PerDocExtract(doc_id=doc_id, filename=filename, nothing_relevant=True)
-
-            # Parse JSON claims
-            if raw.startswith("```"):
-                raw = raw.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
-            items = json.loads(raw)
-
-            claims = []
-            for item in items:
-                claim_text = item.get("claim", "").strip()
-                span = item.get("verbatim_span", "").strip()
-                conf = float(item.get("confidence", 0.8))
-                if not claim_text:
-                    continue
-                # Attribute the evidence to the chunk the span actually came from,
-                # not blindly to chunk[0] — so the Trust UI can highlight the span
-                # in the right source chunk.
-                ev_chunk_id, ev_doc_id = _locate_evidence(span, chunks, doc_id)
-                claims.append(Claim(
-                    text=claim_text,
-                    evidence=[EvidenceSpan(
-                        doc_id=ev_doc_id,
-                        chunk_id=ev_chunk_id,
-                        verbatim_span=span,
-                    )] if span else [],
-                    confidence=conf,
-                    derivation="extracted",
-                ))
+        logger.info(
+            "[Brain MAP] %s: %d claims extracted from %d chunks",
+            filename, len(claims), len(chunks),
+        )
+        return PerDocExtract(
+            doc_id=doc_id,
+            filename=filename,
+            claims=claims,
+            nothing_relevant=len(claims) == 0,
+        )
 
-            logger.info(
-                "[Brain MAP] %s: %d claims extracted from %d chunks",
-                filename, len(claims), len(chunks),
-            )
-            return PerDocExtract(
-                doc_id=doc_id,
-                filename=filename,
-                claims=claims,
-                nothing_relevant=len(claims) == 0,
-            )
+    def _map_extract(
+        self,
+        query: str,
+        doc_id: str,
+        filename: str,
+        chunks: list[Document],
+    ) -> PerDocExtract:
+        """One MAP LLM call over a doc's chunks → parsed claims (uncached)."""
+        try:
+            raw = self._get_map_llm().invoke(
+                self._map_request(query, doc_id, filename, chunks)
+            ).content
+            return self._parse_map_output(raw, doc_id, filename, chunks)
 
         except Exception as exc:
             logger.warning("[Brain MAP] Failed for %s: %s", filename, exc)
@@ -348,21 +758,27 @@ class Brain:
         query: str,
         doc_chunks: dict[str, tuple[str, list[Document]]],
         on_progress: Optional[Callable[[str, PerDocExtract], None]] = None,
+        cancel: Optional[CancelToken] = None,
     ) -> list[PerDocExtract]:
         """Run MAP over all docs in parallel (bounded by MAP_CONCURRENCY).
 
         doc_chunks: {doc_id: (filename, [chunks])}
         on_progress: callback(doc_id, extract) called as each doc completes (for SSE)
+        cancel: the request's CancelToken — a doc whose MAP has not started when it fires
+                is skipped (an error extract "cancelled"), not called
         """
         results: list[PerDocExtract] = []
         concurrency = min(MAP_CONCURRENCY, len(doc_chunks))
 
+        def _map_one(doc_id: str, filename: str, chunks: list[Document]) -> PerDocExtract:
+            if is_cancelled(cancel):
+                cancel.skip("brain_map")
+                return PerDocExtract(doc_id=doc_id, filename=filename, error="cancelled")
+            return self._map_single_doc(query, doc_id, filename, chunks)
+
         with ThreadPoolExecutor(max_workers=concurrency) as pool:
             futures = {
-                pool.submit(
-                    self._map_single_doc,
-                    query, doc_id, filename, chunks,
-                ): doc_id
+                pool.submit(_map_one, doc_id, filename, chunks): doc_id
                 for doc_id, (filename, chunks) in doc_chunks.items()
             }
             for future in as_completed(futures):
@@ -379,30 +795,122 @@ class Brain:
 
         return results
 
+    def _map_verify_pipeline(
+        self,
+        query: str,
+        doc_chunks: dict[str, tuple[str, list[Document]]],
+        stats: VerifyStats,
+        side_task: Optional[Future] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> Iterator[tuple[str, Optional[PerDocExtract], int]]:
+        """Pipelined MAP → VERIFY over one bounded pool of LLM_CONCURRENCY workers.
+
+        Each doc's MAP is submitted up front (MAP first: it heads the longest chain); the
+        moment a doc's MAP completes its claims go through the verifier pre-pass and the rest
+        join a claim queue, so verification overlaps the MAP tail instead of waiting for the
+        slowest doc. A freed worker takes up to one verifier batch off that queue — claims of
+        several docs share a call when they piled up while the workers were busy, and a lone
+        late doc is verified alone rather than waiting for company. Never more than the
+        budget in flight across both stages.
+
+        Yields, in completion order:
+          ("map",    extract, maps_done)      — a doc's MAP finished
+          ("verify", extract, verified_docs)  — every claim of that doc now has its verdict
+          ("side_task", None, 0)              — ``side_task`` finished (at most once)
+        ``side_task`` is a future running OUTSIDE the LLM budget (the run_stream Analyst);
+        it is waited on alongside the pool so its completion surfaces the moment it lands,
+        not at the next MAP/VERIFY event. If it is still running when the pool drains, the
+        generator simply ends — joining it is the caller's job.
+        Verdicts land on the Claim objects themselves, so the caller assembles the final,
+        deterministic result in ``doc_chunks`` order once the generator is exhausted.
+
+        When ``cancel`` fires the pipeline stops handing out work and ends without waiting
+        for the calls already in flight (they finish on the pool and are discarded); every
+        MAP and verifier batch never started is counted as avoided.
+        """
+        llm = self._get_verify_llm()
+        ledger = _MapVerifyLedger(doc_chunks, self._chunk_text_lookup(doc_chunks), stats)
+        budget = max(1, LLM_CONCURRENCY)
+        stats.workers = budget
+        inflight: dict = {}
+
+        pool = ThreadPoolExecutor(max_workers=budget)
+        try:
+            def _fill():
+                while len(inflight) < budget and not is_cancelled(cancel):
+                    job = ledger.next_job()
+                    if job is None:
+                        break
+                    kind, tag, arg = job
+                    if kind == "map":
+                        fut = pool.submit(self._map_single_doc, query, tag, *arg)
+                    else:
+                        fut = pool.submit(verify_claim_batch, arg, llm, ABSTAIN_THRESHOLD, stats)
+                    inflight[fut] = job
+
+            _fill()
+            while inflight and not is_cancelled(cancel):
+                watched = [*inflight, side_task] if side_task is not None else inflight
+                done, _ = wait(watched, return_when=FIRST_COMPLETED)
+                events: list[tuple[str, Optional[PerDocExtract], int]] = []
+                for fut in done:
+                    if fut is side_task:
+                        side_task = None
+                        events.append(("side_task", None, 0))
+                        continue
+                    events.extend(ledger.settle(inflight.pop(fut), fut))
+                # Refill the budget BEFORE handing events out: a slow consumer (an SSE client)
+                # must not leave workers idle.
+                _fill()
+                yield from events
+        finally:
+            cancelled = is_cancelled(cancel)
+            if cancelled:
+                maps, batches = ledger.abandon()
+                cancel.skip("brain_map", maps)
+                cancel.skip("brain_verify", batches)
+            # Uncancelled (done, or the consumer closed us) ⇒ join in-flight calls as before.
+            pool.shutdown(wait=not cancelled, cancel_futures=cancelled)
+
+        ledger.finish()
+
+    @staticmethod
+    def _assemble(
+        doc_chunks: dict[str, tuple[str, list[Document]]],
+        by_doc: dict[str, PerDocExtract],
+    ) -> tuple[list[PerDocExtract], list[Claim], list[Claim], list[Claim]]:
+        """(extracts, all_claims, verified, dropped) in ``doc_chunks`` order — independent of
+        the order MAP / VERIFY happened to finish in, so REDUCE always sees the same input."""
+        extracts = [by_doc[d] for d in doc_chunks if d in by_doc]
+        all_claims = [c for e in extracts if e.error is None for c in e.claims]
+        verified = [c for c in all_claims if c.verified]
+        dropped = [c for c in all_claims if not c.verified]
+        return extracts, all_claims, verified, dropped
+
+    @staticmethod
+    def _chunk_text_lookup(
+        doc_chunks: dict[str, tuple[str, list[Document]]],
+    ) -> Callable[[EvidenceSpan], Optional[str]]:
+        """Evidence span → text of the chunk it cites, for the verifier's verbatim pre-pass."""
+        texts = {
+            (doc_id, str(c.metadata.get("chunk_id", "") or "")): c.page_content or ""
+            for doc_id, (_fn, chunks) in doc_chunks.items()
+            for c in (chunks or [])
+        }
+        return lambda ev: texts.get((ev.doc_id, str(ev.chunk_id)))
+
     # ── REDUCE step ───────────────────────────────────────────────────────────
 
-    def _reduce(
+    def _reduce_prompt(
         self,
         query: str,
         extracts: list[PerDocExtract],
         analyst_block: Optional[str] = None,
-    ) -> tuple[str, float, list[Claim]]:
-        """Synthesize per-doc extracts into one answer.
-
-        When ``analyst_block`` is provided (Phase 4.3), it carries figures the
-        deterministic Analyst already COMPUTED from source table cells (with shown
-        formulas). It is prepended to the extracts as authoritative, so REDUCE
-        states those numbers verbatim instead of doing the arithmetic itself.
-
-        Returns: (prose_answer, confidence, synthesized_claims)
-        """
+    ) -> tuple[list[PerDocExtract], str, str]:
+        """(relevant_extracts, system, user) for REDUCE; empty prompts when nothing is relevant."""
         relevant = [e for e in extracts if not e.nothing_relevant and not e.error]
         if not relevant:
-            return (
-                "I couldn't find relevant information across the documents for this question.",
-                0.0,
-                [],
-            )
+            return relevant, "", ""
 
         # Build the extracts block
         extracts_text_parts = []
@@ -424,28 +932,44 @@ class Brain:
                 f"{analyst_block}\n\n" + extracts_text
             )
 
+        system, user = _reduce_messages(query, len(relevant), extracts_text,
+                                        has_computed=bool(analyst_block))
+        return relevant, system, user
+
+    @staticmethod
+    def _reduce_fallback(relevant: list[PerDocExtract]) -> str:
+        """Degraded REDUCE answer: per-doc summaries of the first claims."""
+        return "\n\n".join(
+            f"**{ext.filename}:** " + " ".join(c.text for c in ext.claims[:3])
+            for ext in relevant[:5]
+        )
+
+    def _reduce(
+        self,
+        query: str,
+        extracts: list[PerDocExtract],
+        analyst_block: Optional[str] = None,
+    ) -> tuple[str, float, list[Claim]]:
+        """Synthesize per-doc extracts into one answer.
+
+        When ``analyst_block`` is provided (Phase 4.3), it carries figures the
+        deterministic Analyst already COMPUTED from source table cells (with shown
+        formulas). It is prepended to the extracts as authoritative, so REDUCE
+        states those numbers verbatim instead of doing the arithmetic itself.
+
+        Returns: (prose_answer, confidence, synthesized_claims)
+        """
+        relevant, system, user = self._reduce_prompt(query, extracts, analyst_block)
+        if not relevant:
+            return _NOTHING_RELEVANT_ANSWER, 0.0, []
+
         try:
             from langchain_core.messages import SystemMessage, HumanMessage
 
-            system, user = _reduce_messages(query, len(relevant), extracts_text,
-                                            has_computed=bool(analyst_block))
             raw_answer = self._get_reduce_llm().invoke(
                 [SystemMessage(content=system), HumanMessage(content=user)]
             ).content
-            raw_answer = raw_answer or ""
-
-            # Parse confidence from answer
-            confidence = 0.7  # default
-            answer = raw_answer
-            if "## Confidence" in raw_answer:
-                parts = raw_answer.rsplit("## Confidence", 1)
-                answer = parts[0].strip()
-                conf_text = parts[1].strip()
-                import re
-                m = re.search(r"(\d+\.?\d*)", conf_text)
-                if m:
-                    val = float(m.group(1))
-                    confidence = val if val <= 1.0 else val / 100.0
+            answer, confidence = _parse_reduce_answer(raw_answer or "")
 
             # Build synthesized claims from all per-doc claims (for citation UI)
             all_claims = []
@@ -457,11 +981,81 @@ class Brain:
         except Exception as exc:
             logger.error("[Brain REDUCE] Failed: %s", exc)
             # Degraded: return per-doc summaries as fallback answer
-            fallback = "\n\n".join(
-                f"**{ext.filename}:** " + " ".join(c.text for c in ext.claims[:3])
-                for ext in relevant[:5]
-            )
-            return fallback, 0.4, []
+            return self._reduce_fallback(relevant), 0.4, []
+
+    def _reduce_stream(
+        self,
+        query: str,
+        extracts: list[PerDocExtract],
+        verified_claims: list[Claim],
+        analyst_block: Optional[str],
+        stats: VerifyStats,
+        cancel: Optional[CancelToken] = None,
+    ) -> Iterator[tuple[str, object]]:
+        """REDUCE streamed from the model, with each finished sentence grounded as it lands.
+
+        The streaming twin of ``_reduce`` + ``verify_reduce_output`` (same prompt, same
+        confidence parse, same sentence set — see SentenceGrounder). Answer text is released
+        as the model writes it, except: the trailing "## Confidence" section never goes out,
+        a line that opens with "|" (table row) or "#" (heading — possibly that section) is
+        held until it is complete, and leading/trailing whitespace is trimmed — so the
+        concatenated tokens equal the final ``answer`` exactly.
+
+        Yields, interleaved in arrival order:
+          ("token",    text)                         — answer text, ready to show
+          ("grounded", (index, sentence, supported)) — a sentence's §4a.3-step-2 verdict
+          ("done",     (answer, confidence, groundedness, unsupported_sentences))
+        ``confidence`` is REDUCE's self-reported confidence (NOT yet × groundedness), as
+        ``_reduce`` returns it; a model failure degrades to the per-doc fallback at 0.4.
+        If ``cancel`` fires mid-stream the model stream is closed, pending sentence checks
+        are dropped and the generator ends without "done".
+        """
+        relevant, system, user = self._reduce_prompt(query, extracts, analyst_block)
+        grounder = SentenceGrounder(verified_claims, self._get_verify_llm(), stats=stats,
+                                    cancel=cancel)
+        out = _AnswerRelease(grounder)
+        confidence = 0.0 if not relevant else None
+
+        try:
+            if not relevant:
+                chunks = iter([_NOTHING_RELEVANT_ANSWER])
+            else:
+                from langchain_core.messages import SystemMessage, HumanMessage
+
+                llm = self._get_reduce_llm()
+                messages = [SystemMessage(content=system), HumanMessage(content=user)]
+                if hasattr(llm, "stream"):
+                    chunks = (getattr(c, "content", c) for c in llm.stream(messages))
+                else:
+                    chunks = iter([llm.invoke(messages).content])
+            for piece in chunks:
+                if is_cancelled(cancel):
+                    # Closing the model stream stops paying for tokens nobody will read.
+                    getattr(chunks, "close", lambda: None)()
+                    grounder.shutdown()
+                    return
+                delta = out.add(piece)
+                if delta:
+                    yield "token", delta
+                for verdict in grounder.poll():
+                    yield "grounded", verdict
+        except Exception as exc:
+            logger.error("[Brain REDUCE] Stream failed: %s", exc)
+            out.fail(self._reduce_fallback(relevant))
+            confidence = 0.4
+        except GeneratorExit:
+            grounder.shutdown()
+            raise
+
+        delta = out.release(final=True)
+        if delta:
+            yield "token", delta
+        grounder.close()
+        for verdict in grounder.drain():
+            yield "grounded", verdict
+        if confidence is None:
+            confidence = _parse_reduce_answer(out.raw)[1]
+        yield "done", (out.answer, confidence, grounder.groundedness, grounder.unsupported)
 
     def _group_claims_by_doc(
         self,
@@ -537,7 +1131,9 @@ class Brain:
 
         Order matters (§4a.2): claims are verified BEFORE synthesis so the prose
         is rendered from verified claims only — never from claims an entailment
-        check would have dropped.
+        check would have dropped. MAP and VERIFY are pipelined per document (a doc's
+        claims are verified while other docs are still mapping); REDUCE still waits
+        for every verdict, and its input is assembled in ``doc_chunks`` order.
 
         Args:
             query:      User query.
@@ -555,13 +1151,19 @@ class Brain:
         docs_routed = len(doc_chunks)
         t0 = time.perf_counter()
 
-        # ── MAP ──────────────────────────────────────────────────────────────
-        logger.info("[Brain] MAP start: %d docs", docs_routed)
-        extracts = self._map_all_docs(query, doc_chunks)
+        # ── MAP → VERIFY, pipelined (verify before REDUCE — §4a.2) ──────────────
+        logger.info("[Brain] MAP+VERIFY start: %d docs", docs_routed)
+        verify_stats = VerifyStats()
+        by_doc: dict[str, PerDocExtract] = {}
+        for kind, ext, _n in self._map_verify_pipeline(query, doc_chunks, verify_stats):
+            if kind == "map":
+                by_doc[ext.doc_id] = ext
+        extracts, all_claims, verified_claims, dropped_claims = self._assemble(doc_chunks, by_doc)
 
         docs_read = len([e for e in extracts if e.error is None])
         docs_relevant = len([e for e in extracts if not e.nothing_relevant and not e.error])
         docs_failed = len([e for e in extracts if e.error is not None])
+        docs_cached = len([e for e in extracts if e.cached])
 
         # Quorum check (§6.3)
         if docs_read < docs_routed * MAP_QUORUM:
@@ -569,11 +1171,6 @@ class Brain:
                 "[Brain] MAP quorum not met: %d/%d succeeded (need %.0f%%)",
                 docs_read, docs_routed, MAP_QUORUM * 100,
             )
-
-        # ── VERIFY (before REDUCE — §4a.2) ─────────────────────────────────────
-        all_claims = [c for e in extracts if e.error is None for c in e.claims]
-        logger.info("[Brain] VERIFY start: %d claims", len(all_claims))
-        verified_claims, dropped_claims = verify_claims(all_claims, self._get_verify_llm())
         if dropped_claims:
             logger.info(
                 "[Brain] VERIFY: %d/%d claims dropped (below threshold)",
@@ -610,7 +1207,7 @@ class Brain:
             # synthesised prose, which can introduce an unsupported connection.
             # Re-check the synthesised sentences against the verified claim pool.
             groundedness, unsupported = verify_reduce_output(
-                answer, verified_claims, self._get_verify_llm(),
+                answer, verified_claims, self._get_verify_llm(), stats=verify_stats,
             )
             confidence *= groundedness  # ungrounded synthesis cannot stay high-confidence
             if unsupported:
@@ -636,10 +1233,11 @@ class Brain:
         sources = self._build_sources(verified_claims, doc_chunks)
 
         elapsed_ms = int((time.perf_counter() - t0) * 1000)
+        self._log_verify_stats(verify_stats)
         logger.info(
-            "[Brain] Done: routed=%d read=%d relevant=%d failed=%d "
+            "[Brain] Done: routed=%d read=%d relevant=%d failed=%d cached=%d "
             "claims=%d confidence=%.2f elapsed=%dms",
-            docs_routed, docs_read, docs_relevant, docs_failed,
+            docs_routed, docs_read, docs_relevant, docs_failed, docs_cached,
             len(verified_claims), confidence, elapsed_ms,
         )
 
@@ -654,7 +1252,9 @@ class Brain:
             docs_read=docs_read,
             docs_relevant=docs_relevant,
             docs_failed=docs_failed,
+            docs_cached=docs_cached,
             per_doc_extracts=extracts,
+            verify_stats=verify_stats.to_dict(),
         )
 
         self._record_ledger(
@@ -662,6 +1262,16 @@ class Brain:
         )
         return result
 
+    @staticmethod
+    def _log_verify_stats(stats: VerifyStats) -> None:
+        if stats.items:
+            logger.info(
+                "[Brain] VERIFY cost: %d items, %d auto-accepted, %d LLM calls "
+                "(%d batched, %d per-item fallbacks) — %d calls saved, ~%dms saved, %dms spent",
+                stats.items, stats.auto_accepted, stats.llm_calls, stats.batch_calls,
+                stats.fallback_items, stats.calls_saved, stats.est_saved_ms, stats.wall_ms,
+            )
+
     @staticmethod
     def _record_ledger(result, query, user_id, collection_id, conversation_id, wall_ms):
         """Best-effort coverage-ledger write (§3.2).  Never raises."""
@@ -695,115 +1305,85 @@ class Brain:
         analyst_block: Optional[str] = None,
         analyst_count: int = 0,
         spine_abstain: Optional[str] = None,
+        analyst_fn: Optional[Callable[[], tuple[Optional[str], int]]] = None,
+        cancel: Optional[CancelToken] = None,
     ) -> Iterator[str]:
         """Generator yielding SSE events as the Brain works.
 
         Pipeline order is MAP → VERIFY → REDUCE (§4a.2: prose is synthesised from
-        verified claims only).  MAP progress is streamed live, per document, as each
-        finishes.
-
-        ``analyst_block`` (and its ``analyst_count``) are produced by the caller's
-        deterministic Analyst (§4b) BEFORE this generator runs — the compute already
-        happened. We surface it as a live ``brain_analyst`` step so the user can see
-        the Analyst woke up and computed N figures, instead of it folding silently
-        into the answer. The number is the count of OK (traced) computed figures.
+        verified claims only).  MAP and VERIFY are pipelined per document on one shared
+        LLM budget (``_map_verify_pipeline``); both stream live progress as each doc
+        finishes a stage.
+
+        The deterministic Analyst (§4b) comes in one of two shapes:
+          • ``analyst_fn`` — a zero-arg callable returning ``(analyst_block, analyst_count)``.
+            It is started on its own thread the moment the stream opens and runs alongside
+            MAP + VERIFY (it reads grids, not the routed chunks, so it needs nothing they
+            produce); REDUCE is the only consumer, so it is joined just before REDUCE. Its
+            one spec-LLM call sits OUTSIDE the LLM_CONCURRENCY budget, as before. A failing
+            Analyst degrades to "no figures" — the Brain answers from prose alone.
+          • ``analyst_block`` / ``analyst_count`` — already computed by the caller.
+        Either way it is surfaced as a live ``brain_analyst`` step (the count of OK, traced
+        computed figures) so the user sees the Analyst woke up instead of it folding
+        silently into the answer. With ``analyst_fn`` that event lands whenever the
+        Analyst finishes — possibly between brain_map events — but always before
+        brain_reduce.
 
         Events emitted (JSON, same wire format as the existing chat stream):
           {"type": "brain_start",    "docs_routed": N}
-          {"type": "brain_analyst",  "figures": N}        ← only when the Analyst computed ≥1 figure
-          {"type": "brain_map",      "filename": ..., "claims": N, "relevant": bool, "progress": "k/N"}
-          {"type": "brain_verify",   "claims_total": N, "claims_verified": N}
-          {"type": "brain_reduce",   "docs_relevant": N}
+          {"type": "brain_analyst",  "figures": N}        ← only when the Analyst computed ≥1 figure;
+                                                           at most once, any time before brain_reduce
+          {"type": "brain_map",      "filename": ..., "claims": N, "relevant": bool, "cached": bool, "progress": "k/N"}
+                                                           ← cached: served by the MAP extract cache (no MAP call)
+          {"type": "brain_verify",   "filename": ..., "claims_total": N, "claims_verified": N, "progress": "k/N"}
+                                                           ← per doc as its claims are verified (cumulative counts)
+          {"type": "brain_verify",   "claims_total": N, "claims_verified": N, "auto_accepted": N, "llm_calls": N, "done": true}
+          {"type": "brain_reduce",   "docs_relevant": N, "streaming": true}   ← REDUCE started
           {"type": "sources",        "sources": [...]}   ← same as fast path
-          {"type": "token",          "content": "..."}   ← streamed answer tokens
-          {"type": "brain_meta",     "confidence": ..., "abstained": ..., "coverage": {...}}
+          {"type": "token",          "content": "..."}   ← answer text as the REDUCE model writes it
+          {"type": "brain_sentence", "index": i, "text": ..., "grounded": true}
+                                                           ← a finished sentence is entailed by the claims
+          {"type": "brain_retract",  "index": i, "text": ..., "reason": "unsupported"}
+                                                           ← a finished sentence (already sent) is NOT
+          {"type": "brain_reduce",   "docs_relevant": N, "groundedness": g, "unsupported": N, "done": true}
+          {"type": "token",          "content": "..."}   ← "preliminary" note, only when abstained
+          {"type": "brain_meta",     "confidence": ..., "abstained": ..., "coverage": {...}, "verify": {...}}
           [DONE]
+        token / brain_sentence / brain_retract interleave; every substantive sentence gets
+        exactly one of the two verdict events, indexed in answer order. When no REDUCE runs
+        (spine withhold, or no verified claims) there is a single brain_reduce carrying
+        groundedness, then sources and the replayed answer tokens.
+
+        ``cancel`` is the request's CancelToken (fired when the SSE client disconnects): no
+        further MAP / VERIFY / REDUCE call is started once it fires, and the stream ends
+        without brain_meta / [DONE] and without a ledger row — nobody is listening.
         """
-        import json as _json
-
         t0 = time.perf_counter()
-        docs_routed = len(doc_chunks)
-        yield f"data: {_json.dumps({'type': 'brain_start', 'docs_routed': docs_routed})}\n\n"
-
-        # The deterministic Analyst (§4b) ran in the caller before us; announce it as
-        # its own step so its work is visible (not just a backend log line).
-        if analyst_count > 0:
-            yield f"data: {_json.dumps({'type': 'brain_analyst', 'figures': analyst_count})}\n\n"
-
-        # ── MAP with live per-doc progress (driven directly so we can yield) ────
-        extracts: list[PerDocExtract] = []
-        concurrency = max(1, min(MAP_CONCURRENCY, len(doc_chunks)))
-        done = 0
-        with ThreadPoolExecutor(max_workers=concurrency) as pool:
-            futures = {
-                pool.submit(self._map_single_doc, query, doc_id, filename, chunks): doc_id
-                for doc_id, (filename, chunks) in doc_chunks.items()
-            }
-            for future in as_completed(futures):
-                doc_id = futures[future]
-                try:
-                    ext = future.result()
-                except Exception as exc:
-                    ext = PerDocExtract(
-                        doc_id=doc_id, filename=doc_chunks[doc_id][0], error=str(exc)
-                    )
-                extracts.append(ext)
-                done += 1
-                yield f"data: {_json.dumps({'type': 'brain_map', 'filename': ext.filename, 'claims': len(ext.claims), 'relevant': not ext.nothing_relevant and not ext.error, 'progress': f'{done}/{docs_routed}'})}\n\n"
-
-        docs_read = len([e for e in extracts if e.error is None])
-        docs_relevant = len([e for e in extracts if not e.nothing_relevant and not e.error])
-        docs_failed = len([e for e in extracts if e.error is not None])
-
-        # ── VERIFY (before REDUCE) ─────────────────────────────────────────────
-        all_claims = [c for e in extracts if e.error is None for c in e.claims]
-        verified_claims, _dropped = verify_claims(all_claims, self._get_verify_llm())
-        yield f"data: {_json.dumps({'type': 'brain_verify', 'claims_total': len(all_claims), 'claims_verified': len(verified_claims)})}\n\n"
-
-        # ── REDUCE from verified claims only ───────────────────────────────────
-        if spine_abstain:
-            # C4 enforcement (§5.5): the spine's self-monitor flagged the numeric reasoning
-            # → binary WITHHOLD; skip REDUCE so no rejected figure is synthesised. A withheld
-            # number beats a confident wrong one (§4a). The old path no longer ships the wrong
-            # answer the monitor just caught.
-            answer, confidence = _spine_withhold_message(spine_abstain), 0.0
-            groundedness, n_unsupported = 1.0, 0
-        elif not verified_claims:
-            answer, confidence = (
-                "I couldn't verify any claims against the source documents for this "
-                "question, so I can't give a grounded answer.",
-                0.0,
-            )
-            groundedness, n_unsupported = 1.0, 0
-        else:
-            answer, confidence, _ = self._reduce(
-                query, self._group_claims_by_doc(verified_claims, doc_chunks),
-                analyst_block=analyst_block,
-            )
-            # §4a.3 step 2: verify the synthesised prose against verified claims.
-            groundedness, unsupported = verify_reduce_output(
-                answer, verified_claims, self._get_verify_llm(),
-            )
-            confidence *= groundedness
-            n_unsupported = len(unsupported)
-        yield f"data: {_json.dumps({'type': 'brain_reduce', 'docs_relevant': docs_relevant, 'groundedness': round(groundedness, 2), 'unsupported': n_unsupported})}\n\n"
-
-        abstained = confidence < BRAIN_ABSTAIN_THRESHOLD
-        # a spine withhold is already a clean refusal — don't wrap it as "preliminary".
-        if abstained and not spine_abstain:
-            answer = (
-                "I can only partially answer this question based on the available documents. "
-                f"Here is what I found, but please treat it as preliminary:\n\n{answer}"
+        # Start the Analyst before anything else so it overlaps the whole of MAP + VERIFY.
+        analyst_pool = analyst_future = None
+        if analyst_fn is not None:
+            analyst_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="brain-analyst")
+            analyst_future = analyst_pool.submit(analyst_fn)
+        try:
+            yield from self._run_stream_body(
+                query, doc_chunks, t0, user_id, collection_id, conversation_id,
+                analyst_block, analyst_count, spine_abstain, analyst_future, cancel,
             )
+        finally:
+            if analyst_pool is not None:
+                # A client that disconnects mid-stream must not block on the Analyst.
+                analyst_pool.shutdown(wait=False)
 
-        sources = self._build_sources(verified_claims, doc_chunks)
-        yield f"data: {_json.dumps({'type': 'sources', 'sources': sources})}\n\n"
+    @staticmethod
+    def _replay_answer(answer: str) -> Iterator[str]:
+        """SSE token events for an answer that is already complete (no model to stream from)."""
+        import json as _json
 
-        # Stream the answer. Markdown tables only parse correctly when each table
-        # row arrives as a whole line, so we stream line-by-line: words within a
-        # line stream for the live "typing" feel, but every newline is preserved
-        # and flushed intact — keeping the `| col | col |` rows un-shattered so the
-        # frontend renders them as proper sortable tables (not broken fragments).
+        # Markdown tables only parse correctly when each table row arrives as a whole
+        # line, so we stream line-by-line: words within a line stream for the live
+        # "typing" feel, but every newline is preserved and flushed intact — keeping the
+        # `| col | col |` rows un-shattered so the frontend renders them as proper
+        # sortable tables (not broken fragments).
         for line in answer.splitlines(keepends=True):
             if line.strip().startswith("|"):
                 # Table row — emit the whole line atomically so GFM can parse it.
@@ -817,15 +1397,70 @@ class Brain:
                 if newline:
                     yield f"data: {_json.dumps({'type': 'token', 'content': newline})}\n\n"
 
-        elapsed_ms = int((time.perf_counter() - t0) * 1000)
-        yield f"data: {_json.dumps({'type': 'brain_meta', 'confidence': confidence, 'abstained': abstained, 'coverage': {'docs_routed': docs_routed, 'docs_read': docs_read, 'docs_relevant': docs_relevant, 'docs_failed': docs_failed}})}\n\n"
+    @staticmethod
+    def _join_analyst(future: Future) -> tuple[Optional[str], int]:
+        """Wait for the concurrent Analyst; any failure degrades to (None, 0) — non-fatal."""
+        try:
+            block, count = future.result()
+            return block, int(count or 0)
+        except Exception as exc:
+            logger.warning("[Brain] Analyst failed (non-fatal, answering from prose): %s", exc)
+            return None, 0
 
-        result = BrainResult(
-            answer=answer, claims=verified_claims, confidence=confidence,
-            abstained=abstained, sources=sources, docs_routed=docs_routed,
-            docs_read=docs_read, docs_relevant=docs_relevant, docs_failed=docs_failed,
-        )
-        self._record_ledger(
-            result, query, user_id, collection_id, conversation_id, elapsed_ms,
-        )
-        yield "data: [DONE]\n\n"
+    def _run_stream_body(
+        self,
+        query: str,
+        doc_chunks: dict[str, tuple[str, list[Document]]],
+        t0: float,
+        user_id: Optional[str],
+        collection_id: Optional[str],
+        conversation_id: Optional[str],
+        analyst_block: Optional[str],
+        analyst_count: int,
+        spine_abstain: Optional[str],
+        analyst_future: Optional[Future],
+        cancel: Optional[CancelToken] = None,
+    ) -> Iterator[str]:
+        """The body of ``run_stream`` (split out so the Analyst thread is always released).
+
+        Only the driving lives here — which stage runs when, on which threads; every event
+        payload comes from ``_StreamRun``, which the asyncio driver (async_brain) shares."""
+        run = _StreamRun(self, query, doc_chunks, t0, analyst_block, analyst_count, spine_abstain)
+        yield from run.start(analyst_pending=analyst_future is not None)
+
+        # ── MAP → VERIFY, pipelined, with live per-doc progress for both stages ──
+        # A doc's claims are verified as soon as its MAP lands (shared LLM budget), so
+        # brain_verify progress streams while slower docs are still being read.
+        for kind, ext, n in self._map_verify_pipeline(
+            query, doc_chunks, run.stats, side_task=analyst_future, cancel=cancel,
+        ):
+            if kind == "side_task":
+                yield from run.analyst(*self._join_analyst(analyst_future))
+                analyst_future = None
+            else:
+                yield from run.stage(kind, ext, n)
+        assembled = run.assembled()
+        if run.skip_reduce(cancel):
+            return
+        yield from assembled
+
+        # Join point: REDUCE is the Analyst's only consumer. Still running ⇒ wait here.
+        if analyst_future is not None:
+            yield from run.analyst(*self._join_analyst(analyst_future))
+
+        # ── REDUCE from verified claims only ───────────────────────────────────
+        if not run.reduces:
+            yield from run.unreduced()
+        else:
+            if run.skip_reduce(cancel):
+                return
+            yield from run.reduce_open()
+            for kind, payload in self._reduce_stream(query, *run.reduce_inputs(), cancel=cancel):
+                yield from run.reduce_event(kind, payload)
+            if is_cancelled(cancel):
+                return
+            yield from run.reduce_close()
+
+        yield run.meta()
+        run.record(user_id, collection_id, conversation_id)
+        yield _SSE_DONE
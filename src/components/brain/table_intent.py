@@ -11,7 +11,9 @@ Two jobs, both cheap and side-effect-free:
 2. ``load_grids_for_docs(...)`` — pull the structured table grids we stored at
    ingest (``chunk_type="table"`` rows, ``metadata.table_json``) for a set of
    doc_ids, so the Analyst can compute on them. Reads Supabase JSONB; no Pinecone
-   round-trip needed (the grid is bookkeeping, not a vector).
+   round-trip needed (the grid is bookkeeping, not a vector). Parsed grids are kept in
+   the process grid store (grid_store.py) until the doc is re-ingested or deleted;
+   ``load_grids_by_doc`` is the per-doc variant for the review-grid preload.
 """
 
 from __future__ import annotations
@@ -147,84 +149,92 @@ def load_grids_for_docs(
 ):
     """Load structured table grids (analyst.Grid) for doc_ids, ranked by relevance.
 
-    Pulls ``chunk_type="table"`` chunks from Supabase, rehydrates each
+    Pulls ``chunk_type="table"`` chunks from Supabase (via the process grid store — one
+    batched query for every doc not already cached), rehydrates each
     ``metadata.table_json`` into a Grid with provenance, and — when ``question``
     is given — keeps only the ``top_grids`` most lexically relevant tables. This
     is the "table-aware retrieval" step: a numeric question gets the handful of
     on-topic tables, so the Analyst selects among a small, accurate set (small
     prompt, low latency, right table). Never raises.
     """
+    tables_by_doc = _tables_for_docs(db_client, doc_ids, owner_id)
+    return _rank_grids(tables_by_doc, doc_ids, question=question, filename_by_doc=filename_by_doc,
+                       top_grids=top_grids, max_tables_per_doc=max_tables_per_doc,
+                       per_doc_top=per_doc_top)
+
+
+def load_grids_by_doc(
+    db_client,
+    doc_ids: List[str],
+    *,
+    filename_by_doc: Optional[Dict[str, str]] = None,
+    per_doc_top: int = 20,
+    max_tables_per_doc: int = 60,
+    owner_id: Optional[str] = None,
+) -> Dict[str, list]:
+    """doc_id → that doc's grids, exactly as ``load_grids_for_docs(db, [did], question=None,
+    per_doc_top=…)`` per doc — but off ONE batched table-chunk fetch (grid_store) instead of
+    one query per doc. The review-grid / workflow preload. Never raises."""
+    tables_by_doc = _tables_for_docs(db_client, doc_ids, owner_id)
+    return {
+        did: _rank_grids(tables_by_doc, [did], question=None, filename_by_doc=filename_by_doc,
+                         top_grids=8, max_tables_per_doc=max_tables_per_doc,
+                         per_doc_top=per_doc_top)
+        for did in doc_ids
+    }
+
+
+def _tables_for_docs(db_client, doc_ids: List[str], owner_id: Optional[str]) -> Dict[str, list]:
+    """Parsed table rows (grid_store.TableRow) per doc, scoped to the caller / matter owner."""
+    from src.components.brain.grid_store import grid_store
+
+    # F1b/H2 (cross-user leak fix): the live client runs with the SERVICE ROLE, so RLS is
+    # bypassed — the app-layer user_id filter is one layer. Without it, any document_id (from
+    # another user/vault, e.g. injected into the agent) would load its chunks. Filter by the
+    # verified user_id at the DB. `_uid` may be None on offline/test clients (no user); there
+    # we don't add the filter (no live data to leak) and nothing is cached.
+    # F1 RLS hardening (defense-in-depth): READ through `read_client` when present — on the
+    # request path it carries the user's JWT so Postgres RLS ALSO enforces auth.uid()=user_id
+    # (a second, data-layer guard). Falls back to `.client` on the worker/offline/test path
+    # (no JWT) — byte-identical there.
+    # F2m (shared-matter read): when owner_id is supplied and is NOT the caller, the matter is
+    # owned by another firm member and its chunks are stamped with the OWNER's user_id. The
+    # access was already authorized upstream (db.accessible_vault_owner: membership + same-firm +
+    # not-screened). Scope to the OWNER and read via the SERVICE-ROLE client — read_client carries
+    # the CALLER's JWT, so RLS (auth.uid()=user_id) would block the owner's rows. For the caller's
+    # own vault (owner_id None or == caller) this is byte-identical to the F1 hardened path.
+    # The grid store is keyed by this same resolved `_uid`, so a cached entry is only ever
+    # served under the scope its rows were fetched with.
+    _caller_uid = getattr(db_client, "user_id", None)
+    _shared = bool(owner_id) and owner_id != _caller_uid
+    _uid = owner_id if _shared else _caller_uid
+    _reader = db_client.client if _shared else (getattr(db_client, "read_client", None) or db_client.client)
+    try:
+        return grid_store.tables_for_docs(_reader, doc_ids, _uid)
+    except Exception as exc:  # noqa: BLE001 — grids are best-effort
+        logger.warning("[table_intent] grid load failed: %s", exc)
+        return {}
+
+
+def _rank_grids(
+    tables_by_doc: Dict[str, list],
+    doc_ids: List[str],
+    *,
+    question: Optional[str],
+    filename_by_doc: Optional[Dict[str, str]],
+    top_grids: int,
+    max_tables_per_doc: int,
+    per_doc_top: Optional[int],
+) -> list:
     from src.components.brain.analyst import Grid
 
     scored = []  # (relevance, Grid)
     for did in doc_ids:
-        # Pull ONLY table chunks from the DB (metadata is JSONB), not every chunk.
-        # On an 8-doc collection the naive "select all chunks, filter in Python"
-        # loaded ~2600 rows of text per numeric query — needless memory pressure
-        # that contributed to the local OOM. The JSONB filter keeps it to the few
-        # hundred table rows. Falls back to the full pull if the filter is
-        # unsupported, so it can never break.
-        # F1b/H2 (cross-user leak fix): the live client runs with the SERVICE ROLE, so RLS is
-        # bypassed — the app-layer user_id filter below is one layer. Without it, any
-        # document_id (from another user/vault, e.g. injected into the agent) would load its
-        # chunks. Filter by the verified user_id at the DB. `_uid` may be None on offline/test
-        # clients (no user); there we don't add the filter (no live data to leak).
-        # F1 RLS hardening (defense-in-depth): READ through `read_client` when present — on the
-        # request path it carries the user's JWT so Postgres RLS ALSO enforces auth.uid()=user_id
-        # (a second, data-layer guard). Falls back to `.client` on the worker/offline/test path
-        # (no JWT) — byte-identical there.
-        # F2m (shared-matter read): when owner_id is supplied and is NOT the caller, the matter is
-        # owned by another firm member and its chunks are stamped with the OWNER's user_id. The
-        # access was already authorized upstream (db.accessible_vault_owner: membership + same-firm +
-        # not-screened). Scope to the OWNER and read via the SERVICE-ROLE client — read_client carries
-        # the CALLER's JWT, so RLS (auth.uid()=user_id) would block the owner's rows. For the caller's
-        # own vault (owner_id None or == caller) this is byte-identical to the F1 hardened path.
-        _caller_uid = getattr(db_client, "user_id", None)
-        _shared = bool(owner_id) and owner_id != _caller_uid
-        _uid = owner_id if _shared else _caller_uid
-        _reader = db_client.client if _shared else (getattr(db_client, "read_client", None) or db_client.client)
-        rows = None
-        try:
-            q = (
-                _reader.table("document_chunks")
-                .select("content,metadata")
-                .eq("document_id", did)
-                .eq("metadata->>chunk_type", "table")
-            )
-            if _uid:
-                q = q.eq("user_id", _uid)
-            rows = q.execute().data
-        except Exception:
-            rows = None
-        if rows is None:
-            try:
-                q = (
-                    _reader.table("document_chunks")
-                    .select("content,metadata")
-                    .eq("document_id", did)
-                )
-                if _uid:
-                    q = q.eq("user_id", _uid)
-                rows = q.execute().data or []
-            except Exception as exc:
-                logger.warning("[table_intent] grid load failed for doc %s: %s", did, exc)
-                continue
-
         n = 0
-        for r in rows:
-            md = r.get("metadata") or {}
-            if md.get("chunk_type") != "table":
-                continue
-            raw = md.get("table_json")
-            if not raw:
-                continue
-            try:
-                tj = json.loads(raw) if isinstance(raw, str) else raw
-            except Exception:
-                continue
-            doc_name = (filename_by_doc or {}).get(did) or md.get("filename")
-            grid = Grid(tj, doc=doc_name, page=md.get("page_number"))
-            rel = _relevance(question, tj, r.get("content", "")) if question else 1.0
+        for t in tables_by_doc.get(str(did), ()):
+            doc_name = (filename_by_doc or {}).get(did) or t.filename
+            grid = t.grid if doc_name == t.filename else Grid(t.table_json, doc=doc_name, page=t.page)
+            rel = _relevance(question, t.table_json, t.content) if question else 1.0
             # STATEMENT PRIORITY (2026-06-11): a primary financial statement (income
             # statement / balance sheet / cash flow) is one table among ~100 in a 10-K,
             # and MD&A prose pages that merely MENTION a metric outrank it lexically — so
@@ -233,7 +243,7 @@ def load_grids_for_docs(
             # grid that STRUCTURALLY looks like a core statement (many line-items across
             # multiple periods) above the prose pages so it always survives the per-doc
             # cap. Structural, not keyword — generalizes across issuers and finance/law.
-            if _looks_like_statement(tj):
+            if t.statement:
                 rel += 100.0
             scored.append((rel, grid))
             n += 1
@@ -15,15 +15,33 @@ Design choices:
     prose claims only.
   - Failure is non-fatal: if the verifier LLM call fails, the claim is marked
     unverified (confidence = 0.5) rather than crashing the whole answer.
+
+Batched mode (PERF — VERIFY dominated Brain latency):
+  One call per claim plus one per answer sentence meant a 12-doc MAP with 60 claims and a
+  15-sentence answer paid 75 verifier round-trips. ``verify_claims`` / ``verify_reduce_output``
+  now pack up to BRAIN_VERIFY_BATCH_SIZE (claim, evidence) pairs into ONE call that returns a
+  per-item verdict list, after a deterministic pre-pass that auto-accepts a claim whose
+  verbatim_span is found word-for-word in its cited chunk AND whose content words all appear
+  in that span (it asserts nothing the quote doesn't). A batch response that is malformed —
+  or that omits / garbles an item — falls back to the single-item check for exactly those
+  items, so a bad batch never costs a verdict. Each run reports calls + estimated wall time
+  saved via ``VerifyStats``. BRAIN_VERIFY_BATCH_SIZE=1 restores one call per item.
 """
 
 from __future__ import annotations
 
 import json
 import logging
-from typing import Optional
+import math
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
 
 from src.components.brain.claims import Claim, EvidenceSpan
+from src.components.cancellation import is_cancelled
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -31,6 +49,64 @@ logger = get_logger(__name__)
 # Confidence below this → claim is dropped from the answer (abstain/flag)
 ABSTAIN_THRESHOLD = 0.5
 
+# Items (claims or answer sentences) per verifier call; ≤1 ⇒ one call per item (legacy).
+VERIFY_BATCH_SIZE = int(os.environ.get("BRAIN_VERIFY_BATCH_SIZE", "12"))
+# A batch is also cut once its evidence text passes this many characters (keeps each call
+# well inside the verifier's context and its latency bounded).
+VERIFY_BATCH_MAX_CHARS = int(os.environ.get("BRAIN_VERIFY_BATCH_MAX_CHARS", "16000"))
+# Confidence recorded for a claim accepted by the deterministic verbatim pre-pass.
+AUTO_ACCEPT_CONFIDENCE = 0.95
+
+# Latency of one single-item verifier call (ms), for the "time saved" estimate. Seeded from
+# the env, then tracked as an EMA of the single-item calls this process actually makes.
+_single_call_ms: float = float(os.environ.get("BRAIN_VERIFY_CALL_MS_HINT", "1500"))
+
+
+def _observe_single_call(ms: float) -> None:
+    global _single_call_ms
+    _single_call_ms = 0.8 * _single_call_ms + 0.2 * ms
+
+
+@dataclass
+class VerifyStats:
+    """Per-run accounting for the VERIFY stage (claims + REDUCE sentences).
+
+    ``items`` is what the per-item verifier would have paid one call each for; ``llm_calls``
+    is what this run actually paid (batch calls + per-item fallbacks). ``wall_ms`` is the time
+    VERIFY kept the run waiting — when the Brain pipelines it behind MAP, only the part after
+    the last MAP finished. ``est_saved_ms`` prices the per-item verifier at the observed
+    single-call latency over the same worker pool and subtracts that."""
+    items: int = 0
+    auto_accepted: int = 0
+    llm_calls: int = 0
+    batch_calls: int = 0
+    fallback_items: int = 0
+    wall_ms: int = 0
+    workers: int = 3
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for k, v in counts.items():
+                setattr(self, k, getattr(self, k) + v)
+
+    @property
+    def calls_saved(self) -> int:
+        return max(0, self.items - self.llm_calls)
+
+    @property
+    def est_saved_ms(self) -> int:
+        per_item_ms = math.ceil(self.items / max(1, self.workers)) * _single_call_ms
+        return max(0, int(per_item_ms - self.wall_ms))
+
+    def to_dict(self) -> dict:
+        return {
+            "items": self.items, "auto_accepted": self.auto_accepted,
+            "llm_calls": self.llm_calls, "batch_calls": self.batch_calls,
+            "fallback_items": self.fallback_items, "calls_saved": self.calls_saved,
+            "wall_ms": self.wall_ms, "est_saved_ms": self.est_saved_ms,
+        }
+
 # Verification prompt  ──────────────────────────────────────────────────────────
 _VERIFY_SYSTEM = """You are a strict fact-checker verifying whether a CLAIM is entailed by SOURCE TEXT.
 
@@ -52,10 +128,40 @@ SOURCE TEXT:
 Is the claim entailed by the source text? Respond with JSON only."""
 
 
+def _claim_messages(claim: Claim) -> list:
+    """[system, user] for the single-claim entailment check."""
+    # Build messages directly — _VERIFY_SYSTEM contains a literal JSON example
+    # ({"verdict": ...}) which ChatPromptTemplate would mis-parse as variables.
+    from langchain_core.messages import SystemMessage, HumanMessage
+
+    user_msg = _VERIFY_USER.format(claim=claim.text, evidence=_evidence_text(claim))
+    return [SystemMessage(content=_VERIFY_SYSTEM), HumanMessage(content=user_msg)]
+
+
+def _verdict_confidence(raw: str) -> float:
+    """Confidence from a single-item verdict ({"verdict", "confidence"}); raises on bad JSON."""
+    raw_stripped = (raw or "").strip()
+    if raw_stripped.startswith("```"):
+        raw_stripped = raw_stripped.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
+    result = json.loads(raw_stripped)
+    return float(result.get("confidence", 0.5))
+
+
+def _settle_claim(claim: Claim, conf: float, abstain_threshold: float) -> None:
+    claim.confidence = conf
+    claim.verified = conf >= abstain_threshold
+    if not claim.verified:
+        logger.info(
+            "Verifier: claim dropped (conf=%.2f < %.2f): %s",
+            conf, abstain_threshold, claim.text[:80],
+        )
+
+
 def verify_claim(
     claim: Claim,
     llm,
     abstain_threshold: float = ABSTAIN_THRESHOLD,
+    stats: Optional[VerifyStats] = None,
 ) -> Claim:
     """Run entailment check on a single claim.  Mutates and returns the claim.
 
@@ -63,6 +169,7 @@ def verify_claim(
         claim:              The claim to verify.
         llm:                A LangChain-compatible LLM (should differ from the generator).
         abstain_threshold:  Drop claim if confidence below this.
+        stats:              Optional run accounting (counts the call).
 
     Returns:
         The claim with .verified and .confidence updated.
@@ -72,42 +179,47 @@ def verify_claim(
         claim.confidence = 0.0
         return claim
 
-    evidence_text = "\n---\n".join(
-        f"[{e.doc_id} / {e.chunk_id}]: {e.verbatim_span}"
-        for e in claim.evidence
-    )
-
     try:
-        # Build messages directly — _VERIFY_SYSTEM contains a literal JSON example
-        # ({"verdict": ...}) which ChatPromptTemplate would mis-parse as variables.
-        from langchain_core.messages import SystemMessage, HumanMessage
+        messages = _claim_messages(claim)
+        if stats is not None:
+            stats.add(llm_calls=1)
+        t0 = time.perf_counter()
+        raw = llm.invoke(messages).content
+        _observe_single_call((time.perf_counter() - t0) * 1000)
+        _settle_claim(claim, _verdict_confidence(raw), abstain_threshold)
 
-        user_msg = _VERIFY_USER.format(claim=claim.text, evidence=evidence_text)
-        raw = llm.invoke(
-            [SystemMessage(content=_VERIFY_SYSTEM), HumanMessage(content=user_msg)]
-        ).content
+    except Exception as exc:
+        logger.warning("Verifier LLM call failed (non-fatal): %s", exc)
+        claim.confidence = 0.5  # uncertain — don't drop, but flag
+        claim.verified = False
 
-        # Parse JSON response
-        raw_stripped = (raw or "").strip()
-        if raw_stripped.startswith("```"):
-            raw_stripped = raw_stripped.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
-        result = json.loads(raw_stripped)
+    return claim
 
-        verdict = result.get("verdict", "not_supported")
-        conf = float(result.get("confidence", 0.5))
 
-        claim.confidence = conf
-        claim.verified = conf >= abstain_threshold
+async def averify_claim(
+    claim: Claim,
+    llm,
+    abstain_threshold: float = ABSTAIN_THRESHOLD,
+    stats: Optional[VerifyStats] = None,
+) -> Claim:
+    """asyncio twin of ``verify_claim`` (``llm.ainvoke``; same prompt, parse and degrade)."""
+    if not claim.evidence:
+        claim.verified = False
+        claim.confidence = 0.0
+        return claim
 
-        if not claim.verified:
-            logger.info(
-                "Verifier: claim dropped (conf=%.2f < %.2f): %s",
-                conf, abstain_threshold, claim.text[:80],
-            )
+    try:
+        messages = _claim_messages(claim)
+        if stats is not None:
+            stats.add(llm_calls=1)
+        t0 = time.perf_counter()
+        raw = (await llm.ainvoke(messages)).content
+        _observe_single_call((time.perf_counter() - t0) * 1000)
+        _settle_claim(claim, _verdict_confidence(raw), abstain_threshold)
 
     except Exception as exc:
         logger.warning("Verifier LLM call failed (non-fatal): %s", exc)
-        claim.confidence = 0.5  # uncertain — don't drop, but flag
+        claim.confidence = 0.5
         claim.verified = False
 
     return claim
@@ -118,12 +230,22 @@ def verify_claims(
     llm,
     abstain_threshold: float = ABSTAIN_THRESHOLD,
     max_workers: int = 3,
+    chunk_text: Optional[Callable[[EvidenceSpan], Optional[str]]] = None,
+    batch_size: Optional[int] = None,
+    stats: Optional[VerifyStats] = None,
+    cancel=None,
 ) -> tuple[list[Claim], list[Claim]]:
-    """Verify a list of claims (in parallel, bounded concurrency).
-
-    Each claim is an independent entailment check, so we run them in a small
-    thread pool to keep latency reasonable when REDUCE feeds in dozens of claims.
-    Order is preserved in the returned lists.
+    """Verify a list of claims (batched, bounded concurrency).
+
+    1. Deterministic pre-pass (when ``chunk_text`` can resolve an evidence span to the text
+       of the chunk it cites): a claim whose every span is found verbatim in its chunk and
+       whose content words all appear in those spans is accepted without an LLM call.
+    2. The rest are packed into batches of ``batch_size`` (default VERIFY_BATCH_SIZE) —
+       one verifier call each, returning per-item verdicts — run in a small thread pool.
+    3. Items a batch response omitted or garbled (or a whole failed batch) are re-checked
+       one by one with ``verify_claim``.
+    Order is preserved in the returned lists. A batch not yet started when ``cancel`` (a
+    cancellation.CancelToken) fires is skipped — its claims stay unverified.
 
     Returns:
         (verified_claims, dropped_claims)
@@ -135,16 +257,289 @@ def verify_claims(
 
     from concurrent.futures import ThreadPoolExecutor
 
-    workers = max(1, min(max_workers, len(claims)))
-    with ThreadPoolExecutor(max_workers=workers) as pool:
-        # executor.map preserves input order
-        checked = list(pool.map(lambda c: verify_claim(c, llm, abstain_threshold), claims))
-
-    verified = [c for c in checked if c.verified]
-    dropped = [c for c in checked if not c.verified]
+    t0 = time.perf_counter()
+    stats = stats if stats is not None else VerifyStats()
+    stats.workers = max(1, max_workers)
+    batches = plan_verification(claims, abstain_threshold, chunk_text, batch_size, stats)
+    if batches:
+        workers = max(1, min(max_workers, len(batches)))
+
+        def _run(batch: list[Claim]) -> None:
+            if is_cancelled(cancel):
+                cancel.skip("brain_verify")
+                return
+            verify_claim_batch(batch, llm, abstain_threshold, stats)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_run, batches))
+
+    stats.add(wall_ms=int((time.perf_counter() - t0) * 1000))
+    verified = [c for c in claims if c.verified]
+    dropped = [c for c in claims if not c.verified]
     return verified, dropped
 
 
+def plan_verification(
+    claims: list[Claim],
+    abstain_threshold: float = ABSTAIN_THRESHOLD,
+    chunk_text: Optional[Callable[[EvidenceSpan], Optional[str]]] = None,
+    batch_size: Optional[int] = None,
+    stats: Optional[VerifyStats] = None,
+) -> list[list[Claim]]:
+    """Steps 1-2 of ``verify_claims`` without running anything: settle what the verbatim
+    pre-pass can, and return the rest as order-preserving batches for ``verify_claim_batch``.
+    Lets a caller (the Brain's pipelined MAP→VERIFY) schedule the batches on its own pool."""
+    if stats is not None:
+        stats.add(items=len(claims))
+    size = VERIFY_BATCH_SIZE if batch_size is None else batch_size
+
+    pending: list[Claim] = []
+    for c in claims:
+        if chunk_text is not None and _verbatim_supported(c, chunk_text):
+            c.confidence = AUTO_ACCEPT_CONFIDENCE
+            c.verified = AUTO_ACCEPT_CONFIDENCE >= abstain_threshold
+            if stats is not None:
+                stats.add(auto_accepted=1)
+        else:
+            pending.append(c)
+    if size <= 1:
+        return [[c] for c in pending]
+    return _batches(pending, size, lambda c: len(c.text) + len(_evidence_text(c)))
+
+
+# ── Batched verification ──────────────────────────────────────────────────────
+
+_VERIFY_BATCH_SYSTEM = """You are a strict fact-checker. You receive numbered ITEMS; each is a CLAIM with its OWN SOURCE TEXT. For every item, decide whether the claim is entailed by that item's source text.
+
+Rules:
+- Judge each item independently, ONLY against its own source text — never against another item's.
+- Answer ONLY with a JSON object: {"verdicts": [{"id": 1, "verdict": "supported"|"not_supported"|"partial", "confidence": 0.0-1.0}, ...]} with exactly one entry per item id.
+- "supported"     → the source text directly and explicitly supports the claim (confidence ≥ 0.8)
+- "partial"       → the source partially supports it but the claim over-states or adds details not present (confidence 0.3-0.79)
+- "not_supported" → the source does not support or contradicts the claim (confidence 0.0-0.29)
+- confidence is your certainty about the verdict, not about the claim itself.
+- Do NOT use world knowledge — only the provided source text matters.
+- Be strict: if the claim adds ANY information not in its source, it is at most "partial".
+"""
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was "
+    "were which with".split()
+)
+_NEGATORS = frozenset("not no never without neither nor none cannot".split())
+# Words that make the rest of a clause conditional or carve something out of it: "shall pay only
+# if invoiced", "liable unless notified", "subject to clause 9". Dropping one turns a qualified
+# obligation into an absolute one, which is as material as dropping a "not".
+_QUALIFIERS = frozenset(
+    "only if unless except excluding subject provided providing until solely".split()
+)
+
+
+def _norm(text: str) -> str:
+    return " ".join((text or "").split()).lower()
+
+
+def _tokens(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9]+(?:[.,][0-9]+)*", _norm(text).replace("n't", " not"))
+
+
+def _contains_run(seq: list[str], run: list[str]) -> bool:
+    n = len(run)
+    return any(seq[i:i + n] == run for i in range(len(seq) - n + 1))
+
+
+def _verbatim_supported(claim: Claim, chunk_text: Callable[[EvidenceSpan], Optional[str]]) -> bool:
+    """True when every evidence span is a word-for-word quote from the chunk it cites AND the
+    claim's words appear as one contiguous run inside a span — i.e. the claim is a restatement
+    of a real quote, so an entailment call could only say "supported". Token overlap alone is
+    not enough: "the seller shall be liable" shares every content word with "the seller shall
+    not be liable", and swapped figures share the same numbers. So the run must be in order,
+    and a span carrying a negator, a conditional/carve-out qualifier ("only if", "unless",
+    "subject to", ...) or a number the claim leaves out goes to the verifier."""
+    if not claim.evidence:
+        return False
+    spans: list[list[str]] = []
+    for ev in claim.evidence:
+        span = _norm(ev.verbatim_span)
+        try:
+            source = chunk_text(ev)
+        except Exception:
+            return False
+        if not span or not source or span not in _norm(source):
+            return False
+        spans.append(_tokens(span))
+    run = _tokens(claim.text)
+    if all(t in _STOPWORDS for t in run):
+        return False
+    claimed = set(run)
+    for toks in spans:
+        if not _contains_run(toks, run):
+            continue
+        dropped = set(toks) - claimed
+        if any(t in _NEGATORS or t in _QUALIFIERS or any(ch.isdigit() for ch in t)
+               for t in dropped):
+            return False
+        return True
+    return False
+
+
+def _evidence_text(claim: Claim) -> str:
+    return "\n---\n".join(
+        f"[{e.doc_id} / {e.chunk_id}]: {e.verbatim_span}" for e in claim.evidence
+    )
+
+
+def _batches(items: list, size: int, weight: Callable[[object], int]) -> list[list]:
+    """Greedy, order-preserving split into batches of ≤ size items / ≤ VERIFY_BATCH_MAX_CHARS."""
+    out: list[list] = []
+    cur: list = []
+    chars = 0
+    for it in items:
+        w = weight(it)
+        if cur and (len(cur) >= size or chars + w > VERIFY_BATCH_MAX_CHARS):
+            out.append(cur)
+            cur, chars = [], 0
+        cur.append(it)
+        chars += w
+    if cur:
+        out.append(cur)
+    return out
+
+
+def take_batch(queue, batch_size: Optional[int] = None) -> list:
+    """Pop the next batch off a deque of (tag, Claim) pairs, under the same item / char caps
+    as ``plan_verification``. For callers that coalesce claims from several sources (docs)
+    into shared batches as workers free up."""
+    size = max(1, VERIFY_BATCH_SIZE if batch_size is None else batch_size)
+    out: list = []
+    chars = 0
+    while queue and len(out) < size:
+        w = len(queue[0][1].text) + len(_evidence_text(queue[0][1]))
+        if out and chars + w > VERIFY_BATCH_MAX_CHARS:
+            break
+        out.append(queue.popleft())
+        chars += w
+    return out
+
+
+def _parse_verdicts(raw: str, n: int) -> dict[int, float]:
+    """{item index (0-based): confidence} for every well-formed verdict in a batch response.
+    Unparseable JSON ⇒ {}; an entry with a bad id / confidence is skipped (→ per-item fallback)."""
+    text = (raw or "").strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
+    try:
+        data = json.loads(text)
+    except (ValueError, TypeError):
+        return {}
+    entries = data.get("verdicts") if isinstance(data, dict) else data
+    out: dict[int, float] = {}
+    for e in entries if isinstance(entries, list) else []:
+        try:
+            idx = int(e["id"]) - 1
+            conf = float(e["confidence"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= idx < n and 0.0 <= conf <= 1.0 and idx not in out:
+            out[idx] = conf
+    return out
+
+
+def _claim_batch_messages(todo: list[Claim]) -> list:
+    from langchain_core.messages import SystemMessage, HumanMessage
+
+    items = "\n\n".join(
+        f"ITEM {i}\nCLAIM: {c.text}\nSOURCE TEXT:\n{_evidence_text(c)}"
+        for i, c in enumerate(todo, 1)
+    )
+    return [
+        SystemMessage(content=_VERIFY_BATCH_SYSTEM),
+        HumanMessage(content=f"{items}\n\nReturn one verdict per ITEM ({len(todo)} items). JSON only."),
+    ]
+
+
+def _batch_todo(batch: list[Claim]) -> list[Claim]:
+    """The claims of ``batch`` that need the LLM; evidence-less ones are settled as dropped."""
+    for c in batch:
+        if not c.evidence:
+            c.verified, c.confidence = False, 0.0
+    return [c for c in batch if c.evidence]
+
+
+def _apply_claim_verdicts(
+    todo: list[Claim], verdicts: dict[int, float], abstain_threshold: float, stats: VerifyStats,
+) -> list[Claim]:
+    """Settle every claim the batch response covered; return the rest (per-item fallback)."""
+    unsettled = []
+    for i, c in enumerate(todo):
+        if i in verdicts:
+            _settle_claim(c, verdicts[i], abstain_threshold)
+        else:
+            stats.add(fallback_items=1)
+            unsettled.append(c)
+    return unsettled
+
+
+def verify_claim_batch(
+    batch: list[Claim],
+    llm,
+    abstain_threshold: float = ABSTAIN_THRESHOLD,
+    stats: Optional[VerifyStats] = None,
+) -> None:
+    """One verifier call for `batch` (mutates its claims); per-item fallback for whatever the
+    response didn't settle. A one-claim batch is just ``verify_claim``."""
+    stats = stats if stats is not None else VerifyStats()
+
+    todo = _batch_todo(batch)
+    if len(todo) == 1:
+        verify_claim(todo[0], llm, abstain_threshold, stats)
+        return
+    if not todo:
+        return
+
+    verdicts: dict[int, float] = {}
+    stats.add(llm_calls=1, batch_calls=1)
+    try:
+        raw = llm.invoke(_claim_batch_messages(todo)).content
+        verdicts = _parse_verdicts(raw, len(todo))
+    except Exception as exc:
+        logger.warning("Verifier batch call failed (falling back per claim): %s", exc)
+
+    for c in _apply_claim_verdicts(todo, verdicts, abstain_threshold, stats):
+        verify_claim(c, llm, abstain_threshold, stats)
+
+
+async def averify_claim_batch(
+    batch: list[Claim],
+    llm,
+    abstain_threshold: float = ABSTAIN_THRESHOLD,
+    stats: Optional[VerifyStats] = None,
+) -> None:
+    """asyncio twin of ``verify_claim_batch``; the per-item fallbacks run concurrently."""
+    import asyncio
+
+    stats = stats if stats is not None else VerifyStats()
+
+    todo = _batch_todo(batch)
+    if len(todo) == 1:
+        await averify_claim(todo[0], llm, abstain_threshold, stats)
+        return
+    if not todo:
+        return
+
+    verdicts: dict[int, float] = {}
+    stats.add(llm_calls=1, batch_calls=1)
+    try:
+        raw = (await llm.ainvoke(_claim_batch_messages(todo))).content
+        verdicts = _parse_verdicts(raw, len(todo))
+    except Exception as exc:
+        logger.warning("Verifier batch call failed (falling back per claim): %s", exc)
+
+    unsettled = _apply_claim_verdicts(todo, verdicts, abstain_threshold, stats)
+    if unsettled:
+        await asyncio.gather(*(averify_claim(c, llm, abstain_threshold, stats) for c in unsettled))
+
+
 # ── REDUCE-output verification (§4a.3 step 2) ───────────────────────────────────
 # The per-claim verifier above checks the MAP-extracted claims. But REDUCE then
 # *synthesizes* prose from those claims, and synthesis can introduce an
@@ -176,6 +571,17 @@ SENTENCE FROM THE ANSWER:
 
 Is the sentence supported by the verified facts? Respond with JSON only."""
 
+_REDUCE_VERIFY_BATCH_SYSTEM = """You are a strict fact-checker. You are given numbered SENTENCES from an AI-generated answer and a set of VERIFIED FACTS that were extracted from source documents. Decide, for EACH sentence independently, whether it is supported by the verified facts.
+
+Rules:
+- Answer ONLY with a JSON object: {"verdicts": [{"id": 1, "verdict": "supported"|"not_supported"|"partial", "confidence": 0.0-1.0}, ...]} with exactly one entry per sentence id.
+- "supported"     → every assertion in the sentence is backed by the verified facts (confidence ≥ 0.8)
+- "partial"       → the sentence is mostly supported but adds a detail or connection not in the facts (confidence 0.3-0.79)
+- "not_supported" → the sentence asserts something the verified facts do not contain or contradict (confidence 0.0-0.29)
+- A sentence that only restates the question, gives structure ("Here is a summary"), or hedges ("I could not find X") is "supported" with confidence 1.0 — it asserts no new fact.
+- Do NOT use world knowledge — only the verified facts matter. A fluent, plausible-sounding connection that the facts do not state is "not_supported".
+"""
+
 
 def _split_sentences(text: str) -> list[str]:
     """Lightweight sentence splitter (no nltk dependency).
@@ -199,11 +605,114 @@ def _split_sentences(text: str) -> list[str]:
     return pieces
 
 
+def _sentence_messages(sentence: str, facts_text: str) -> list:
+    from langchain_core.messages import SystemMessage, HumanMessage
+
+    user_msg = _REDUCE_VERIFY_USER.format(facts=facts_text, sentence=sentence)
+    return [SystemMessage(content=_REDUCE_VERIFY_SYSTEM), HumanMessage(content=user_msg)]
+
+
+def _sentence_batch_messages(batch: list[str], facts_text: str) -> list:
+    from langchain_core.messages import SystemMessage, HumanMessage
+
+    numbered = "\n".join(f"{i}. {snt}" for i, snt in enumerate(batch, 1))
+    return [
+        SystemMessage(content=_REDUCE_VERIFY_BATCH_SYSTEM),
+        HumanMessage(content=(
+            f"VERIFIED FACTS:\n{facts_text}\n\nSENTENCES FROM THE ANSWER:\n{numbered}\n\n"
+            f"Return one verdict per sentence ({len(batch)} sentences). JSON only."
+        )),
+    ]
+
+
+def _ground_sentence(
+    sentence: str, facts_text: str, llm, support_threshold: float, stats: VerifyStats,
+) -> tuple[str, bool]:
+    """Single-sentence REDUCE check. Non-fatal: a failed call counts as unsupported."""
+    try:
+        messages = _sentence_messages(sentence, facts_text)
+        stats.add(llm_calls=1)
+        t_call = time.perf_counter()
+        raw = llm.invoke(messages).content
+        _observe_single_call((time.perf_counter() - t_call) * 1000)
+        return sentence, _verdict_confidence(raw) >= support_threshold
+    except Exception as exc:  # non-fatal: treat as unsupported (conservative)
+        logger.warning("REDUCE verifier failed for a sentence (non-fatal): %s", exc)
+        return sentence, False
+
+
+async def _aground_sentence(
+    sentence: str, facts_text: str, llm, support_threshold: float, stats: VerifyStats,
+) -> tuple[str, bool]:
+    """asyncio twin of ``_ground_sentence``."""
+    try:
+        messages = _sentence_messages(sentence, facts_text)
+        stats.add(llm_calls=1)
+        t_call = time.perf_counter()
+        raw = (await llm.ainvoke(messages)).content
+        _observe_single_call((time.perf_counter() - t_call) * 1000)
+        return sentence, _verdict_confidence(raw) >= support_threshold
+    except Exception as exc:
+        logger.warning("REDUCE verifier failed for a sentence (non-fatal): %s", exc)
+        return sentence, False
+
+
+def _ground_batch(
+    batch: list[str], facts_text: str, llm, support_threshold: float, stats: VerifyStats,
+) -> list[tuple[str, bool]]:
+    """One call for several sentences (the fact pool sent once); unsettled ones go singly."""
+    if len(batch) == 1:
+        return [_ground_sentence(batch[0], facts_text, llm, support_threshold, stats)]
+    verdicts: dict[int, float] = {}
+    stats.add(llm_calls=1, batch_calls=1)
+    try:
+        raw = llm.invoke(_sentence_batch_messages(batch, facts_text)).content
+        verdicts = _parse_verdicts(raw, len(batch))
+    except Exception as exc:
+        logger.warning("REDUCE verifier batch failed (falling back per sentence): %s", exc)
+    out = []
+    for i, snt in enumerate(batch):
+        if i in verdicts:
+            out.append((snt, verdicts[i] >= support_threshold))
+        else:
+            stats.add(fallback_items=1)
+            out.append(_ground_sentence(snt, facts_text, llm, support_threshold, stats))
+    return out
+
+
+async def _aground_batch(
+    batch: list[str], facts_text: str, llm, support_threshold: float, stats: VerifyStats,
+) -> list[tuple[str, bool]]:
+    """asyncio twin of ``_ground_batch``; the per-sentence fallbacks run concurrently."""
+    import asyncio
+
+    if len(batch) == 1:
+        return [await _aground_sentence(batch[0], facts_text, llm, support_threshold, stats)]
+    verdicts: dict[int, float] = {}
+    stats.add(llm_calls=1, batch_calls=1)
+    try:
+        raw = (await llm.ainvoke(_sentence_batch_messages(batch, facts_text))).content
+        verdicts = _parse_verdicts(raw, len(batch))
+    except Exception as exc:
+        logger.warning("REDUCE verifier batch failed (falling back per sentence): %s", exc)
+    missing = [i for i in range(len(batch)) if i not in verdicts]
+    stats.add(fallback_items=len(missing))
+    singles = await asyncio.gather(*(
+        _aground_sentence(batch[i], facts_text, llm, support_threshold, stats) for i in missing
+    ))
+    settled = dict(zip(missing, singles))
+    return [settled[i] if i in settled else (snt, verdicts[i] >= support_threshold)
+            for i, snt in enumerate(batch)]
+
+
 def verify_reduce_output(
     answer: str,
     verified_claims: list[Claim],
     llm,
     support_threshold: float = ABSTAIN_THRESHOLD,
+    batch_size: Optional[int] = None,
+    stats: Optional[VerifyStats] = None,
+    cancel=None,
 ) -> tuple[float, list[str]]:
     """Check that the synthesized REDUCE answer is entailed by verified claims.
 
@@ -215,6 +724,12 @@ def verify_reduce_output(
         verified_claims:   The pool of already-verified claims REDUCE was given.
         llm:               Independent verifier LLM (same one used for claims).
         support_threshold: A sentence at/above this confidence counts as grounded.
+        batch_size:        Sentences per verifier call (default VERIFY_BATCH_SIZE; the fact
+                           pool is sent once per batch instead of once per sentence).
+                           Sentences a batch response doesn't settle are re-checked singly.
+        stats:             Optional run accounting.
+        cancel:            Optional cancellation.CancelToken; a batch not yet started
+                           when it fires is skipped (its sentences count as unsupported).
 
     Returns:
         (groundedness, unsupported_sentences)
@@ -236,27 +751,26 @@ def verify_reduce_output(
         return 1.0, []
 
     from concurrent.futures import ThreadPoolExecutor
-    from langchain_core.messages import SystemMessage, HumanMessage
 
-    def _check(sentence: str) -> tuple[str, bool]:
-        try:
-            user_msg = _REDUCE_VERIFY_USER.format(facts=facts_text, sentence=sentence)
-            raw = llm.invoke(
-                [SystemMessage(content=_REDUCE_VERIFY_SYSTEM), HumanMessage(content=user_msg)]
-            ).content
-            raw_stripped = (raw or "").strip()
-            if raw_stripped.startswith("```"):
-                raw_stripped = raw_stripped.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
-            result = json.loads(raw_stripped)
-            conf = float(result.get("confidence", 0.5))
-            return sentence, conf >= support_threshold
-        except Exception as exc:  # non-fatal: treat as unsupported (conservative)
-            logger.warning("REDUCE verifier failed for a sentence (non-fatal): %s", exc)
-            return sentence, False
-
-    workers = max(1, min(3, len(sentences)))
+    t0 = time.perf_counter()
+    stats = stats if stats is not None else VerifyStats()
+    stats.add(items=len(sentences))
+    size = VERIFY_BATCH_SIZE if batch_size is None else batch_size
+
+    def _check_batch(batch: list[str]) -> list[tuple[str, bool]]:
+        if is_cancelled(cancel):
+            cancel.skip("brain_ground")
+            return [(snt, False) for snt in batch]
+        return _ground_batch(batch, facts_text, llm, support_threshold, stats)
+
+    if size <= 1:
+        batches = [[snt] for snt in sentences]
+    else:
+        batches = _batches(sentences, size, len)
+    workers = max(1, min(3, len(batches)))
     with ThreadPoolExecutor(max_workers=workers) as pool:
-        results = list(pool.map(_check, sentences))
+        results = [r for rs in pool.map(_check_batch, batches) for r in rs]
+    stats.add(wall_ms=int((time.perf_counter() - t0) * 1000))
 
     unsupported = [s for s, ok in results if not ok]
     supported_count = len(sentences) - len(unsupported)
@@ -268,3 +782,187 @@ def verify_reduce_output(
             len(unsupported), len(sentences), groundedness,
         )
     return groundedness, unsupported
+
+
+class SentenceGrounder:
+    """Incremental §4a.3-step-2 check for a REDUCE answer that is still being generated.
+
+    ``feed`` takes answer text as the model streams it; every sentence that is COMPLETE
+    (its line ended, or sentence-final punctuation was followed by whitespace) goes to the
+    verifier right away, on up to ``max_workers`` concurrent calls. Sentences that complete
+    while every worker is busy coalesce into one batched call (≤ batch_size), so a fast
+    model costs batches and a slow one gets a verdict per sentence as it lands. ``close``
+    treats the remaining tail as complete. The sentence set — and therefore groundedness
+    and the unsupported list — is exactly what ``verify_reduce_output`` computes over the
+    finished text (same splitter, same ≥ _MIN_SENTENCE_CHARS filter, same prompts).
+
+    Verdicts come back as (index, sentence, supported) from ``poll`` (non-blocking) and
+    ``drain`` (blocks until every sentence is judged, yielding each as it lands). The
+    caller must pass a non-empty ``verified_claims`` pool (REDUCE never runs without one).
+    Once ``cancel`` (a cancellation.CancelToken) fires, queued batches are dropped instead
+    of submitted; ``shutdown`` drops them too.
+    """
+
+    def __init__(
+        self,
+        verified_claims: list[Claim],
+        llm,
+        support_threshold: float = ABSTAIN_THRESHOLD,
+        batch_size: Optional[int] = None,
+        stats: Optional[VerifyStats] = None,
+        max_workers: int = 3,
+        cancel=None,
+    ):
+        self._facts = "\n".join(f"- {c.text}" for c in verified_claims)
+        self._llm = llm
+        self._threshold = support_threshold
+        self._size = max(1, VERIFY_BATCH_SIZE if batch_size is None else batch_size)
+        self._stats = stats if stats is not None else VerifyStats()
+        self._workers = max(1, max_workers)
+        self._cancel = cancel
+        self._pool = None                   # created on the first check (_submit)
+        self._buf = ""                      # text not yet cut into complete sentences
+        self._queue: list[tuple[int, str]] = []
+        self._inflight: dict = {}           # future → [(index, sentence), ...]
+        self._ready: list[tuple[int, str, bool]] = []
+        self._results: dict[int, tuple[str, bool]] = {}
+        self._n = 0
+        self._t0 = time.perf_counter()
+
+    # ── input ──
+    def feed(self, text: str) -> None:
+        self._buf += text
+        # Complete lines split exactly like _split_sentences; within the open line every
+        # piece but the last is already terminated (punctuation + whitespace follows it).
+        *lines, tail = self._buf.split("\n")
+        done = [p for ln in lines for p in _split_sentences(ln)]
+        pieces = re.split(r"(?<=[.!?])\s+", tail.lstrip())
+        if len(pieces) > 1:
+            done.extend(p.strip() for p in pieces[:-1] if p.strip())
+            tail = pieces[-1]
+        self._buf = tail
+        self._enqueue(done)
+
+    def close(self) -> None:
+        """The answer is finished — whatever is buffered is the last sentence(s)."""
+        tail, self._buf = self._buf, ""
+        self._enqueue(_split_sentences(tail))
+
+    def _enqueue(self, sentences: list[str]) -> None:
+        for snt in sentences:
+            if len(snt) >= _MIN_SENTENCE_CHARS:
+                self._queue.append((self._n, snt))
+                self._n += 1
+                self._stats.add(items=1)
+        self._pump()
+
+    def _pump(self) -> None:
+        if is_cancelled(self._cancel):
+            self._drop_queue()
+        while self._queue and len(self._inflight) < self._workers:
+            batch, self._queue = self._queue[: self._size], self._queue[self._size:]
+            self._inflight[self._submit([s for _i, s in batch])] = batch
+
+    def _submit(self, sentences: list[str]):
+        """Start one batched check; returns its future."""
+        if self._pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._pool = ThreadPoolExecutor(max_workers=self._workers,
+                                            thread_name_prefix="reduce-ground")
+        return self._pool.submit(_ground_batch, sentences, self._facts,
+                                 self._llm, self._threshold, self._stats)
+
+    def _drop_queue(self) -> None:
+        """Discard the sentences not yet sent, counting the batches that won't be made."""
+        if self._queue and self._cancel is not None:
+            self._cancel.skip("brain_ground", -(-len(self._queue) // self._size))
+        self._queue = []
+
+    def _collect(self, done) -> None:
+        for fut in done:
+            batch = self._inflight.pop(fut)
+            try:
+                verdicts = fut.result()
+            except Exception as exc:  # _ground_batch is non-fatal; belt + braces
+                logger.warning("REDUCE verifier batch failed (non-fatal): %s", exc)
+                verdicts = [(s, False) for _i, s in batch]
+            for (idx, snt), (_s, ok) in zip(batch, verdicts):
+                self._results[idx] = (snt, ok)
+                self._ready.append((idx, snt, ok))
+        self._pump()
+
+    # ── output ──
+    def poll(self) -> list[tuple[int, str, bool]]:
+        """Verdicts that landed since the last poll/drain, without blocking."""
+        self._collect([f for f in list(self._inflight) if f.done()])
+        out, self._ready = self._ready, []
+        return out
+
+    def drain(self):
+        """Yield every outstanding verdict as it lands, until all sentences are judged."""
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        yield from self.poll()
+        while self._inflight:
+            done, _ = wait(list(self._inflight), return_when=FIRST_COMPLETED)
+            self._collect(done)
+            out, self._ready = self._ready, []
+            yield from out
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        self._stats.add(wall_ms=int((time.perf_counter() - self._t0) * 1000))
+
+    def shutdown(self) -> None:
+        """Abandon outstanding checks (client went away)."""
+        self._drop_queue()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def unsupported(self) -> list[str]:
+        return [snt for _i, (snt, ok) in sorted(self._results.items()) if not ok]
+
+    @property
+    def groundedness(self) -> float:
+        if not self._results:
+            return 1.0
+        return (len(self._results) - len(self.unsupported)) / len(self._results)
+
+
+class AsyncSentenceGrounder(SentenceGrounder):
+    """``SentenceGrounder`` for an asyncio caller (the AsyncBrain's streamed REDUCE).
+
+    Same sentence cutting, batching and verdict order; each check is a task on the running
+    event loop (``_aground_batch`` → ``llm.ainvoke``) instead of a pool thread, so a REDUCE
+    stream costs no threads at all. ``feed`` / ``close`` / ``poll`` are unchanged and must be
+    called from the loop; ``drain`` is an async generator, and ``shutdown`` cancels the
+    in-flight tasks — the HTTP call under each is cancelled with it.
+    """
+
+    def _submit(self, sentences: list[str]):
+        import asyncio
+
+        return asyncio.ensure_future(_aground_batch(
+            sentences, self._facts, self._llm, self._threshold, self._stats))
+
+    async def drain(self):
+        """Yield every outstanding verdict as it lands, until all sentences are judged."""
+        import asyncio
+
+        for verdict in self.poll():
+            yield verdict
+        while self._inflight:
+            done, _ = await asyncio.wait(list(self._inflight), return_when=asyncio.FIRST_COMPLETED)
+            self._collect(done)
+            out, self._ready = self._ready, []
+            for verdict in out:
+                yield verdict
+        self._stats.add(wall_ms=int((time.perf_counter() - self._t0) * 1000))
+
+    def shutdown(self) -> None:
+        """Abandon outstanding checks (client went away): cancel their tasks."""
+        self._drop_queue()
+        for task in self._inflight:
+            task.cancel()
+        self._inflight.clear()
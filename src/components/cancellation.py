@@ -0,0 +1,165 @@
+"""
+DocQuery — Cooperative cancellation for streamed backend work
+
+A streamed Brain / agent / review-grid run keeps paying for LLM calls after the browser
+tab closes: the sync generator is iterated on a worker thread (or a grid runs in
+``asyncio.to_thread``), and cancelling the awaiting coroutine does not stop that thread —
+every remaining MAP, verifier batch, agent step and grid cell still runs, for nobody.
+
+A ``CancelToken`` is created per request, handed down the whole call tree (run_agent,
+build_cell, Brain MAP / VERIFY / REDUCE, the verifier pools, tools via RunScope) and
+checked between steps and before each LLM call. ``guard_stream`` wraps the route's SSE
+body and fires the token when the client goes away — either Starlette cancels the
+response, or a poll of ``request.is_disconnected()`` sees the disconnect while the body
+is still busy between events (a long MAP phase emits nothing to fail a ``send`` on).
+
+Work that was NOT started because the token fired is counted — per token (``avoided``)
+and process-wide (the ``docquery_llm_calls_avoided_total`` counter, by stage; ``stats()``
+for /health) — so the saving is visible rather than assumed. Calls already in flight when
+the token fires are not counted: they were paid for.
+
+Usage:
+    cancel = CancelToken()
+    ...
+    if cancel.cancelled:          # between steps
+        cancel.skip("agent_step")
+        return
+    return StreamingResponse(guard_stream(body, cancel, request.is_disconnected), ...)
+"""
+
+import asyncio
+import contextlib
+import os
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# How often guard_stream asks the server whether the client is still there (seconds).
+DISCONNECT_POLL_S = float(os.environ.get("DISCONNECT_POLL_S", "1.0"))
+
+_totals: Dict[str, int] = {}
+_totals_lock = threading.Lock()
+
+
+class CancelToken:
+    """One request's cancellation flag, shared by every thread and task working for it.
+
+    ``cancelled`` is a cheap check for loops; ``skip(stage, n)`` records ``n`` LLM calls
+    not made because of it. Thread-safe; cancelling twice is a no-op.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self.reason: Optional[str] = None
+        self.avoided: Dict[str, int] = {}
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "client_disconnected") -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+            logger.info("[cancel] request work cancelled (%s)", reason)
+
+    def skip(self, stage: str, calls: int = 1) -> None:
+        """Record ``calls`` LLM calls at ``stage`` that will not be made."""
+        if calls <= 0:
+            return
+        with self._lock:
+            self.avoided[stage] = self.avoided.get(stage, 0) + calls
+        with _totals_lock:
+            _totals[stage] = _totals.get(stage, 0) + calls
+        try:
+            from src.components.metrics import llm_calls_avoided
+            llm_calls_avoided.labels(stage=stage).inc(calls)
+        except Exception:  # pragma: no cover — metrics are best-effort
+            pass
+
+    @property
+    def avoided_total(self) -> int:
+        with self._lock:
+            return sum(self.avoided.values())
+
+
+def is_cancelled(cancel: Optional[CancelToken]) -> bool:
+    """``cancel.cancelled`` for an optional token (None ⇒ never cancelled)."""
+    return cancel is not None and cancel.cancelled
+
+
+def stats() -> Dict[str, Any]:
+    """Process-wide LLM calls avoided by cancellation, by stage (for /health)."""
+    with _totals_lock:
+        by_stage = dict(_totals)
+    return {"llm_calls_avoided": sum(by_stage.values()), "by_stage": by_stage}
+
+
+async def _watch(is_disconnected: Callable[[], Awaitable[bool]], cancel: CancelToken,
+                 poll_s: float) -> None:
+    while not cancel.cancelled:
+        try:
+            if await is_disconnected():
+                cancel.cancel()
+                return
+        except Exception:  # noqa: BLE001 — a broken probe must not end the stream
+            return
+        await asyncio.sleep(poll_s)
+
+
+async def guard_stream(
+    body,
+    cancel: CancelToken,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    poll_s: float = DISCONNECT_POLL_S,
+) -> AsyncIterator[str]:
+    """Stream ``body`` (a sync or async iterator of SSE strings) and fire ``cancel`` when
+    the client goes away before it finished.
+
+    A sync body is advanced on a worker thread, one item at a time, like Starlette does;
+    once the token fires it winds down at its next check. An async body is interrupted at
+    its current ``await`` (its pending step is cancelled, then it is closed), so its
+    ``finally`` blocks cancel whatever it had in flight.
+    """
+    is_async = hasattr(body, "__aiter__")
+    if is_async:
+        source = body
+    else:
+        from starlette.concurrency import iterate_in_threadpool
+
+        source = iterate_in_threadpool(body)
+    watcher = (asyncio.ensure_future(_watch(is_disconnected, cancel, poll_s))
+               if is_disconnected is not None else None)
+    finished = False
+    step = None
+    try:
+        while not cancel.cancelled:
+            step = asyncio.ensure_future(source.__anext__())
+            if watcher is not None and not watcher.done():
+                await asyncio.wait([step, watcher], return_when=asyncio.FIRST_COMPLETED)
+            if cancel.cancelled and not step.done():
+                # Disconnected while the body was busy between events.
+                step.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await step
+                break
+            try:
+                chunk = await step
+            except StopAsyncIteration:
+                finished = True
+                break
+            yield chunk
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        if not finished:
+            cancel.cancel()
+        if step is not None and not step.done():
+            step.cancel()   # the route task itself was cancelled mid-step
+        if is_async:
+            with contextlib.suppress(Exception):
+                await source.aclose()
@@ -85,8 +85,17 @@ class CircuitBreaker:
         self._failure_times = [t for t in self._failure_times if t > cutoff]
         return len(self._failure_times)
 
+    def _cooldown_elapsed(self) -> bool:
+        """OPEN long enough for the next request to be a probe (must be called with lock held)."""
+        return (self.state == CircuitState.OPEN
+                and time.time() - (self._opened_at or 0) >= self.config.timeout_duration)
+
     def _record_failure(self):
         with self._lock:
+            if self._cooldown_elapsed():
+                # The outcome of a request admitted on a read-only check (current_state()
+                # said HALF_OPEN): it was the probe, so treat it as one.
+                self.state = CircuitState.HALF_OPEN
             self._failure_times.append(time.time())
             self._success_count = 0
 
@@ -112,6 +121,9 @@ class CircuitBreaker:
 
     def _record_success(self):
         with self._lock:
+            if self._cooldown_elapsed():
+                self.state = CircuitState.HALF_OPEN
+                self._success_count = 0
             if self.state == CircuitState.HALF_OPEN:
                 self._success_count += 1
                 if self._success_count >= self.config.success_threshold:
@@ -128,7 +140,7 @@ class CircuitBreaker:
 
             if self.state == CircuitState.OPEN:
                 elapsed = time.time() - (self._opened_at or 0)
-                if elapsed >= self.config.timeout_duration:
+                if self._cooldown_elapsed():
                     self.state = CircuitState.HALF_OPEN
                     self._success_count = 0
                     logger.info(
@@ -146,6 +158,27 @@ class CircuitBreaker:
 
     # ── Public API ────────────────────────────────────────────────────────────
 
+    def current_state(self) -> CircuitState:
+        """The state a request would meet right now, without moving the breaker.
+
+        Read-only counterpart of ``_is_request_allowed``: an OPEN breaker whose cooldown has
+        run out reports HALF_OPEN (the next request would be the probe) but stays OPEN until
+        an outcome is recorded. Lets callers that only *look* — the LLM rate limiter polling
+        while a call is queued — gate on the breaker without flipping it to HALF_OPEN for a
+        request that may never be sent.
+        """
+        with self._lock:
+            return CircuitState.HALF_OPEN if self._cooldown_elapsed() else self.state
+
+    def record_success(self):
+        """Record a call made outside ``call()`` that succeeded (HALF_OPEN → CLOSED after
+        ``success_threshold`` of them)."""
+        self._record_success()
+
+    def record_failure(self):
+        """Record a call made outside ``call()`` that failed (may trip the breaker OPEN)."""
+        self._record_failure()
+
     def call(self, func: Callable, *args, **kwargs):
         """
         Execute func through the circuit breaker.
@@ -178,7 +211,7 @@ class CircuitBreaker:
             failures = self._failures_in_window()
         return {
             "name": self.name,
-            "state": self.state.value,
+            "state": self.current_state().value,
             "failures_in_window": failures,
             "failure_threshold": self.config.failure_threshold,
             "window_size_s": self.config.window_size,
@@ -204,6 +237,17 @@ _openai_breaker = CircuitBreaker(
     ),
 )
 
+_anthropic_breaker = CircuitBreaker(
+    "anthropic",
+    CircuitBreakerConfig(
+        failure_threshold=5,
+        success_threshold=2,
+        timeout_duration=60,
+        window_size=60,
+        request_timeout=30,
+    ),
+)
+
 _pinecone_breaker = CircuitBreaker(
     "pinecone",
     CircuitBreakerConfig(
@@ -221,6 +265,17 @@ def get_openai_breaker() -> CircuitBreaker:
     return _openai_breaker
 
 
+def get_anthropic_breaker() -> CircuitBreaker:
+    """Return the singleton Anthropic circuit breaker."""
+    return _anthropic_breaker
+
+
 def get_pinecone_breaker() -> CircuitBreaker:
     """Return the singleton Pinecone circuit breaker."""
     return _pinecone_breaker
+
+
+def get_breaker(name: str) -> Optional[CircuitBreaker]:
+    """Singleton breaker by provider name ("openai" / "anthropic" / "pinecone"), else None."""
+    return {"openai": _openai_breaker, "anthropic": _anthropic_breaker,
+            "pinecone": _pinecone_breaker}.get(name)
@@ -148,6 +148,22 @@ class Config:
     # diverse. 0.7 keeps relevance dominant while breaking up redundant clusters.
     ROUTING_MMR_LAMBDA: float = float(os.getenv("ROUTING_MMR_LAMBDA", "0.7"))
 
+    # Hierarchical routing (routing_clusters.py). A vault with at least this many docs AND a
+    # persisted cluster model is routed centroids-first: the query is scored against the K
+    # cluster centroids, then only docs inside the best clusters are scored. 0 disables (always
+    # the flat scan). Clusters are probed in similarity order until ROUTING_CLUSTER_PROBE_MIN
+    # candidate docs (and at least ROUTING_CLUSTER_PROBE clusters) are in — a recall floor.
+    # K ≈ √n clusters each mix several topics, so the floor alone misses small ones (a 10k
+    # vault's worst query kept 1 of the flat top-12); the sampled recall guard below catches
+    # them (eval/hierarchical_routing_recall.py).
+    ROUTING_HIERARCHICAL_MIN_DOCS: int = int(os.getenv("ROUTING_HIERARCHICAL_MIN_DOCS", "2000"))
+    ROUTING_CLUSTER_PROBE_MIN: int = int(os.getenv("ROUTING_CLUSTER_PROBE_MIN", "300"))
+    ROUTING_CLUSTER_PROBE: int = int(os.getenv("ROUTING_CLUSTER_PROBE", "4"))
+    # Sampled recall guard: a skipped cluster whose sentinel doc (ROUTING_CLUSTER_SENTINELS per
+    # cluster, routing_clusters.py) ranks in the probe's top (ROUTING_CLUSTER_GUARD_CHECK × top_n)
+    # cosine is probed too. 0 disables.
+    ROUTING_CLUSTER_GUARD_CHECK: int = int(os.getenv("ROUTING_CLUSTER_GUARD_CHECK", "2"))
+
     # ── Stage-2 Brain (Phase 4) ──
     # Opt-in: set USE_BRAIN=true to route synthesis/collection queries through
     # the map-reduce Brain instead of the single-call fast path.
@@ -164,6 +180,12 @@ class Config:
     # DNS blip instead of hanging on Pinecone retries for minutes.
     BRAIN_RETRIEVE_TIMEOUT_S: float = float(os.getenv("BRAIN_RETRIEVE_TIMEOUT_S", "20"))
 
+    # asyncio-native Brain (brain/async_brain.py): MAP / VERIFY / REDUCE run as coroutines
+    # on the event loop instead of worker threads, and a client disconnect cancels the
+    # in-flight LLM calls. Opt-in: off by default, the threaded Brain.run_stream (same SSE
+    # events) stays the default path until the async driver has run alongside it in prod.
+    BRAIN_ASYNC: bool = os.getenv("BRAIN_ASYNC", "false").lower() == "true"
+
     # ── Stage-2 Table intelligence (Phase 4.3) ──
     # Bounded parallelism for the per-table LLM summary generated at ingest (the
     # discriminative caption that lets the Analyst pick the right grid among near-twins).
@@ -21,7 +21,7 @@ from unstructured.partition.text import partition_text
 
 from langchain_core.documents import Document
 
-from src.utils import _log_elements_analysis, _get_element_type, _get_page_number, _element_has_image_payload, _table_html, _stable_id,_create_image_description,_create_table_description
+from src.utils import _log_elements_analysis, _get_element_type, _get_page_number, _element_has_image_payload, _table_html, _stable_id,_create_image_description,_create_table_description, _token_count
 
 try:
     from .config import Config
@@ -1102,6 +1102,12 @@ class DocumentProcessor:
             _logger.info("[ingest] fiscal_year=%s stamped on %d chunks",
                          self._last_fiscal_year, len(docs))
 
+        # token_count: encoded ONCE here and carried in the chunk metadata (→ Pinecone), so
+        # every context budget downstream (generation, Brain MAP) sums stored counts
+        # instead of re-encoding the same retrieved text on every request.
+        for d in docs:
+            d.metadata["token_count"] = _token_count(d.page_content)
+
         print(f"Total LangChain Documents created: {len(docs)}")
         return docs
 
@@ -39,6 +39,57 @@ def _is_missing_relation(exc: Exception) -> bool:
     )
 
 
+def _authz_invalidate_user(user_id: Optional[str]) -> None:
+    """Drop `user_id`'s cached authz context (authz_cache) after a write that changes it, so the
+    NEXT request in this process re-resolves (T7). Never raises — a write must not fail on this."""
+    try:
+        from src.components.authz_cache import invalidate_user
+        invalidate_user(user_id)
+    except Exception:
+        pass
+
+
+def _authz_invalidate_firm(firm_id: Optional[str]) -> None:
+    """Firm-wide variant of _authz_invalidate_user (role changes re-bound other members' grants)."""
+    try:
+        from src.components.authz_cache import invalidate_firm
+        invalidate_firm(firm_id)
+    except Exception:
+        pass
+
+
+def _routing_invalidate(vault_id: Optional[str] = None, doc_id: Optional[str] = None) -> None:
+    """Drop the Stage-1 router's cached index (routing_index) for a vault whose doc set changed, or
+    for every vault holding a changed doc. Never raises — the index is also version-checked, so this
+    only makes the drop immediate."""
+    try:
+        from src.components import routing_index
+        routing_index.invalidate_vault(vault_id)
+        routing_index.invalidate_doc(doc_id)
+    except Exception:
+        pass
+
+
+def _map_cache_invalidate(doc_id: Optional[str]) -> None:
+    """Drop the Brain's cached MAP extracts (brain/map_cache) for a deleted doc. Never raises —
+    the cache is TTL-bounded, so this only makes the drop immediate."""
+    try:
+        from src.components.brain.map_cache import invalidate_doc
+        invalidate_doc(doc_id)
+    except Exception:
+        pass
+
+
+def _grid_store_invalidate(doc_id: Optional[str]) -> None:
+    """Drop the parsed table grids (brain/grid_store) of a doc whose chunk rows were replaced
+    or deleted, and bump its ingest generation. Never raises — the store is TTL-bounded."""
+    try:
+        from src.components.brain.grid_store import invalidate_doc
+        invalidate_doc(doc_id)
+    except Exception:
+        pass
+
+
 def get_supabase_client(use_service_role: bool = False) -> Client:
     """Create a Supabase client.
 
@@ -116,6 +167,9 @@ class SupabaseManager:
         # offline/test path are byte-identical. Built lazily, once, per manager.
         self._access_token: Optional[str] = None
         self._read_client: Optional[Client] = None
+        # Cross-request authz-context cache (authz_cache). None ⇒ every authz_context is read from
+        # the DB (worker / offline / Streamlit); the FastAPI auth dependency opts request managers in.
+        self._authz_cache = None
 
     def attach_access_token(self, token: Optional[str]) -> "SupabaseManager":
         """Attach the request's verified JWT so READS run RLS-enforced (`read_client`).
@@ -305,8 +359,13 @@ class SupabaseManager:
             for idx, chunk in enumerate(chunks)
         ]
 
-        if rows:
-            self.client.table("document_chunks").insert(rows).execute()
+        try:
+            if rows:
+                self.client.table("document_chunks").insert(rows).execute()
+        finally:
+            # The table grids are read from these rows: once the old ones are gone (even if
+            # the insert failed) no process may keep serving them.
+            _grid_store_invalidate(document_id)
 
     def get_document_chunks(self, document_id: str) -> list:
         """Retrieve all stored chunks for a document (ordered by chunk_index)."""
@@ -462,6 +521,9 @@ class SupabaseManager:
         self.client.table("documents").delete().eq(
             "user_id", self.user_id
         ).eq("id", doc_id).execute()
+        _routing_invalidate(doc_id=doc_id)
+        _map_cache_invalidate(doc_id)
+        _grid_store_invalidate(doc_id)
 
     # ─────────────────────────────────────────
     # CONVERSATIONS (THREADS)
@@ -625,6 +687,98 @@ class SupabaseManager:
         firm["role"] = rows[0].get("role")
         return firm
 
+    def authz_context(self, firm_id: str = None) -> dict:
+        """The caller's resolved AUTHZ CONTEXT — firm (+role), screened vaults, delegated verbs,
+        staffed matters — in ONE round-trip, cached briefly across requests (authz_cache).
+
+        Shape: {"firm": {"id","name","role"} | {}, "screened_vault_ids": frozenset,
+                "delegated_verbs": frozenset, "matter_vault_ids": frozenset, "fresh": bool}
+        `fresh` is True only when the context was read from the DB by THIS manager (this request);
+        is_vault_screened trusts the screen set only then, so the wall never rides a cached value.
+
+        Resolution order: per-request memo → cross-request cache (request managers only) → the
+        `authz_context` RPC (migration 020) → the per-table reads it replaces (RPC unapplied or
+        faulted). RAISES when the screen read faults so the caller fails closed / degrades exactly as
+        before; nothing faulted is cached.
+        """
+        uid = self.user_id
+        if not uid:
+            return {"firm": {}, "screened_vault_ids": frozenset(), "delegated_verbs": frozenset(),
+                    "matter_vault_ids": frozenset(), "fresh": True}
+        memo = getattr(self, "_authz_ctx_memo", None)
+        if memo is None:
+            memo = self._authz_ctx_memo = {}
+        mkey = str(firm_id) if firm_id else "__active__"
+        if mkey in memo:
+            return memo[mkey]
+
+        cache = getattr(self, "_authz_cache", None)
+        if cache is not None:
+            cached = cache.get(uid, firm_id)
+            if cached is not None:
+                ctx = dict(cached, fresh=False)
+                memo[mkey] = ctx
+                return ctx
+            epoch = cache.epoch()
+        ctx = self._fetch_authz_context(uid, firm_id)
+        if cache is not None:
+            cache.put(uid, firm_id, ctx, epoch)
+        ctx = dict(ctx, fresh=True)
+        memo[mkey] = ctx
+        return ctx
+
+    def _fetch_authz_context(self, uid: str, firm_id: str = None) -> dict:
+        """One DB read of the authz context (the uncached half of authz_context)."""
+        from src.components import authz
+        try:
+            res = self.client.rpc("authz_context", {"p_user": uid, "p_firm": firm_id}).execute()
+            data = res.data
+        except Exception as e:
+            # Migration 020 unapplied (missing function) or a transient RPC fault: the per-table
+            # reads below are the authority either way, with their own fail-closed screen read.
+            import logging
+            logging.getLogger(__name__).debug("authz_context RPC unavailable, per-table reads: %s", e)
+            data = None
+        if isinstance(data, list):
+            data = data[0] if data else None
+        if isinstance(data, dict):
+            firm = dict(data.get("firm") or {})
+            if firm.get("id") is not None:
+                firm["id"] = str(firm["id"])
+            delegated: set = set()
+            for d in (data.get("delegations") or []):
+                role = (d or {}).get("delegator_role")
+                caps = authz.caps_for_role(role) if role else frozenset()
+                delegated |= set((d or {}).get("verbs") or []) & set(caps)
+            return {
+                "firm": firm,
+                "screened_vault_ids": frozenset(str(v) for v in (data.get("screened_vault_ids") or []) if v),
+                "delegated_verbs": frozenset(delegated),
+                "matter_vault_ids": frozenset(str(v) for v in (data.get("matter_vault_ids") or []) if v),
+            }
+
+        # The per-table reads (pre-020 behavior, same fault semantics — screened_vault_ids re-raises
+        # a live fault, the delegation/staffing reads degrade to ∅ as resolve_membership always did).
+        firm = (self.get_user_firm(firm_id=firm_id) if firm_id else self.get_user_firm()) or {}
+        resolved = firm.get("id") or firm_id
+        screened = frozenset(self.screened_vault_ids(firm_id=resolved))
+        try:
+            delegated = frozenset(self.active_delegated_verbs(firm_id=resolved))
+        except Exception:
+            delegated = frozenset()
+        return {
+            "firm": dict(firm),
+            "screened_vault_ids": screened,
+            "delegated_verbs": delegated,
+            "matter_vault_ids": frozenset(self.matter_member_vault_ids(firm_id=resolved)),
+        }
+
+    def _fresh_authz_context(self) -> "dict | None":
+        """The active-firm context IF this manager already read it from the DB this request, else
+        None. Never triggers a fetch — used by the wall checks to skip a redundant re-query."""
+        ctx = (getattr(self, "_authz_ctx_memo", None) or {}).get("__active__")
+        return ctx if ctx and ctx.get("fresh") else None
+
     # ─────────────────────────────────────────
     # FIRM POPULATION + ROLES + INVITES  (F2a — plans/F2_FIRM_CONSOLE_PLAN.md §F2a)
     #   No enforcement here (that is F2b's authorize/require_cap). These are the writes that
@@ -656,6 +810,7 @@ class SupabaseManager:
         if not (firm_id and name and name.strip()):
             raise ValueError("firm_id and a non-empty name are required.")
         res = self.client.table("firms").update({"name": name.strip()}).eq("id", firm_id).execute()
+        _authz_invalidate_firm(firm_id)
         row = res.data[0] if res.data else {"id": firm_id, "name": name.strip()}
         return {"id": str(row.get("id", firm_id)), "name": row.get("name", name.strip())}
 
@@ -667,6 +822,7 @@ class SupabaseManager:
         res = self.client.table("firm_memberships").upsert(
             row, on_conflict="user_id,firm_id"
         ).execute()
+        _authz_invalidate_user(user_id)
         return res.data[0] if res.data else row
 
     def list_members(self, firm_id: str) -> list:
@@ -871,7 +1027,8 @@ class SupabaseManager:
     #   central authz.authorize over a SERVER-RESOLVED Scope) BEFORE calling them. db.py never
     #   authorizes itself and never trusts a body firm_id — every call is scoped to the firm the
     #   caller resolved as their own. The CHANGE takes effect on the target's NEXT request (T7 —
-    #   caps are resolved per-request in resolve_membership; there is no session cache to bust).
+    #   caps are resolved per-request in resolve_membership; each write below busts the short-TTL
+    #   authz_cache so this process never serves the pre-write context).
 
     def change_member_role(self, user_id: str, firm_id: str, new_role: str) -> dict:
         """Change a member's role within a firm. Firm-scoped (the UPDATE matches only a row whose
@@ -883,6 +1040,8 @@ class SupabaseManager:
         res = self.client.table("firm_memberships").update(
             {"role": new_role}
         ).eq("user_id", user_id).eq("firm_id", firm_id).execute()
+        # Firm-wide: the member's own caps change AND every delegation they granted is re-bounded.
+        _authz_invalidate_firm(firm_id)
         return (res.data or [{}])[0] if res.data else {}
 
     def reassign_member_matters(self, user_id: str, firm_id: str, new_owner_id: str) -> int:
@@ -918,6 +1077,7 @@ class SupabaseManager:
             "user_id", user_id
         ).eq("firm_id", firm_id).execute()
         removed = bool(res.data)
+        _authz_invalidate_firm(firm_id)
         return {"removed": removed, "delegations_revoked": revoked}
 
     # ── delegations (F2d / D6) — time-boxed, revocable, bounded grants ─────────────────────────
@@ -985,6 +1145,7 @@ class SupabaseManager:
             "expires_at": expires_at,
         }
         res = self.client.table("delegations").insert(row).execute()
+        _authz_invalidate_user(delegate_id)
         return res.data[0] if res.data else row
 
     def revoke_delegation(self, delegation_id: str, firm_id: str) -> dict:
@@ -998,7 +1159,12 @@ class SupabaseManager:
         ).eq("id", delegation_id).eq("firm_id", firm_id).is_(
             "revoked_at", "null"
         ).execute()
-        return (res.data or [{}])[0] if res.data else {}
+        row = (res.data or [{}])[0] if res.data else {}
+        if row.get("delegate_id"):
+            _authz_invalidate_user(row["delegate_id"])
+        else:
+            _authz_invalidate_firm(firm_id)
+        return row
 
     def revoke_member_delegations(self, user_id: str, firm_id: str) -> int:
         """Revoke EVERY active delegation a user holds OR granted within a firm (the offboard hook —
@@ -1019,6 +1185,7 @@ class SupabaseManager:
             self.client.table("delegations").update(
                 {"revoked_at": now_iso}
             ).in_("id", ids).execute()
+            _authz_invalidate_firm(firm_id)
             return len(ids)
         except Exception:
             return 0
@@ -1086,6 +1253,13 @@ class SupabaseManager:
         uid = user_id or self.user_id
         if not uid or not vault_id:
             return False
+        # Authz-context short-circuit: when THIS request already read the caller's screens from the
+        # DB (authz_context, fresh — never a cross-request cache hit), that set IS the live answer
+        # for the active firm; re-querying would be the same read twice. Any other shape (another
+        # user, a named firm, a cached context) falls through to the direct query below.
+        fresh = self._fresh_authz_context() if str(uid) == str(self.user_id) else None
+        if fresh is not None and (not firm_id or str(firm_id) == str((fresh["firm"] or {}).get("id"))):
+            return str(vault_id) in fresh["screened_vault_ids"]
         # MUST use self.client (service-role) — same reason as screened_vault_ids: the RLS
         # policy on `screens` only grants SELECT to managers; a screened paralegal's JWT
         # would return 0 rows (no wall), silently opening the gate. Internal enforcement
@@ -1125,6 +1299,7 @@ class SupabaseManager:
             "created_by": created_by or self.user_id,
         }
         res = self.client.table("screens").insert(row).execute()
+        _authz_invalidate_user(user_id)
         return res.data[0] if res.data else row
 
     def remove_screen(self, screen_id: str, firm_id: str) -> dict:
@@ -1140,7 +1315,12 @@ class SupabaseManager:
         ).eq("id", screen_id).eq("firm_id", firm_id).is_(
             "removed_at", "null"
         ).execute()
-        return (res.data or [{}])[0] if res.data else {}
+        row = (res.data or [{}])[0] if res.data else {}
+        if row.get("user_id"):
+            _authz_invalidate_user(row["user_id"])
+        else:
+            _authz_invalidate_firm(firm_id)
+        return row
 
     def list_screens(self, firm_id: str, include_removed: bool = False) -> list:
         """All screens of a firm (active by default; include_removed shows the lifted ones for the
@@ -1206,6 +1386,7 @@ class SupabaseManager:
         except Exception:
             # The unique-conflict path or table-absent: fall back to a plain insert / return the row.
             res = self.client.table("matter_memberships").insert(row).execute()
+        _authz_invalidate_user(user_id)
         return res.data[0] if res.data else row
 
     def remove_matter_member(self, firm_id: str, vault_id: str, user_id: str) -> bool:
@@ -1217,6 +1398,7 @@ class SupabaseManager:
         res = self.client.table("matter_memberships").delete().eq(
             "firm_id", firm_id
         ).eq("vault_id", vault_id).eq("user_id", user_id).execute()
+        _authz_invalidate_user(user_id)
         return bool(res.data)
 
     def list_matter_members(self, firm_id: str, vault_id: str) -> list:
@@ -1868,6 +2050,7 @@ class SupabaseManager:
             "collection_id": collection_id,
             "document_id": document_id,
         }).execute()
+        _routing_invalidate(vault_id=collection_id)
         return res.data[0] if res.data else {}
 
     def remove_document_from_collection(self, collection_id: str, document_id: str):
@@ -1875,6 +2058,7 @@ class SupabaseManager:
         self.client.table("collection_documents").delete().eq(
             "collection_id", collection_id
         ).eq("document_id", document_id).execute()
+        _routing_invalidate(vault_id=collection_id)
 
     def accessible_vault_owner(self, collection_id: str) -> "str | None":
         """THE matter-access authority (F2m / D3): the user_id whose namespace + documents back a
@@ -1901,7 +2085,9 @@ class SupabaseManager:
         *_documents), each ~3-4 sequential Supabase round-trips. The SupabaseManager is built per
         request, so a tiny per-instance cache keyed on collection_id collapses those to one resolve
         (the screen check stays per-request across DIFFERENT requests — T7 — since the instance is new
-        each time). Safe: same boundary, far less latency.
+        each time). Safe: same boundary, far less latency. The staffed path takes the caller's firm
+        + staffing (+ a fresh screen set) from authz_context — the request's single authz read,
+        shared with resolve_membership — instead of three reads of its own.
         """
         if not (self.user_id and collection_id):
             return None
@@ -1925,15 +2111,15 @@ class SupabaseManager:
         except Exception:
             pass
 
-        # Not the owner — is the caller STAFFED on this matter? Resolve the caller's firm + the
-        # vault's owner/firm via service-role (cross-user by nature), then require:
+        # Not the owner — is the caller STAFFED on this matter? The caller's firm + staffing come
+        # from the authz context (one RPC per request, shared with resolve_membership); the vault's
+        # owner/firm via service-role (cross-user by nature). Then require:
         #   (1) the vault is in the caller's firm, (2) the caller is staffed on it, (3) no screen.
-        firm = {}
         try:
-            firm = self.get_user_firm() or {}
+            ctx = self.authz_context()
         except Exception:
-            firm = {}
-        firm_id = firm.get("id")
+            return None  # fail closed — an unresolvable context grants nothing (don't memo a fault)
+        firm_id = (ctx.get("firm") or {}).get("id")
         if not firm_id:
             return _remember(None)  # firm-less ⇒ no matter sharing ⇒ owner-only (handled above)
 
@@ -1951,20 +2137,16 @@ class SupabaseManager:
             return _remember(None)
 
         # (2) staffed on the matter? (the productivity grant — D3)
-        try:
-            staffed = self.client.table("matter_memberships").select("id").eq(
-                "firm_id", firm_id).eq("vault_id", collection_id).eq(
-                "user_id", self.user_id).limit(1).execute()
-        except Exception:
-            return _remember(None)
-        if not staffed.data:
+        if str(collection_id) not in ctx.get("matter_vault_ids", frozenset()):
             return _remember(None)
 
-        # (3) the ethical wall (deny-overrides): a screened member reads nothing. screened_vault_ids
-        # fails CLOSED on a live fault (re-raises) — so a wall lookup blip denies, never opens.
+        # (3) the ethical wall (deny-overrides): a screened member reads nothing. is_vault_screened
+        # answers from a FRESH (this-request) context or re-queries directly, and fails CLOSED on a
+        # live fault (re-raises) — so a wall lookup blip denies, never opens, and a cross-request
+        # cached context is never what lets a staffed member past a new screen.
         # NOT memoized through a raise: a screen fault must re-deny on each call, never cache "open".
         try:
-            if str(collection_id) in self.screened_vault_ids(firm_id=firm_id):
+            if self.is_vault_screened(str(collection_id), firm_id=firm_id):
                 return _remember(None)
         except Exception:
             return None  # fail closed — uncertain wall ⇒ deny (don't memo a transient fault)
@@ -2015,17 +2197,125 @@ class SupabaseManager:
         return counts
 
     def get_collection_documents(self, collection_id: str) -> list:
-        """Get full document records for all documents in a collection (owner-resolved, F2m)."""
+        """Get full document records for all documents in a collection (owner-resolved, F2m).
+        One round-trip via the vault_documents RPC (021) — see get_vault_documents."""
+        return self.get_vault_documents(collection_id, with_summaries=False)
+
+    def get_vault_documents(self, collection_id: str, with_summaries: bool = True) -> list:
+        """Full document rows for a vault — optionally with each doc's `summary` + `topic_embedding`
+        from document_summaries (None when not yet computed) — in ONE round-trip (021).
+
+        Before 021 a vault load was accessible_vault_owner → a collection_documents⋈collections join
+        → a `documents .in_(ids)` read, and the Stage-1 router then made a fourth
+        `document_summaries .in_(ids)` read on every collection query. The `vault_documents` RPC
+        returns the same rows from one owner-scoped join.
+
+        ACCESS CONTRACT (unchanged): accessible_vault_owner is still THE gate and still runs first —
+        no access ⇒ [] without touching documents. The RPC is then bounded to exactly that owner's
+        docs in this vault (collections.user_id = owner AND documents.user_id = owner — the same two
+        filters the per-table reads applied), and summaries are joined on the OWNER too. Until 021
+        is applied (or on any RPC fault) this falls back to the per-table reads — byte-identical to
+        the pre-021 path; a live fault there raises exactly as it did before."""
         owner = self.accessible_vault_owner(collection_id)
         if not owner:
             return []
+        try:
+            res = self.client.rpc("vault_documents", {
+                "p_owner": owner,
+                "p_collection": collection_id,
+                "p_with_summaries": bool(with_summaries),
+            }).execute()
+            rows = res.data
+            if isinstance(rows, list):
+                return rows
+        except Exception as e:
+            import logging
+            logging.getLogger(__name__).debug("vault_documents RPC unavailable, per-table fallback: %s", e)
+
+        # Legacy per-table path (021 unapplied / RPC fault). The owner is memoized, so the
+        # get_collection_document_ids call below does not re-run the access gate.
         doc_ids = self.get_collection_document_ids(collection_id)
         if not doc_ids:
             return []
         res = self.client.table("documents").select("*").in_(
             "id", doc_ids
         ).eq("user_id", owner).execute()
-        return res.data or []
+        docs = res.data or []
+        if not with_summaries or not docs:
+            return docs
+        try:
+            srows = self.client.table("document_summaries").select(
+                "document_id, summary, topic_embedding"
+            ).in_("document_id", [d["id"] for d in docs]).eq("user_id", owner).execute()
+            summaries = {r["document_id"]: r for r in (srows.data or [])}
+        except Exception:  # noqa: BLE001 — routing data is an optimisation; docs still route by name
+            summaries = {}
+        for d in docs:
+            srow = summaries.get(d.get("id")) or {}
+            d["summary"] = srow.get("summary")
+            d["topic_embedding"] = srow.get("topic_embedding")
+        return docs
+
+    def get_routing_clusters(self, collection_id: str) -> dict:
+        """The vault's persisted routing clusters (022) — {"centroids": [rows], "members": [rows]} —
+        for the hierarchical router (routing_clusters.py). Owner-resolved like get_vault_documents:
+        no access ⇒ {}; the reads are bounded to the resolved owner. A missing table (022 unapplied)
+        ⇒ {} (the router keeps the flat scan); a live fault raises (the caller degrades to flat)."""
+        owner = self.accessible_vault_owner(collection_id)
+        if not owner:
+            return {}
+        try:
+            cents = self.client.table("routing_clusters").select(
+                "cluster_id, centroid, size, fitted_doc_count"
+            ).eq("collection_id", collection_id).eq("user_id", owner).execute()
+            if not cents.data:
+                return {}
+            members = self.client.table("routing_cluster_members").select(
+                "document_id, cluster_id"
+            ).eq("collection_id", collection_id).eq("user_id", owner).execute()
+        except Exception as e:
+            if _is_missing_relation(e):
+                return {}
+            raise
+        return {"centroids": cents.data or [], "members": members.data or []}
+
+    def save_routing_clusters(self, collection_id: str, model) -> None:
+        """Persist a routing_clusters.ClusterModel for a vault (the worker). Rows are written under the
+        vault OWNER resolved by accessible_vault_owner — the uploader may be a staffed member, not the
+        owner — and nothing is written without access. Upserts the centroids + memberships, then
+        deletes clusters / members the new model no longer has (a re-fit with a smaller K, docs that
+        left the vault)."""
+        import json
+        uid = self.accessible_vault_owner(collection_id) if collection_id else None
+        if not uid:
+            return
+        self.client.table("routing_clusters").upsert([
+            {
+                "collection_id": collection_id, "cluster_id": j, "user_id": uid,
+                "centroid": json.dumps([round(float(v), 6) for v in model.centroids[j]]),
+                "size": int(model.sizes[j]), "fitted_doc_count": model.fitted_doc_count,
+            }
+            for j in range(model.k)
+        ], on_conflict="collection_id,cluster_id").execute()
+        rows = [
+            {"collection_id": collection_id, "document_id": did, "user_id": uid, "cluster_id": int(c)}
+            for did, c in model.members.items()
+        ]
+        for i in range(0, len(rows), 1000):
+            self.client.table("routing_cluster_members").upsert(
+                rows[i:i + 1000], on_conflict="collection_id,document_id"
+            ).execute()
+        self.client.table("routing_clusters").delete().eq(
+            "collection_id", collection_id
+        ).eq("user_id", uid).gte("cluster_id", model.k).execute()
+        stale = self.client.table("routing_cluster_members").select("document_id").eq(
+            "collection_id", collection_id
+        ).eq("user_id", uid).execute()
+        gone = [r["document_id"] for r in (stale.data or []) if r["document_id"] not in model.members]
+        for i in range(0, len(gone), 500):
+            self.client.table("routing_cluster_members").delete().eq(
+                "collection_id", collection_id
+            ).eq("user_id", uid).in_("document_id", gone[i:i + 500]).execute()
 
     def get_document_collections(self, document_id: str) -> list:
         """Get all collections that contain a specific document."""
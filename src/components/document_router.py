@@ -19,7 +19,10 @@ This is what fixes MISTAKE 1 from the Brain plan:
   After:  it only fans out to the ≤N docs the router selected.
 
 The router uses cosine similarity on the stored topic_embeddings (one per doc),
-which is a fast in-process numpy operation — no Pinecone query, no LLM call.
+which is a fast in-process numpy operation — no Pinecone query, no LLM call. The
+embeddings live in a per-vault routing index (routing_index.py): a pre-normalised
+float32 matrix cached per process and versioned by the vault's doc set, so a query
+scores every doc in one matmul instead of re-fetching and re-parsing them.
 Optional BM25-over-summaries fallback when embeddings aren't yet computed.
 """
 
@@ -71,10 +74,18 @@ def _mmr_select(
     chosen is penalised — naturally spreading selection across distinct documents
     (and therefore across companies/topics) without hard-coding "company".
 
+    Array form: the candidate vectors are stacked and L2-normalised ONCE, and a running
+    max-similarity vector is kept over the whole pool — each pick costs one (n × dim)
+    matvec against the new doc plus an `np.maximum`, instead of n × |selected| Python
+    `_cosine` calls. Only the columns for the ≤ top_n selected docs are ever computed
+    (the full n × n matrix would be 400 MB at 10k candidates for no benefit). Selection
+    and tie-breaking match the per-pair loop exactly (eval/mmr_benchmark.py).
+
     Args:
         candidates:        list of (relevance_score, filename, topic_vec | None).
                            topic_vec is the doc's embedding (for redundancy calc);
-                           None falls back to pure relevance for that doc.
+                           None falls back to pure relevance for that doc, as does a
+                           vector whose dimension differs from the first one seen.
         top_n:             how many to select.
         lambda_relevance:  1.0 = pure relevance (old behaviour); lower = more diverse.
 
@@ -83,27 +94,49 @@ def _mmr_select(
     """
     if top_n <= 0 or not candidates:
         return []
-    # Sort by relevance once; the first pick is always the most relevant doc.
+    # Sort by relevance once (stable); the first pick is always the most relevant doc.
     pool = sorted(candidates, key=lambda c: c[0], reverse=True)
     if len(pool) <= top_n:
         return [fn for _, fn, _ in pool]
 
-    selected: list[tuple[float, str, Optional[list]]] = [pool.pop(0)]
-    while pool and len(selected) < top_n:
-        best_idx, best_mmr = 0, -1e9
-        for i, (rel, _fn, vec) in enumerate(pool):
-            if vec is None:
-                redundancy = 0.0  # no embedding → can't measure overlap, don't penalise
-            else:
-                redundancy = max(
-                    (_cosine(vec, s_vec) for _, _, s_vec in selected if s_vec is not None),
-                    default=0.0,
-                )
-            mmr = lambda_relevance * rel - (1.0 - lambda_relevance) * redundancy
-            if mmr > best_mmr:
-                best_mmr, best_idx = mmr, i
-        selected.append(pool.pop(best_idx))
-    return [fn for _, fn, _ in selected]
+    n = len(pool)
+    rel = np.fromiter((c[0] for c in pool), dtype=np.float64, count=n)
+    dim = next((np.asarray(c[2]).size for c in pool if c[2] is not None), 0)
+    has_vec = np.zeros(n, dtype=bool)
+    unit = np.zeros((n, dim), dtype=np.float32)
+    for i, (_rel, _fn, vec) in enumerate(pool):
+        if vec is None:
+            continue
+        v = np.asarray(vec, dtype=np.float32)
+        if v.size == dim:   # another dimension can't be compared (older model) — don't penalise
+            unit[i] = v
+            has_vec[i] = True
+    norms = np.linalg.norm(unit, axis=1, keepdims=True)
+    unit /= np.where(norms > 0, norms, 1.0)   # a zero vector stays zero: cosine 0, as in _cosine
+
+    # Running max similarity of each candidate to the picked docs that HAVE a vector (it can be
+    # negative). Redundancy is that max, or 0.0 while no vector has been picked (the per-pair
+    # form's `default=0.0`), and always 0.0 for a candidate with no vector.
+    max_sim = np.full(n, -np.inf, dtype=np.float64)
+    picked_vec = False
+    available = np.ones(n, dtype=bool)
+    order: list[int] = []
+
+    def _pick(i: int) -> None:
+        nonlocal max_sim, picked_vec
+        order.append(i)
+        available[i] = False
+        if has_vec[i]:
+            max_sim = np.maximum(max_sim, unit @ unit[i])
+            picked_vec = True
+
+    _pick(0)
+    while len(order) < top_n:
+        redundancy = np.where(has_vec, max_sim, 0.0) if picked_vec else np.zeros(n)
+        mmr = lambda_relevance * rel - (1.0 - lambda_relevance) * redundancy
+        mmr[~available] = -np.inf
+        _pick(int(np.argmax(mmr)))   # first max in relevance order — the loop's tie-break
+    return [pool[i][1] for i in order]
 
 
 # ── Extractive summary ────────────────────────────────────────────────────────
@@ -190,6 +223,11 @@ def compute_and_store_doc_routing_data(
         db_client.client.table("document_summaries").upsert(
             row, on_conflict="document_id"
         ).execute()
+        # A re-summarised doc keeps its id (the vault's doc-set version doesn't move), so drop any
+        # cached routing index holding it — the next query rebuilds with the new embedding.
+        from src.components import routing_index
+        routing_index.invalidate_doc(doc_id)
+        routing_index.invalidate_vault(collection_id)
 
         logger.info(
             "[doc_router] Stored summary+embedding for doc %s (%d chunks → centroid dim=%d)",
@@ -303,32 +341,48 @@ class DocumentRouter:
 
         try:
             from src.components.db import SupabaseManager
+            from src.components.routing_index import VaultRoutingIndex, load_vault_index
             db = SupabaseManager(use_service_role=True)
             db._user = type("User", (), {"id": user_id})()
 
-            # 1. Resolve collection membership.  Documents join collections through
-            #    the many-to-many `collection_documents` table (a doc can belong to
-            #    several collections), so `collection_id` is NOT denormalised onto
-            #    document_summaries — we resolve the member doc_ids here (ownership
-            #    checked inside get_collection_documents) and join to summaries on
-            #    document_id.  This is the fix for the router being dead-on-arrival:
-            #    filtering document_summaries by collection_id matched zero rows
-            #    because that column is never populated at ingest. We keep each doc's
-            #    persisted doc_type / fiscal_year here so Step D can pre-narrow on them.
-            coll_docs = db.get_collection_documents(collection_id)
-            doc_meta = {
-                d["id"]: {
-                    "filename": d.get("filename", ""),
-                    "doc_type": d.get("doc_type"),
-                    "fiscal_year": d.get("fiscal_year"),
+            # 1. Resolve collection membership + routing data.  Documents join collections through
+            #    the many-to-many `collection_documents` table (a doc can belong to several
+            #    collections), so `collection_id` is NOT denormalised onto document_summaries — we
+            #    resolve the member doc_ids (ownership checked inside get_collection_document_ids /
+            #    get_collection_documents) and join to summaries on document_id.  This is the fix
+            #    for the router being dead-on-arrival: filtering document_summaries by collection_id
+            #    matched zero rows because that column is never populated at ingest.
+            #
+            #    The per-vault ROUTING INDEX (routing_index.py) holds every member doc's metadata +
+            #    a pre-normalised topic-embedding matrix, cached per process and versioned by the
+            #    vault's doc set: a query costs one member-id read (the access gate) and, on a hit,
+            #    no summary fetch / JSON parse at all. A manager that can't supply it (older/offline)
+            #    keeps the per-query path: docs, Step-D pre-narrow, then summaries for the narrowed
+            #    set only, built into a transient (uncached) index.
+            hier_min = getattr(self.config, "ROUTING_HIERARCHICAL_MIN_DOCS", 0)
+            index = load_vault_index(db, collection_id, user_id, hierarchical_min_docs=hier_min)
+            if index is not None:
+                if not len(index):
+                    return []
+                doc_meta = {
+                    did: {"pos": i, "filename": index.filenames[i], **index.meta[i]}
+                    for i, did in enumerate(index.doc_ids)
+                }
+            else:
+                coll_docs = db.get_collection_documents(collection_id)
+                doc_meta = {
+                    d["id"]: {
+                        "filename": d.get("filename", ""),
+                        "doc_type": d.get("doc_type"),
+                        "fiscal_year": d.get("fiscal_year"),
+                    }
+                    for d in (coll_docs or [])
+                    if d.get("id") and d.get("filename")
                 }
-                for d in (coll_docs or [])
-                if d.get("id") and d.get("filename")
-            }
-            if not doc_meta:
-                return []
+                if not doc_meta:
+                    return []
 
-            # 2. G3 Step D — metadata pre-narrow for big vaults (BEFORE any embedding).
+            # 2. G3 Step D — metadata pre-narrow for big vaults (BEFORE any scoring).
             #    Only kicks in past the threshold: below it, scoring the whole (small)
             #    set is cheap and recall-first. The pre-narrow only DROPS known
             #    non-matches from the vault-scoped set — it can never add a doc outside
@@ -345,19 +399,29 @@ class DocumentRouter:
                         collection_id, full_count, len(narrowed), metadata_filter,
                     )
                     doc_meta = narrowed
-            id_to_filename = {did: m["filename"] for did, m in doc_meta.items()}
-            doc_ids = list(id_to_filename.keys())
 
-            # 3. Fetch summaries + topic embeddings for exactly the (pre-narrowed) docs.
-            rows = db.client.table("document_summaries").select(
-                "document_id, summary, topic_embedding"
-            ).in_("document_id", doc_ids).eq("user_id", user_id).execute()
-            summaries = {r["document_id"]: r for r in (rows.data or [])}
+            # 3. Summaries + topic embeddings for exactly the (pre-narrowed) docs — already in the
+            #    index, else fetched now and built into a transient one.
+            if index is None:
+                doc_ids = list(doc_meta.keys())
+                rows = db.client.table("document_summaries").select(
+                    "document_id, summary, topic_embedding"
+                ).in_("document_id", doc_ids).eq("user_id", user_id).execute()
+                summaries = {r["document_id"]: r for r in (rows.data or [])}
+                index = VaultRoutingIndex.build([
+                    {"id": did, "filename": m["filename"],
+                     "summary": (summaries.get(did) or {}).get("summary"),
+                     "topic_embedding": (summaries.get(did) or {}).get("topic_embedding")}
+                    for did, m in doc_meta.items()
+                ])
+                positions = list(range(len(index)))
+            else:
+                positions = [m["pos"] for m in doc_meta.values()]
 
-            # 4. Embed the query once — only needed if any doc has a topic embedding.
+            # 4. Embed the query once — only needed if any candidate has a topic embedding.
             #    Treat an empty list the same as None (some callers pass []), so we
             #    re-embed instead of silently degrading to keyword-only scoring.
-            have_embeddings = any(r.get("topic_embedding") for r in summaries.values())
+            have_embeddings = index.has_embeddings(positions)
             if have_embeddings and not query_embedding:
                 try:
                     from langchain_openai import OpenAIEmbeddings
@@ -372,29 +436,54 @@ class DocumentRouter:
                     )
                     query_embedding = None
 
+            # 4b. Hierarchical routing (routing_clusters.py) for very large vaults: score the
+            #     query against the cluster CENTROIDS, keep only the docs in the best clusters
+            #     (probed until a candidate floor is met) + every doc without an embedding.
+            #     Needs a persisted cluster model and a query vector — else the flat scan below.
+            #     SAMPLED RECALL GUARD: the skipped clusters' sentinel docs are scored with the
+            #     candidates; a cluster whose sentinel ranks in their top
+            #     ROUTING_CLUSTER_GUARD_CHECK × top_n is probed too. Only those docs are scored.
+            sims = None
+            probed_from = None
+            widened = 0
+            if (index.clusters is not None and query_embedding and hier_min > 0
+                    and len(positions) >= hier_min):
+                q = np.asarray(query_embedding, dtype=np.float32)
+                if q.size == index.clusters.centroids.shape[1] and np.linalg.norm(q) > 0:
+                    from src.components.routing_clusters import guard, probe
+                    probed_from = len(positions)
+                    q = q / np.linalg.norm(q)
+                    probed = probe(
+                        index.clusters, index.cluster_of, q, positions,
+                        min_candidates=max(getattr(self.config, "ROUTING_CLUSTER_PROBE_MIN", 300), top_n),
+                        min_clusters=getattr(self.config, "ROUTING_CLUSTER_PROBE", 4),
+                    )
+                    positions, sims, widened = guard(
+                        index, q, positions, probed,
+                        top=getattr(self.config, "ROUTING_CLUSTER_GUARD_CHECK", 2) * top_n,
+                    )
+            if sims is None and have_embeddings and query_embedding:
+                sims = index.cosine_scores(query_embedding)
+
             # 5. Score EVERY (pre-narrowed) doc so a doc without routing data is still a
-            #    candidate (recall-first): cosine on the topic embedding when present,
-            #    else keyword overlap on the summary, else on the filename. Keep each
-            #    doc's topic vector AND doc_id so MMR (step 6) can measure redundancy and
-            #    the caller can scope by doc_id.
+            #    candidate (recall-first): cosine on the topic embedding when present — one
+            #    matmul over the index's unit-row matrix (only the probed docs' rows on the
+            #    hierarchical path) — else keyword overlap on the summary,
+            #    else on the filename. Keep each doc's (unit) topic vector AND doc_id so MMR
+            #    (step 6) can measure redundancy and the caller can scope by doc_id.
             scored: list[tuple[float, str, Optional[list]]] = []
             id_by_filename: dict[str, str] = {}
-            for did, filename in id_to_filename.items():
+            with_summaries = 0
+            for pos in positions:
+                did, filename, summary = index.doc_ids[pos], index.filenames[pos], index.summaries[pos]
                 id_by_filename[filename] = did
-                row = summaries.get(did)
-                emb_raw = row.get("topic_embedding") if row else None
-                topic_vec: Optional[list] = None
-                if emb_raw and query_embedding:
-                    try:
-                        topic_vec = json.loads(emb_raw) if isinstance(emb_raw, str) else emb_raw
-                        score = _cosine(query_embedding, topic_vec)
-                    except Exception:
-                        topic_vec = None
-                        score = _keyword_score(query, (row or {}).get("summary", "") or filename)
-                elif row:
-                    score = _keyword_score(query, row.get("summary", "") or filename)
+                if summary or index.vec_row[pos] >= 0:
+                    with_summaries += 1
+                topic_vec = index.vector(pos) if sims is not None else None
+                if topic_vec is not None:
+                    score = float(sims[pos])
                 else:
-                    score = _keyword_score(query, filename)
+                    score = _keyword_score(query, summary or filename)
                 scored.append((score, filename, topic_vec))
 
             # 6. Diversity-aware selection (MMR). When more docs than top_n,
@@ -407,11 +496,13 @@ class DocumentRouter:
 
             elapsed = (time.perf_counter() - t0) * 1000
             logger.info(
-                "[doc_router] Routed collection %s: %d docs (%d with summaries) → top %d (MMR λ=%.2f) in %.1fms",
-                collection_id, len(scored), len(summaries), len(result_fns), lam, elapsed,
+                "[doc_router] Routed collection %s: %d docs (%d with summaries) → top %d (MMR λ=%.2f) in %.1fms%s",
+                collection_id, len(scored), with_summaries, len(result_fns), lam, elapsed,
+                f" [hierarchical: {len(scored)}/{probed_from} docs probed via {index.clusters.k} clusters"
+                f"{f', guard widened +{widened}' if widened else ''}]"
+                if probed_from is not None else "",
             )
             return [(id_by_filename[fn], fn) for fn in result_fns if fn in id_by_filename]
-
         except Exception as exc:
             logger.warning(
                 "[doc_router] route_ranked() failed for collection %s (falling back): %s",
@@ -183,7 +183,14 @@ class RAGASEvaluator:
             from ragas.llms import LangchainLLMWrapper
             from ragas.embeddings import LangchainEmbeddingsWrapper
 
-            llm = LangchainLLMWrapper(ChatOpenAI(model=self.config.LLM_MODEL_NAME))
+            from src.components.rate_limiter import Priority, llm_limit_kwargs
+
+            # RAGAS scoring is background work — BATCH priority leaves chat its headroom.
+            llm = LangchainLLMWrapper(ChatOpenAI(
+                model=self.config.LLM_MODEL_NAME,
+                **llm_limit_kwargs("openai", self.config.LLM_MODEL_NAME,
+                                   Priority.BATCH, est_tokens=2000),
+            ))
             emb = LangchainEmbeddingsWrapper(
                 OpenAIEmbeddings(model=self.config.EMBEDDING_MODEL_NAME)
             )
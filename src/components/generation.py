@@ -8,28 +8,16 @@ from langchain_core.output_parsers import StrOutputParser
 from src.components.retrieval import RetrievalManager
 from src.components.config import Config
 from src.components.circuit_breaker import get_openai_breaker, CircuitOpenError
+from src.components.rate_limiter import llm_limit_kwargs
 from src.logger import get_logger
 logger = get_logger(__name__)
 import logging
 logging.getLogger("httpx").setLevel(logging.WARNING)
-from src.utils import format_chat_history
+from src.utils import format_chat_history, _token_budget_cut
 
 # ── Token budget (Invariant R2) ───────────────────────────────────────────────
-# Use tiktoken when available; fall back to a chars/4 heuristic so we never hard-
-# crash if the package isn't installed yet.
-try:
-    import tiktoken
-    _ENC = tiktoken.get_encoding("cl100k_base")
-
-    def _count_tokens(text: str) -> int:
-        return len(_ENC.encode(text, disallowed_special=()))
-except ImportError:  # pragma: no cover
-    logger.warning("tiktoken not installed — using char/4 token estimate (install tiktoken for accuracy)")
-
-    def _count_tokens(text: str) -> int:  # type: ignore[misc]
-        return len(text) // 4
-
-
+# Counts come from the ingest-stamped ``token_count`` metadata (a memoised tiktoken
+# encode — chars/4 without tiktoken — for legacy chunks); see src/utils.py.
 def _apply_token_budget(docs: List[Document], budget: int) -> tuple[List[Document], bool]:
     """Trim docs (furthest-first) so their combined text fits within *budget* tokens.
 
@@ -38,13 +26,11 @@ def _apply_token_budget(docs: List[Document], budget: int) -> tuple[List[Documen
     """
     if not docs:
         return docs, False
-    total = sum(_count_tokens(d.page_content) for d in docs)
+    # Drop from the tail (lowest-ranked after reranking) until we fit.
+    keep, total = _token_budget_cut(docs, budget)
     if total <= budget:
         return docs, False
-    # Drop from the tail (lowest-ranked after reranking) until we fit.
-    kept = list(docs)
-    while len(kept) > 1 and sum(_count_tokens(d.page_content) for d in kept) > budget:
-        kept.pop()
+    kept = list(docs[:keep])
     logger.warning(
         "Context token budget (%d) exceeded (%d tokens across %d docs); "
         "trimmed to %d docs. Consider enabling map-reduce Brain path.",
@@ -79,6 +65,10 @@ class AnswerGenration():
             temperature=0.1,
             api_key=self.config.OPENAI_API_KEY,
             request_timeout=30,   # P6: prevent infinite hang on OpenAI upstream stall
+            # generate() / generate_stream() record outcomes on the OpenAI breaker themselves;
+            # the limiter's callback recording them too would count every call twice.
+            **llm_limit_kwargs("openai", self.config.LLM_MODEL_NAME, est_tokens=4000,
+                               breaker_outcomes=False),
         )
 
         self.prompt = ChatPromptTemplate.from_messages([
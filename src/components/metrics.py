@@ -73,3 +73,28 @@ user_llm_cost = Counter(
     "Approximate input token usage per user (len(text)//4 heuristic)",
     ["user_id", "model", "operation"],
 )
+
+# ── LLM rate limiter (rate_limiter.py) ──
+# Time a call spent queued for bucket capacity, by provider and priority; plus why it was
+# held (bucket / half_open breaker) or turned away (timeout / circuit_open / 429 penalty).
+llm_ratelimit_wait = Histogram(
+    "docquery_llm_ratelimit_wait_seconds",
+    "Time an LLM call waited for rate-limit capacity",
+    ["provider", "priority"],
+    buckets=[0, 0.05, 0.25, 1, 2.5, 5, 10, 30, 60, 120],
+)
+
+llm_ratelimit_throttled = Counter(
+    "docquery_llm_ratelimit_throttled_total",
+    "LLM calls held or rejected by the rate limiter",
+    ["provider", "priority", "reason"],
+)
+
+# ── Request cancellation (cancellation.py) ──
+# LLM calls NOT made because the client disconnected mid-stream, by the stage that skipped
+# them (brain_map / brain_verify / brain_reduce / agent_step / grid_cell / ...).
+llm_calls_avoided = Counter(
+    "docquery_llm_calls_avoided_total",
+    "LLM calls skipped because the requesting client disconnected",
+    ["stage"],
+)
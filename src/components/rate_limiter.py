@@ -0,0 +1,443 @@
+"""
+DocQuery — Distributed LLM Rate Limiter
+
+One token bucket per (provider, model), shared through Redis by every API process and
+Celery worker, so the Brain's MAP pool, the verifier pools, agent loops, the review grid
+and RAGAS scoring stop discovering the provider's limits independently via 429s.
+
+Two buckets per model, both refilled continuously:
+  - requests/min (RPM)
+  - tokens/min   (TPM) — a call is charged its prompt estimate + max output up front (the
+    way the providers meter TPM), then SETTLED to the real usage when the response lands.
+
+Priorities (interactive chat over background work):
+  INTERACTIVE — chat, Brain, agent chat          may drain a bucket to 0
+  STANDARD    — (reserved for non-user-facing single calls)   must leave 10% of it
+  BATCH       — review grid, redline, RAGAS      must leave 30% of it
+A batch caller waits while the bucket is below its floor, so a grid backlog can never
+spend the headroom a user's next question needs.
+
+Hooks into circuit_breaker.py:
+  - breaker OPEN      → fail fast with CircuitOpenError (never queue behind a dead provider);
+  - breaker HALF_OPEN → only INTERACTIVE calls go through; background work waits for CLOSED,
+    so a recovering provider is probed by user traffic, not a grid's backlog;
+  - every limited call's outcome is recorded on its provider's breaker (``slot`` and the
+    LangChain callback), so Brain, agent and grid traffic can trip and close it — not just
+    the /query stream. Gating reads ``breaker.current_state()``, which never moves the
+    breaker, so a queued call that is never sent can't leave it HALF_OPEN.
+A 429 seen by any caller drains a quarter of both buckets for EVERY process (penalize).
+
+Queue-wait metrics: docquery_llm_ratelimit_wait_seconds{provider,priority} and
+docquery_llm_ratelimit_throttled_total{provider,priority,reason} (metrics.py), plus
+``llm_limiter.stats()`` on /health.
+
+Degrades like map_cache / SemanticCache: any Redis error falls back to an in-process bucket
+for LLM_RATE_LIMIT_BACKOFF_S (the limit is then per process, not shared). LLM_RATE_LIMIT=false
+disables limiting entirely.
+
+Usage:
+    # LangChain chat models — the native BaseRateLimiter hook + a usage callback
+    ChatOpenAI(model=m, ..., **llm_limit_kwargs("openai", m, est_tokens=3000))
+
+    # direct SDK calls (agent_core models)
+    with llm_limiter.slot("anthropic", model, tokens=est, priority=Priority.BATCH) as slot:
+        resp = client.messages.create(...)
+        slot.used(resp.usage.input_tokens + resp.usage.output_tokens)
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from src.components.circuit_breaker import CircuitOpenError, CircuitState, get_breaker
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+LLM_RATE_LIMIT: bool = os.getenv("LLM_RATE_LIMIT", "true").lower() == "true"
+LLM_RATE_LIMIT_DEFAULT_RPM: int = int(os.getenv("LLM_RATE_LIMIT_DEFAULT_RPM", "500"))
+LLM_RATE_LIMIT_DEFAULT_TPM: int = int(os.getenv("LLM_RATE_LIMIT_DEFAULT_TPM", "200000"))
+# Per-model overrides, JSON: {"openai:gpt-4o-mini": {"rpm": 5000, "tpm": 2000000},
+#                             "anthropic:*": {"rpm": 50, "tpm": 40000}}
+LLM_RATE_LIMITS: str = os.getenv("LLM_RATE_LIMITS", "")
+# A caller still waiting after this long gets RateLimitTimeout (its usual degrade path).
+LLM_RATE_LIMIT_MAX_WAIT_S: float = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT_S", "120"))
+LLM_RATE_LIMIT_BACKOFF_S: float = float(os.getenv("LLM_RATE_LIMIT_BACKOFF_S", "30"))
+
+_PREFIX = "docquery:llm_rl:"
+_PENALTY_FRAC = 0.25        # share of both buckets a 429 drains
+_POLL_MAX_S = 1.0           # longest single sleep while queued (re-checks the breaker)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    STANDARD = 1
+    BATCH = 2
+
+
+# Share of each bucket a priority must leave untouched.
+_FLOOR = {Priority.INTERACTIVE: 0.0, Priority.STANDARD: 0.10, Priority.BATCH: 0.30}
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a call waited LLM_RATE_LIMIT_MAX_WAIT_S without getting capacity."""
+    pass
+
+
+@dataclass
+class Limit:
+    rpm: int
+    tpm: int
+
+
+def _parse_limits(raw: str) -> Dict[str, Limit]:
+    if not raw:
+        return {}
+    try:
+        return {k: Limit(int(v["rpm"]), int(v["tpm"])) for k, v in json.loads(raw).items()}
+    except Exception as exc:
+        logger.warning("[rate_limiter] LLM_RATE_LIMITS unparseable — using defaults: %s", exc)
+        return {}
+
+
+_LIMITS = _parse_limits(LLM_RATE_LIMITS)
+
+
+def limits_for(provider: str, model: str) -> Limit:
+    """Exact "provider:model", then "provider:*", then the env defaults."""
+    return (_LIMITS.get(f"{provider}:{model}") or _LIMITS.get(f"{provider}:*")
+            or Limit(LLM_RATE_LIMIT_DEFAULT_RPM, LLM_RATE_LIMIT_DEFAULT_TPM))
+
+
+def estimate_tokens(obj: Any) -> int:
+    """len//4 heuristic (as metrics.user_llm_cost) over the serialised prompt."""
+    text = obj if isinstance(obj, str) else json.dumps(obj, default=str)
+    return len(text) // 4
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """openai.RateLimitError / anthropic.RateLimitError / any HTTP 429, without importing SDKs."""
+    return (type(exc).__name__ == "RateLimitError"
+            or getattr(exc, "status_code", None) == 429
+            or getattr(getattr(exc, "response", None), "status_code", None) == 429)
+
+
+# Atomic two-bucket take. Levels refill at cap/60 per second from the server clock, so every
+# process sees one bucket. Returns the seconds to wait ("0" = admitted and charged). force=1
+# charges unconditionally (settle / penalize / refunds via a negative cost).
+_TAKE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local function level(key, cap)
+  local v = redis.call('HMGET', key, 'l', 't')
+  local l, ts = tonumber(v[1]), tonumber(v[2])
+  if l == nil then return cap end
+  return math.min(cap, l + (now - ts) * cap / 60)
+end
+local rpm, tpm = tonumber(ARGV[1]), tonumber(ARGV[2])
+local rc, tc, floor = tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5])
+local rl, tl = level(KEYS[1], rpm), level(KEYS[2], tpm)
+local wait = 0
+if ARGV[6] ~= '1' then
+  local rneed, tneed = rc + floor * rpm - rl, tc + floor * tpm - tl
+  if rneed > 0 then wait = math.max(wait, rneed * 60 / rpm) end
+  if tneed > 0 then wait = math.max(wait, tneed * 60 / tpm) end
+end
+if wait == 0 then rl = rl - rc; tl = tl - tc end
+redis.call('HSET', KEYS[1], 'l', rl, 't', now)
+redis.call('HSET', KEYS[2], 'l', tl, 't', now)
+redis.call('EXPIRE', KEYS[1], 120)
+redis.call('EXPIRE', KEYS[2], 120)
+return tostring(wait)
+"""
+
+
+class _LocalBuckets:
+    """In-process mirror of _TAKE_LUA — the fallback while Redis is unreachable."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[str, tuple] = {}
+
+    def take(self, key: str, lim: Limit, rc: float, tc: float, floor: float, force: bool) -> float:
+        with self._lock:
+            now = time.monotonic()
+            rl, tl, ts = self._state.get(key, (lim.rpm, lim.tpm, now))
+            rl = min(lim.rpm, rl + (now - ts) * lim.rpm / 60)
+            tl = min(lim.tpm, tl + (now - ts) * lim.tpm / 60)
+            wait = 0.0
+            if not force:
+                rneed, tneed = rc + floor * lim.rpm - rl, tc + floor * lim.tpm - tl
+                if rneed > 0:
+                    wait = max(wait, rneed * 60 / lim.rpm)
+                if tneed > 0:
+                    wait = max(wait, tneed * 60 / lim.tpm)
+            if wait == 0:
+                rl, tl = rl - rc, tl - tc
+            self._state[key] = (rl, tl, now)
+            return wait
+
+
+class LLMRateLimiter:
+    """Shared RPM/TPM token buckets per (provider, model) with priorities and breaker gating."""
+
+    def __init__(self, enabled: bool = LLM_RATE_LIMIT, client=None, shared: bool = True,
+                 max_wait_s: float = LLM_RATE_LIMIT_MAX_WAIT_S):
+        self.enabled = enabled
+        self.shared = shared
+        self.max_wait_s = max_wait_s
+        self._redis = client
+        self._script = None
+        self._down_until = 0.0
+        self._local = _LocalBuckets()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    # ── backend ─────────────────────────────────────────────────────────────────
+
+    def _client(self):
+        if not self.shared or time.monotonic() < self._down_until:
+            return None
+        if self._redis is None:
+            try:
+                import redis as redis_lib
+                self._redis = redis_lib.from_url(
+                    os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                    socket_connect_timeout=1, socket_timeout=1,
+                )
+            except Exception as exc:
+                logger.warning("[rate_limiter] Redis unavailable — per-process buckets: %s", exc)
+                self.shared = False
+                return None
+        return self._redis
+
+    def _take(self, provider: str, model: str, rc: float, tc: float, floor: float,
+              force: bool = False) -> float:
+        lim = limits_for(provider, model)
+        if not force:
+            # A call bigger than its priority's share of the bucket could never be admitted.
+            tc = min(tc, lim.tpm * (1 - floor))
+        key = f"{_PREFIX}{provider}:{model}"
+        r = self._client()
+        if r is not None:
+            try:
+                if self._script is None:
+                    self._script = r.register_script(_TAKE_LUA)
+                return float(self._script(keys=[key + ":req", key + ":tok"],
+                                          args=[lim.rpm, lim.tpm, rc, tc, floor, int(force)]))
+            except Exception as exc:
+                self._down_until = time.monotonic() + LLM_RATE_LIMIT_BACKOFF_S
+                logger.warning("[rate_limiter] Redis bucket failed — per-process for %.0fs: %s",
+                               LLM_RATE_LIMIT_BACKOFF_S, exc)
+        return self._local.take(key, lim, rc, tc, floor, force)
+
+    # ── public API ──────────────────────────────────────────────────────────────
+
+    def acquire(self, provider: str, model: str, tokens: int = 0,
+                priority: Priority = Priority.INTERACTIVE, blocking: bool = True) -> float:
+        """Block until one request + ``tokens`` fit under the bucket's priority floor.
+
+        Returns the seconds spent queued. Raises CircuitOpenError while the provider's breaker
+        is OPEN and RateLimitTimeout after max_wait_s. ``blocking=False`` returns -1.0 instead
+        of waiting when capacity isn't there right now.
+        """
+        if not self.enabled:
+            return 0.0
+        breaker = get_breaker(provider)
+        t0 = time.monotonic()
+        throttled = None
+        while True:
+            state = breaker.current_state() if breaker is not None else CircuitState.CLOSED
+            if state == CircuitState.OPEN:
+                self._record(provider, priority, time.monotonic() - t0, reason="circuit_open")
+                raise CircuitOpenError(f"Circuit '{breaker.name}' is OPEN — not queueing LLM call.")
+            if state == CircuitState.HALF_OPEN and priority != Priority.INTERACTIVE:
+                wait, reason = _POLL_MAX_S, "half_open"
+            else:
+                wait, reason = self._take(provider, model, 1, tokens, _FLOOR[priority]), "bucket"
+            if wait <= 0:
+                waited = time.monotonic() - t0
+                self._record(provider, priority, waited, reason=throttled)
+                return waited
+            if not blocking:
+                return -1.0
+            throttled = throttled or reason
+            elapsed = time.monotonic() - t0
+            if elapsed + min(wait, _POLL_MAX_S) > self.max_wait_s:
+                self._record(provider, priority, elapsed, reason="timeout")
+                raise RateLimitTimeout(
+                    f"{provider}:{model} — no capacity for {Priority(priority).name} call after "
+                    f"{elapsed:.1f}s ({reason})."
+                )
+            # Jitter so processes released by the same refill don't stampede the bucket.
+            time.sleep(min(wait, _POLL_MAX_S) * random.uniform(1.0, 1.2))
+
+    def settle(self, provider: str, model: str, delta_tokens: int) -> None:
+        """Correct the TPM charge once real usage is known (negative = refund)."""
+        if self.enabled and delta_tokens:
+            self._take(provider, model, 0, delta_tokens, 0.0, force=True)
+
+    def penalize(self, provider: str, model: str) -> None:
+        """A 429 reached us — drain a share of both buckets for every process."""
+        if not self.enabled:
+            return
+        lim = limits_for(provider, model)
+        self._take(provider, model, lim.rpm * _PENALTY_FRAC, lim.tpm * _PENALTY_FRAC, 0.0, force=True)
+        self._record(provider, None, 0.0, reason="429")
+        logger.warning("[rate_limiter] 429 from %s:%s — bucket drained %.0f%%",
+                       provider, model, _PENALTY_FRAC * 100)
+
+    def record_outcome(self, provider: str, error: Optional[BaseException] = None) -> None:
+        """Feed a finished call to the provider's circuit breaker: success when ``error`` is
+        None, failure for a provider error. Our own refusals (CircuitOpenError,
+        RateLimitTimeout) and cancellation (GeneratorExit / CancelledError — not Exception
+        subclasses) are not the provider's fault and are not counted."""
+        if not self.enabled:
+            return
+        breaker = get_breaker(provider)
+        if breaker is None:
+            return
+        if error is None:
+            breaker.record_success()
+        elif (isinstance(error, Exception)
+              and not isinstance(error, (CircuitOpenError, RateLimitTimeout))):
+            breaker.record_failure()
+
+    @contextmanager
+    def slot(self, provider: str, model: str, tokens: int,
+             priority: Priority = Priority.INTERACTIVE):
+        """acquire → body → settle to ``slot.used(n)`` (if reported); a 429 in the body penalizes.
+        The body's outcome is recorded on the provider's breaker."""
+        s = _Slot()
+        self.acquire(provider, model, tokens, priority)
+        try:
+            yield s
+        except BaseException as exc:
+            if is_rate_limit_error(exc):
+                self.penalize(provider, model)
+            self.record_outcome(provider, exc)
+            raise
+        else:
+            self.record_outcome(provider)
+        finally:
+            if s.actual is not None:
+                self.settle(provider, model, s.actual - tokens)
+
+    # ── metrics ─────────────────────────────────────────────────────────────────
+
+    def _record(self, provider: str, priority: Optional[Priority], waited: float,
+                reason: Optional[str] = None) -> None:
+        label = Priority(priority).name.lower() if priority is not None else "any"
+        with self._lock:
+            s = self._stats.setdefault(f"{provider}:{label}", {
+                "calls": 0, "throttled": 0, "wait_s_total": 0.0, "wait_s_max": 0.0,
+                "timeouts": 0, "circuit_open": 0, "rate_limited_429": 0,
+            })
+            if reason == "429":
+                s["rate_limited_429"] += 1
+            elif reason == "timeout":
+                s["timeouts"] += 1
+            elif reason == "circuit_open":
+                s["circuit_open"] += 1
+            else:
+                s["calls"] += 1
+                s["throttled"] += 1 if reason else 0
+                s["wait_s_total"] += waited
+                s["wait_s_max"] = max(s["wait_s_max"], waited)
+        try:
+            from src.components.metrics import llm_ratelimit_throttled, llm_ratelimit_wait
+            if reason in (None, "bucket", "half_open"):
+                llm_ratelimit_wait.labels(provider=provider, priority=label).observe(waited)
+            if reason:
+                llm_ratelimit_throttled.labels(provider=provider, priority=label, reason=reason).inc()
+        except Exception:  # noqa: BLE001 — metrics never break a call
+            pass
+
+    def stats(self) -> dict:
+        """JSON-serialisable per provider:priority counters for the /health endpoint."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "shared": self.shared and time.monotonic() >= self._down_until,
+                "queues": {k: dict(v, wait_s_total=round(v["wait_s_total"], 3),
+                                   wait_s_max=round(v["wait_s_max"], 3))
+                           for k, v in self._stats.items()},
+            }
+
+
+class _Slot:
+    def __init__(self):
+        self.actual: Optional[int] = None
+
+    def used(self, tokens: int) -> None:
+        self.actual = int(tokens or 0)
+
+
+class LangChainRateLimiter(BaseRateLimiter, BaseCallbackHandler):
+    """Plugs LLMRateLimiter into a LangChain chat model.
+
+    As ``rate_limiter=`` it gates every generate / stream call (one request + ``est_tokens``);
+    as a callback it settles the TPM charge to the reported usage, turns a 429 into a
+    shared bucket penalty and records the outcome on the provider's breaker
+    (``breaker_outcomes=False`` for a model whose caller already records them itself).
+    """
+
+    def __init__(self, limiter: LLMRateLimiter, provider: str, model: str,
+                 priority: Priority, est_tokens: int, breaker_outcomes: bool = True):
+        self.limiter = limiter
+        self.provider = provider
+        self.model = model
+        self.priority = priority
+        self.est_tokens = est_tokens
+        self.breaker_outcomes = breaker_outcomes
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        return self.limiter.acquire(self.provider, self.model, self.est_tokens,
+                                    self.priority, blocking=blocking) >= 0
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        return await asyncio.to_thread(self.acquire, blocking=blocking)
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+        total = usage.get("total_tokens")
+        if total is None:
+            for gens in getattr(response, "generations", None) or []:
+                for g in gens:
+                    meta = getattr(getattr(g, "message", None), "usage_metadata", None) or {}
+                    if meta.get("total_tokens") is not None:
+                        total = (total or 0) + meta["total_tokens"]
+        if total is not None:
+            self.limiter.settle(self.provider, self.model, int(total) - self.est_tokens)
+        if self.breaker_outcomes:
+            self.limiter.record_outcome(self.provider)
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        if is_rate_limit_error(error):
+            self.limiter.penalize(self.provider, self.model)
+        if self.breaker_outcomes:
+            self.limiter.record_outcome(self.provider, error)
+
+
+# Process-wide singleton (the API and every Celery worker share the Redis buckets through it).
+llm_limiter = LLMRateLimiter()
+
+
+def llm_limit_kwargs(provider: str, model: str, priority: Priority = Priority.INTERACTIVE,
+                     est_tokens: int = 2000, breaker_outcomes: bool = True) -> Dict[str, Any]:
+    """``rate_limiter=`` + ``callbacks=`` kwargs for a LangChain chat model ({} when disabled)."""
+    if not llm_limiter.enabled:
+        return {}
+    rl = LangChainRateLimiter(llm_limiter, provider, model, priority, est_tokens,
+                              breaker_outcomes)
+    return {"rate_limiter": rl, "callbacks": [rl]}
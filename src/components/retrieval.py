@@ -244,6 +244,7 @@ class RetrievalManager:
         doc_id: str = None,
         doc_ids: list[str] = None,
         metadata_filter: dict = None,
+        fetch_k_override: int = None,
     ) -> list[Document]:
         """Run similarity search using a pre-computed embedding vector.
 
@@ -253,9 +254,12 @@ class RetrievalManager:
 
         apply_threshold=False keeps the top-k regardless of absolute score — used by
         per-file collection retrieval (see retrieve_across_files).
+        fetch_k_override sets the candidate pool, as in _raw_retrieve.
         """
         similarity_threshold = self.config.SIMILARITY_THRESHOLD
-        if self._hybrid:
+        if fetch_k_override:
+            fetch_k = fetch_k_override
+        elif self._hybrid:
             fetch_k = self.config.HYBRID_FETCH_K
         elif self._reranker:
             fetch_k = self.config.RERANK_INITIAL_K
@@ -307,6 +311,7 @@ class RetrievalManager:
         doc_ids: list[str] = None,
         metadata_filter: dict = None,
         collection_id: str = None,
+        query_embedding: list = None,
     ) -> list[Document]:
         """Retrieve relevant docs with optional hybrid BM25+RRF fusion and/or reranking.
 
@@ -325,6 +330,10 @@ class RetrievalManager:
         silently dropped whole documents from the answer (e.g. AWS net-sales never
         reaching MAP). Skipping it removes the timeout source; on the cloud (GPU/hosted
         rerank) it can be re-enabled via env.
+
+        query_embedding: the query's pre-computed embedding (see embed_query). The vector
+        search then skips the embed call; everything else is unchanged. A caller running
+        the SAME query against many single-file scopes (survey_collection) embeds once.
         """
         # Vault scope spanning multiple docs → guarantee each doc is represented.
         # G3: prefer the stable doc_id axis; fall back to the legacy filename balance.
@@ -347,13 +356,22 @@ class RetrievalManager:
             fetch_override = max(top_k * 4, self.config.RERANK_INITIAL_K) if rerank_on else top_k
         else:
             fetch_override = None
-        docs = self._raw_retrieve(
-            query, filename_filter, page_filter,
-            filename_filters=filename_filters, fetch_k_override=fetch_override,
-            apply_threshold=apply_threshold,
-            doc_ids=doc_ids, metadata_filter=metadata_filter,
-            collection_id=collection_id,
-        )
+        if query_embedding is not None:
+            docs = self._raw_retrieve_by_vector(
+                query_embedding, filename_filter, page_filter,
+                filename_filters=filename_filters, fetch_k_override=fetch_override,
+                apply_threshold=apply_threshold,
+                doc_ids=doc_ids, metadata_filter=metadata_filter,
+                collection_id=collection_id,
+            )
+        else:
+            docs = self._raw_retrieve(
+                query, filename_filter, page_filter,
+                filename_filters=filename_filters, fetch_k_override=fetch_override,
+                apply_threshold=apply_threshold,
+                doc_ids=doc_ids, metadata_filter=metadata_filter,
+                collection_id=collection_id,
+            )
 
         # Step 1: Hybrid BM25 + RRF fusion
         if self._hybrid and docs:
@@ -367,6 +385,10 @@ class RetrievalManager:
 
         return docs
 
+    def embed_query(self, query: str) -> list:
+        """The query's embedding, from the same model the vector store searches with."""
+        return self.vectorstore.embeddings.embed_query(query)
+
     def retrieve_by_vector(
         self,
         query_embedding: list,
@@ -0,0 +1,366 @@
+"""Hierarchical Stage-1 routing — per-vault topic CLUSTERS over the routing index.
+
+WHY: DocumentRouter scores every doc in a vault (flat scan over routing_index.VaultRoutingIndex).
+That is fine at hundreds of docs, but the firm-wide matters being onboarded hold thousands, where the
+flat scan is the routing latency floor. The hierarchical router scores the query against K cluster
+CENTROIDS first, then only the docs inside the best clusters — O(K + probed) instead of O(n).
+
+OFFLINE (the Celery worker, refresh_routing_clusters_task — after a doc's summary lands):
+  • spherical k-means (cosine) over the vault's unit topic embeddings, K ≈ √n (ROUTING_CLUSTER_K to
+    pin it), k-means++ seeded deterministically so a re-fit of the same vault is reproducible;
+  • INCREMENTAL: a refresh assigns docs that arrived since the last fit to their nearest centroid and
+    folds them into it (running mean), drops removed docs, and only re-fits from scratch once the vault
+    has drifted by ROUTING_RECLUSTER_FRACTION (default 20%) of the docs the last full fit saw;
+  • persisted next to document_summaries (migration 022: routing_clusters + routing_cluster_members).
+
+QUERY TIME (DocumentRouter.route_ranked, vaults ≥ ROUTING_HIERARCHICAL_MIN_DOCS):
+  • the index build loads the persisted model and aligns it to the index (`cluster_of` per doc). A doc
+    with no persisted assignment yet is put in its nearest centroid IN MEMORY — never unroutable;
+  • probe clusters in centroid-similarity order until ≥ ROUTING_CLUSTER_PROBE_MIN candidate docs (and
+    at least ROUTING_CLUSTER_PROBE clusters) are in — a recall floor, not a fixed cluster count;
+  • docs with NO topic embedding yet are always candidates (keyword-scored, recall-first — exactly the
+    flat router's rule), and the Step-D pre-narrow still applies first;
+  • SAMPLED RECALL GUARD (guard): each cluster keeps ROUTING_CLUSTER_SENTINELS sentinel docs
+    (farthest-point picks that span its sub-topics, chosen at index build). The query is scored against
+    the probed docs plus the sentinels of every skipped cluster only; a skipped cluster whose sentinel
+    ranks in the top (ROUTING_CLUSTER_GUARD_CHECK × top_n) cosine is probed too. Nothing scores
+    the whole vault.
+No model (022 unapplied, small vault, nothing fitted yet) ⇒ the flat scan, byte-identical.
+
+eval/hierarchical_routing_recall.py measures recall vs the flat scan (synthetic, 200 queries, top-12).
+With the probe floor at 300 and 8 sentinels per cluster: 2k docs 1.000 / worst 1.00 (4% of queries
+widened, 31% of the vault scored, 12 → 4-5 ms); 10k docs 0.998 / worst 0.92 (13.5% widened, 12%
+scored, 61-78 → 15-19 ms across runs). Without the guard the same floor gave 10k a worst query of
+0.08 (1 of 12). The guard is a sample, not a proof — the residual misses are single docs ranked ~12th
+in a neighbouring cluster; more sentinels or a higher floor didn't close them (16 sentinels: worst
+0.92 at 20% scored).
+
+Numpy only; no DB here except through the SupabaseManager methods (get/save_routing_clusters).
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+from typing import Optional
+
+import numpy as np
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# K: 0 ⇒ ⌈√n⌉ clamped to [ROUTING_CLUSTER_K_MIN, ROUTING_CLUSTER_K_MAX].
+ROUTING_CLUSTER_K: int = int(os.getenv("ROUTING_CLUSTER_K", "0"))
+ROUTING_CLUSTER_K_MIN: int = 4
+ROUTING_CLUSTER_K_MAX: int = int(os.getenv("ROUTING_CLUSTER_K_MAX", "256"))
+ROUTING_CLUSTER_ITERS: int = int(os.getenv("ROUTING_CLUSTER_ITERS", "20"))
+# Re-fit from scratch once this fraction of the last full fit's doc count has been added/removed.
+ROUTING_RECLUSTER_FRACTION: float = float(os.getenv("ROUTING_RECLUSTER_FRACTION", "0.2"))
+# Sentinel docs per cluster for the probe's recall guard (farthest-point picks, see sentinels()).
+ROUTING_CLUSTER_SENTINELS: int = int(os.getenv("ROUTING_CLUSTER_SENTINELS", "8"))
+
+
+# ── spherical k-means ─────────────────────────────────────────────────────────
+
+def _normalize_rows(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    return (m / np.where(norms > 0, norms, 1.0)).astype(np.float32, copy=False)
+
+
+def choose_k(n: int) -> int:
+    if ROUTING_CLUSTER_K > 0:
+        return max(1, min(ROUTING_CLUSTER_K, n))
+    return max(1, min(n, max(ROUTING_CLUSTER_K_MIN, min(ROUTING_CLUSTER_K_MAX, math.ceil(math.sqrt(n))))))
+
+
+def spherical_kmeans(
+    x: np.ndarray,
+    k: int,
+    iters: int = ROUTING_CLUSTER_ITERS,
+    seed: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Cosine k-means over UNIT rows `x` (n × d). Returns (centroids k × d unit, assign (n,) int32).
+
+    k-means++ init on cosine distance, deterministic for a given seed. An emptied cluster is re-seeded
+    with the point currently worst-served by its centroid, so K stays K."""
+    n = x.shape[0]
+    k = max(1, min(k, n))
+    rng = np.random.default_rng(seed)
+    centers = np.empty((k, x.shape[1]), dtype=np.float32)
+    centers[0] = x[int(rng.integers(n))]
+    best = 1.0 - x @ centers[0]
+    for j in range(1, k):
+        w = np.clip(best, 0.0, None)
+        total = float(w.sum())
+        idx = int(rng.choice(n, p=w / total)) if total > 0 else int(rng.integers(n))
+        centers[j] = x[idx]
+        best = np.minimum(best, 1.0 - x @ centers[j])
+
+    assign = np.zeros(n, dtype=np.int32)
+    for it in range(max(1, iters)):
+        sims = x @ centers.T
+        new_assign = sims.argmax(axis=1).astype(np.int32)
+        if it and np.array_equal(new_assign, assign):
+            break
+        assign = new_assign
+        sums = np.zeros_like(centers)
+        np.add.at(sums, assign, x)
+        counts = np.bincount(assign, minlength=k)
+        if (counts == 0).any():
+            served = sims[np.arange(n), assign]
+            for j in np.flatnonzero(counts == 0):
+                worst = int(served.argmin())
+                served[worst] = np.inf   # one point re-seeds at most one empty cluster
+                sums[assign[worst]] -= x[worst]
+                sums[j] = x[worst]
+                assign[worst] = j
+        centers = _normalize_rows(sums)
+    return centers, assign
+
+
+# ── the model ─────────────────────────────────────────────────────────────────
+
+class ClusterModel:
+    """A vault's clustering: unit centroids, per-cluster sizes, doc → cluster, and the full-fit size."""
+
+    __slots__ = ("centroids", "sizes", "members", "fitted_doc_count")
+
+    def __init__(self, centroids: np.ndarray, sizes, members: dict, fitted_doc_count: int):
+        self.centroids = centroids.astype(np.float32, copy=False)
+        self.sizes = np.asarray(sizes, dtype=np.int64)
+        self.members = members
+        self.fitted_doc_count = int(fitted_doc_count)
+
+    @property
+    def k(self) -> int:
+        return int(self.centroids.shape[0])
+
+    def nearest(self, vecs: np.ndarray) -> np.ndarray:
+        return (vecs @ self.centroids.T).argmax(axis=1).astype(np.int32) if len(vecs) else np.zeros(0, np.int32)
+
+    def align(self, index) -> np.ndarray:
+        """cluster_of per index position: the persisted assignment, else the nearest centroid (an
+        unassigned newcomer — in memory only), -1 for a doc without a topic embedding."""
+        out = np.full(len(index), -1, dtype=np.int32)
+        if not len(index) or not index.matrix.size or index.matrix.shape[1] != self.centroids.shape[1]:
+            return out
+        todo = []
+        for pos, did in enumerate(index.doc_ids):
+            row = int(index.vec_row[pos])
+            if row < 0:
+                continue
+            cid = self.members.get(did)
+            if cid is not None and 0 <= cid < self.k:
+                out[pos] = cid
+            else:
+                todo.append(pos)
+        if todo:
+            out[todo] = self.nearest(index.matrix[index.vec_row[todo]])
+        return out
+
+    def sentinels(self, index, cluster_of: np.ndarray, per: Optional[int] = None) -> np.ndarray:
+        """Up to `per` index positions per cluster that between them cover the cluster's sub-topics:
+        farthest-point sampling from the centroid (first the member least like it, then the member
+        least like anything picked so far). K ≈ √n clusters mix topics, and a random sample of a
+        cluster mostly lands in its dominant one — these reach the minority topics the centroid
+        hides, which is exactly where a probe goes wrong. O(n · per · dim), once per index build.
+        `per` defaults to ROUTING_CLUSTER_SENTINELS."""
+        per = ROUTING_CLUSTER_SENTINELS if per is None else per
+        if per <= 0 or not len(cluster_of) or not index.matrix.size:
+            return np.zeros(0, dtype=np.int64)
+        embedded = np.flatnonzero(cluster_of >= 0)
+        by_cluster = embedded[np.argsort(cluster_of[embedded], kind="stable")]
+        bounds = np.searchsorted(cluster_of[by_cluster], np.arange(self.k + 1))
+        out = []
+        for c in range(self.k):
+            members = by_cluster[bounds[c]:bounds[c + 1]]
+            if not len(members):
+                continue
+            x = index.matrix[index.vec_row[members]]
+            nearest = x @ self.centroids[c]
+            for _ in range(min(per, len(members))):
+                j = int(nearest.argmin())
+                out.append(int(members[j]))
+                nearest = np.maximum(nearest, x @ x[j])
+                nearest[j] = np.inf
+        return np.asarray(sorted(out), dtype=np.int64)
+
+
+def fit(index, seed: int = 0) -> Optional[ClusterModel]:
+    """A full k-means fit over every embedded doc in `index` (None when nothing is embedded)."""
+    embedded = np.flatnonzero(index.vec_row >= 0)
+    if not len(embedded):
+        return None
+    x = index.matrix[index.vec_row[embedded]]
+    centroids, assign = spherical_kmeans(x, choose_k(len(embedded)), seed=seed)
+    members = {index.doc_ids[p]: int(c) for p, c in zip(embedded, assign)}
+    return ClusterModel(centroids, np.bincount(assign, minlength=len(centroids)), members, len(embedded))
+
+
+def refresh(model: Optional[ClusterModel], index, seed: int = 0) -> tuple[Optional[ClusterModel], str]:
+    """Bring `model` up to date with the vault in `index`. Returns (model, "fit" | "incremental" | "noop").
+
+    Incremental: drop docs that left the vault, fold newcomers into their nearest centroid (running
+    mean on the unit sphere), and re-fit from scratch only once the churn since the last full fit
+    exceeds ROUTING_RECLUSTER_FRACTION — or the dimension/K no longer fit the vault."""
+    embedded = np.flatnonzero(index.vec_row >= 0)
+    if not len(embedded):
+        return None, "noop"
+    if model is None or index.matrix.shape[1] != model.centroids.shape[1]:
+        return fit(index, seed=seed), "fit"
+    current = {index.doc_ids[p]: p for p in embedded}
+    removed = [d for d in model.members if d not in current]
+    added = [d for d in current if d not in model.members]
+    churn = len(removed) + len(added)
+    if churn > ROUTING_RECLUSTER_FRACTION * max(1, model.fitted_doc_count) or model.k > len(embedded):
+        return fit(index, seed=seed), "fit"
+    if not churn:
+        return model, "noop"
+
+    members = {d: c for d, c in model.members.items() if d in current}
+    sizes = model.sizes.copy()
+    for d in removed:
+        sizes[model.members[d]] -= 1
+    sums = model.centroids * np.maximum(sizes, 0)[:, None].astype(np.float32)
+    if added:
+        vecs = index.matrix[index.vec_row[[current[d] for d in added]]]
+        assign = model.nearest(vecs)
+        np.add.at(sums, assign, vecs)
+        for d, c in zip(added, assign):
+            members[d] = int(c)
+            sizes[c] += 1
+    centroids = np.where((sizes > 0)[:, None], _normalize_rows(sums), model.centroids)
+    return ClusterModel(centroids, np.maximum(sizes, 0), members, model.fitted_doc_count), "incremental"
+
+
+def probe(
+    model: ClusterModel,
+    cluster_of: np.ndarray,
+    query_unit: np.ndarray,
+    positions: list,
+    min_candidates: int,
+    min_clusters: int = 1,
+) -> list:
+    """The candidate subset of `positions` for a query: every doc without an embedding (keyword-scored,
+    recall-first) plus the docs of the best clusters, taken in centroid-similarity order until at
+    least `min_candidates` embedded docs and `min_clusters` clusters are in."""
+    pos = np.asarray(positions, dtype=np.int64)
+    cl = cluster_of[pos]
+    keep = cl < 0
+    order = np.argsort(-(model.centroids @ query_unit), kind="stable")
+    per_cluster = np.bincount(cl[cl >= 0], minlength=model.k)
+    taken = np.zeros(model.k, dtype=bool)
+    got = 0
+    for i, c in enumerate(order):
+        if got >= min_candidates and i >= min_clusters:
+            break
+        taken[c] = True
+        got += int(per_cluster[c])
+    keep |= (cl >= 0) & taken[np.clip(cl, 0, None)]
+    return pos[keep].tolist()
+
+
+def guard(index, query_unit: np.ndarray, positions: list, candidates: list, top: int) -> tuple:
+    """The SAMPLED RECALL GUARD: score the probed `candidates` plus the sentinels of every cluster the
+    probe skipped, and widen the probe into each skipped cluster whose sentinel ranks in the top-`top`
+    cosine of the docs scored — a second round then re-checks against the raised bar. Centroid
+    similarity alone can't tell when it is wrong: a small topic can sit in a cluster whose centroid
+    ranks below the probe cut-off, and its sentinel is what scores high.
+
+    Only the candidates, the skipped clusters' sentinels and any widened cluster are ever scored — no
+    full-vault matmul. Returns (candidates, sims, clusters_added): the widened candidate positions
+    (sorted, as probe() returns them), and a cosine array aligned with the index's doc_ids that holds
+    the scores of the docs scored here (NaN elsewhere) — the router's per-doc scores. `top` ≤ 0
+    disables widening (sentinels are still not candidates)."""
+    cand = np.asarray(candidates, dtype=np.int64)
+    allowed = np.asarray(positions, dtype=np.int64)
+    cl = index.cluster_of
+    taken = np.zeros(index.clusters.k, dtype=bool)
+    taken[cl[cand][cl[cand] >= 0]] = True
+    sent = index.sentinels if index.sentinels is not None else np.zeros(0, dtype=np.int64)
+    sent = sent[np.isin(sent, allowed)]          # the pre-narrow applies to sentinels too
+    sent = sent[~taken[cl[sent]]]
+    sims = index.cosine_scores(query_unit, positions=np.concatenate([cand, sent]))
+    added = 0
+    for _ in range(2):
+        if top <= 0 or not len(sent):
+            break
+        # The bar is the top-`top` of candidates AND sentinels together: a sentinel that would rank
+        # in the top means its cluster does — and a probe holding fewer than `top` docs lets the
+        # best sentinels fill the open slots.
+        pool = np.concatenate([sims[cand], sims[sent]])
+        pool = pool[~np.isnan(pool)]
+        bar = np.partition(pool, len(pool) - top)[len(pool) - top] if len(pool) > top else -np.inf
+        hit = np.unique(cl[sent[sims[sent] >= bar]])
+        if not len(hit):
+            break
+        taken[hit] = True
+        added += len(hit)
+        cl_allowed = cl[allowed]
+        new = allowed[(cl_allowed >= 0) & np.isin(cl_allowed, hit)]
+        fresh = index.cosine_scores(query_unit, positions=new)
+        sims[new] = fresh[new]
+        cand = np.union1d(cand, new)
+        sent = sent[~taken[cl[sent]]]
+    return cand.tolist(), sims, added
+
+
+# ── persistence glue (worker side) ────────────────────────────────────────────
+
+def load_model(db, collection_id: str) -> Optional[ClusterModel]:
+    """The persisted model for a vault via db.get_routing_clusters, or None (no model / 022 unapplied /
+    a manager without the method). Never raises — routing falls back to the flat scan."""
+    getter = getattr(db, "get_routing_clusters", None)
+    if not callable(getter):
+        return None
+    try:
+        data = getter(collection_id)
+    except Exception as exc:
+        logger.debug("[routing_clusters] load failed for %s (flat scan): %s", collection_id, exc)
+        return None
+    if not data or not data.get("centroids"):
+        return None
+    try:
+        rows = sorted(data["centroids"], key=lambda r: int(r["cluster_id"]))
+        cents = np.asarray(
+            [json.loads(r["centroid"]) if isinstance(r["centroid"], str) else r["centroid"] for r in rows],
+            dtype=np.float32,
+        )
+        ids = [int(r["cluster_id"]) for r in rows]
+        if ids != list(range(len(ids))):
+            return None  # a torn write — refit rather than route on it
+        return ClusterModel(
+            _normalize_rows(cents),
+            [int(r.get("size") or 0) for r in rows],
+            {m["document_id"]: int(m["cluster_id"]) for m in (data.get("members") or [])},
+            max(int(r.get("fitted_doc_count") or 0) for r in rows),
+        )
+    except Exception as exc:
+        logger.warning("[routing_clusters] unreadable model for %s (flat scan): %s", collection_id, exc)
+        return None
+
+
+def refresh_vault_clusters(db, collection_id: str, min_docs: Optional[int] = None) -> str:
+    """Worker entrypoint: load the vault, refresh (or first-fit) its clusters and persist them.
+
+    `db` must already be scoped to the vault OWNER. Vaults below `min_docs` (default: the router's
+    ROUTING_HIERARCHICAL_MIN_DOCS) are skipped — they route flat. Returns the refresh outcome."""
+    from src.components.routing_index import VaultRoutingIndex
+    if min_docs is None:
+        from src.components.config import Config
+        min_docs = Config.ROUTING_HIERARCHICAL_MIN_DOCS
+    if min_docs <= 0:
+        return "disabled"
+    rows = db.get_vault_documents(collection_id)
+    index = VaultRoutingIndex.build(rows)
+    if len(index) < min_docs:
+        return "small"
+    model, outcome = refresh(load_model(db, collection_id), index)
+    if model is not None and outcome != "noop":
+        db.save_routing_clusters(collection_id, model)
+        from src.components import routing_index
+        routing_index.invalidate_vault(collection_id)
+    logger.info("[routing_clusters] vault %s: %s (%d docs, k=%s)",
+                collection_id, outcome, len(index), model.k if model is not None else 0)
+    return outcome
@@ -0,0 +1,410 @@
+"""Per-vault ROUTING INDEX for the Stage-1 document router — the topic-embedding matrix, cached.
+
+WHY: DocumentRouter.route_ranked used to rebuild its whole candidate set on EVERY collection query —
+fetch every member doc's `topic_embedding` (a ~1536-float JSON string) from document_summaries,
+`json.loads` each one, then `_cosine` doc-by-doc in a Python loop. On a 200-1000 doc vault that is
+megabytes of JSON and thousands of interpreted dot products per query, for data that only changes
+when a doc is added, removed or (re)summarised.
+
+A VaultRoutingIndex holds, for one vault:
+  • aligned per-doc metadata  — doc_id, filename, doc_type, fiscal_year, summary (Step D pre-narrow +
+                                the keyword fallback need nothing else);
+  • `matrix`                  — float32 (k × dim), every topic embedding L2-NORMALISED once at build,
+                                so relevance for ALL docs is one matmul: `matrix @ q̂`;
+  • `vec_row`                 — doc position → matrix row, or -1 for a doc with no (parseable) embedding
+                                yet (scored by keyword, recall-first — exactly as before).
+MMR (document_router._mmr_select) takes its redundancy vectors straight from the same matrix rows.
+
+Versioning / invalidation (never route on a stale doc set):
+  • An index is VERSIONED by the vault's doc set (sha1 of the sorted member doc_ids). The router reads
+    the member ids every query (get_collection_document_ids — which is also the access gate, so the
+    F2m contract runs on every query, cache or not) and only uses an index whose version matches, so
+    an add/remove from ANY process is picked up on the very next query.
+  • db.add_document_to_collection / remove_document_from_collection / delete_document_record and the
+    ingest-side summary writer (document_router.compute_and_store_doc_routing_data) also invalidate
+    explicitly — a re-summarised doc keeps its id, so only the explicit drop (in-process) or the TTL
+    (other processes) catches it.
+  • TTL: ROUTING_INDEX_TTL_S (default 600s) for a fully-embedded vault; ROUTING_INDEX_PENDING_TTL_S
+    (default 30s) while any doc is still waiting for its summary, so a freshly-ingested doc moves from
+    filename scoring to embedding scoring within seconds without a cross-process signal.
+
+Optional Redis tier (ROUTING_INDEX_REDIS=true): indexes are also stored in Redis (REDIS_URL) as an
+npz blob (no pickle) so other API replicas and restarts skip the rebuild. The version check applies
+to Redis hits too. Any Redis error is a miss — the DB is authoritative.
+
+Keyed by (owner, vault): the index only ever holds the OWNER's docs, and it is only consulted AFTER
+the access gate resolved that owner for the caller. ROUTING_INDEX_TTL_S=0 disables caching (every
+query rebuilds — byte-identical routing). Thread-safe (the API runs sync handlers on a thread pool).
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+ROUTING_INDEX_TTL_S: float = float(os.getenv("ROUTING_INDEX_TTL_S", "600"))
+ROUTING_INDEX_PENDING_TTL_S: float = float(os.getenv("ROUTING_INDEX_PENDING_TTL_S", "30"))
+# Bounded: a 1000-doc × 1536-dim vault is ~6 MB of float32, so cap the number of resident vaults.
+ROUTING_INDEX_MAX_VAULTS: int = int(os.getenv("ROUTING_INDEX_MAX_VAULTS", "64"))
+ROUTING_INDEX_REDIS: bool = os.getenv("ROUTING_INDEX_REDIS", "false").lower() == "true"
+
+_REDIS_PREFIX = "docquery:routing_index:"
+
+
+def doc_set_version(doc_ids) -> str:
+    """Version of a vault's doc set: order-independent hash of its member doc_ids."""
+    h = hashlib.sha1()
+    for did in sorted(str(d) for d in (doc_ids or [])):
+        h.update(did.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _parse_embedding(raw) -> Optional[np.ndarray]:
+    """document_summaries.topic_embedding (JSON text, or an already-decoded list) → float32 vector."""
+    if raw is None or raw == "" or raw == []:
+        return None
+    try:
+        vec = np.asarray(json.loads(raw) if isinstance(raw, str) else raw, dtype=np.float32)
+    except Exception:
+        return None
+    return vec if vec.ndim == 1 and vec.size else None
+
+
+class VaultRoutingIndex:
+    """One vault's routing data: aligned doc metadata + a pre-normalised float32 embedding matrix."""
+
+    __slots__ = ("version", "doc_ids", "filenames", "meta", "summaries", "matrix", "vec_row", "built_at",
+                 "clusters", "cluster_of", "sentinels")
+
+    def __init__(self, version, doc_ids, filenames, meta, summaries, matrix, vec_row, built_at=None):
+        self.version = version
+        self.doc_ids: list = doc_ids
+        self.filenames: list = filenames
+        self.meta: list = meta                # [{"doc_type", "fiscal_year"}] aligned with doc_ids
+        self.summaries: list = summaries      # summary text or None, aligned with doc_ids
+        self.matrix: np.ndarray = matrix      # (k, dim) float32, unit rows (a zero vector stays zero)
+        self.vec_row: np.ndarray = vec_row    # (n,) int32 — matrix row per doc, -1 = no embedding
+        self.built_at = built_at if built_at is not None else time.time()
+        # Hierarchical routing (routing_clusters.py): the vault's cluster model + each doc's cluster
+        # (-1 = no embedding), and each cluster's sentinel positions for the probe's recall guard.
+        # None ⇒ flat scan.
+        self.clusters = None
+        self.cluster_of: Optional[np.ndarray] = None
+        self.sentinels: Optional[np.ndarray] = None
+
+    def attach_clusters(self, model) -> None:
+        """Align a routing_clusters.ClusterModel to this index (None / unalignable ⇒ flat scan)."""
+        if model is None:
+            return
+        cluster_of = model.align(self)
+        if (cluster_of >= 0).any():
+            self.clusters, self.cluster_of = model, cluster_of
+            self.sentinels = model.sentinels(self, cluster_of)
+
+    @classmethod
+    def build(cls, rows: list, version: Optional[str] = None) -> "VaultRoutingIndex":
+        """Build from vault doc rows ({id, filename, doc_type, fiscal_year, summary, topic_embedding}).
+
+        Rows without an id or filename are skipped (the router never routed them). The matrix
+        dimension is the first parseable embedding's; a vector of any other dimension (a doc embedded
+        under an older model) is treated as missing — it falls back to keyword scoring, as a failed
+        `_cosine` did before."""
+        doc_ids, filenames, meta, summaries, vecs, vec_row = [], [], [], [], [], []
+        dim = None
+        for r in rows or []:
+            did, fn = r.get("id"), r.get("filename")
+            if not did or not fn:
+                continue
+            doc_ids.append(did)
+            filenames.append(fn)
+            meta.append({"doc_type": r.get("doc_type"), "fiscal_year": r.get("fiscal_year")})
+            summaries.append(r.get("summary"))
+            vec = _parse_embedding(r.get("topic_embedding"))
+            if vec is not None and dim is None:
+                dim = vec.size
+            if vec is not None and vec.size == dim:
+                vec_row.append(len(vecs))
+                vecs.append(vec)
+            else:
+                vec_row.append(-1)
+        if vecs:
+            matrix = np.vstack(vecs).astype(np.float32, copy=False)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.where(norms > 0, norms, 1.0)
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        return cls(
+            version if version is not None else doc_set_version(doc_ids),
+            doc_ids, filenames, meta, summaries,
+            matrix, np.asarray(vec_row, dtype=np.int32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @property
+    def pending(self) -> int:
+        """Docs with no usable topic embedding yet (scored by keyword until their summary lands)."""
+        return int((self.vec_row < 0).sum())
+
+    def has_embeddings(self, positions=None) -> bool:
+        rows = self.vec_row if positions is None else self.vec_row[positions]
+        return bool((rows >= 0).any())
+
+    def cosine_scores(self, query_embedding, positions=None) -> Optional[np.ndarray]:
+        """Cosine of the query against every embedded doc — or only those at `positions` (the
+        hierarchical probe scores its candidates, never the whole vault). Returns an (n,) float32
+        array aligned with doc_ids (NaN where a doc has no embedding or was not scored), or None when
+        the query can't be scored (no query vector / dimension mismatch ⇒ the caller keyword-scores
+        everything)."""
+        if query_embedding is None or not self.matrix.size:
+            return None
+        q = np.asarray(query_embedding, dtype=np.float32)
+        if q.ndim != 1 or q.size != self.matrix.shape[1]:
+            return None
+        qn = float(np.linalg.norm(q))
+        q = q / qn if qn > 0 else q
+        out = np.full(len(self.doc_ids), np.nan, dtype=np.float32)
+        if positions is None:
+            has = np.flatnonzero(self.vec_row >= 0)
+            sims = self.matrix @ q
+            out[has] = sims[self.vec_row[has]]
+        else:
+            pos = np.asarray(positions, dtype=np.int64)
+            pos = pos[self.vec_row[pos] >= 0]
+            out[pos] = self.matrix[self.vec_row[pos]] @ q
+        return out
+
+    def vector(self, pos: int) -> Optional[np.ndarray]:
+        """The doc's unit topic vector (a view into the matrix), or None."""
+        row = int(self.vec_row[pos])
+        return self.matrix[row] if row >= 0 else None
+
+    # ── Redis (de)serialisation — npz, no pickle ──────────────────────────────
+    def to_bytes(self) -> bytes:
+        header = json.dumps({
+            "version": self.version, "doc_ids": self.doc_ids, "filenames": self.filenames,
+            "meta": self.meta, "summaries": self.summaries, "built_at": self.built_at,
+        })
+        arrays = {"matrix": self.matrix, "vec_row": self.vec_row, "header": np.array(header)}
+        if self.clusters is not None:
+            arrays["centroids"] = self.clusters.centroids
+            arrays["cluster_of"] = self.cluster_of
+            arrays["sentinels"] = self.sentinels
+        buf = io.BytesIO()
+        np.savez(buf, **arrays)
+        return buf.getvalue()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "VaultRoutingIndex":
+        with np.load(io.BytesIO(blob), allow_pickle=False) as z:
+            h = json.loads(str(z["header"]))
+            index = cls(h["version"], h["doc_ids"], h["filenames"], h["meta"], h["summaries"],
+                        z["matrix"].astype(np.float32, copy=False),
+                        z["vec_row"].astype(np.int32, copy=False), built_at=h.get("built_at"))
+            if "centroids" in z.files:
+                from src.components.routing_clusters import ClusterModel
+                index.clusters = ClusterModel(z["centroids"], [], {}, 0)
+                index.cluster_of = z["cluster_of"].astype(np.int32, copy=False)
+                index.sentinels = (z["sentinels"].astype(np.int64, copy=False) if "sentinels" in z.files
+                                   else index.clusters.sentinels(index, index.cluster_of))
+            return index
+
+
+class RoutingIndexCache:
+    """TTL + LRU cache of VaultRoutingIndex keyed by (owner, vault), version-checked on read."""
+
+    def __init__(
+        self,
+        ttl_s: float = ROUTING_INDEX_TTL_S,
+        pending_ttl_s: float = ROUTING_INDEX_PENDING_TTL_S,
+        max_vaults: int = ROUTING_INDEX_MAX_VAULTS,
+        use_redis: bool = ROUTING_INDEX_REDIS,
+    ):
+        self.ttl_s = ttl_s
+        self.pending_ttl_s = pending_ttl_s
+        self.max_vaults = max_vaults
+        self.use_redis = use_redis
+        self._redis = None
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple[str, str], tuple[float, VaultRoutingIndex]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.invalidations = 0
+
+    def _ttl_for(self, index: VaultRoutingIndex) -> float:
+        return min(self.ttl_s, self.pending_ttl_s) if index.pending else self.ttl_s
+
+    def _redis_client(self):
+        if not self.use_redis:
+            return None
+        if self._redis is None:
+            try:
+                import redis as redis_lib
+                self._redis = redis_lib.from_url(
+                    os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                    decode_responses=False, socket_connect_timeout=1, socket_timeout=1,
+                )
+            except Exception as exc:
+                logger.warning("[routing_index] Redis unavailable — in-process only: %s", exc)
+                self.use_redis = False
+                return None
+        return self._redis
+
+    @staticmethod
+    def _redis_key(owner: str, vault_id: str) -> str:
+        return f"{_REDIS_PREFIX}{vault_id}:{owner}"
+
+    def get(self, owner: str, vault_id: str, version: str) -> Optional[VaultRoutingIndex]:
+        """The cached index for this vault IF it is for exactly this doc-set version and unexpired."""
+        if self.ttl_s <= 0:
+            return None
+        key = (str(owner), str(vault_id))
+        now = time.monotonic()
+        try:
+            with self._lock:
+                hit = self._entries.get(key)
+                if hit is not None:
+                    expires_at, index = hit
+                    if expires_at > now and index.version == version:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        return index
+                    del self._entries[key]
+        except Exception:
+            return None
+        index = self._redis_get(owner, vault_id, version)
+        if index is not None:
+            self._store(key, index, now)
+            with self._lock:
+                self.hits += 1
+            return index
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, owner: str, vault_id: str, index: VaultRoutingIndex) -> None:
+        if self.ttl_s <= 0:
+            return
+        with self._lock:
+            self.builds += 1
+        self._store((str(owner), str(vault_id)), index, time.monotonic())
+        r = self._redis_client()
+        if r is not None:
+            try:
+                r.setex(self._redis_key(owner, vault_id), max(1, int(self._ttl_for(index))), index.to_bytes())
+            except Exception as exc:
+                logger.debug("[routing_index] Redis put failed (non-fatal): %s", exc)
+
+    def _store(self, key, index, now) -> None:
+        with self._lock:
+            self._entries[key] = (now + self._ttl_for(index), index)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_vaults:
+                self._entries.popitem(last=False)
+
+    def _redis_get(self, owner, vault_id, version) -> Optional[VaultRoutingIndex]:
+        r = self._redis_client()
+        if r is None:
+            return None
+        try:
+            blob = r.get(self._redis_key(owner, vault_id))
+            if not blob:
+                return None
+            index = VaultRoutingIndex.from_bytes(blob)
+            return index if index.version == version else None
+        except Exception as exc:
+            logger.debug("[routing_index] Redis get failed (miss): %s", exc)
+            return None
+
+    def invalidate_vault(self, vault_id: str) -> None:
+        """Drop every cached index for this vault (all owners), here and in Redis."""
+        vid = str(vault_id)
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == vid]:
+                del self._entries[key]
+            self.invalidations += 1
+        r = self._redis_client()
+        if r is not None:
+            try:
+                keys = list(r.scan_iter(f"{_REDIS_PREFIX}{vid}:*", count=100))
+                if keys:
+                    r.delete(*keys)
+            except Exception as exc:
+                logger.debug("[routing_index] Redis invalidate failed (TTL bounds it): %s", exc)
+
+    def invalidate_doc(self, doc_id: str) -> None:
+        """Drop every in-process index that contains this doc (re-summarised / deleted). Redis copies
+        of vaults we can't name here expire on their (pending) TTL."""
+        did = str(doc_id)
+        with self._lock:
+            for key in [k for k, (_e, idx) in self._entries.items() if did in idx.doc_ids]:
+                del self._entries[key]
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"vaults": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "builds": self.builds, "invalidations": self.invalidations}
+
+
+# Process-wide singleton (the API process; the worker only ever invalidates).
+routing_index_cache = RoutingIndexCache()
+
+
+def invalidate_vault(vault_id: Optional[str]) -> None:
+    if vault_id:
+        routing_index_cache.invalidate_vault(vault_id)
+
+
+def invalidate_doc(doc_id: Optional[str]) -> None:
+    if doc_id:
+        routing_index_cache.invalidate_doc(doc_id)
+
+
+def load_vault_index(
+    db, collection_id: str, owner: str, hierarchical_min_docs: int = 0,
+) -> Optional[VaultRoutingIndex]:
+    """The routing index for `collection_id`, from cache when its doc-set version still matches.
+
+    Reads the member doc_ids first — get_collection_document_ids runs the access gate
+    (accessible_vault_owner), so the F2m contract is checked on EVERY query, hit or miss — then
+    returns the cached index for that exact doc set, or builds one from get_vault_documents (one
+    round-trip, 021) and caches it. A vault of at least `hierarchical_min_docs` docs (0 = never) also
+    gets its persisted cluster model (routing_clusters.py) attached at build. Returns None when the
+    manager can't supply both reads (an older/offline manager) — the router keeps its per-query path
+    for those."""
+    ids_fn = getattr(db, "get_collection_document_ids", None)
+    rows_fn = getattr(db, "get_vault_documents", None)
+    if not (callable(ids_fn) and callable(rows_fn)):
+        return None
+    doc_ids = ids_fn(collection_id) or []
+    if not doc_ids:
+        return VaultRoutingIndex.build([], version=doc_set_version([]))
+    version = doc_set_version(doc_ids)
+    index = routing_index_cache.get(owner, collection_id, version)
+    if index is not None:
+        return index
+    index = VaultRoutingIndex.build(rows_fn(collection_id), version=version)
+    if hierarchical_min_docs > 0 and len(index) >= hierarchical_min_docs:
+        from src.components.routing_clusters import load_model
+        index.attach_clusters(load_model(db, collection_id))
+    routing_index_cache.put(owner, collection_id, index)
+    return index
@@ -1,5 +1,8 @@
 import os
 import sys
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
 from typing import List, Dict, Any, Optional
 import hashlib
 
@@ -83,6 +86,56 @@ def _get_tiktoken_enc():
     return _tiktoken_enc
 
 
+# ── Chunk token counts (context budgets) ─────────────────────────────────────
+# Ingest stamps ``token_count`` on every chunk's metadata (build_langchain_documents), so
+# a context budget sums stored integers instead of re-encoding retrieved text on every
+# request. Chunks ingested before that (and web results) fall back to an encode that is
+# memoised per text — a legacy chunk retrieved again costs a dict lookup, not tiktoken.
+_tiktoken_unavailable = False
+
+
+def _token_count(text: str) -> int:
+    """cl100k token count of ``text``; a chars/4 estimate when tiktoken can't be loaded
+    (not installed, or its BPE file can't be fetched) — checked once, not per call."""
+    global _tiktoken_unavailable
+    if not _tiktoken_unavailable:
+        try:
+            enc = _get_tiktoken_enc()
+        except Exception as e:  # noqa: BLE001 — a missing encoder must not fail a request
+            _tiktoken_unavailable = True
+            from src.logger import get_logger
+            get_logger(__name__).warning("tiktoken unavailable (%s) — using char/4 token estimate", e)
+        else:
+            return len(enc.encode(text, disallowed_special=()))
+    return len(text) // 4
+
+
+_cached_token_count = lru_cache(maxsize=4096)(_token_count)
+
+
+def _doc_token_count(doc) -> int:
+    """A chunk's token count: the ingest-stamped ``token_count`` when present (Pinecone
+    hands numbers back as floats), else a memoised encode of its text."""
+    stamped = (getattr(doc, "metadata", None) or {}).get("token_count")
+    if isinstance(stamped, (int, float)) and stamped >= 0:
+        return int(stamped)
+    return _cached_token_count(doc.page_content or "")
+
+
+def _token_budget_cut(docs: list, budget: int) -> tuple:
+    """(k, total): keep ``docs[:k]`` — the longest ranked prefix whose tokens fit in
+    ``budget``, never fewer than one doc — out of ``total`` tokens overall.
+
+    One count per doc and a prefix-sum bisect, instead of re-summing the survivors
+    after every drop from the tail.
+    """
+    prefix = list(accumulate(_doc_token_count(d) for d in docs))
+    total = prefix[-1] if prefix else 0
+    if total <= budget:
+        return len(docs), total
+    return max(1, bisect_right(prefix, budget)), total
+
+
 def format_chat_history(chat_history: list, window: int = 6, max_tokens: int = 2000) -> str:
     """Format last N messages into a string for LLM prompt injection.
 
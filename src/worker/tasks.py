@@ -227,6 +227,14 @@ def process_document_task(
         )
         uploads_total.labels(status="success").inc()
 
+        # A re-ingest keeps its doc_id: drop the Brain's cached MAP extracts for it now
+        # that the new vectors are live (map_cache.py). Non-fatal — TTL bounds them anyway.
+        try:
+            from src.components.brain.map_cache import invalidate_doc
+            invalidate_doc(doc_id)
+        except Exception as cache_exc:
+            logger.debug("[%s] MAP cache invalidation skipped: %s", doc_id, cache_exc)
+
         total_time = time.perf_counter() - t_start
         logger.info("[%s] Document ready: %d chunks in %.1fs (parse=%.1fs, embed=%.1fs)",
                     doc_id, len(chunks), total_time, t_parse, t_embed)
@@ -256,6 +264,16 @@ def process_document_task(
         except Exception as router_exc:
             logger.warning("[%s] Doc routing data failed (non-fatal): %s", doc_id, router_exc)
 
+        # -- Hierarchical routing: fold the new doc into its vault's topic clusters (offline,
+        # debounced — a bulk upload of 500 docs triggers one refresh, not 500). Non-fatal; the
+        # task itself skips vaults below ROUTING_HIERARCHICAL_MIN_DOCS.
+        if collection_id:
+            try:
+                schedule_routing_cluster_refresh(collection_id, user_id)
+            except Exception as cluster_exc:
+                logger.warning("[%s] Routing cluster refresh not scheduled (non-fatal): %s",
+                               doc_id, cluster_exc)
+
         return {"status": "ready", "chunks": len(chunks), "time_s": round(total_time, 1)}
 
     except Exception as exc:
@@ -292,6 +310,63 @@ def process_document_task(
             logger.warning("[%s] Could not remove temp file %s: %s", doc_id, tmp_path, e)
 
 
+# Debounce window for routing-cluster refreshes: the first ingest into a vault schedules one refresh
+# this many seconds out; later ingests inside the window ride along with it.
+ROUTING_CLUSTER_REFRESH_DELAY_S = int(os.getenv("ROUTING_CLUSTER_REFRESH_DELAY_S", "60"))
+
+
+def schedule_routing_cluster_refresh(collection_id: str, user_id: str) -> bool:
+    """Enqueue refresh_routing_clusters_task for a vault unless one is already pending.
+
+    The pending marker is a Redis SET NX with the debounce window as its TTL (the broker's Redis).
+    If Redis can't be reached the refresh is enqueued anyway — an extra refresh is only wasted work.
+    Returns True when a task was enqueued."""
+    try:
+        import redis as redis_lib
+        from src.worker.celery_app import REDIS_URL
+        r = redis_lib.from_url(REDIS_URL, socket_connect_timeout=1, socket_timeout=1)
+        fresh = r.set(f"docquery:routing_clusters:pending:{collection_id}", "1",
+                      nx=True, ex=ROUTING_CLUSTER_REFRESH_DELAY_S + 60)
+        if not fresh:
+            return False
+    except Exception as exc:
+        logger.debug("[routing_clusters] debounce unavailable, enqueueing: %s", exc)
+    refresh_routing_clusters_task.apply_async(
+        args=[collection_id, user_id], countdown=ROUTING_CLUSTER_REFRESH_DELAY_S,
+    )
+    return True
+
+
+@celery.task(bind=True, max_retries=1, default_retry_delay=120)
+def refresh_routing_clusters_task(self, collection_id: str, user_id: str):
+    """Refresh (or first-fit) a vault's hierarchical-routing clusters (routing_clusters.py).
+
+    Runs as the uploading user; the clusters are read and written under the vault OWNER resolved by
+    accessible_vault_owner (a staffed uploader refreshes the owner's vault, a user without access
+    refreshes nothing). Incremental unless the vault has drifted past ROUTING_RECLUSTER_FRACTION."""
+    from src.components.db import SupabaseManager
+    from src.components.routing_clusters import refresh_vault_clusters
+
+    try:
+        import redis as redis_lib
+        from src.worker.celery_app import REDIS_URL
+        redis_lib.from_url(REDIS_URL, socket_connect_timeout=1, socket_timeout=1).delete(
+            f"docquery:routing_clusters:pending:{collection_id}")
+    except Exception:
+        pass  # the marker's TTL clears it anyway
+
+    sb = SupabaseManager(use_service_role=True)
+    sb._user = type("User", (), {"id": user_id})()
+    try:
+        outcome = refresh_vault_clusters(sb, collection_id)
+        return {"status": outcome, "collection_id": collection_id}
+    except Exception as exc:
+        logger.warning("[routing_clusters] refresh failed for vault %s: %s", collection_id, exc)
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc)
+        return {"status": "failed", "collection_id": collection_id, "error": str(exc)}
+
+
 @celery.task(bind=True)
 def run_evaluation_task(
     self,